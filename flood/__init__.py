@@ -16,9 +16,11 @@ from flood.ops import get_dependency_versions
 from flood.runners import load_single_run_test_payload
 from flood.runners import load_single_run_results_payload
 from flood.runners import run
+from flood.runners import scan_single_run_raw_output
 from flood.tests.equality_tests import run_equality_test
 from flood.tests.load_tests import run_load_test
 from flood.tests.load_tests import run_load_tests
+from flood.tests.subscription_tests import run_subscription_test
 
 
 __version__ = '0.3.1'
@@ -21,7 +21,9 @@ def run_cli(raw_command: str | None = None) -> None:
         (): 'flood.cli.root_command',
         ('help',): 'toolcli.command_utils.standard_subcommands.help_command',
         ('ls',): 'flood.cli.ls_command',
+        ('outliers',): 'flood.cli.outliers_command',
         ('print',): 'flood.cli.print_command',
+        ('record',): 'flood.cli.record_command',
         ('report',): 'flood.cli.report_command',
         ('samples', 'collect'): 'flood.cli.samples_collect_command',
         ('samples', 'download'): 'flood.cli.samples_download_command',
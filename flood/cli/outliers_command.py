@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import typing
+
+import toolcli
+
+import flood
+
+
+help_message = """replay slowest calls of previous test results against idle node
+
+each slowest call recorded by [metavar]--deep-check[/metavar] is sent sequentially, and its
+isolated latency is compared to its latency under load, to tell whether it
+is intrinsically expensive or was only slow from queueing"""  # noqa: E501
+
+
+def get_command_spec() -> toolcli.CommandSpec:
+    return {
+        'f': outliers_command,
+        'help': help_message,
+        'args': [
+            {
+                'name': 'output_dir',
+                'help': 'output directory of previous deep checked test',
+            },
+            {
+                'name': ['-n', '--nodes'],
+                'help': 'names of nodes to replay calls against (default = all)',  # noqa: E501
+                'nargs': '+',
+            },
+            {
+                'name': ['--repeats'],
+                'type': int,
+                'help': 'times to send each call (default = [metavar]3[/metavar])',  # noqa: E501
+            },
+            {
+                'name': ['--top'],
+                'type': int,
+                'help': 'number of slowest calls to replay (default = all)',
+            },
+        ],
+        'examples': [
+            'flood_output --repeats 5',
+            'flood_output --nodes reth --top 5',
+        ],
+    }
+
+
+def outliers_command(
+    output_dir: str,
+    nodes: typing.Sequence[str] | None,
+    repeats: int | None,
+    top: int | None,
+) -> None:
+    if repeats is None:
+        repeats = 3
+
+    results_payload = flood.load_single_run_results_payload(output_dir)
+    results = results_payload['results']
+    if nodes is None:
+        nodes = list(results.keys())
+
+    remeasurements = {}
+    for name in nodes:
+        if name not in results:
+            raise Exception('no results for node: ' + str(name))
+        slowest_calls = flood.tests.load_tests.get_slowest_calls(results[name])
+        if top is not None:
+            slowest_calls = slowest_calls[:top]
+
+        print()
+        flood.user_io.print_header(
+            'Replaying '
+            + str(len(slowest_calls))
+            + ' slowest calls of '
+            + name
+            + '...'
+        )
+        remeasurements[name] = flood.tests.load_tests.remeasure_slowest_calls(
+            node=results_payload['nodes'][name],
+            slowest_calls=slowest_calls,
+            n_repeats=repeats,
+        )
+        print()
+        flood.tests.load_tests.print_slowest_call_remeasurements(
+            remeasurements[name], indent=4
+        )
+
+    single_runner_io = flood.runners.single_runner.single_runner_io
+    single_runner_io._save_single_run_remeasurements(
+        output_dir=output_dir, remeasurements=remeasurements
+    )
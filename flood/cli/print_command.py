@@ -41,17 +41,43 @@ def print_single(
     output_dir: str, metrics: typing.Sequence[str]
 ) -> None:
     test_payload = flood.load_single_run_test_payload(output_dir)
-    test = flood.generate_test(**test_payload['test_parameters'])
-    results_payload = flood.load_single_run_results_payload(output_dir)
+    test_parameters = test_payload['test_parameters']
+    results_payload = flood.load_single_run_results_payload(
+        output_dir, deep=False
+    )
     results = results_payload['results']
 
+    # rates and durations are read from results rather than regenerating
+    # the calls of the test, which can require decoding whole logs
+    first_result = next(iter(results.values()))
+    rates = test_parameters.get('rates')
+    if rates is None:
+        rates = first_result['target_rate']
+    durations = test_parameters.get('durations')
+    if durations is None:
+        durations = [
+            int(duration) for duration in first_result['target_duration']
+        ]
+
     # print test summary
     flood.runners.single_runner.single_runner_summary._print_single_run_preamble_copy(
         test_name=test_payload['name'],
-        rates=[subtest['rate'] for subtest in test['attacks']],
-        durations=[subtest['duration'] for subtest in test['attacks']],
-        vegeta_args=[subtest['vegeta_args'] for subtest in test['attacks']],
+        rates=rates,
+        durations=durations,
+        vegeta_args=test_parameters.get('vegeta_args'),
         output_dir=output_dir,
+        adaptive_duration=test_parameters.get('adaptive_duration'),
+        warmup=test_parameters.get('warmup'),
+        engine=test_parameters.get('engine'),
+        max_connections=test_parameters.get('max_connections'),
+        max_workers=test_parameters.get('max_workers'),
+        batch_size=test_parameters.get('batch_size'),
+        mix=test_parameters.get('mix'),
+        replay=test_parameters.get('replay'),
+        workload_model=test_parameters.get('workload_model'),
+        distribution=test_parameters.get('distribution'),
+        repeats=test_parameters.get('repeats'),
+        block_range=test_parameters.get('block_range'),
     )
 
     # print node data
@@ -80,7 +106,7 @@ def print_multiple(output_dirs: typing.Sequence[str]) -> None:
     outputs = []
     for output_dir in output_dirs:
         test_payload = flood.load_single_run_test_payload(output_dir)
-        output = flood.load_single_run_results_payload(output_dir)
+        output = flood.load_single_run_results_payload(output_dir, deep=False)
         test_payloads.append(test_payload)
         outputs.append(output)
 
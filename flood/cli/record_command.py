@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import toolcli
+
+import flood
+
+
+help_message = """record live JSON-RPC traffic for later replay
+
+runs a reverse proxy that forwards requests to upstream node and appends
+each request to ndjson recordings in output directory, until ctrl-c
+
+replay recordings with [metavar]flood replay NODE --replay-log OUTPUT_DIR[/metavar]"""  # noqa: E501
+
+
+def get_command_spec() -> toolcli.CommandSpec:
+    return {
+        'f': record_command,
+        'help': help_message,
+        'args': [
+            {
+                'name': ['--upstream'],
+                'required': True,
+                'help': 'url of node that requests are forwarded to',
+            },
+            {
+                'name': ['--listen'],
+                'help': 'address to listen on, as [metavar]\\[host]:port[/metavar] (default = [metavar]:9545[/metavar])',  # noqa: E501
+            },
+            {
+                'name': ['-o', '--output'],
+                'help': 'directory of recordings \\[default = current directory]',  # noqa: E501
+            },
+            {
+                'name': ['--max-file-size'],
+                'type': float,
+                'help': 'MB per recording file before rotating (default = [metavar]100[/metavar])',  # noqa: E501
+            },
+            {
+                'name': ['--max-connections'],
+                'type': int,
+                'help': 'max number of open connections to upstream',
+            },
+            {
+                'name': ['--duration'],
+                'type': float,
+                'help': 'seconds to record before stopping',
+            },
+        ],
+        'examples': [
+            '--upstream http://localhost:8545 --listen :9545 -o recordings',
+        ],
+    }
+
+
+def record_command(
+    upstream: str,
+    listen: str | None,
+    output: str | None,
+    max_file_size: float | None,
+    max_connections: int | None,
+    duration: float | None,
+) -> None:
+    import os
+
+    if output is None:
+        output = os.getcwd()
+    if listen is None:
+        listen = flood.ops.default_listen
+    if max_file_size is None:
+        use_max_file_size = flood.ops.default_max_file_size
+    else:
+        use_max_file_size = int(max_file_size * 1e6)
+
+    flood.ops.run_recording_proxy(
+        upstream=upstream,
+        output_dir=output,
+        listen=listen,
+        max_file_size=use_max_file_size,
+        max_connections=max_connections,
+        duration=duration,
+    )
@@ -62,6 +62,27 @@ def get_command_spec() -> toolcli.CommandSpec:
                 'help': 'run equality test instead of load test',
                 'action': 'store_true',
             },
+            {
+                'name': ['--subscribe'],
+                'help': 'run subscription test instead of load test, [metavar]TEST[/metavar] is\n[metavar]newHeads[/metavar], [metavar]logs[/metavar], or [metavar]newPendingTransactions[/metavar]',  # noqa: E501
+                'action': 'store_true',
+            },
+            {
+                'name': ['--subscribers'],
+                'nargs': '+',
+                'type': int,
+                'help': 'numbers of subscribers in subscription test\n(default = [metavar]1 10 100 1000[/metavar])',  # noqa: E501
+            },
+            {
+                'name': ['--late-threshold'],
+                'type': float,
+                'help': 'seconds after earliest subscriber that a notification is\nlate in subscription test (default = [metavar]1[/metavar])',  # noqa: E501
+            },
+            {
+                'name': ['--node-pid'],
+                'type': int,
+                'help': 'pid of local node, used to report node memory in\nsubscription test',  # noqa: E501
+            },
             {
                 'name': ['-m', '--mode'],
                 'choices': ['stress', 'spike', 'soak'],
@@ -78,6 +99,98 @@ def get_command_spec() -> toolcli.CommandSpec:
                 'type': int,
                 'help': 'number of seconds to test each rate (default = [metavar]30[/metavar])',  # noqa: E501
             },
+            {
+                'name': ['--target-precision'],
+                'type': float,
+                'help': 'extend each rate until the confidence interval of\n[metavar]--precision-metrics[/metavar] is narrower than this fraction,\n[metavar]--duration[/metavar] becomes the max duration',  # noqa: E501
+            },
+            {
+                'name': ['--precision-metrics'],
+                'nargs': '+',
+                'help': 'latency percentiles used by [metavar]--target-precision[/metavar]\n(default = [metavar]p99[/metavar])',  # noqa: E501
+            },
+            {
+                'name': ['--min-duration'],
+                'type': int,
+                'help': 'min seconds to test each rate with [metavar]--target-precision[/metavar]\n(default = [metavar]10[/metavar])',  # noqa: E501
+            },
+            {
+                'name': ['--warmup'],
+                'type': int,
+                'help': 'seconds of load sent before each rate, excluded from metrics',  # noqa: E501
+            },
+            {
+                'name': ['--warmup-requests'],
+                'type': int,
+                'help': 'number of requests sent before each rate, excluded from\nmetrics (alternative to [metavar]--warmup[/metavar])',  # noqa: E501
+            },
+            {
+                'name': ['--batch-size'],
+                'type': int,
+                'help': 'send calls as json-rpc batches of this many calls',
+            },
+            {
+                'name': ['--mix'],
+                'nargs': '+',
+                'help': 'weights of tests interleaved in a [metavar]mix[/metavar] test, as\n[metavar]TEST=WEIGHT[/metavar] pairs, e.g. [metavar]eth_call=60 eth_getLogs=20[/metavar]',  # noqa: E501
+            },
+            {
+                'name': ['--distribution'],
+                'help': 'how often each block, address, slot, or transaction is\nrequested: [metavar]uniform[/metavar], [metavar]zipf[:EXPONENT][/metavar], [metavar]hot_set[:FRACTION[:PROBABILITY]][/metavar],\nor [metavar]recent[:MEAN_AGE][/metavar] (default = [metavar]uniform[/metavar])',  # noqa: E501
+            },
+            {
+                'name': ['--repeat-ratio'],
+                'type': float,
+                'help': 'fraction of calls that repeat an earlier call of the same rate',  # noqa: E501
+            },
+            {
+                'name': ['--reuse-distance'],
+                'help': 'how many calls back repeats reach, as a distribution of\n[metavar]--distribution[/metavar], e.g. [metavar]recent:100[/metavar] (default = [metavar]uniform[/metavar])',  # noqa: E501
+            },
+            {
+                'name': ['--block-range'],
+                'help': 'sample blocks within [metavar]START:END[/metavar], e.g. [metavar]16000000:17000000[/metavar],\nwithin blocks whose state every node has with [metavar]node[/metavar], or\nwithin the latest N of those blocks with [metavar]latest-N[/metavar]\n(default = range hard-coded for each test)',  # noqa: E501
+            },
+            {
+                'name': ['--replay-log'],
+                'help': 'request log replayed by a [metavar]replay[/metavar] test, as ndjson of\n[metavar]timestamp[/metavar] and [metavar]body[/metavar], or proxy log lines of [metavar]$msec $request_body[/metavar]',  # noqa: E501
+            },
+            {
+                'name': ['--replay-speeds'],
+                'nargs': '+',
+                'type': float,
+                'help': 'replay log at original timing sped up by each factor\n(default = [metavar]1[/metavar])',  # noqa: E501
+            },
+            {
+                'name': ['--replay-shuffle'],
+                'help': 'replay log as shuffled stream at [metavar]--rates[/metavar] instead of\noriginal timing',  # noqa: E501
+                'action': 'store_true',
+            },
+            {
+                'name': ['--synth-log'],
+                'help': 'request log that a [metavar]synth[/metavar] test fits a workload model to,\nin any format of [metavar]--replay-log[/metavar]',  # noqa: E501
+            },
+            {
+                'name': ['--synth-growth'],
+                'nargs': '+',
+                'type': float,
+                'help': 'test [metavar]synth[/metavar] workload at each multiple of its recorded rate,\ninstead of [metavar]--rates[/metavar]',  # noqa: E501
+            },
+            {
+                'name': ['--engine'],
+                'choices': ['vegeta', 'persistent', 'websocket', 'ipc'],
+                'help': 'engine used to send requests, [metavar]persistent[/metavar] keeps\nconnections open across rates and counts connection reuse,\n[metavar]websocket[/metavar] and [metavar]ipc[/metavar] multiplex requests over ws or unix\nsocket connections (default = websocket for ws urls, ipc\nfor ipc urls, otherwise vegeta)',  # noqa: E501
+            },
+            {
+                'name': ['--max-connections'],
+                'type': int,
+                'help': 'max number of open connections per node, or number of\nwebsocket or ipc connections',  # noqa: E501
+            },
+            {
+                'name': ['--max-workers'],
+                'type': int,
+                'help': 'max number of requests in flight per node',
+            },
             {
                 'name': ['-o', '--output'],
                 'dest': 'output_dir',
@@ -129,6 +242,10 @@ def get_command_spec() -> toolcli.CommandSpec:
             'eth_getBlockByNumber localhost:8545',
             'eth_getLogs localhost:8545 localhost:8546 localhost:8547',
             'all client1=0.0.0.0:8545 client2=0.0.0.0:8546 --equality',
+            'replay localhost:8545 --replay-log requests.ndjson --replay-speeds 1 2 10',  # noqa: E501
+            'synth localhost:8545 --synth-log requests.ndjson --synth-growth 1 2 10',  # noqa: E501
+            'mix localhost:8545 --mix eth_call=60 eth_getLogs=20 eth_getBlockByNumber=20',  # noqa: E501
+            'newHeads ws://localhost:8546 --subscribe --subscribers 10 100',
         ],
     }
 
@@ -141,11 +258,34 @@ def root_command(
     mode: flood.LoadTestMode | None,
     rates: typing.Sequence[int] | typing.Sequence[str] | None,
     duration: int | None,
+    target_precision: float | None,
+    precision_metrics: typing.Sequence[str] | None,
+    min_duration: int | None,
+    warmup: int | None,
+    warmup_requests: int | None,
+    batch_size: int | None,
+    mix: typing.Sequence[str] | None,
+    distribution: str | None,
+    repeat_ratio: float | None,
+    reuse_distance: str | None,
+    block_range: str | None,
+    replay_log: str | None,
+    replay_speeds: typing.Sequence[float] | None,
+    replay_shuffle: bool,
+    synth_log: str | None,
+    synth_growth: typing.Sequence[float] | None,
+    engine: flood.LoadTestEngine | None,
+    max_connections: int | None,
+    max_workers: int | None,
     random_seed: int | None,
     dry: bool,
     quiet: bool,
     figures: bool,
     equality: bool,
+    subscribe: bool,
+    subscribers: typing.Sequence[int] | None,
+    late_threshold: float | None,
+    node_pid: int | None,
     save_raw_output: bool,
     deep_check: bool,
     remote_update: bool,
@@ -157,7 +297,70 @@ def root_command(
     if nodes is not None and len(nodes) == 0:
         nodes = None
 
-    if equality:
+    if not subscribe:
+        if subscribers is not None:
+            raise Exception('subscribers only used in subscription test')
+        if late_threshold is not None:
+            raise Exception('late_threshold only used in subscription test')
+        if node_pid is not None:
+            raise Exception('node_pid only used in subscription test')
+
+    if subscribe:
+        if equality:
+            raise Exception('specify only one of --equality or --subscribe')
+        if rates is not None:
+            raise Exception('rates not used in subscription test')
+        if target_precision is not None:
+            raise Exception('target_precision not used in subscription test')
+        if precision_metrics is not None or min_duration is not None:
+            raise Exception(
+                'precision_metrics and min_duration not used in'
+                ' subscription test'
+            )
+        if warmup is not None or warmup_requests is not None:
+            raise Exception('warmup not used in subscription test')
+        if batch_size is not None:
+            raise Exception('batch_size not used in subscription test')
+        if mix is not None:
+            raise Exception('mix not used in subscription test')
+        if distribution is not None:
+            raise Exception('distribution not used in subscription test')
+        if repeat_ratio is not None:
+            raise Exception('repeat_ratio not used in subscription test')
+        if reuse_distance is not None:
+            raise Exception('reuse_distance not used in subscription test')
+        if block_range is not None:
+            raise Exception('block_range not used in subscription test')
+        if replay_log is not None:
+            raise Exception('replay_log not used in subscription test')
+        if replay_speeds is not None or replay_shuffle:
+            raise Exception('replay options not used in subscription test')
+        if synth_log is not None:
+            raise Exception('synth_log not used in subscription test')
+        if synth_growth is not None:
+            raise Exception('synth_growth not used in subscription test')
+        if engine is not None:
+            raise Exception('engine not used in subscription test')
+        if max_connections is not None or max_workers is not None:
+            raise Exception(
+                'max_connections and max_workers not used in subscription test'
+            )
+        if dry:
+            raise Exception('dry not used in subscription test')
+        if nodes is None:
+            raise Exception('must specify nodes for subscription test')
+        flood.run_subscription_test(
+            subscription=test,  # type: ignore
+            nodes=nodes,
+            subscriber_counts=subscribers,
+            duration=duration,
+            late_threshold=late_threshold,
+            node_pid=node_pid,
+            verbose=verbose,
+            output_dir=output_dir,
+        )
+
+    elif equality:
         if output_dir is not None:
             raise Exception('output_dir not used in equality test')
         if metrics is not None:
@@ -168,6 +371,41 @@ def root_command(
             raise Exception('rates not used in equality test')
         if duration is not None:
             raise Exception('duration not used in equality test')
+        if target_precision is not None:
+            raise Exception('target_precision not used in equality test')
+        if precision_metrics is not None or min_duration is not None:
+            raise Exception(
+                'precision_metrics and min_duration not used in'
+                ' equality test'
+            )
+        if warmup is not None or warmup_requests is not None:
+            raise Exception('warmup not used in equality test')
+        if batch_size is not None:
+            raise Exception('batch_size not used in equality test')
+        if mix is not None:
+            raise Exception('mix not used in equality test')
+        if distribution is not None:
+            raise Exception('distribution not used in equality test')
+        if repeat_ratio is not None:
+            raise Exception('repeat_ratio not used in equality test')
+        if reuse_distance is not None:
+            raise Exception('reuse_distance not used in equality test')
+        if block_range is not None:
+            raise Exception('block_range not used in equality test')
+        if replay_log is not None:
+            raise Exception('replay_log not used in equality test')
+        if replay_speeds is not None or replay_shuffle:
+            raise Exception('replay options not used in equality test')
+        if synth_log is not None:
+            raise Exception('synth_log not used in equality test')
+        if synth_growth is not None:
+            raise Exception('synth_growth not used in equality test')
+        if engine is not None:
+            raise Exception('engine not used in equality test')
+        if max_connections is not None or max_workers is not None:
+            raise Exception(
+                'max_connections and max_workers not used in equality test'
+            )
         if dry:
             raise Exception('dry not used in equality test')
         if not figures:
@@ -187,6 +425,75 @@ def root_command(
         if save_raw_output:
             include_deep_output.append('raw')
 
+        adaptive_duration = None
+        if target_precision is not None:
+            adaptive_duration = flood.generators.generate_adaptive_duration(
+                target_precision=target_precision,
+                metrics=precision_metrics,
+                min_duration=min_duration,
+            )
+        elif precision_metrics is not None or min_duration is not None:
+            raise Exception(
+                'must specify --target-precision to use adaptive durations'
+            )
+
+        use_warmup: flood.Warmup | None = None
+        if warmup is not None and warmup_requests is not None:
+            raise Exception('specify only one of --warmup or --warmup-requests')
+        elif warmup is not None or warmup_requests is not None:
+            use_warmup = {'duration': warmup, 'requests': warmup_requests}
+
+        use_mix = None
+        if mix is not None:
+            use_mix = flood.generators.parse_mix(mix)
+
+        use_distribution = None
+        if distribution is not None:
+            use_distribution = flood.generators.parse_distribution(
+                distribution
+            )
+
+        repeats = None
+        if repeat_ratio is not None:
+            use_reuse_distance = None
+            if reuse_distance is not None:
+                use_reuse_distance = flood.generators.parse_distribution(
+                    reuse_distance
+                )
+            repeats = flood.tests.load_tests.create_repeats(
+                repeat_ratio, reuse_distance=use_reuse_distance
+            )
+        elif reuse_distance is not None:
+            raise Exception(
+                'must specify --repeat-ratio to use --reuse-distance'
+            )
+
+        use_block_range = None
+        if block_range is not None:
+            use_block_range = flood.generators.parse_block_range(block_range)
+
+        replay = None
+        if replay_log is not None:
+            replay = flood.generators.create_replay(
+                replay_log, speeds=replay_speeds, shuffle=replay_shuffle
+            )
+        elif replay_speeds is not None or replay_shuffle:
+            raise Exception('must specify --replay-log to replay requests')
+
+        workload_model = None
+        if synth_log is not None:
+            workload_model = flood.generators.fit_workload_model(synth_log)
+            if synth_growth is not None:
+                if rates is not None:
+                    raise Exception(
+                        'specify only one of --rates or --synth-growth'
+                    )
+                rates = flood.generators.get_growth_rates(
+                    workload_model, synth_growth
+                )
+        elif synth_growth is not None:
+            raise Exception('must specify --synth-log to use --synth-growth')
+
         if rates is not None:
             rates = [int(rate) for rate in rates]
         flood.run(
@@ -204,5 +511,17 @@ def root_command(
             include_deep_output=include_deep_output,
             deep_check=deep_check,
             vegeta_args=vegeta_args,
+            adaptive_duration=adaptive_duration,
+            warmup=use_warmup,
+            engine=engine,
+            max_connections=max_connections,
+            max_workers=max_workers,
+            batch_size=batch_size,
+            mix=use_mix,
+            replay=replay,
+            workload_model=workload_model,
+            distribution=use_distribution,
+            repeats=repeats,
+            block_range=use_block_range,
         )
 
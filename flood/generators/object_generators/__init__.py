@@ -1,3 +1,4 @@
+from .access_distributions import *
 from .address_generators import *
 from .block_generators import *
 from .call_generators import *
@@ -0,0 +1,193 @@
+"""access distributions that control how often each object is requested
+
+objects are sampled by rank, where rank 0 is the hottest object:
+- blocks are ranked by age, so rank 0 is the most recent block
+- samples of addresses, slots, and transactions are ranked in a random order
+
+distributions:
+- uniform: every object is equally likely, so most requests are cache misses
+- zipf: rank r is requested with probability proportional to 1 / (r + 1)^s
+- hot_set: hot_probability of requests go to the hottest hot_fraction of
+  objects, and the rest go to the other objects
+- recent: ranks are exponentially distributed with mean mean_age
+"""
+from __future__ import annotations
+
+import typing
+
+from flood import spec
+
+if typing.TYPE_CHECKING:
+    import numpy as np
+
+
+distribution_names = ['uniform', 'zipf', 'hot_set', 'recent']
+
+
+def create_distribution(
+    name: spec.AccessDistributionName,
+    *,
+    exponent: float | None = None,
+    hot_fraction: float | None = None,
+    hot_probability: float | None = None,
+    mean_age: float | None = None,
+) -> spec.AccessDistribution:
+    """create access distribution, using defaults for unspecified parameters
+
+    defaults are exponent 1.0, hot_fraction 0.01, hot_probability 0.9, and
+    mean_age 1000
+    """
+    distribution: spec.AccessDistribution = {
+        'name': name,
+        'exponent': None,
+        'hot_fraction': None,
+        'hot_probability': None,
+        'mean_age': None,
+    }
+    if name == 'zipf':
+        distribution['exponent'] = exponent if exponent is not None else 1.0
+    elif name == 'hot_set':
+        distribution['hot_fraction'] = (
+            hot_fraction if hot_fraction is not None else 0.01
+        )
+        distribution['hot_probability'] = (
+            hot_probability if hot_probability is not None else 0.9
+        )
+    elif name == 'recent':
+        distribution['mean_age'] = mean_age if mean_age is not None else 1000
+    validate_distribution(distribution)
+    return distribution
+
+
+def validate_distribution(distribution: spec.AccessDistribution) -> None:
+    name = distribution['name']
+    if name not in distribution_names:
+        raise Exception('invalid distribution: ' + str(name))
+    exponent = distribution.get('exponent')
+    hot_fraction = distribution.get('hot_fraction')
+    hot_probability = distribution.get('hot_probability')
+    mean_age = distribution.get('mean_age')
+    if name == 'zipf':
+        if exponent is None or exponent <= 0:
+            raise Exception('zipf exponent must be positive')
+    elif name == 'hot_set':
+        if hot_fraction is None or not 0 < hot_fraction < 1:
+            raise Exception('hot_fraction must be between 0 and 1')
+        if hot_probability is None or not 0 <= hot_probability <= 1:
+            raise Exception('hot_probability must be between 0 and 1')
+    elif name == 'recent':
+        if mean_age is None or mean_age <= 0:
+            raise Exception('mean_age must be positive')
+
+
+def parse_distribution(text: str) -> spec.AccessDistribution:
+    """parse distribution from strings like zipf:1.2 or hot_set:0.01:0.9
+
+    forms are uniform, zipf[:EXPONENT], hot_set[:FRACTION[:PROBABILITY]],
+    and recent[:MEAN_AGE]
+    """
+    name, *args = text.split(':')
+    try:
+        values = [float(arg) for arg in args]
+    except ValueError:
+        raise Exception('invalid distribution parameters: ' + text)
+    max_args = {'uniform': 0, 'zipf': 1, 'hot_set': 2, 'recent': 1}
+    if name not in max_args:
+        raise Exception('invalid distribution: ' + str(name))
+    if len(values) > max_args[name]:
+        raise Exception('too many parameters for distribution: ' + text)
+    if name == 'zipf':
+        return create_distribution('zipf', exponent=_get(values, 0))
+    elif name == 'hot_set':
+        return create_distribution(
+            'hot_set',
+            hot_fraction=_get(values, 0),
+            hot_probability=_get(values, 1),
+        )
+    elif name == 'recent':
+        return create_distribution('recent', mean_age=_get(values, 0))
+    else:
+        return create_distribution('uniform')
+
+
+def _get(values: typing.Sequence[float], index: int) -> float | None:
+    if index < len(values):
+        return values[index]
+    else:
+        return None
+
+
+def is_uniform(distribution: spec.AccessDistribution | None) -> bool:
+    return distribution is None or distribution['name'] == 'uniform'
+
+
+def format_distribution(distribution: spec.AccessDistribution) -> str:
+    """format distribution in the form accepted by parse_distribution"""
+    name = distribution['name']
+    if name == 'zipf':
+        args = [distribution['exponent']]
+    elif name == 'hot_set':
+        args = [distribution['hot_fraction'], distribution['hot_probability']]
+    elif name == 'recent':
+        args = [distribution['mean_age']]
+    else:
+        args = []
+    return ':'.join([name] + ['%g' % arg for arg in args if arg is not None])
+
+
+def sample_ranks(
+    n: int,
+    population_size: int,
+    *,
+    distribution: spec.AccessDistribution,
+    rng: np.random.Generator,
+) -> typing.Any:
+    """sample n ranks in [0, population_size), where rank 0 is hottest"""
+    import numpy as np
+
+    validate_distribution(distribution)
+    if population_size <= 0:
+        raise Exception('population_size must be positive')
+    name = distribution['name']
+
+    if name == 'uniform':
+        return rng.integers(population_size, size=n)
+
+    elif name == 'zipf':
+        # inverse cdf of continuous zipf over [1, population_size + 1)
+        s = distribution['exponent']
+        assert s is not None
+        u = rng.random(n)
+        upper = population_size + 1.0
+        if s == 1:
+            x = upper**u
+        else:
+            x = (1 + u * (upper ** (1 - s) - 1)) ** (1 / (1 - s))
+        ranks = np.floor(x).astype(np.int64) - 1
+
+    elif name == 'hot_set':
+        hot_fraction = distribution['hot_fraction']
+        hot_probability = distribution['hot_probability']
+        assert hot_fraction is not None and hot_probability is not None
+        n_hot = round(population_size * hot_fraction)
+        n_hot = min(population_size, max(1, n_hot))
+        n_cold = population_size - n_hot
+        hot = rng.random(n) < hot_probability
+        if n_cold == 0:
+            hot[:] = True
+        ranks = np.where(
+            hot,
+            rng.integers(n_hot, size=n),
+            n_hot + rng.integers(max(n_cold, 1), size=n),
+        )
+
+    elif name == 'recent':
+        mean_age = distribution['mean_age']
+        assert mean_age is not None
+        ranks = np.floor(rng.exponential(mean_age, size=n)).astype(np.int64)
+        ranks = ranks % population_size
+
+    else:
+        raise Exception('invalid distribution: ' + str(name))
+
+    return np.clip(ranks, 0, population_size - 1)
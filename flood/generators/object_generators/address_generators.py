@@ -10,12 +10,14 @@ def generate_contract_addresses(
     n: int,
     network: str,
     random_seed: flood.RandomSeed | None = None,
+    distribution: flood.AccessDistribution | None = None,
 ) -> typing.Sequence[str]:
     return generators.load_samples(
         network=network,
         datatype='contracts',
         n=n,
         random_seed=random_seed,
+        distribution=distribution,
     )
 
 
@@ -23,10 +25,12 @@ def generate_eoas(
     n: int,
     network: str,
     random_seed: flood.RandomSeed | None = None,
+    distribution: flood.AccessDistribution | None = None,
 ) -> typing.Sequence[str]:
     return generators.load_samples(
         network=network,
         datatype='eoas',
         n=n,
         random_seed=random_seed,
+        distribution=distribution,
     )
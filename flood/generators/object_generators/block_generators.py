@@ -4,6 +4,7 @@ import typing
 
 from flood import spec
 from .. import rng_utils
+from . import access_distributions
 
 
 def generate_block_numbers(
@@ -15,16 +16,35 @@ def generate_block_numbers(
     sort: bool = False,
     random_seed: spec.RandomSeed | None = None,
     network: str | None = None,
+    distribution: spec.AccessDistribution | None = None,
 ) -> typing.Sequence[int]:
+    """generate block numbers in [start_block, end_block]
+
+    non-uniform distributions rank blocks by age, so that the hottest block is
+    end_block, and sample blocks with replacement
+    """
     import numpy as np
 
     # seed a generator
     rng = rng_utils.get_rng(random_seed=random_seed)
 
     # generate blocks
-    all_blocks = np.arange(start_block, end_block + 1)
-    chosen_array = rng.choice(all_blocks, size=n, replace=(n > len(all_blocks)))
-    chosen: list[int] = chosen_array.tolist()
+    chosen: list[int]
+    if access_distributions.is_uniform(distribution):
+        all_blocks = np.arange(start_block, end_block + 1)
+        chosen_array = rng.choice(
+            all_blocks, size=n, replace=(n > len(all_blocks))
+        )
+        chosen = chosen_array.tolist()
+    else:
+        assert distribution is not None
+        ages = access_distributions.sample_ranks(
+            n,
+            end_block - start_block + 1,
+            distribution=distribution,
+            rng=rng,
+        )
+        chosen = (end_block - ages).tolist()
 
     # sort
     if sort:
@@ -37,6 +57,7 @@ def generate_block_hashes(
     n: int,
     network: str | None = None,
     random_seed: spec.RandomSeed | None = None,
+    distribution: spec.AccessDistribution | None = None,
 ) -> typing.Sequence[str]:
     raise NotImplementedError()
 
@@ -53,8 +74,26 @@ def generate_block_ranges(
     random_seed: spec.RandomSeed | None = None,
     method: str = 'strides',
     network: str | None = None,
+    distribution: spec.AccessDistribution | None = None,
 ) -> typing.Sequence[tuple[int, int]]:
-    if method == 'strides':
+    """generate block ranges of range_size blocks within [start, end_block]
+
+    non-uniform distributions rank ranges by the age of their end block, and
+    may produce overlapping ranges
+    """
+    if not access_distributions.is_uniform(distribution):
+        end_blocks = generate_block_numbers(
+            n=n,
+            start_block=start_block + range_size,
+            end_block=end_block,
+            sort=sort,
+            random_seed=random_seed,
+            distribution=distribution,
+        )
+        return [
+            (block_end - range_size, block_end) for block_end in end_blocks
+        ]
+    elif method == 'strides':
         return _generate_block_ranges_strides(
             n=n,
             range_size=range_size,
@@ -182,3 +221,110 @@ def _generate_block_ranges_individual(
         ranges_list = list(ranges)
         rng.shuffle(ranges_list)
         return ranges_list
+
+
+#
+# # block ranges
+#
+
+# bands of block age, in blocks behind head, as (min_age, max_age)
+block_age_buckets: typing.Mapping[str, tuple[int, int]] = {
+    'head-1k': (0, 1_000),
+    'head-100k': (1_000, 100_000),
+    'head-1m': (100_000, 1_000_000),
+}
+
+
+def validate_block_range(block_range: tuple[int, int]) -> None:
+    if isinstance(block_range, str):
+        raise Exception('block range shorthand must be resolved against nodes')
+    if len(block_range) != 2:
+        raise Exception('block_range must be (start_block, end_block)')
+    start_block, end_block = block_range
+    if not 0 <= start_block <= end_block:
+        raise Exception('block_range must satisfy 0 <= start <= end')
+
+
+def parse_block_range(text: str) -> spec.BlockRangeShorthand:
+    """parse block range from strings like 16000000:17000000
+
+    node and latest-N are kept as shorthand, see resolve_block_range()
+    """
+    if text == 'node':
+        return text
+    if text.startswith('latest-'):
+        if not text[len('latest-') :].isdecimal():
+            raise Exception('block range should have form latest-N')
+        return text
+    if text.count(':') != 1:
+        raise Exception('block range should have form START:END')
+    start, end = text.split(':')
+    try:
+        block_range = (int(start), int(end))
+    except ValueError:
+        raise Exception('invalid block range: ' + text)
+    validate_block_range(block_range)
+    return block_range
+
+
+def resolve_block_range(
+    block_range: spec.BlockRangeShorthand,
+    block_bounds: typing.Sequence[tuple[int, int]],
+) -> tuple[int, int]:
+    """resolve block range shorthand using (earliest, latest) block of nodes
+
+    - node: blocks available on every node
+    - latest-N: latest N blocks available on every node
+
+    the oldest quarter of a pruned window is skipped, because its state can
+    be pruned while the test runs
+    """
+    if not isinstance(block_range, str):
+        validate_block_range(block_range)
+        return block_range
+    if len(block_bounds) == 0:
+        raise Exception('need block bounds of nodes to resolve block range')
+    earliest_block = max(earliest for earliest, latest in block_bounds)
+    latest_block = min(latest for earliest, latest in block_bounds)
+    if earliest_block > latest_block:
+        raise Exception('nodes have no blocks in common')
+    if earliest_block > 0:
+        earliest_block += (latest_block - earliest_block) // 4
+    if block_range == 'node':
+        return (earliest_block, latest_block)
+    elif block_range.startswith('latest-'):
+        n_blocks = int(block_range[len('latest-') :])
+        return (max(earliest_block, latest_block - n_blocks), latest_block)
+    else:
+        raise Exception('invalid block range: ' + str(block_range))
+
+
+def get_block_age_ranges(
+    head_block: int,
+    *,
+    buckets: typing.Mapping[str, tuple[int, int]] | None = None,
+    genesis_blocks: int | None = 1_000_000,
+    earliest_block: int = 0,
+) -> typing.Mapping[str, tuple[int, int]]:
+    """get block range of each block age bucket, relative to head_block
+
+    each bucket covers ages in [min_age, max_age), buckets reaching past
+    earliest_block are truncated or omitted, and a genesis bucket covering
+    the first genesis_blocks blocks is added unless genesis_blocks is None
+    """
+    if buckets is None:
+        buckets = block_age_buckets
+    block_ranges = {}
+    for name, (min_age, max_age) in buckets.items():
+        if min_age < 0 or max_age <= min_age:
+            raise Exception('bucket ages must satisfy 0 <= min_age < max_age')
+        end_block = head_block - min_age
+        if end_block < earliest_block:
+            continue
+        start_block = max(earliest_block, head_block - max_age + 1)
+        block_ranges[name] = (start_block, end_block)
+    if genesis_blocks is not None:
+        end_block = min(genesis_blocks, head_block)
+        if end_block >= earliest_block:
+            block_ranges['genesis'] = (earliest_block, end_block)
+    return block_ranges
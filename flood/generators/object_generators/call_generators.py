@@ -21,18 +21,23 @@ def generate_calls_eth_get_block_by_number(
     network: str | None = None,
     block_numbers: typing.Sequence[int] | None = None,
     random_seed: flood.RandomSeed | None = None,
+    distribution: flood.AccessDistribution | None = None,
+    block_range: tuple[int, int] | None = None,
 ) -> typing.Sequence[flood.Call]:
     import ctc.rpc
 
     if block_numbers is None:
         if n_calls is None:
             raise Exception('must floodify more parameters')
+        if block_range is None:
+            block_range = (0, 16_000_000)
         block_numbers = block_generators.generate_block_numbers(
             n=n_calls,
             random_seed=random_seed,
-            start_block=0,
-            end_block=16_000_000,
+            start_block=block_range[0],
+            end_block=block_range[1],
             network=network,
+            distribution=distribution,
         )
     return [
         ctc.rpc.construct_eth_get_block_by_number(block_number=block_number)
@@ -46,6 +51,7 @@ def generate_calls_eth_get_block_by_hash(
     network: str | None = None,
     block_hashes: typing.Sequence[str] | None = None,
     random_seed: flood.RandomSeed | None = None,
+    distribution: flood.AccessDistribution | None = None,
 ) -> typing.Sequence[flood.Call]:
     import ctc.rpc
 
@@ -56,6 +62,7 @@ def generate_calls_eth_get_block_by_hash(
             n=n_calls,
             network=network,
             random_seed=random_seed,
+            distribution=distribution,
         )
     return [
         ctc.rpc.construct_eth_get_block_by_hash(block_hash=block_hash)
@@ -69,19 +76,24 @@ def generate_calls_eth_fee_history(
     network: str | None = None,
     random_seed: flood.RandomSeed | None = None,
     block_numbers: typing.Sequence[int] | None = None,
-    block_count: int | None = None
+    block_count: int | None = None,
+    distribution: flood.AccessDistribution | None = None,
+    block_range: tuple[int, int] | None = None,
 ) -> typing.Sequence[flood.Call]:
     import ctc.rpc
 
     if block_numbers is None:
         if n_calls is None:
             raise Exception('must floodify more parameters')
+        if block_range is None:
+            block_range = (13_000_000, 17_000_000)
         block_numbers = block_generators.generate_block_numbers(
             n=n_calls,
             random_seed=random_seed,
-            start_block=13_000_000,
-            end_block=17_000_000,
+            start_block=block_range[0],
+            end_block=block_range[1],
             network=network,
+            distribution=distribution,
         )
     if block_count is None:
         block_count = 1024
@@ -107,18 +119,23 @@ def generate_calls_eth_get_eth_balance(
     addresses: typing.Sequence[str] | None = None,
     block_numbers: typing.Sequence[int] | None = None,
     random_seed: flood.RandomSeed | None = None,
+    distribution: flood.AccessDistribution | None = None,
+    block_range: tuple[int, int] | None = None,
 ) -> typing.Sequence[flood.Call]:
     import ctc.rpc
 
     if block_numbers is None:
         if n_calls is None:
             raise Exception('must floodify more parameters')
+        if block_range is None:
+            block_range = (10_000_000, 16_000_000)
         block_numbers = block_generators.generate_block_numbers(
-            start_block=10_000_000,
-            end_block=16_000_000,
+            start_block=block_range[0],
+            end_block=block_range[1],
             n=n_calls,
             random_seed=random_seed,
             network=network,
+            distribution=distribution,
         )
     if addresses is None:
         if n_calls is None:
@@ -127,6 +144,7 @@ def generate_calls_eth_get_eth_balance(
             n_calls,
             network=network,
             random_seed=random_seed,
+            distribution=distribution,
         )
 
     return [
@@ -144,18 +162,23 @@ def generate_calls_eth_get_transaction_count(
     addresses: typing.Sequence[str] | None = None,
     block_numbers: typing.Sequence[int] | None = None,
     random_seed: flood.RandomSeed | None = None,
+    distribution: flood.AccessDistribution | None = None,
+    block_range: tuple[int, int] | None = None,
 ) -> typing.Sequence[flood.Call]:
     import ctc.rpc
 
     if block_numbers is None:
         if n_calls is None:
             raise Exception('must floodify more parameters')
+        if block_range is None:
+            block_range = (10_000_000, 16_000_000)
         block_numbers = block_generators.generate_block_numbers(
-            start_block=10_000_000,
-            end_block=16_000_000,
+            start_block=block_range[0],
+            end_block=block_range[1],
             n=n_calls,
             random_seed=random_seed,
             network=network,
+            distribution=distribution,
         )
     if addresses is None:
         if n_calls is None:
@@ -164,6 +187,7 @@ def generate_calls_eth_get_transaction_count(
             n_calls,
             network=network,
             random_seed=random_seed,
+            distribution=distribution,
         )
 
     return [
@@ -185,6 +209,7 @@ def generate_calls_eth_get_transaction_by_hash(
     network: str,
     transaction_hashes: typing.Sequence[str] | None = None,
     random_seed: flood.RandomSeed | None = None,
+    distribution: flood.AccessDistribution | None = None,
 ) -> typing.Sequence[flood.Call]:
     import ctc.rpc
 
@@ -195,6 +220,7 @@ def generate_calls_eth_get_transaction_by_hash(
             n_calls,
             network=network,
             random_seed=random_seed,
+            distribution=distribution,
         )
     return [
         ctc.rpc.construct_eth_get_transaction_by_hash(
@@ -210,6 +236,7 @@ def generate_calls_eth_get_transaction_receipt(
     network: str,
     transaction_hashes: typing.Sequence[str] | None = None,
     random_seed: flood.RandomSeed | None = None,
+    distribution: flood.AccessDistribution | None = None,
 ) -> typing.Sequence[flood.Call]:
     import ctc.rpc
 
@@ -220,6 +247,7 @@ def generate_calls_eth_get_transaction_receipt(
             n_calls,
             network=network,
             random_seed=random_seed,
+            distribution=distribution,
         )
     return [
         ctc.rpc.construct_eth_get_transaction_receipt(
@@ -254,6 +282,8 @@ def generate_calls_eth_get_logs(
     block_range_size: int | None = None,
     network: str | None = None,
     random_seed: flood.RandomSeed | None = None,
+    distribution: flood.AccessDistribution | None = None,
+    block_range: tuple[int, int] | None = None,
 ) -> typing.Sequence[flood.Call]:
     import ctc.rpc
 
@@ -264,13 +294,16 @@ def generate_calls_eth_get_logs(
             raise Exception('must floodify more parameters')
         if block_range_size is None:
             block_range_size = 100
+        if block_range is None:
+            block_range = (10_000_000, 16_000_000)
         block_ranges = block_generators.generate_block_ranges(
-            start_block=10_000_000,
-            end_block=16_000_000,
+            start_block=block_range[0],
+            end_block=block_range[1],
             n=n_calls,
             range_size=block_range_size,
             random_seed=random_seed,
             network=network,
+            distribution=distribution,
         )
     if topics is None:
         topics = [_default_event_hashes['Transfer']]
@@ -298,18 +331,23 @@ def generate_calls_eth_get_code(
     block_numbers: typing.Sequence[int | typing.Literal['latest']]
     | None = None,
     random_seed: flood.RandomSeed | None = None,
+    distribution: flood.AccessDistribution | None = None,
+    block_range: tuple[int, int] | None = None,
 ) -> typing.Sequence[flood.Call]:
     import ctc.rpc
 
     if block_numbers is None:
         if n_calls is None:
             raise Exception('must floodify more parameters')
+        if block_range is None:
+            block_range = (10_000_000, 16_000_000)
         block_numbers = block_generators.generate_block_numbers(
-            start_block=10_000_000,
-            end_block=16_000_000,
+            start_block=block_range[0],
+            end_block=block_range[1],
             n=n_calls,
             random_seed=random_seed,
             network=network,
+            distribution=distribution,
         )
     if addresses is None:
         if n_calls is None:
@@ -318,6 +356,7 @@ def generate_calls_eth_get_code(
             n_calls,
             network=network,
             random_seed=random_seed,
+            distribution=distribution,
         )
     return [
         ctc.rpc.construct_eth_get_code(
@@ -335,24 +374,32 @@ def generate_calls_eth_get_storage_at(
     block_numbers: typing.Sequence[int | typing.Literal['latest']]
     | None = None,
     random_seed: flood.RandomSeed | None = None,
+    distribution: flood.AccessDistribution | None = None,
+    block_range: tuple[int, int] | None = None,
 ) -> typing.Sequence[flood.Call]:
     import ctc.rpc
 
     if block_numbers is None:
         if n_calls is None:
             raise Exception('must floodify more parameters')
+        if block_range is None:
+            block_range = (10_000_000, 16_000_000)
         block_numbers = block_generators.generate_block_numbers(
-            start_block=10_000_000,
-            end_block=16_000_000,
+            start_block=block_range[0],
+            end_block=block_range[1],
             n=n_calls,
             random_seed=random_seed,
             network=network,
+            distribution=distribution,
         )
     if slots is None:
         if n_calls is None:
             raise Exception('must floodify more parameters')
         slots = slot_generators.generate_slots(
-            n_calls, network=network, random_seed=random_seed
+            n_calls,
+            network=network,
+            random_seed=random_seed,
+            distribution=distribution,
         )
     return [
         ctc.rpc.construct_eth_get_storage_at(
@@ -373,6 +420,8 @@ def generate_calls_eth_call(
     n_calls: int,
     network: str,
     random_seed: flood.RandomSeed | None = None,
+    distribution: flood.AccessDistribution | None = None,
+    block_range: tuple[int, int] | None = None,
 ) -> typing.Sequence[flood.Call]:
     import ctc.rpc
 
@@ -388,12 +437,15 @@ def generate_calls_eth_call(
         list(_default_call_datas.values()),
         size=n_calls,
     )
+    if block_range is None:
+        block_range = (10_000_000, 16_000_000)
     block_numbers = block_generators.generate_block_numbers(
-        start_block=10_000_000,
-        end_block=16_000_000,
+        start_block=block_range[0],
+        end_block=block_range[1],
         n=n_calls,
         random_seed=random_seed,
         network=network,
+        distribution=distribution,
     )
 
     return [
@@ -419,18 +471,23 @@ def generate_calls_trace_block(
     block_numbers: typing.Sequence[int] | None = None,
     network: str | None = None,
     random_seed: flood.RandomSeed | None = None,
+    distribution: flood.AccessDistribution | None = None,
+    block_range: tuple[int, int] | None = None,
 ) -> typing.Sequence[flood.Call]:
     import ctc.rpc
 
     if block_numbers is None:
         if n_calls is None:
             raise Exception('must floodify more parameters')
+        if block_range is None:
+            block_range = (0, 16_000_000)
         block_numbers = block_generators.generate_block_numbers(
             n=n_calls,
             random_seed=0,
-            start_block=0,
-            end_block=16_000_000,
+            start_block=block_range[0],
+            end_block=block_range[1],
             network=network,
+            distribution=distribution,
         )
     return [
         ctc.rpc.construct_trace_block(block_number=block_number)
@@ -444,6 +501,7 @@ def generate_calls_trace_transaction(
     transaction_hashes: typing.Sequence[str] | None = None,
     network: str | None = None,
     random_seed: flood.RandomSeed | None = None,
+    distribution: flood.AccessDistribution | None = None,
 ) -> typing.Sequence[flood.Call]:
     import ctc.rpc
 
@@ -456,6 +514,7 @@ def generate_calls_trace_transaction(
             n=n_calls,
             network=network,
             random_seed=random_seed,
+            distribution=distribution,
         )
     return [
         ctc.rpc.construct_trace_transaction(transaction_hash=transaction_hash)
@@ -469,18 +528,23 @@ def generate_calls_trace_replay_block_transactions(
     block_numbers: typing.Sequence[int] | None = None,
     network: str | None = None,
     random_seed: flood.RandomSeed | None = None,
+    distribution: flood.AccessDistribution | None = None,
+    block_range: tuple[int, int] | None = None,
 ) -> typing.Sequence[flood.Call]:
     import ctc.rpc
 
     if block_numbers is None:
         if n_calls is None:
             raise Exception('must floodify more parameters')
+        if block_range is None:
+            block_range = (0, 16_000_000)
         block_numbers = block_generators.generate_block_numbers(
             n=n_calls,
             random_seed=random_seed,
-            start_block=0,
-            end_block=16_000_000,
+            start_block=block_range[0],
+            end_block=block_range[1],
             network=network,
+            distribution=distribution,
         )
     return [
         ctc.rpc.construct_trace_replay_block_transactions(
@@ -497,18 +561,23 @@ def generate_calls_trace_replay_block_transactions_state_diff(
     block_numbers: typing.Sequence[int] | None = None,
     network: str | None = None,
     random_seed: flood.RandomSeed | None = None,
+    distribution: flood.AccessDistribution | None = None,
+    block_range: tuple[int, int] | None = None,
 ) -> typing.Sequence[flood.Call]:
     import ctc.rpc
 
     if block_numbers is None:
         if n_calls is None:
             raise Exception('must floodify more parameters')
+        if block_range is None:
+            block_range = (0, 16_000_000)
         block_numbers = block_generators.generate_block_numbers(
             n=n_calls,
             random_seed=random_seed,
-            start_block=0,
-            end_block=16_000_000,
+            start_block=block_range[0],
+            end_block=block_range[1],
             network=network,
+            distribution=distribution,
         )
     return [
         ctc.rpc.construct_trace_replay_block_transactions(
@@ -525,18 +594,23 @@ def generate_calls_trace_replay_block_transactions_vm_trace(
     block_numbers: typing.Sequence[int] | None = None,
     network: str | None = None,
     random_seed: flood.RandomSeed | None = None,
+    distribution: flood.AccessDistribution | None = None,
+    block_range: tuple[int, int] | None = None,
 ) -> typing.Sequence[flood.Call]:
     import ctc.rpc
 
     if block_numbers is None:
         if n_calls is None:
             raise Exception('must floodify more parameters')
+        if block_range is None:
+            block_range = (0, 16_000_000)
         block_numbers = block_generators.generate_block_numbers(
             n=n_calls,
             random_seed=random_seed,
-            start_block=0,
-            end_block=16_000_000,
+            start_block=block_range[0],
+            end_block=block_range[1],
             network=network,
+            distribution=distribution,
         )
     return [
         ctc.rpc.construct_trace_replay_block_transactions(
@@ -553,6 +627,7 @@ def generate_calls_trace_replay_transaction(
     transaction_hashes: typing.Sequence[str] | None = None,
     network: str | None = None,
     random_seed: flood.RandomSeed | None = None,
+    distribution: flood.AccessDistribution | None = None,
 ) -> typing.Sequence[flood.Call]:
     import ctc.rpc
 
@@ -565,6 +640,7 @@ def generate_calls_trace_replay_transaction(
             n=n_calls,
             random_seed=random_seed,
             network=network,
+            distribution=distribution,
         )
     return [
         ctc.rpc.construct_trace_replay_transaction(
@@ -581,6 +657,7 @@ def generate_calls_trace_replay_transaction_state_diff(
     transaction_hashes: typing.Sequence[str] | None = None,
     network: str | None = None,
     random_seed: flood.RandomSeed | None = None,
+    distribution: flood.AccessDistribution | None = None,
 ) -> typing.Sequence[flood.Call]:
     import ctc.rpc
 
@@ -593,6 +670,7 @@ def generate_calls_trace_replay_transaction_state_diff(
             n=n_calls,
             random_seed=random_seed,
             network=network,
+            distribution=distribution,
         )
     return [
         ctc.rpc.construct_trace_replay_transaction(
@@ -609,6 +687,7 @@ def generate_calls_trace_replay_transaction_vm_trace(
     transaction_hashes: typing.Sequence[str] | None = None,
     network: str | None = None,
     random_seed: flood.RandomSeed | None = None,
+    distribution: flood.AccessDistribution | None = None,
 ) -> typing.Sequence[flood.Call]:
     import ctc.rpc
 
@@ -621,6 +700,7 @@ def generate_calls_trace_replay_transaction_vm_trace(
             n=n_calls,
             random_seed=random_seed,
             network=network,
+            distribution=distribution,
         )
     return [
         ctc.rpc.construct_trace_replay_transaction(
@@ -9,10 +9,12 @@ def generate_slots(
     n: int,
     network: str,
     random_seed: flood.RandomSeed | None = None,
+    distribution: flood.AccessDistribution | None = None,
 ) -> typing.Sequence[tuple[str, str]]:
     return generators.load_samples(
         network=network,
         datatype='slots',
         n=n,
         random_seed=random_seed,
+        distribution=distribution,
     )
@@ -143,3 +143,41 @@ def _generate_timings_for_soak_test(
             raise Exception('must specify 1 duration for soak test')
 
     return rates, durations
+
+
+default_adaptive_metrics = ['p99']
+default_adaptive_confidence = 0.95
+default_adaptive_min_duration = 10
+default_adaptive_max_duration = 120
+
+
+def generate_adaptive_duration(
+    target_precision: float,
+    *,
+    metrics: typing.Sequence[str] | None = None,
+    confidence: float | None = None,
+    min_duration: int | None = None,
+) -> flood.AdaptiveDuration:
+    """create adaptive duration specification for test
+
+    each attack is extended until the relative width of the confidence
+    interval of every metric falls below target_precision
+    """
+
+    if target_precision <= 0:
+        raise Exception('target_precision must be positive')
+    if metrics is None:
+        metrics = default_adaptive_metrics
+    if confidence is None:
+        confidence = default_adaptive_confidence
+    if min_duration is None:
+        min_duration = default_adaptive_min_duration
+    if not 0 < confidence < 1:
+        raise Exception('confidence must be between 0 and 1')
+
+    return {
+        'metrics': list(metrics),
+        'target_precision': target_precision,
+        'confidence': confidence,
+        'min_duration': min_duration,
+    }
@@ -105,7 +105,13 @@ def load_samples(
     binary_convert: bool = True,
     download_missing: bool = True,
     random_seed: flood.RandomSeed | None = None,
+    distribution: flood.AccessDistribution | None = None,
 ) -> typing.Sequence[typing.Any]:
+    """load n samples of datatype
+
+    non-uniform distributions rank samples in a seeded random order, and
+    sample them with replacement, so that hot samples are requested repeatedly
+    """
     import polars as pl
 
     # get path
@@ -148,7 +154,15 @@ def load_samples(
     }[datatype]
 
     df = pl.scan_parquet(path).select(columns).collect()
-    if n > len(df):
+    if not generators.is_uniform(distribution):
+        assert distribution is not None
+        rng = generators.get_rng(random_seed=random_seed)
+        order = rng.permutation(len(df))
+        ranks = generators.sample_ranks(
+            n, len(df), distribution=distribution, rng=rng
+        )
+        df = df[order[ranks]]
+    elif n > len(df):
         import math
 
         n_copies = math.ceil(n / len(df))
@@ -3,6 +3,9 @@ from .block_test_generators import *
 from .contract_test_generators import *
 from .generic_test_generators import *
 from .log_test_generators import *
+from .mixed_test_generators import *
 from .multi_test_generators import *
+from .replay_test_generators import *
+from .synthesized_test_generators import *
 from .transaction_test_generators import *
 from .trace_test_generators import *
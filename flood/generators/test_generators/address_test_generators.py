@@ -14,6 +14,8 @@ def generate_test_eth_get_balance(
     network: str,
     vegeta_args: flood.VegetaArgsShorthand | None = None,
     random_seed: flood.RandomSeed | None = None,
+    distribution: flood.AccessDistribution | None = None,
+    block_range: tuple[int, int] | None = None,
 ) -> typing.Sequence[flood.VegetaAttack]:
     n_calls = load_tests.estimate_call_count(
         rates=rates, duration=duration, durations=durations
@@ -22,6 +24,8 @@ def generate_test_eth_get_balance(
         n_calls=n_calls,
         network=network,
         random_seed=random_seed,
+        distribution=distribution,
+        block_range=block_range,
     )
     return load_tests.create_load_test(
         calls=calls,
@@ -40,6 +44,8 @@ def generate_test_eth_get_transaction_count(
     network: str,
     vegeta_args: flood.VegetaArgsShorthand | None = None,
     random_seed: flood.RandomSeed | None = None,
+    distribution: flood.AccessDistribution | None = None,
+    block_range: tuple[int, int] | None = None,
 ) -> typing.Sequence[flood.VegetaAttack]:
     n_calls = load_tests.estimate_call_count(
         rates=rates, duration=duration, durations=durations
@@ -48,6 +54,8 @@ def generate_test_eth_get_transaction_count(
         n_calls=n_calls,
         network=network,
         random_seed=random_seed,
+        distribution=distribution,
+        block_range=block_range,
     )
     return load_tests.create_load_test(
         calls=calls,
@@ -14,6 +14,8 @@ def generate_test_eth_get_code(
     durations: typing.Sequence[int] | None = None,
     vegeta_args: flood.VegetaArgsShorthand | None = None,
     random_seed: flood.RandomSeed | None = None,
+    distribution: flood.AccessDistribution | None = None,
+    block_range: tuple[int, int] | None = None,
 ) -> typing.Sequence[flood.VegetaAttack]:
     n_calls = load_tests.estimate_call_count(
         rates=rates, duration=duration, durations=durations
@@ -22,6 +24,8 @@ def generate_test_eth_get_code(
         n_calls=n_calls,
         network=network,
         random_seed=random_seed,
+        distribution=distribution,
+        block_range=block_range,
     )
     return load_tests.create_load_test(
         calls=calls,
@@ -40,6 +44,8 @@ def generate_test_eth_get_storage_at(
     durations: typing.Sequence[int] | None = None,
     vegeta_args: flood.VegetaArgsShorthand | None = None,
     random_seed: flood.RandomSeed | None = None,
+    distribution: flood.AccessDistribution | None = None,
+    block_range: tuple[int, int] | None = None,
 ) -> typing.Sequence[flood.VegetaAttack]:
     n_calls = load_tests.estimate_call_count(
         rates=rates, duration=duration, durations=durations
@@ -48,6 +54,8 @@ def generate_test_eth_get_storage_at(
         n_calls=n_calls,
         network=network,
         random_seed=random_seed,
+        distribution=distribution,
+        block_range=block_range,
     )
     return load_tests.create_load_test(
         calls=calls,
@@ -66,6 +74,8 @@ def generate_test_eth_call(
     durations: typing.Sequence[int] | None = None,
     vegeta_args: flood.VegetaArgsShorthand | None = None,
     random_seed: flood.RandomSeed | None = None,
+    distribution: flood.AccessDistribution | None = None,
+    block_range: tuple[int, int] | None = None,
 ) -> typing.Sequence[flood.VegetaAttack]:
     n_calls = load_tests.estimate_call_count(
         rates=rates, duration=duration, durations=durations
@@ -74,6 +84,8 @@ def generate_test_eth_call(
         n_calls=n_calls,
         network=network,
         random_seed=random_seed,
+        distribution=distribution,
+        block_range=block_range,
     )
     return load_tests.create_load_test(
         calls=calls,
@@ -3,6 +3,7 @@ from __future__ import annotations
 import typing
 
 import flood
+from flood.tests import load_tests
 
 
 #
@@ -65,10 +66,58 @@ def generate_test(
     network: str,
     # output_dir: str | None = None,
     flood_version: str,
+    adaptive_duration: flood.AdaptiveDuration | None = None,
+    warmup: flood.Warmup | None = None,
+    engine: flood.LoadTestEngine | None = None,
+    max_connections: int | None = None,
+    max_workers: int | None = None,
+    batch_size: int | None = None,
+    mix: typing.Mapping[str, float] | None = None,
+    replay: flood.Replay | None = None,
+    workload_model: flood.WorkloadModel | None = None,
+    distribution: flood.AccessDistribution | None = None,
+    repeats: flood.Repeats | None = None,
+    block_range: tuple[int, int] | None = None,
 ) -> flood.LoadTest:
     if test_name is None:
         raise Exception('must specify test_name')
-    test_generator = get_test_generator(test_name)
+    if (test_name == flood.generators.mixed_test_name) != (mix is not None):
+        raise Exception(
+            'mix must be specified if and only if test_name is '
+            + flood.generators.mixed_test_name
+        )
+    if (test_name == flood.generators.replay_test_name) != (replay is not None):
+        raise Exception(
+            'replay must be specified if and only if test_name is '
+            + flood.generators.replay_test_name
+        )
+    if replay is not None and replay['mode'] == 'timed':
+        if warmup is not None or batch_size is not None:
+            raise Exception('warmup and batch_size not used in timed replay')
+        if adaptive_duration is not None:
+            raise Exception('adaptive_duration not used in timed replay')
+    if (test_name == flood.generators.synthesized_test_name) != (
+        workload_model is not None
+    ):
+        raise Exception(
+            'workload_model must be specified if and only if test_name is '
+            + flood.generators.synthesized_test_name
+        )
+    if workload_model is not None:
+        if warmup is not None or batch_size is not None:
+            raise Exception('warmup and batch_size not used in synth test')
+        if adaptive_duration is not None:
+            raise Exception('adaptive_duration not used in synth test')
+    if distribution is not None:
+        flood.generators.validate_distribution(distribution)
+        if replay is not None or workload_model is not None:
+            raise Exception('distribution not used in replay or synth test')
+    if repeats is not None:
+        load_tests.validate_repeats(repeats)
+    if block_range is not None:
+        flood.generators.validate_block_range(block_range)
+        if replay is not None or workload_model is not None:
+            raise Exception('block_range not used in replay or synth test')
     test_parameters: flood.TestGenerationParameters = {
         'flood_version': flood.get_flood_version(),
         'test_name': test_name,
@@ -77,14 +126,91 @@ def generate_test(
         'durations': durations,
         'vegeta_args': vegeta_args,
         'network': network,
+        'adaptive_duration': adaptive_duration,
+        'warmup': warmup,
+        'engine': engine,
+        'max_connections': max_connections,
+        'max_workers': max_workers,
+        'batch_size': batch_size,
+        'mix': mix,
+        'replay': replay,
+        'workload_model': workload_model,
+        'distribution': distribution,
+        'repeats': repeats,
+        'block_range': block_range,
     }
-    attacks = test_generator(
-        rates=rates,
-        durations=durations,
-        vegeta_args=vegeta_args,
-        network=network,
-        random_seed=random_seed,
-    )
+
+    # generate extra calls for warmups
+    generator_durations = durations
+    if warmup is not None and rates is not None and durations is not None:
+        import math
+
+        generator_durations = [
+            duration
+            + math.ceil(load_tests.get_warmup_duration(warmup, rate))
+            for rate, duration in zip(rates, durations)
+        ]
+
+    # generate calls for each element of batches
+    generator_rates = rates
+    if batch_size is not None and rates is not None:
+        generator_rates = [rate * batch_size for rate in rates]
+
+    if mix is not None:
+        if generator_rates is None or generator_durations is None:
+            raise Exception('must specify rates and durations for mix')
+        attacks = flood.generators.generate_mixed_attacks(
+            mix=mix,
+            rates=generator_rates,
+            durations=generator_durations,
+            vegeta_args=vegeta_args,
+            network=network,
+            random_seed=random_seed,
+            distribution=distribution,
+            block_range=block_range,
+        )
+    elif replay is not None:
+        attacks = flood.generators.generate_replay_attacks(
+            replay=replay,
+            rates=generator_rates,
+            durations=generator_durations,
+            vegeta_args=vegeta_args,
+            random_seed=random_seed,
+        )
+    elif workload_model is not None:
+        if generator_rates is None or generator_durations is None:
+            raise Exception('must specify rates and durations for synth test')
+        attacks = flood.generators.generate_synthesized_attacks(
+            workload_model=workload_model,
+            rates=generator_rates,
+            durations=generator_durations,
+            vegeta_args=vegeta_args,
+            random_seed=random_seed,
+            network=network,
+        )
+    else:
+        test_generator = get_test_generator(test_name)
+        attacks = test_generator(
+            rates=generator_rates,
+            durations=generator_durations,
+            vegeta_args=vegeta_args,
+            network=network,
+            random_seed=random_seed,
+            distribution=distribution,
+            block_range=block_range,
+        )
+    if repeats is not None:
+        attacks = load_tests.add_attack_repeats(
+            attacks, repeats=repeats, random_seed=random_seed
+        )
+    if batch_size is not None and rates is not None:
+        attacks = load_tests.add_attack_batches(
+            attacks, batch_size=batch_size, rates=rates
+        )
+    if warmup is not None and durations is not None:
+        attacks = load_tests.add_attack_warmups(
+            attacks, warmup=warmup, durations=durations
+        )
     return {'attacks': attacks, 'test_parameters': test_parameters}
 
 
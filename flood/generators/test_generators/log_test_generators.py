@@ -15,6 +15,8 @@ def generate_test_eth_get_logs(
     durations: typing.Sequence[int] | None = None,
     vegeta_args: flood.VegetaArgsShorthand | None = None,
     random_seed: flood.RandomSeed | None = None,
+    distribution: flood.AccessDistribution | None = None,
+    block_range: tuple[int, int] | None = None,
     contract_address: str | None = None,
     block_range_size: int | None = None,
 ) -> typing.Sequence[flood.VegetaAttack]:
@@ -25,6 +27,8 @@ def generate_test_eth_get_logs(
         n_calls,
         network=network,
         random_seed=random_seed,
+        distribution=distribution,
+        block_range=block_range,
         contract_address=contract_address,
         block_range_size=block_range_size,
     )
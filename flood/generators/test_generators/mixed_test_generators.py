@@ -0,0 +1,139 @@
+"""mixed workloads, where calls of multiple tests are interleaved in one attack
+
+mixes are specified as weight maps from test name to relative weight, e.g.
+{'eth_call': 60, 'eth_getLogs': 20, 'eth_getBlockByNumber': 20}
+"""
+from __future__ import annotations
+
+import typing
+
+from flood import spec
+from flood.tests import load_tests
+import flood
+
+
+mixed_test_name = 'mix'
+
+
+def generate_mixed_attacks(
+    *,
+    mix: typing.Mapping[str, float],
+    rates: typing.Sequence[int],
+    durations: typing.Sequence[int],
+    network: str,
+    vegeta_args: flood.VegetaArgsShorthand | None = None,
+    random_seed: spec.RandomSeed | None = None,
+    distribution: spec.AccessDistribution | None = None,
+    block_range: tuple[int, int] | None = None,
+) -> typing.Sequence[flood.VegetaAttack]:
+    """generate attacks whose calls are drawn from multiple tests by weight
+
+    each attack contains exactly rate * duration calls, split between tests
+    in proportion to their weights and shuffled into a single call stream
+    """
+    import math
+
+    validate_mix(mix)
+    if len(rates) != len(durations):
+        raise Exception('different number of rates vs durations')
+
+    # allocate calls of each attack to each test
+    test_names = list(mix.keys())
+    weights = list(mix.values())
+    counts = [
+        _allocate_call_counts(rate * duration, weights)
+        for rate, duration in zip(rates, durations)
+    ]
+
+    # generate calls of each test, at just enough rate for its allocation
+    test_calls = {}
+    for t, test_name in enumerate(test_names):
+        test_generator = flood.generators.get_test_generator(test_name)
+        test_rates = [
+            max(1, math.ceil(attack_counts[t] / duration))
+            for attack_counts, duration in zip(counts, durations)
+        ]
+        test_attacks = test_generator(
+            rates=test_rates,
+            durations=durations,
+            vegeta_args=vegeta_args,
+            network=network,
+            random_seed=random_seed,
+            distribution=distribution,
+            block_range=block_range,
+        )
+        test_calls[test_name] = [
+            attack['calls'][: attack_counts[t]]
+            for attack, attack_counts in zip(test_attacks, counts)
+        ]
+
+    # interleave calls of each attack in a random order
+    rng = flood.generators.get_rng(random_seed=random_seed)
+    calls = []
+    for a, attack_counts in enumerate(counts):
+        labels = [
+            test_name
+            for test_name, count in zip(test_names, attack_counts)
+            for i in range(count)
+        ]
+        iterators = {name: iter(test_calls[name][a]) for name in test_names}
+        for index in rng.permutation(len(labels)):
+            calls.append(next(iterators[labels[index]]))
+
+    return load_tests.create_load_test(
+        calls=calls,
+        rates=rates,
+        durations=durations,
+        vegeta_args=vegeta_args,
+    )
+
+
+def validate_mix(mix: typing.Mapping[str, float]) -> None:
+    """validate that mix maps single test names to positive weights"""
+    if len(mix) == 0:
+        raise Exception('mix must contain at least one test')
+    test_generators = flood.generators.get_single_test_generators()
+    for test_name, weight in mix.items():
+        if test_name not in test_generators:
+            raise Exception('invalid test name in mix: ' + str(test_name))
+        if weight <= 0:
+            raise Exception('mix weights must be positive')
+
+
+def parse_mix(items: typing.Sequence[str]) -> typing.Mapping[str, float]:
+    """parse mix from strings of the form TEST=WEIGHT"""
+    mix = {}
+    for item in items:
+        if item.count('=') != 1:
+            raise Exception('mix items should have form TEST=WEIGHT')
+        test_name, weight = item.split('=')
+        if test_name in mix:
+            raise Exception('test specified multiple times in mix')
+        mix[test_name] = float(weight)
+    validate_mix(mix)
+    return mix
+
+
+def get_mix_fractions(
+    mix: typing.Mapping[str, float],
+) -> typing.Mapping[str, float]:
+    """normalize mix weights into fractions that sum to 1"""
+    total = sum(mix.values())
+    return {test_name: weight / total for test_name, weight in mix.items()}
+
+
+def _allocate_call_counts(
+    n_calls: int, weights: typing.Sequence[float]
+) -> typing.Sequence[int]:
+    """split n_calls by weight using largest remainders, summing to n_calls"""
+    total = sum(weights)
+    quotas = [n_calls * weight / total for weight in weights]
+    counts = [int(quota) for quota in quotas]
+    remainders = sorted(
+        range(len(weights)),
+        key=lambda i: quotas[i] - counts[i],
+        reverse=True,
+    )
+    for i in remainders[: n_calls - sum(counts)]:
+        counts[i] += 1
+    return counts
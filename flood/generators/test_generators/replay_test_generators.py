@@ -0,0 +1,301 @@
+"""replay of recorded json-rpc traffic
+
+request logs are replayed either at their original timing, optionally sped
+up, or as a shuffled stream sent at the usual rates and durations
+
+replays are stored in test parameters, so reruns send the same requests
+"""
+from __future__ import annotations
+
+import typing
+
+from flood import spec
+from flood.tests import load_tests
+import flood
+
+
+replay_test_name = 'replay'
+
+
+def create_replay(
+    path: str,
+    *,
+    speeds: typing.Sequence[float] | None = None,
+    shuffle: bool = False,
+) -> spec.Replay:
+    """create replay of request log
+
+    - if shuffle is False, requests are sent at their original timing, with
+      one attack per speed, where speed 2 sends requests twice as fast
+    - if shuffle is True, requests are shuffled and sent at constant rates
+
+    batch requests in log are replayed as batch requests, and call ids are
+    replaced by unique ids so that responses can be matched to calls
+    """
+    if shuffle:
+        if speeds is not None:
+            raise Exception('speeds not used by shuffled replay')
+        mode: spec.ReplayMode = 'shuffled'
+    else:
+        if speeds is None:
+            speeds = [1]
+        if len(speeds) == 0 or any(speed <= 0 for speed in speeds):
+            raise Exception('replay speeds must be positive')
+        mode = 'timed'
+
+    # make call ids unique
+    timestamps = []
+    requests: list[typing.Any] = []
+    next_id = 1
+    for timestamp, body in load_request_log(path):
+        body_calls = body if isinstance(body, list) else [body]
+        if len(body_calls) == 0:
+            raise Exception('empty batch request in request log')
+        for call in body_calls:
+            if not isinstance(call, dict) or 'method' not in call:
+                raise Exception('invalid json-rpc call in request log')
+        request, next_id = _renumber_request(body, next_id)
+        timestamps.append(timestamp)
+        requests.append(request)
+    if len(requests) == 0:
+        raise Exception('no requests in request log')
+
+    t_start = timestamps[0]
+    offsets = [round(timestamp - t_start, 6) for timestamp in timestamps]
+    return {
+        'mode': mode,
+        'speeds': speeds,
+        'n_requests': len(requests),
+        'duration': offsets[-1],
+        'requests': _encode_replay_requests(offsets, requests),
+    }
+
+
+def _renumber_request(
+    request: typing.Any, next_id: int
+) -> tuple[typing.Any, int]:
+    """give each call of request a new id, returning request and next id"""
+    if isinstance(request, list):
+        batch = []
+        for call in request:
+            batch.append(dict(call, id=next_id))
+            next_id += 1
+        return batch, next_id
+    else:
+        return dict(request, id=next_id), next_id + 1
+
+
+def load_request_log(path: str) -> typing.Sequence[tuple[float, typing.Any]]:
+    """load (timestamp, body) of each request in log, sorted by timestamp
+
+    supported formats, optionally gzip compressed with a .gz extension:
+    - ndjson with a timestamp and a body on each line, e.g.
+      {"timestamp": 1697712000.123, "body": {"jsonrpc": "2.0", ...}}
+    - proxy logs with a unix timestamp and a request body on each line, e.g.
+      from nginx using log_format replay '$msec $request_body'
+
+    timestamps can be unix seconds, milliseconds, microseconds, nanoseconds,
+    or ISO 8601 strings
+
+    path can also be a directory of recordings made by flood record
+    """
+    import gzip
+    import os
+
+    if os.path.isdir(path):
+        paths = flood.ops.get_recording_paths(path)
+        if len(paths) == 0:
+            raise Exception('no recordings in directory: ' + str(path))
+    else:
+        paths = [path]
+
+    requests: list[tuple[float, typing.Any]] = []
+    for log_path in paths:
+        opener: typing.Any = gzip.open if log_path.endswith('.gz') else open
+        with opener(log_path, 'rt') as f:
+            requests.extend(_parse_request_log_lines(f))
+    return sorted(requests, key=lambda request: request[0])
+
+
+def _parse_request_log_lines(
+    lines: typing.Iterable[str],
+) -> typing.Sequence[tuple[float, typing.Any]]:
+    import json
+
+    requests = []
+    for line in lines:
+        line = line.strip()
+        if line == '':
+            continue
+        if line.startswith('{'):
+            entry = json.loads(line)
+            if 'timestamp' not in entry or 'body' not in entry:
+                raise Exception('log entries need timestamp and body')
+            timestamp = entry['timestamp']
+            body = entry['body']
+        else:
+            timestamp, _, body = line.partition(' ')
+            body = _unescape_proxy_log(body.strip())
+            if body in ['', '-']:
+                continue
+        if isinstance(body, str):
+            body = json.loads(body)
+        requests.append((_parse_log_timestamp(timestamp), body))
+    return requests
+
+
+def _unescape_proxy_log(text: str) -> str:
+    """undo the \\xHH escaping that nginx applies to logged variables"""
+    import re
+
+    return re.sub(
+        r'\\x([0-9A-Fa-f]{2})', lambda match: chr(int(match[1], 16)), text
+    )
+
+
+def _parse_log_timestamp(timestamp: typing.Any) -> float:
+    """parse request log timestamp into unix seconds"""
+    import datetime
+
+    if isinstance(timestamp, str):
+        try:
+            timestamp = float(timestamp)
+        except ValueError:
+            iso = timestamp.replace('Z', '+00:00')
+            dt = datetime.datetime.fromisoformat(iso)
+            if dt.tzinfo is None:
+                dt = dt.replace(tzinfo=datetime.timezone.utc)
+            return dt.timestamp()
+    if not isinstance(timestamp, (int, float)):
+        raise Exception('invalid request log timestamp: ' + str(timestamp))
+    for scale in [1e18, 1e15, 1e12]:
+        if timestamp >= scale:
+            return timestamp / (scale / 1e9)
+    return float(timestamp)
+
+
+#
+# # serde
+#
+
+
+def _encode_replay_requests(
+    offsets: typing.Sequence[float], calls: typing.Sequence[typing.Any]
+) -> str:
+    """encode requests as gzip-compressed base64 ndjson of [offset, call]
+
+    each call is a single call or a batch of calls
+    """
+    import base64
+    import gzip
+    import json
+
+    lines = ''.join(
+        json.dumps([offset, call], separators=(',', ':')) + '\n'
+        for offset, call in zip(offsets, calls)
+    )
+    compressed = gzip.compress(lines.encode())
+    return base64.b64encode(compressed).decode('utf-8')
+
+
+def decode_replay_requests(
+    replay: spec.Replay,
+) -> tuple[typing.Sequence[float], typing.Sequence[typing.Any]]:
+    """decode offsets and calls of replay requests"""
+    import base64
+    import gzip
+    import json
+
+    decompressed = gzip.decompress(base64.b64decode(replay['requests']))
+    offsets = []
+    calls = []
+    for line in decompressed.decode().splitlines():
+        offset, call = json.loads(line)
+        offsets.append(offset)
+        calls.append(call)
+    return offsets, calls
+
+
+#
+# # generation
+#
+
+
+def get_replay_timings(
+    replay: spec.Replay,
+) -> tuple[typing.Sequence[int], typing.Sequence[int]]:
+    """get (rates, durations) of each attack of timed replay"""
+    import math
+
+    if replay['mode'] != 'timed' or replay['speeds'] is None:
+        raise Exception('only timed replays have fixed timings')
+    rates = []
+    durations = []
+    for speed in replay['speeds']:
+        duration = max(1, math.ceil(replay['duration'] / speed))
+        rates.append(max(1, round(replay['n_requests'] / duration)))
+        durations.append(duration)
+    return rates, durations
+
+
+def generate_replay_attacks(
+    *,
+    replay: spec.Replay,
+    rates: typing.Sequence[int] | None = None,
+    durations: typing.Sequence[int] | None = None,
+    vegeta_args: flood.VegetaArgsShorthand | None = None,
+    random_seed: spec.RandomSeed | None = None,
+) -> typing.Sequence[flood.VegetaAttack]:
+    """generate attacks of replay
+
+    timed replays ignore rates and durations, rates of timed attacks are
+    average rates used for reporting
+    """
+    offsets, calls = decode_replay_requests(replay)
+
+    if replay['mode'] == 'timed':
+        if replay['speeds'] is None:
+            raise Exception('timed replay needs speeds')
+        attacks: list[flood.VegetaAttack] = []
+        timed_rates, timed_durations = get_replay_timings(replay)
+        for speed, rate, duration in zip(
+            replay['speeds'], timed_rates, timed_durations
+        ):
+            attacks.append(
+                {
+                    'rate': rate,
+                    'duration': duration,
+                    'calls': calls,
+                    'vegeta_args': None,
+                    'warmup_calls': None,
+                    'offsets': [offset / speed for offset in offsets],
+                }
+            )
+        return attacks
+
+    elif replay['mode'] == 'shuffled':
+        if rates is None or durations is None:
+            raise Exception('must specify rates and durations for replay')
+
+        # shuffle with fixed default seed, so reruns send the same stream
+        if random_seed is None:
+            random_seed = 0
+        rng = flood.generators.get_rng(random_seed=random_seed)
+        n_calls = sum(
+            rate * duration for rate, duration in zip(rates, durations)
+        )
+        shuffled: list[typing.Any] = []
+        next_id = 1
+        while len(shuffled) < n_calls:
+            for index in rng.permutation(len(calls)):
+                request, next_id = _renumber_request(calls[index], next_id)
+                shuffled.append(request)
+        return load_tests.create_load_test(
+            calls=shuffled[:n_calls],
+            rates=rates,
+            durations=durations,
+            vegeta_args=vegeta_args,
+        )
+
+    else:
+        raise Exception('invalid replay mode: ' + str(replay['mode']))
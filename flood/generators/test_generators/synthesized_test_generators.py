@@ -0,0 +1,506 @@
+"""synthetic workloads fitted from recorded json-rpc traffic
+
+a workload model summarizes the shape of a request log:
+- method mix, as the fraction of calls of each method
+- block ages, relative to the latest block number seen in the log
+- address popularity, as counts of the most requested addresses at each
+  address parameter of each method
+- log range sizes, as toBlock - fromBlock of log filters
+- arrival burstiness, as the distribution of gaps between requests
+
+calls of methods that only take an address and a block are built by the
+call generators of flood.generators from sampled addresses and blocks. other
+calls reuse recorded parameter templates, whose block numbers, log ranges,
+and addresses are resampled only at the known parameters of their method.
+addresses that are tied to other parameters, like the contract of calldata,
+storage slots, or log topics, keep their recorded value
+
+calls are sent with gaps resampled from the fitted gap distribution, scaled
+to the target rate
+
+models are stored in test parameters, so reruns send the same requests
+"""
+from __future__ import annotations
+
+import typing
+
+from flood import spec
+from flood.tests import load_tests
+import flood
+from . import mixed_test_generators
+
+if typing.TYPE_CHECKING:
+    import numpy as np
+
+
+synthesized_test_name = 'synth'
+default_max_templates = 64
+default_max_addresses = 1000
+n_quantiles = 101
+
+# index of block number parameter of each method
+_block_param_indices = {
+    'eth_call': 1,
+    'eth_estimateGas': 1,
+    'eth_feeHistory': 1,
+    'eth_getBalance': 1,
+    'eth_getBlockByNumber': 0,
+    'eth_getBlockReceipts': 0,
+    'eth_getBlockTransactionCountByNumber': 0,
+    'eth_getCode': 1,
+    'eth_getProof': 2,
+    'eth_getStorageAt': 2,
+    'eth_getTransactionCount': 1,
+    'eth_getUncleCountByBlockNumber': 0,
+    'debug_traceBlockByNumber': 0,
+    'trace_block': 0,
+    'trace_call': 2,
+    'trace_replayBlockTransactions': 0,
+}
+
+# methods whose first parameter is a filter with fromBlock and toBlock
+_log_range_methods = {'eth_getLogs', 'eth_newFilter', 'trace_filter'}
+
+# address parameters of each method, as an index of params, or an index and
+# key of an object in params, whose value is an address or list of addresses
+_address_params: typing.Mapping[str, typing.Sequence[str]] = {
+    'eth_getBalance': ['0'],
+    'eth_getCode': ['0'],
+    'eth_getTransactionCount': ['0'],
+    'eth_call': ['0.from'],
+    'eth_estimateGas': ['0.from'],
+    'trace_call': ['0.from'],
+    'trace_filter': ['0.fromAddress', '0.toAddress'],
+}
+
+# methods built by call generators from an address and a block number
+_call_generator_names = {
+    'eth_getBalance': 'generate_calls_eth_get_eth_balance',
+    'eth_getCode': 'generate_calls_eth_get_code',
+    'eth_getTransactionCount': 'generate_calls_eth_get_transaction_count',
+}
+
+
+#
+# # fitting
+#
+
+
+def fit_workload_model(
+    path: str,
+    *,
+    max_templates: int = default_max_templates,
+    max_addresses: int = default_max_addresses,
+) -> spec.WorkloadModel:
+    """fit workload model to request log
+
+    path can be any request log supported by load_request_log, including a
+    directory of recordings made by flood record
+
+    - up to max_templates recorded parameter lists are kept for each method
+    - up to max_addresses most requested addresses are kept for each address
+      parameter of each method
+    """
+    import collections
+    import numpy as np
+
+    # flatten batches
+    timestamps = []
+    method_params: dict[str, list[typing.Any]] = collections.defaultdict(list)
+    for timestamp, body in flood.generators.load_request_log(path):
+        if isinstance(body, list):
+            body_calls = body
+        else:
+            body_calls = [body]
+        for call in body_calls:
+            if not isinstance(call, dict) or 'method' not in call:
+                raise Exception('invalid json-rpc call in request log')
+            timestamps.append(timestamp)
+            method_params[call['method']].append(call.get('params', []))
+    if len(timestamps) == 0:
+        raise Exception('no requests in request log')
+
+    # use latest block number in log as reference for block ages
+    blocks = [
+        block
+        for method, params_list in method_params.items()
+        for params in params_list
+        for block in _get_block_numbers(method, params).values()
+        if block is not None
+    ]
+    if len(blocks) > 0:
+        head_block: int | None = max(blocks)
+    else:
+        head_block = None
+
+    # fit each method
+    rng = flood.generators.get_rng(random_seed=0)
+    methods: dict[str, spec.WorkloadMethodModel] = {}
+    for method, params_list in sorted(method_params.items()):
+        ages = []
+        range_sizes = []
+        addresses: dict[str, typing.Counter[str]] = {
+            param: collections.Counter()
+            for param in _address_params.get(method, [])
+        }
+        for params in params_list:
+            block_numbers = _get_block_numbers(method, params)
+            from_block = block_numbers.get('fromBlock')
+            to_block = block_numbers.get('toBlock')
+            block: int | None
+            if from_block is not None and to_block is not None:
+                range_sizes.append(to_block - from_block)
+                block = to_block
+            elif to_block is not None:
+                block = to_block
+            elif from_block is not None:
+                block = from_block
+            else:
+                block = block_numbers.get('block')
+            if block is not None and head_block is not None:
+                ages.append(head_block - block)
+            for param, counter in addresses.items():
+                counter.update(_get_param_addresses(params, param))
+
+        if len(params_list) > max_templates:
+            indices = rng.choice(
+                len(params_list), size=max_templates, replace=False
+            )
+            templates = [params_list[index] for index in sorted(indices)]
+        else:
+            templates = list(params_list)
+
+        methods[method] = {
+            'weight': len(params_list) / len(timestamps),
+            'templates': templates,
+            'block_age_quantiles': _fit_quantiles(ages),
+            'log_range_quantiles': _fit_quantiles(range_sizes),
+            'addresses': {
+                param: dict(counter.most_common(max_addresses))
+                for param, counter in addresses.items()
+                if len(counter) > 0
+            },
+        }
+
+    # fit gaps between requests, relative to mean gap
+    timestamps = sorted(timestamps)
+    duration = timestamps[-1] - timestamps[0]
+    if len(timestamps) > 1 and duration > 0:
+        gaps = np.diff(timestamps) / (duration / (len(timestamps) - 1))
+        gap_quantiles = _fit_quantiles(gaps.tolist())
+        burstiness = round(float(gaps.std()), 6)
+    else:
+        gap_quantiles = None
+        burstiness = 0.0
+
+    return {
+        'n_requests': len(timestamps),
+        'duration': round(duration, 6),
+        'rate': round(len(timestamps) / max(duration, 1), 6),
+        'head_block': head_block,
+        'burstiness': burstiness,
+        'gap_quantiles': gap_quantiles,
+        'methods': methods,
+    }
+
+
+def _get_block_numbers(
+    method: str, params: typing.Any
+) -> typing.Mapping[str, int | None]:
+    """get numeric block parameters of call, tags like latest become None
+
+    log filters have fromBlock and toBlock keys, other methods a block key
+    """
+    if not isinstance(params, list) or len(params) == 0:
+        return {}
+    if method in _log_range_methods:
+        if not isinstance(params[0], dict):
+            return {}
+        return {
+            key: _parse_block_number(params[0].get(key))
+            for key in ['fromBlock', 'toBlock']
+        }
+    index = _block_param_indices.get(method)
+    if index is None or index >= len(params):
+        return {}
+    return {'block': _parse_block_number(params[index])}
+
+
+def _parse_block_number(value: typing.Any) -> int | None:
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.startswith('0x') and len(value) <= 18:
+        try:
+            return int(value, 16)
+        except ValueError:
+            return None
+    return None
+
+
+def _is_address(value: typing.Any) -> bool:
+    return (
+        isinstance(value, str)
+        and len(value) == 42
+        and value.startswith('0x')
+        and all(c in '0123456789abcdefABCDEF' for c in value[2:])
+    )
+
+
+def _get_param_addresses(
+    params: typing.Any, param: str
+) -> typing.Sequence[str]:
+    """get lowercased addresses of parameter, see _address_params"""
+    value = _get_param(params, param)
+    values = value if isinstance(value, list) else [value]
+    return [value.lower() for value in values if _is_address(value)]
+
+
+def _get_param(params: typing.Any, param: str) -> typing.Any:
+    index, _, key = param.partition('.')
+    if not isinstance(params, list) or int(index) >= len(params):
+        return None
+    value = params[int(index)]
+    if key != '':
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def _set_param(params: typing.Any, param: str, value: typing.Any) -> None:
+    index, _, key = param.partition('.')
+    if key == '':
+        params[int(index)] = value
+    else:
+        params[int(index)][key] = value
+
+
+def _fit_quantiles(values: typing.Sequence[float]) -> list[float] | None:
+    import numpy as np
+
+    if len(values) == 0:
+        return None
+    quantiles = np.quantile(values, np.linspace(0, 1, n_quantiles))
+    return [round(float(quantile), 6) for quantile in quantiles]
+
+
+def _sample_quantiles(
+    quantiles: typing.Sequence[float], n: int, rng: np.random.Generator
+) -> typing.Any:
+    """sample from distribution by interpolating its quantiles"""
+    import numpy as np
+
+    positions = rng.random(n) * (len(quantiles) - 1)
+    return np.interp(positions, np.arange(len(quantiles)), quantiles)
+
+
+#
+# # generation
+#
+
+
+def get_growth_rates(
+    workload_model: spec.WorkloadModel,
+    growth_factors: typing.Sequence[float],
+) -> typing.Sequence[int]:
+    """get rates that are multiples of the recorded rate of workload model"""
+    if any(factor <= 0 for factor in growth_factors):
+        raise Exception('growth factors must be positive')
+    return [
+        max(1, round(workload_model['rate'] * factor))
+        for factor in growth_factors
+    ]
+
+
+def generate_synthesized_attacks(
+    *,
+    workload_model: spec.WorkloadModel,
+    rates: typing.Sequence[int],
+    durations: typing.Sequence[int],
+    vegeta_args: flood.VegetaArgsShorthand | None = None,
+    random_seed: spec.RandomSeed | None = None,
+    network: str = 'ethereum',
+) -> typing.Sequence[flood.VegetaAttack]:
+    """generate attacks with the shape of workload model at each rate
+
+    each attack contains exactly rate * duration calls, split between methods
+    by their fitted weights, with offsets that span the attack duration
+    """
+    if len(rates) != len(durations):
+        raise Exception('different number of rates vs durations')
+
+    # synthesize with fixed default seed, so reruns send the same stream
+    if random_seed is None:
+        random_seed = 0
+    rng = flood.generators.get_rng(random_seed=random_seed)
+
+    methods = list(workload_model['methods'].keys())
+    weights = [model['weight'] for model in workload_model['methods'].values()]
+    calls: list[typing.Any] = []
+    attacks_offsets = []
+    for rate, duration in zip(rates, durations):
+        counts = mixed_test_generators._allocate_call_counts(
+            rate * duration, weights
+        )
+        method_calls = {
+            method: iter(
+                _synthesize_method_calls(
+                    method=method,
+                    method_model=workload_model['methods'][method],
+                    head_block=workload_model['head_block'],
+                    n=count,
+                    rng=rng,
+                    network=network,
+                )
+            )
+            for method, count in zip(methods, counts)
+        }
+        labels = [
+            method
+            for method, count in zip(methods, counts)
+            for i in range(count)
+        ]
+        for index in rng.permutation(len(labels)):
+            call = next(method_calls[labels[index]])
+            calls.append(dict(call, id=len(calls) + 1))
+        attacks_offsets.append(
+            _synthesize_offsets(
+                workload_model['gap_quantiles'],
+                n=len(labels),
+                duration=duration,
+                rng=rng,
+            )
+        )
+
+    attacks = load_tests.create_load_test(
+        calls=calls,
+        rates=rates,
+        durations=durations,
+        vegeta_args=vegeta_args,
+    )
+    for attack, offsets in zip(attacks, attacks_offsets):
+        attack['offsets'] = offsets
+    return attacks
+
+
+def _synthesize_method_calls(
+    *,
+    method: str,
+    method_model: spec.WorkloadMethodModel,
+    head_block: int | None,
+    n: int,
+    rng: np.random.Generator,
+    network: str,
+) -> typing.Sequence[typing.Any]:
+    """synthesize calls with blocks and addresses sampled from method model
+
+    templates that use block tags like latest keep their tag
+    """
+    import copy
+    import numpy as np
+
+    templates = method_model['templates']
+    template_indices = rng.integers(len(templates), size=n)
+    params_list = [
+        copy.deepcopy(templates[index]) for index in template_indices
+    ]
+
+    # resample block numbers and log ranges at their known parameters
+    if head_block is not None and method_model['block_age_quantiles']:
+        ages = _sample_integers(method_model['block_age_quantiles'], n, rng)
+        range_sizes = None
+        if method_model['log_range_quantiles']:
+            range_sizes = _sample_integers(
+                method_model['log_range_quantiles'], n, rng
+            )
+        for i, params in enumerate(params_list):
+            block = max(0, head_block - ages[i])
+            block_numbers = _get_block_numbers(method, params)
+            if block_numbers.get('toBlock') is not None:
+                params[0]['toBlock'] = hex(block)
+                if (
+                    block_numbers.get('fromBlock') is not None
+                    and range_sizes is not None
+                ):
+                    from_block = max(0, block - range_sizes[i])
+                    params[0]['fromBlock'] = hex(from_block)
+            elif block_numbers.get('fromBlock') is not None:
+                params[0]['fromBlock'] = hex(block)
+            elif block_numbers.get('block') is not None:
+                params[_block_param_indices[method]] = hex(block)
+
+    # resample addresses at their known parameters, by popularity
+    for param, popularity in method_model['addresses'].items():
+        candidates = list(popularity.keys())
+        counts = np.array(list(popularity.values()), dtype=float)
+        for params in params_list:
+            value = _get_param(params, param)
+            if isinstance(value, list):
+                indices = rng.choice(
+                    len(candidates), size=len(value), p=counts / counts.sum()
+                )
+                _set_param(params, param, [candidates[i] for i in indices])
+            elif _is_address(value):
+                index = rng.choice(len(candidates), p=counts / counts.sum())
+                _set_param(params, param, candidates[index])
+
+    # build calls of methods that take an address and block with generators
+    generator_name = _call_generator_names.get(method)
+    if generator_name is not None and all(
+        _is_address(_get_param(params, '0'))
+        and _get_param(params, '1') is not None
+        for params in params_list
+    ):
+        generator = getattr(flood.generators, generator_name)
+        blocks: list[int | str] = []
+        for params in params_list:
+            parsed = _parse_block_number(params[1])
+            blocks.append(parsed if parsed is not None else params[1])
+        calls = generator(
+            n_calls=n,
+            network=network,
+            addresses=[params[0] for params in params_list],
+            block_numbers=blocks,
+        )
+        return [
+            {'jsonrpc': '2.0', 'method': method, 'params': call['params']}
+            for call in calls
+        ]
+
+    return [
+        {'jsonrpc': '2.0', 'method': method, 'params': params}
+        for params in params_list
+    ]
+
+
+def _sample_integers(
+    quantiles: typing.Sequence[float], n: int, rng: np.random.Generator
+) -> list[int]:
+    import numpy as np
+
+    samples = _sample_quantiles(quantiles, n, rng)
+    return np.round(samples).astype(int).tolist()  # type: ignore
+
+
+def _synthesize_offsets(
+    gap_quantiles: typing.Sequence[float] | None,
+    *,
+    n: int,
+    duration: int,
+    rng: np.random.Generator,
+) -> typing.Sequence[float]:
+    """synthesize offsets of n requests whose mean gap is duration / n"""
+    import numpy as np
+
+    if n == 0:
+        return []
+    if gap_quantiles is None:
+        gaps = np.ones(n)
+    else:
+        gaps = _sample_quantiles(gap_quantiles, n, rng)
+    total = gaps.sum()
+    if total == 0:
+        gaps = np.ones(n)
+        total = n
+    offsets = (np.cumsum(gaps) - gaps[0]) * (duration / total)
+    return [round(float(offset), 6) for offset in offsets]
@@ -1,2 +1,3 @@
 from .installation_utils import *
+from .recording_proxy import *
 from .update_utils import *
@@ -0,0 +1,496 @@
+"""reverse proxy that records live json-rpc traffic for later replay
+
+requests are forwarded to the upstream node over a pool of keep-alive
+connections, and each request is appended to an ndjson recording that can be
+replayed with the replay test, see replay_test_generators.py
+
+entries are written after the response has been sent to the client, and the
+time the proxy adds on top of the upstream latency is measured for every
+request, so that latencies observed through the proxy can be trusted.
+latencies are kept in bounded aggregates, so that memory of the proxy does not
+grow with recording length
+"""
+from __future__ import annotations
+
+import typing
+
+from flood import spec
+
+if typing.TYPE_CHECKING:
+    import asyncio
+
+
+default_listen = ':9545'
+default_max_file_size = 100_000_000
+recording_file_template = 'recording_{index:06}.ndjson'
+recording_summary_filename = 'recording_summary.json'
+
+# latencies are merged into bounded aggregates after this many requests
+aggregate_batch_size = 10_000
+
+# headers that only apply to a single connection, see RFC 9110 section 7.6.1
+hop_by_hop_headers = {
+    'connection',
+    'keep-alive',
+    'proxy-authenticate',
+    'proxy-authorization',
+    'proxy-connection',
+    'te',
+    'trailer',
+    'transfer-encoding',
+    'upgrade',
+}
+
+
+def run_recording_proxy(
+    *,
+    upstream: str,
+    output_dir: str,
+    listen: str = default_listen,
+    max_file_size: int = default_max_file_size,
+    max_connections: int | None = None,
+    duration: float | None = None,
+    verbose: bool = True,
+) -> spec.RecordingSummary:
+    """forward requests to upstream and record them, until duration or ctrl-c
+
+    - listen is [host]:port, where an empty host listens on all interfaces
+    - recordings are rotated into a new file after max_file_size bytes
+    - each run starts a new file after any recordings already in output_dir
+    """
+    import os
+    import time
+
+    from flood.tests.load_tests import deep_aggregates
+    from flood.tests.load_tests import persistent_engine
+
+    host, _, port = listen.rpartition(':')
+    if host == '':
+        host = '0.0.0.0'
+    if max_file_size <= 0:
+        raise Exception('max_file_size must be positive')
+    os.makedirs(output_dir, exist_ok=True)
+
+    pool = persistent_engine.create_connection_pool(
+        upstream, max_connections=max_connections
+    )
+    recorder: spec.Recorder = {
+        'output_dir': output_dir,
+        'max_file_size': max_file_size,
+        'file': None,
+        'file_index': len(get_recording_paths(output_dir)),
+        'file_size': 0,
+        'paths': [],
+        'n_requests': 0,
+        'n_errors': 0,
+        'n_bytes': 0,
+        'overheads': deep_aggregates.create_value_aggregate(),
+        'latencies': deep_aggregates.create_value_aggregate(),
+        'pending_overheads': [],
+        'pending_latencies': [],
+    }
+    t_start = time.time()
+    try:
+        pool['loop'].run_until_complete(
+            _serve(
+                pool=pool,
+                recorder=recorder,
+                host=host,
+                port=int(port),
+                duration=duration,
+                verbose=verbose,
+            )
+        )
+    except KeyboardInterrupt:
+        pass
+    finally:
+        _close_recording_file(recorder)
+        persistent_engine.close_connection_pool(pool)
+
+    summary = _summarize_recording(
+        recorder, upstream=upstream, duration=time.time() - t_start
+    )
+    _save_recording_summary(summary, output_dir=output_dir)
+    if verbose:
+        print_recording_summary(summary)
+    return summary
+
+
+async def _serve(
+    *,
+    pool: spec.ConnectionPool,
+    recorder: spec.Recorder,
+    host: str,
+    port: int,
+    duration: float | None,
+    verbose: bool,
+) -> None:
+    import asyncio
+
+    pool['available'] = asyncio.Condition()
+
+    async def handle(
+        reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            await _handle_client(pool, recorder, reader, writer)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, host=host, port=port)
+    if verbose:
+        import flood
+
+        flood.user_io.print_timestamped(
+            'Recording requests to '
+            + pool['url']
+            + ' on '
+            + host
+            + ':'
+            + str(port)
+            + ', press ctrl-c to stop'
+        )
+    async with server:
+        if duration is None:
+            await server.serve_forever()
+        else:
+            await asyncio.sleep(duration)
+
+
+async def _handle_client(
+    pool: spec.ConnectionPool,
+    recorder: spec.Recorder,
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+) -> None:
+    """forward each request of client connection until it is closed"""
+    import time
+
+    from flood.tests.load_tests import persistent_engine
+    from flood.tests.load_tests.request_phases import latency_phases
+
+    while True:
+        request = await _read_request(reader)
+        if request is None:
+            return
+        method, headers, body = request
+        timestamp = time.time()
+        t_received = time.perf_counter()
+
+        # forward request
+        if method != 'POST':
+            code, status, content_type = 405, 'Method Not Allowed', None
+            response_body = b''
+            latency = None
+        else:
+            upstream_request = (
+                b'POST '
+                + pool['path'].encode()
+                + b' HTTP/1.1\r\nHost: '
+                + pool['host_header'].encode()
+                + b'\r\n'
+                + _get_forwarded_headers(headers)
+                + b'Content-Length: '
+                + str(len(body)).encode()
+                + b'\r\n\r\n'
+                + body
+            )
+            timings: dict[str, int] = dict.fromkeys(latency_phases, 0)
+            t_forwarded = time.perf_counter()
+            try:
+                (
+                    code,
+                    status,
+                    response_headers,
+                    response_body,
+                ) = await persistent_engine._request(
+                    pool, upstream_request, timings
+                )
+                content_types = response_headers.get('Content-Type', [])
+                content_type = content_types[0] if content_types else None
+            except Exception as e:
+                code, status, content_type = 502, 'Bad Gateway', None
+                response_body = (str(e) or type(e).__name__).encode()
+            latency = time.perf_counter() - t_forwarded
+
+        # respond to client
+        connection = ','.join(
+            value for key, value in headers if key.lower() == 'connection'
+        )
+        keep_alive = 'close' not in connection.lower()
+        response = b'HTTP/1.1 ' + str(code).encode() + b' ' + status.encode()
+        if content_type is not None:
+            response += b'\r\nContent-Type: ' + content_type.encode()
+        response += b'\r\nContent-Length: ' + str(len(response_body)).encode()
+        if not keep_alive:
+            response += b'\r\nConnection: close'
+        response += b'\r\n\r\n' + response_body
+        writer.write(response)
+        await writer.drain()
+
+        # record request after response is sent
+        if latency is not None:
+            overhead = time.perf_counter() - t_received - latency
+            _record_request(
+                recorder,
+                timestamp=timestamp,
+                body=body,
+                code=code,
+                latency=latency,
+                overhead=overhead,
+                response_size=len(response_body),
+            )
+        if not keep_alive:
+            return
+
+
+async def _read_request(
+    reader: asyncio.StreamReader,
+) -> tuple[str, typing.Sequence[tuple[str, str]], bytes] | None:
+    """read HTTP/1.1 request, returning (method, headers, body)
+
+    headers are (name, value) pairs in their original order and case
+
+    returns None if connection is closed before a new request
+    """
+    request_line = await reader.readline()
+    if len(request_line) == 0:
+        return None
+    method = request_line.decode('latin-1').split(' ', 1)[0]
+
+    headers: list[tuple[str, str]] = []
+    header_values: dict[str, str] = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        key, _, value = line.decode('latin-1').partition(':')
+        headers.append((key.strip(), value.strip()))
+        header_values[key.strip().lower()] = value.strip()
+
+    if 'chunked' in header_values.get('transfer-encoding', '').lower():
+        chunks = []
+        while True:
+            size_line = await reader.readline()
+            size = int(size_line.split(b';', 1)[0].strip(), 16)
+            if size == 0:
+                while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+        body = b''.join(chunks)
+    else:
+        body = await reader.readexactly(
+            int(header_values.get('content-length', 0))
+        )
+
+    return method, headers, body
+
+
+def _get_forwarded_headers(headers: typing.Sequence[tuple[str, str]]) -> bytes:
+    """encode client headers to forward upstream
+
+    hop-by-hop headers, and headers named by the client's Connection header,
+    are dropped, and Host and Content-Length are set by the proxy
+    """
+    dropped = set(hop_by_hop_headers)
+    dropped.update(['host', 'content-length'])
+    for key, value in headers:
+        if key.lower() == 'connection':
+            dropped.update(
+                token.strip().lower() for token in value.split(',')
+            )
+    return b''.join(
+        key.encode('latin-1') + b': ' + value.encode('latin-1') + b'\r\n'
+        for key, value in headers
+        if key.lower() not in dropped
+    )
+
+
+#
+# # recording files
+#
+
+
+def _record_request(
+    recorder: spec.Recorder,
+    *,
+    timestamp: float,
+    body: bytes,
+    code: int,
+    latency: float,
+    overhead: float,
+    response_size: int,
+) -> None:
+    """append request to current recording file, rotating it if full"""
+    import os
+    import orjson
+
+    entry = {
+        'timestamp': round(timestamp, 6),
+        'body': body.decode('utf-8', errors='replace'),
+        'code': code,
+        'latency': round(latency, 6),
+        'overhead': round(overhead, 6),
+        'response_size': response_size,
+    }
+    line = orjson.dumps(entry) + b'\n'
+
+    if recorder['file'] is not None and (
+        recorder['file_size'] + len(line) > recorder['max_file_size']
+    ):
+        _close_recording_file(recorder)
+        recorder['file_index'] += 1
+    if recorder['file'] is None:
+        filename = recording_file_template.format(index=recorder['file_index'])
+        path = os.path.join(recorder['output_dir'], filename)
+        f = open(path, 'ab', buffering=1 << 20)
+        recorder['file'] = f
+        recorder['file_size'] = f.tell()
+        recorder['paths'].append(path)
+    else:
+        f = recorder['file']
+    f.write(line)
+
+    recorder['file_size'] += len(line)
+    recorder['n_bytes'] += len(line)
+    recorder['n_requests'] += 1
+    if code != 200:
+        recorder['n_errors'] += 1
+    recorder['pending_overheads'].append(max(0, round(overhead * 1e9)))
+    recorder['pending_latencies'].append(round(latency * 1e9))
+    if len(recorder['pending_latencies']) >= aggregate_batch_size:
+        _aggregate_pending_latencies(recorder)
+
+
+def _aggregate_pending_latencies(recorder: spec.Recorder) -> None:
+    """merge pending latencies in ns into the bounded aggregates"""
+    import polars as pl
+
+    from flood.tests.load_tests import deep_aggregates
+
+    for key, pending_key in [
+        ('overheads', 'pending_overheads'),
+        ('latencies', 'pending_latencies'),
+    ]:
+        pending = recorder[pending_key]  # type: ignore
+        if len(pending) == 0:
+            continue
+        recorder[key] = deep_aggregates.merge_value_aggregates(  # type: ignore
+            recorder[key],  # type: ignore
+            deep_aggregates.create_value_aggregate(
+                pl.Series(pending, dtype=pl.Int64)
+            ),
+        )
+        pending.clear()
+
+
+def _close_recording_file(recorder: spec.Recorder) -> None:
+    if recorder['file'] is not None:
+        recorder['file'].close()
+        recorder['file'] = None
+
+
+def get_recording_paths(output_dir: str) -> typing.Sequence[str]:
+    """get paths of recording files in output_dir, in recording order"""
+    import glob
+    import os
+
+    pattern = recording_file_template.replace('{index:06}', '*')
+    return sorted(glob.glob(os.path.join(output_dir, pattern)))
+
+
+#
+# # summary
+#
+
+
+def _summarize_recording(
+    recorder: spec.Recorder, *, upstream: str, duration: float
+) -> spec.RecordingSummary:
+    _aggregate_pending_latencies(recorder)
+    return {
+        'upstream': upstream,
+        'duration': duration,
+        'n_requests': recorder['n_requests'],
+        'n_errors': recorder['n_errors'],
+        'n_bytes': recorder['n_bytes'],
+        'paths': list(recorder['paths']),
+        'overhead': _summarize_seconds(recorder['overheads']),
+        'latency': _summarize_seconds(recorder['latencies']),
+    }
+
+
+def _summarize_seconds(
+    aggregate: spec.ValueAggregate,
+) -> typing.Mapping[str, float | None]:
+    """summarize aggregate of values in ns, in seconds"""
+    from flood.tests.load_tests import deep_aggregates
+
+    stats = ['mean', 'p50', 'p90', 'p99', 'max']
+    value_stats = deep_aggregates.compute_value_stats(aggregate)
+    if value_stats is None:
+        return dict.fromkeys(stats, None)
+    return {stat: float(value_stats[stat]) / 1e9 for stat in stats}
+
+
+def _save_recording_summary(
+    summary: spec.RecordingSummary, output_dir: str
+) -> None:
+    import os
+    import orjson
+
+    path = os.path.join(output_dir, recording_summary_filename)
+    with open(path, 'wb') as f:
+        f.write(orjson.dumps(summary))
+
+
+def print_recording_summary(summary: spec.RecordingSummary) -> None:
+    """print requests recorded by proxy and the latency it added"""
+    import toolstr
+
+    import flood
+
+    styles = flood.user_io.styles
+
+    print()
+    flood.user_io.print_header('Recording summary')
+    toolstr.print_bullet(
+        key='upstream', value=summary['upstream'], styles=styles
+    )
+    toolstr.print_bullet(
+        key='requests', value=summary['n_requests'], styles=styles
+    )
+    toolstr.print_bullet(
+        key='non-200 responses', value=summary['n_errors'], styles=styles
+    )
+    toolstr.print_bullet(
+        key='recorded',
+        value=toolstr.format_nbytes(summary['n_bytes'])
+        + ' in '
+        + str(len(summary['paths']))
+        + ' files',
+        styles=styles,
+    )
+    print()
+    stats = ['mean', 'p50', 'p90', 'p99', 'max']
+    rows = []
+    for name, values in [
+        ('upstream latency', summary['latency']),
+        ('proxy overhead', summary['overhead']),
+    ]:
+        row: list[typing.Any] = [name]
+        for stat in stats:
+            value = values[stat]
+            row.append(value * 1e3 if value is not None else None)
+        rows.append(row)
+    toolstr.print_table(
+        rows,
+        labels=[''] + [stat + ' (ms)' for stat in stats],
+        column_formats={stat + ' (ms)': {'decimals': 3} for stat in stats},
+        label_style=styles.get('metavar'),
+        border=styles.get('content'),
+    )
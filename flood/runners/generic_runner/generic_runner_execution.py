@@ -26,6 +26,18 @@ def run(
     metrics: typing.Sequence[str] | None = None,
     include_deep_output: typing.Sequence[flood.DeepOutput] | None = None,
     deep_check: bool = False,
+    adaptive_duration: flood.AdaptiveDuration | None = None,
+    warmup: flood.Warmup | None = None,
+    engine: flood.LoadTestEngine | None = None,
+    max_connections: int | None = None,
+    max_workers: int | None = None,
+    batch_size: int | None = None,
+    mix: typing.Mapping[str, float] | None = None,
+    replay: flood.Replay | None = None,
+    workload_model: flood.WorkloadModel | None = None,
+    distribution: flood.AccessDistribution | None = None,
+    repeats: flood.Repeats | None = None,
+    block_range: flood.BlockRangeShorthand | None = None,
 ) -> flood.RunOutput:
     """generate and run tests against nodes"""
     import os
@@ -62,13 +74,47 @@ def run(
     else:
         if nodes is None:
             raise Exception('must specify nodes')
+        if (test_name == generators.mixed_test_name) != (mix is not None):
+            raise Exception(
+                'mix must be specified if and only if test is '
+                + generators.mixed_test_name
+            )
+        if (test_name == generators.replay_test_name) != (replay is not None):
+            raise Exception(
+                'replay must be specified if and only if test is '
+                + generators.replay_test_name
+            )
+        if (test_name == generators.synthesized_test_name) != (
+            workload_model is not None
+        ):
+            raise Exception(
+                'workload_model must be specified if and only if test is '
+                + generators.synthesized_test_name
+            )
 
-        if test_name in generators.get_single_test_generators():
+        if (
+            test_name in generators.get_single_test_generators()
+            or test_name == generators.mixed_test_name
+            or test_name == generators.replay_test_name
+            or test_name == generators.synthesized_test_name
+        ):
             output = single_runner_execution._run_single(
                 rates=rates,
                 duration=duration,
                 durations=durations,
                 vegeta_args=vegeta_args,
+                adaptive_duration=adaptive_duration,
+                warmup=warmup,
+                engine=engine,
+                max_connections=max_connections,
+                max_workers=max_workers,
+                batch_size=batch_size,
+                mix=mix,
+                replay=replay,
+                workload_model=workload_model,
+                distribution=distribution,
+                repeats=repeats,
+                block_range=block_range,
                 #
                 test_name=test_name,
                 nodes=nodes,
@@ -114,7 +160,9 @@ def _load_old_test_data(
 
     # use old nodes if none specified
     if nodes is None:
-        results_payload = flood.load_single_run_results_payload(path_spec)
+        results_payload = flood.load_single_run_results_payload(
+            path_spec, deep=False
+        )
         nodes = results_payload['nodes']
 
     return (test_name, path_spec, test, nodes)
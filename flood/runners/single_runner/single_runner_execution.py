@@ -19,6 +19,18 @@ def _run_single(
     durations: typing.Sequence[int] | None = None,
     mode: flood.LoadTestMode | None = None,
     vegeta_args: flood.VegetaArgsShorthand | None = None,
+    adaptive_duration: flood.AdaptiveDuration | None = None,
+    warmup: flood.Warmup | None = None,
+    engine: flood.LoadTestEngine | None = None,
+    max_connections: int | None = None,
+    max_workers: int | None = None,
+    batch_size: int | None = None,
+    mix: typing.Mapping[str, float] | None = None,
+    replay: flood.Replay | None = None,
+    workload_model: flood.WorkloadModel | None = None,
+    distribution: flood.AccessDistribution | None = None,
+    repeats: flood.Repeats | None = None,
+    block_range: flood.BlockRangeShorthand | None = None,
     dry: bool,
     output_dir: str,
     figures: bool,
@@ -37,6 +49,22 @@ def _run_single(
         include_deep_output = list(include_deep_output) + ['metrics']
 
     # get test parameters
+    if test is not None:
+        adaptive_duration = test['test_parameters'].get('adaptive_duration')
+        warmup = test['test_parameters'].get('warmup')
+        engine = test['test_parameters'].get('engine')
+        max_connections = test['test_parameters'].get('max_connections')
+        max_workers = test['test_parameters'].get('max_workers')
+        batch_size = test['test_parameters'].get('batch_size')
+        mix = test['test_parameters'].get('mix')
+        replay = test['test_parameters'].get('replay')
+        workload_model = test['test_parameters'].get('workload_model')
+        distribution = test['test_parameters'].get('distribution')
+        repeats = test['test_parameters'].get('repeats')
+        block_range = test['test_parameters'].get('block_range')
+    elif adaptive_duration is not None:
+        if duration is None and durations is None:
+            duration = flood.generators.default_adaptive_max_duration
     rates, durations, vegeta_args = _get_single_test_parameters(
         test=test,
         rates=rates,
@@ -44,6 +72,7 @@ def _run_single(
         durations=durations,
         mode=mode,
         vegeta_args=vegeta_args,
+        replay=replay,
     )
 
     # print preamble
@@ -55,6 +84,18 @@ def _run_single(
             durations=durations,
             vegeta_args=vegeta_args,
             output_dir=output_dir,
+            adaptive_duration=adaptive_duration,
+            warmup=warmup,
+            engine=engine,
+            max_connections=max_connections,
+            max_workers=max_workers,
+            batch_size=batch_size,
+            mix=mix,
+            replay=replay,
+            workload_model=workload_model,
+            distribution=distribution,
+            repeats=repeats,
+            block_range=block_range,
         )
 
     # parse nodes
@@ -62,6 +103,18 @@ def _run_single(
         nodes, verbose=verbose, request_metadata=True
     )
 
+    # discover block range shared by nodes
+    if isinstance(block_range, str):
+        block_bounds = [
+            flood.user_io.get_node_block_bounds(
+                url=node['url'], remote=node['remote']
+            )
+            for node in nodes.values()
+        ]
+        block_range = flood.generators.resolve_block_range(
+            block_range, block_bounds
+        )
+
     # generate test and save to disk
     use_test: flood.LoadTest | flood.TestGenerationParameters
     test_parameters: flood.TestGenerationParameters
@@ -74,6 +127,18 @@ def _run_single(
             'vegeta_args': vegeta_args,
             'network': flood.user_io.parse_nodes_network(nodes),
             'random_seed': random_seed,
+            'adaptive_duration': adaptive_duration,
+            'warmup': warmup,
+            'engine': engine,
+            'max_connections': max_connections,
+            'max_workers': max_workers,
+            'batch_size': batch_size,
+            'mix': mix,
+            'replay': replay,
+            'workload_model': workload_model,
+            'distribution': distribution,
+            'repeats': repeats,
+            'block_range': block_range,
         }
         flood.runners.single_runner.single_runner_io._save_single_run_test(
             test_name=test_name,
@@ -99,6 +164,9 @@ def _run_single(
         test=use_test,
         verbose=verbose,
         include_deep_output=include_deep_output,
+        raw_output_dir=single_runner_io.get_single_run_raw_output_path(
+            output_dir
+        ),
     )
 
     # output results to file
@@ -121,6 +189,7 @@ def _run_single(
             verbose=verbose,
             figures=figures,
             deep_check=deep_check,
+            adaptive_duration=adaptive_duration,
         )
 
     return {
@@ -138,6 +207,7 @@ def _get_single_test_parameters(
     durations: typing.Sequence[int] | None = None,
     mode: flood.LoadTestMode | None = None,
     vegeta_args: flood.VegetaArgsShorthand | None = None,
+    replay: flood.Replay | None = None,
 ) -> tuple[
     typing.Sequence[int],
     typing.Sequence[int],
@@ -148,6 +218,8 @@ def _get_single_test_parameters(
         rates = test_data['rates']
         durations = test_data['durations']
         vegeta_args = test_data['vegeta_args']
+    elif replay is not None and replay['mode'] == 'timed':
+        rates, durations = flood.generators.get_replay_timings(replay)
     else:
         rates, durations = flood.generators.generate_timings(
             rates=rates,
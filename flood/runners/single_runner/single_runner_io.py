@@ -4,6 +4,9 @@ import typing
 
 import flood
 
+if typing.TYPE_CHECKING:
+    import polars as pl
+
 
 #
 # # path utiltiies
@@ -12,7 +15,11 @@ import flood
 _path_templates = {
     'single_run_test': '{output_dir}/test.json',
     'single_run_results': '{output_dir}/results.json',
+    'single_run_deep_results': '{output_dir}/deep_results.json',
     'single_run_figures_dir': '{output_dir}/figures',
+    'single_run_failed_calls': '{output_dir}/failed_calls.json',
+    'single_run_remeasurements': '{output_dir}/remeasured_calls.json',
+    'single_run_raw_output_dir': '{output_dir}/raw',
 }
 
 
@@ -24,12 +31,36 @@ def get_single_run_results_path(output_dir: str) -> str:
     return _path_templates['single_run_results'].format(output_dir=output_dir)
 
 
+def get_single_run_deep_results_path(output_dir: str) -> str:
+    return _path_templates['single_run_deep_results'].format(
+        output_dir=output_dir
+    )
+
+
 def get_single_run_figures_path(output_dir: str) -> str:
     return _path_templates['single_run_figures_dir'].format(
         output_dir=output_dir
     )
 
 
+def get_single_run_failed_calls_path(output_dir: str) -> str:
+    return _path_templates['single_run_failed_calls'].format(
+        output_dir=output_dir
+    )
+
+
+def get_single_run_raw_output_path(output_dir: str) -> str:
+    return _path_templates['single_run_raw_output_dir'].format(
+        output_dir=output_dir
+    )
+
+
+def get_single_run_remeasurements_path(output_dir: str) -> str:
+    return _path_templates['single_run_remeasurements'].format(
+        output_dir=output_dir
+    )
+
+
 #
 # # save utilities
 #
@@ -81,6 +112,9 @@ def _save_single_run_results(
         else:
             os.makedirs(output_dir)
 
+    results = _save_raw_output_sidecars(output_dir=output_dir, results=results)
+    summary_results, deep_results = _split_deep_results(results)
+
     path = _path_templates['single_run_results'].format(output_dir=output_dir)
     payload: flood.SingleRunResultsPayload = {
         'flood_version': flood.get_flood_version(),
@@ -90,10 +124,22 @@ def _save_single_run_results(
         't_run_start': t_run_start,
         't_run_end': t_run_end,
         'nodes': nodes,
-        'results': results,
+        'results': summary_results,
     }
     with open(path, 'wb') as f:
         f.write(orjson.dumps(payload))
+    payload['results'] = results
+
+    if len(deep_results) > 0:
+        path = get_single_run_deep_results_path(output_dir=output_dir)
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(deep_results))
+
+    failed_calls = _create_failed_calls_table(results)
+    if len(failed_calls) > 0:
+        path = get_single_run_failed_calls_path(output_dir=output_dir)
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(failed_calls))
 
     if figures:
         figures_dir = get_single_run_figures_path(output_dir=output_dir)
@@ -108,6 +154,150 @@ def _save_single_run_results(
     return payload
 
 
+def _save_single_run_remeasurements(
+    *,
+    output_dir: str,
+    remeasurements: typing.Mapping[
+        str, typing.Sequence[flood.SlowCallRemeasurement]
+    ],
+) -> None:
+    import orjson
+
+    path = get_single_run_remeasurements_path(output_dir=output_dir)
+    with open(path, 'wb') as f:
+        f.write(orjson.dumps(remeasurements))
+
+
+def _save_raw_output_sidecars(
+    *,
+    output_dir: str,
+    results: typing.Mapping[str, flood.LoadTestOutput],
+) -> typing.Mapping[str, flood.LoadTestOutput]:
+    """move parquet files of raw output into output_dir
+
+    one file is saved per node and attack, as raw/{name}__{attack}.parquet,
+    and results reference files by paths relative to output_dir
+    """
+    import os
+    import shutil
+
+    raw_dir = get_single_run_raw_output_path(output_dir=output_dir)
+    saved_results: typing.MutableMapping[str, typing.Any] = {}
+    for name, result in results.items():
+        saved_result: typing.Any = dict(result)
+        for prefix in ['', 'warmup_']:
+            if prefix == '':
+                output = saved_result
+            elif saved_result['warmup'] is not None:
+                output = saved_result['warmup'] = dict(saved_result['warmup'])
+            else:
+                continue
+            if output.get('deep_raw_output') is None:
+                continue
+            paths: list[str | None] = []
+            for a, path in enumerate(output['deep_raw_output']):
+                if path is None or not path.endswith('.parquet'):
+                    paths.append(path)
+                    continue
+                relpath = os.path.join(
+                    'raw', name + '__' + prefix + str(a) + '.parquet'
+                )
+                target = os.path.join(output_dir, relpath)
+                if os.path.abspath(path) != os.path.abspath(target):
+                    os.makedirs(raw_dir, exist_ok=True)
+                    shutil.move(path, target)
+                paths.append(relpath)
+            output['deep_raw_output'] = paths
+        saved_results[name] = saved_result
+    return saved_results
+
+
+# keys of results that hold per-call data rather than per-attack metrics,
+# saved to deep_results.json so that summaries can be loaded without them
+_deep_result_keys = [
+    'deep_rpc_error_pairs',
+    'deep_failed_calls',
+    'deep_slowest_calls',
+    'deep_size_latency_samples',
+]
+
+
+def _split_deep_results(
+    results: typing.Mapping[str, flood.LoadTestOutput],
+) -> tuple[
+    typing.Mapping[str, flood.LoadTestOutput],
+    typing.Mapping[str, typing.Mapping[str, typing.Any]],
+]:
+    """split per-call deep keys out of results, including of warmups"""
+    summary_results: typing.MutableMapping[str, typing.Any] = {}
+    deep_results: typing.MutableMapping[str, typing.Any] = {}
+    for name, result in results.items():
+        summary_result, deep_result = _split_deep_result(result)
+        if summary_result['warmup'] is not None:
+            summary_warmup, deep_warmup = _split_deep_result(
+                summary_result['warmup']
+            )
+            summary_result['warmup'] = summary_warmup
+            if len(deep_warmup) > 0:
+                deep_result['warmup'] = deep_warmup
+        summary_results[name] = summary_result
+        if len(deep_result) > 0:
+            deep_results[name] = deep_result
+    return summary_results, deep_results
+
+
+def _split_deep_result(
+    result: flood.LoadTestOutput,
+) -> tuple[typing.Any, typing.MutableMapping[str, typing.Any]]:
+    summary_result: typing.Any = dict(result)
+    deep_result = {}
+    for key in _deep_result_keys:
+        if summary_result.get(key) is not None:
+            deep_result[key] = summary_result.pop(key)
+    return summary_result, deep_result
+
+
+def _merge_deep_results(
+    results: typing.Mapping[str, flood.LoadTestOutput],
+    deep_results: typing.Mapping[str, typing.Mapping[str, typing.Any]],
+) -> typing.Mapping[str, flood.LoadTestOutput]:
+    """merge per-call deep keys back into results, inverse of split"""
+    merged: typing.MutableMapping[str, typing.Any] = {}
+    for name, result in results.items():
+        merged_result: typing.Any = dict(result)
+        deep_result = dict(deep_results.get(name, {}))
+        deep_warmup = deep_result.pop('warmup', None)
+        merged_result.update(deep_result)
+        if deep_warmup is not None and merged_result['warmup'] is not None:
+            merged_result['warmup'] = dict(merged_result['warmup'])
+            merged_result['warmup'].update(deep_warmup)
+        merged[name] = merged_result
+    return merged
+
+
+def _create_failed_calls_table(
+    results: typing.Mapping[str, flood.LoadTestOutput],
+) -> list[typing.Mapping[str, typing.Any]]:
+    """create table of failed calls of each node and rate, if deep checked
+
+    each row is a failed call and its number of failures with one error
+    message, so that failing calls can be replayed against a node
+    """
+    table: list[typing.Mapping[str, typing.Any]] = []
+    for name, result in results.items():
+        attacks_failed_calls = result.get('deep_failed_calls')
+        if attacks_failed_calls is None:
+            continue
+        for target_rate, failed_calls in zip(
+            result['target_rate'], attacks_failed_calls
+        ):
+            for failed_call in failed_calls or []:
+                table.append(
+                    {'name': name, 'target_rate': target_rate, **failed_call}
+                )
+    return table
+
+
 #
 # # load utiltiies
 #
@@ -142,13 +332,97 @@ def load_single_run_test_payload(
     return test
 
 
+def load_single_run_failed_calls(
+    output_dir: str,
+) -> typing.Sequence[typing.Mapping[str, typing.Any]]:
+    """load table of failed calls saved by deep checked runs"""
+    import orjson
+
+    path = get_single_run_failed_calls_path(output_dir=output_dir)
+    with open(path, 'rb') as f:
+        failed_calls: typing.Sequence[
+            typing.Mapping[str, typing.Any]
+        ] = orjson.loads(f.read())
+    return failed_calls
+
+
+def scan_single_run_raw_output(
+    output_dir: str,
+    names: typing.Sequence[str] | None = None,
+    *,
+    warmup: bool = False,
+) -> pl.LazyFrame:
+    """lazily scan raw output of previous test, 1 row per response
+
+    adds result_name and attack_index columns, so that only the needed
+    columns, nodes, or attacks are read from the parquet files, for example
+
+    flood.scan_single_run_raw_output(output_dir)
+        .filter(pl.col('result_name') == 'reth')
+        .select('attack_index', 'latency', 'bytes_in')
+        .collect()
+    """
+    import os
+    import polars as pl
+
+    results = load_single_run_results_payload(output_dir, deep=False)[
+        'results'
+    ]
+    if names is None:
+        names = list(results.keys())
+    frames = []
+    for name in names:
+        output: typing.Any = results[name]
+        if warmup:
+            output = output['warmup']
+        if output is None or output.get('deep_raw_output') is None:
+            raise Exception('raw output was not saved for ' + name)
+        for a, path in enumerate(output['deep_raw_output']):
+            if path is None:
+                continue
+            if path.endswith('.parquet'):
+                path = os.path.join(output_dir, path)
+            else:
+                raise Exception(
+                    'raw output of ' + name + ' is embedded in results.json,'
+                    ' use flood.tests.load_tests.decode_raw_vegeta_output()'
+                )
+            frames.append(
+                pl.scan_parquet(path).with_columns(
+                    pl.lit(name).alias('result_name'),
+                    pl.lit(a).alias('attack_index'),
+                )
+            )
+    if len(frames) == 0:
+        raise Exception('no raw output saved')
+    return pl.concat(frames, how='diagonal')
+
+
 def load_single_run_results_payload(
     output_dir: str,
+    *,
+    deep: bool = True,
 ) -> flood.SingleRunResultsPayload:
+    """load results of previous test
+
+    per-call deep keys (error pairs, failed calls, slowest calls, and size
+    samples) are saved in deep_results.json and only loaded if deep is True,
+    so that node data and per-attack metrics load quickly for summaries
+    """
+    import os
     import orjson
 
     path = get_single_run_results_path(output_dir=output_dir)
     with open(path, 'rb') as f:
         results: flood.SingleRunResultsPayload = orjson.loads(f.read())
+
+    deep_path = get_single_run_deep_results_path(output_dir=output_dir)
+    if deep and os.path.isfile(deep_path):
+        with open(deep_path, 'rb') as f:
+            deep_results = orjson.loads(f.read())
+        results['results'] = _merge_deep_results(
+            results['results'], deep_results
+        )
+
     return results
 
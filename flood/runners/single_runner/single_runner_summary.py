@@ -14,6 +14,18 @@ def _print_single_run_preamble(
     vegeta_args: flood.VegetaArgsShorthand | None,
     rerun_of: str | None = None,
     output_dir: str | None,
+    adaptive_duration: flood.AdaptiveDuration | None = None,
+    warmup: flood.Warmup | None = None,
+    engine: flood.LoadTestEngine | None = None,
+    max_connections: int | None = None,
+    max_workers: int | None = None,
+    batch_size: int | None = None,
+    mix: typing.Mapping[str, float] | None = None,
+    replay: flood.Replay | None = None,
+    workload_model: flood.WorkloadModel | None = None,
+    distribution: flood.AccessDistribution | None = None,
+    repeats: flood.Repeats | None = None,
+    block_range: flood.BlockRangeShorthand | None = None,
 ) -> None:
     import os
     import toolstr
@@ -25,6 +37,18 @@ def _print_single_run_preamble(
         durations=durations,
         vegeta_args=vegeta_args,
         output_dir=output_dir,
+        adaptive_duration=adaptive_duration,
+        warmup=warmup,
+        engine=engine,
+        max_connections=max_connections,
+        max_workers=max_workers,
+        batch_size=batch_size,
+        mix=mix,
+        replay=replay,
+        workload_model=workload_model,
+        distribution=distribution,
+        repeats=repeats,
+        block_range=block_range,
     )
     if output_dir is not None:
         summary_path = os.path.join(output_dir, 'summary.txt')
@@ -36,6 +60,18 @@ def _print_single_run_preamble(
                 durations=durations,
                 vegeta_args=vegeta_args,
                 output_dir=output_dir,
+                adaptive_duration=adaptive_duration,
+                warmup=warmup,
+                engine=engine,
+                max_connections=max_connections,
+                max_workers=max_workers,
+                batch_size=batch_size,
+                mix=mix,
+                replay=replay,
+                workload_model=workload_model,
+                distribution=distribution,
+                repeats=repeats,
+                block_range=block_range,
             )
 
 
@@ -47,6 +83,18 @@ def _print_single_run_preamble_copy(
     vegeta_args: flood.VegetaArgsShorthand | None,
     rerun_of: str | None = None,
     output_dir: str | None,
+    adaptive_duration: flood.AdaptiveDuration | None = None,
+    warmup: flood.Warmup | None = None,
+    engine: flood.LoadTestEngine | None = None,
+    max_connections: int | None = None,
+    max_workers: int | None = None,
+    batch_size: int | None = None,
+    mix: typing.Mapping[str, float] | None = None,
+    replay: flood.Replay | None = None,
+    workload_model: flood.WorkloadModel | None = None,
+    distribution: flood.AccessDistribution | None = None,
+    repeats: flood.Repeats | None = None,
+    block_range: flood.BlockRangeShorthand | None = None,
 ) -> None:
     import toolstr
 
@@ -57,7 +105,26 @@ def _print_single_run_preamble_copy(
         style=flood.user_io.styles['content'],
     )
     toolstr.print_bullet(key='sample rates', value=rates, styles=styles)
-    if len(set(durations)) == 1:
+    if adaptive_duration is not None:
+        toolstr.print_bullet(
+            key='sample duration',
+            value='adaptive, '
+            + str(adaptive_duration['min_duration'])
+            + ' to '
+            + str(max(durations)),
+            styles=styles,
+        )
+        toolstr.print_bullet(
+            key='target precision',
+            value=str(adaptive_duration['target_precision'])
+            + ' of '
+            + ', '.join(adaptive_duration['metrics'])
+            + ' at '
+            + str(adaptive_duration['confidence'])
+            + ' confidence',
+            styles=styles,
+        )
+    elif len(set(durations)) == 1:
         toolstr.print_bullet(
             key='sample duration',
             value=durations[0],
@@ -67,6 +134,87 @@ def _print_single_run_preamble_copy(
         toolstr.print_bullet(
             key='sample durations', value=durations, styles=styles
         )
+    if warmup is not None:
+        if warmup['requests'] is not None:
+            warmup_str = str(warmup['requests']) + ' requests'
+        else:
+            warmup_str = str(warmup['duration']) + ' seconds'
+        toolstr.print_bullet(
+            key='warmup', value=warmup_str + ' per rate', styles=styles
+        )
+    if batch_size is not None:
+        toolstr.print_bullet(
+            key='batch size', value=str(batch_size) + ' calls', styles=styles
+        )
+    if replay is not None:
+        replay_str = str(replay['n_requests']) + ' requests over '
+        replay_str += toolstr.format(replay['duration'], decimals=1) + 's'
+        if replay['mode'] == 'timed' and replay['speeds'] is not None:
+            replay_str += ', original timing at speeds '
+            replay_str += ', '.join(
+                toolstr.format(speed) + 'x' for speed in replay['speeds']
+            )
+        else:
+            replay_str += ', shuffled'
+        toolstr.print_bullet(key='replay', value=replay_str, styles=styles)
+    if workload_model is not None:
+        model_str = str(workload_model['n_requests']) + ' requests over '
+        model_str += toolstr.format(workload_model['duration'], decimals=1)
+        model_str += 's at '
+        model_str += toolstr.format(workload_model['rate'], decimals=1)
+        model_str += ' rps, '
+        model_str += str(len(workload_model['methods'])) + ' methods'
+        model_str += ', burstiness '
+        model_str += toolstr.format(workload_model['burstiness'], decimals=2)
+        toolstr.print_bullet(
+            key='workload model', value=model_str, styles=styles
+        )
+    if distribution is not None:
+        toolstr.print_bullet(
+            key='distribution',
+            value=flood.generators.format_distribution(distribution),
+            styles=styles,
+        )
+    if repeats is not None:
+        repeats_str = toolstr.format(repeats['ratio'], percentage=True)
+        repeats_str += ' of calls, reuse distance '
+        if repeats['reuse_distance'] is None:
+            repeats_str += 'uniform'
+        else:
+            repeats_str += flood.generators.format_distribution(
+                repeats['reuse_distance']
+            )
+        toolstr.print_bullet(key='repeats', value=repeats_str, styles=styles)
+    if block_range is not None:
+        if isinstance(block_range, str):
+            block_range_str = block_range + ', discovered from nodes'
+        else:
+            block_range_str = (
+                str(block_range[0]) + ' to ' + str(block_range[1])
+            )
+        toolstr.print_bullet(
+            key='block range', value=block_range_str, styles=styles
+        )
+    if mix is not None:
+        fractions = flood.generators.get_mix_fractions(mix)
+        toolstr.print_bullet(
+            key='mix',
+            value=', '.join(
+                test_name + ' ' + toolstr.format(fraction, percentage=True)
+                for test_name, fraction in fractions.items()
+            ),
+            styles=styles,
+        )
+    if engine is not None:
+        toolstr.print_bullet(key='engine', value=engine, styles=styles)
+    if max_connections is not None:
+        toolstr.print_bullet(
+            key='max connections', value=max_connections, styles=styles
+        )
+    if max_workers is not None:
+        toolstr.print_bullet(
+            key='max workers', value=max_workers, styles=styles
+        )
     toolstr.print_bullet(key='extra args', value=vegeta_args, styles=styles)
 
     if rerun_of is not None:
@@ -100,6 +248,7 @@ def _print_single_run_conclusion(
     verbose: bool | int,
     figures: bool,
     deep_check: bool,
+    adaptive_duration: flood.AdaptiveDuration | None = None,
 ) -> None:
     _print_single_run_conclusion_text(
         output_dir=output_dir,
@@ -108,6 +257,7 @@ def _print_single_run_conclusion(
         verbose=verbose,
         figures=figures,
         deep_check=deep_check,
+        adaptive_duration=adaptive_duration,
     )
     if output_dir is not None:
         import os
@@ -122,6 +272,7 @@ def _print_single_run_conclusion(
                 verbose=verbose,
                 figures=figures,
                 deep_check=deep_check,
+                adaptive_duration=adaptive_duration,
             )
 
 
@@ -132,6 +283,7 @@ def _print_single_run_conclusion_text(
     verbose: bool | int,
     figures: bool,
     deep_check: bool,
+    adaptive_duration: flood.AdaptiveDuration | None = None,
 ) -> None:
     import os
     import toolstr
@@ -205,6 +357,92 @@ def _print_single_run_conclusion_text(
         results=results, metrics=metrics, indent=4
     )
 
+    # warmup tables
+    warmup_results = {
+        name: result['warmup']
+        for name, result in results.items()
+        if result.get('warmup') is not None
+    }
+    if len(warmup_results) > 0:
+        print()
+        print()
+        flood.user_io.print_header('Warmup performance metrics...')
+        print()
+        flood.user_io.print_metric_tables(
+            results=warmup_results,  # type: ignore
+            metrics=metrics,
+            suffix=', warmup',
+            indent=4,
+        )
+
+    # connection tables
+    if any(
+        value is not None
+        for result in results.values()
+        for value in result.get('connections_opened', [])
+    ):
+        print()
+        print()
+        flood.user_io.print_header('Connection reuse...')
+        print()
+        flood.user_io.print_metric_tables(
+            results=results,
+            metrics=[
+                'connections_opened',
+                'connections_reused',
+                'connections_dropped',
+            ],
+            comparison=False,
+            indent=4,
+        )
+
+    # per-call tables of batch requests
+    if any(
+        value is not None
+        for result in results.values()
+        for value in result.get('batch_size', [])
+    ):
+        print()
+        print()
+        flood.user_io.print_header('Per-call metrics of batch requests...')
+        print()
+        flood.user_io.print_metric_tables(
+            results=results,
+            metrics=['call_throughput'],
+            indent=4,
+        )
+
+    # repeated call tables
+    if any(
+        value is not None and value > 0
+        for result in results.values()
+        for value in result.get('repeat_ratio', [])
+    ):
+        print()
+        print()
+        flood.user_io.print_header('Repeated calls...')
+        print()
+        flood.user_io.print_metric_tables(
+            results=results,
+            metrics=['repeat_ratio'],
+            comparison=False,
+            indent=4,
+        )
+
+    # latency phase tables
+    if any(
+        value is not None
+        for result in results.values()
+        for value in result.get('phase_latencies', [])
+    ):
+        _print_phase_latency_tables(results=results)
+
+    # adaptive duration tables
+    if adaptive_duration is not None:
+        _print_adaptive_duration_tables(
+            results=results, adaptive_duration=adaptive_duration
+        )
+
     # deep inspection tables
     if deep_check:
         print()
@@ -240,6 +478,62 @@ def _print_single_run_conclusion_text(
             metrics=['n_rpc_errors'],
             indent=4,
         )
+        print()
+        flood.user_io.print_metric_tables(
+            results=deep_results_by_category['failed'],
+            metrics=['n_schema_errors'],
+            indent=4,
+        )
+        schema_error_metrics = []
+        for error_category in flood.tests.load_tests.schema_error_categories:
+            metric = 'n_' + error_category + '_errors'
+            if any(
+                value > 0
+                for result in deep_results_by_category['failed'].values()
+                for value in result.get(metric, [])  # type: ignore
+            ):
+                schema_error_metrics.append(metric)
+        if len(schema_error_metrics) > 0:
+            print()
+            flood.user_io.print_metric_tables(
+                results=deep_results_by_category['failed'],
+                metrics=schema_error_metrics,
+                indent=4,
+            )
+        if any(
+            value is not None
+            for result in results.values()
+            for value in result.get('batch_size', [])
+        ):
+            print()
+            flood.user_io.print_metric_tables(
+                results=deep_results_by_category['all'],
+                metrics=['n_failed_calls'],
+                indent=4,
+            )
+
+        # response size tables, for metrics available at every rate
+        size_metrics = [
+            metric
+            for metric in [
+                'response_size_p50',
+                'bytes_throughput',
+                'size_latency_slope',
+            ]
+            if all(
+                value is not None
+                for result in deep_results_by_category['successful'].values()
+                for value in result.get(metric, [None])  # type: ignore
+            )
+        ]
+        if len(size_metrics) > 0:
+            print()
+            flood.user_io.print_metric_tables(
+                results=deep_results_by_category['successful'],
+                metrics=size_metrics,
+                suffix=', successful calls',
+                indent=4,
+            )
 
         metric_names = [
             m for m in metrics if m not in ['success', 'throughput']
@@ -256,3 +550,81 @@ def _print_single_run_conclusion_text(
                 indent=4,
             )
 
+        # per-method tables of mixed workloads
+        deep_results_by_method: typing.MutableMapping[
+            str, typing.MutableMapping[str, flood.LoadTestDeepOutput]
+        ]
+        deep_results_by_method = {}
+        for result_name, result in results.items():
+            method_metrics = result.get('deep_method_metrics')
+            if method_metrics is not None:
+                for method, method_results in method_metrics.items():
+                    deep_results_by_method.setdefault(method, {})
+                    deep_results_by_method[method][result_name] = method_results
+        if len(deep_results_by_method) > 0:
+            print()
+            print()
+            flood.user_io.print_header('Metrics of each method in mix...')
+            for method, node_results in deep_results_by_method.items():
+                print()
+                flood.user_io.print_metric_tables(
+                    results=node_results,
+                    metrics=metrics,
+                    suffix=', ' + method + ' calls',
+                    indent=4,
+                )
+
+
+def _print_phase_latency_tables(
+    results: typing.Mapping[str, flood.LoadTestOutput],
+    stat: str = 'mean',
+) -> None:
+    print()
+    print()
+    flood.user_io.print_header('Latency phases...')
+    phase_results: typing.Any = {}
+    for name, result in results.items():
+        phase_result: typing.Any = {'target_rate': result['target_rate']}
+        for phase in flood.tests.load_tests.latency_phases:
+            phase_result[phase] = [
+                None if latencies is None else latencies[phase][stat]
+                for latencies in result['phase_latencies']
+            ]
+        phase_results[name] = phase_result
+    print()
+    flood.user_io.print_metric_tables(
+        results=phase_results,
+        metrics=flood.tests.load_tests.latency_phases,
+        suffix=', ' + stat + ' phase latency',
+        indent=4,
+    )
+
+
+def _print_adaptive_duration_tables(
+    results: typing.Mapping[str, flood.LoadTestOutput],
+    adaptive_duration: flood.AdaptiveDuration,
+) -> None:
+    print()
+    print()
+    flood.user_io.print_header('Precision of adaptive duration attacks...')
+    precision_results: typing.Any = {}
+    for name, result in results.items():
+        precision_result: typing.Any = {
+            'target_rate': result['target_rate'],
+            'actual_duration': result['actual_duration'],
+        }
+        for metric in adaptive_duration['metrics']:
+            precision_result['precision_' + metric] = [
+                precision.get(metric) if precision is not None else None
+                for precision in result['precision']
+            ]
+        precision_results[name] = precision_result
+    metric_names = ['actual_duration'] + [
+        'precision_' + metric for metric in adaptive_duration['metrics']
+    ]
+    print()
+    flood.user_io.print_metric_tables(
+        results=precision_results,
+        metrics=metric_names,
+        indent=4,
+    )
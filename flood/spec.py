@@ -6,6 +6,9 @@ import typing
 
 
 if typing.TYPE_CHECKING:
+    import numpy.typing as npt
+    import polars as pl
+
     #
     # # generic types
     #
@@ -71,6 +74,36 @@ if typing.TYPE_CHECKING:
         typing.Mapping[str, typing.Any],
     ]
 
+    #
+    # # subscription test
+    #
+
+    SubscriptionType = typing.Literal[
+        'newHeads', 'logs', 'newPendingTransactions'
+    ]
+
+    class SubscriptionTestDatum(typing.TypedDict):
+        n_subscribers: int
+        n_subscribed: int
+        subscribe_p50: float | None
+        subscribe_max: float | None
+        n_notifications: int
+        n_deliveries: int
+        n_dropped: int
+        n_late: int
+        delivery_rate: float | None
+        delay_mean: float | None
+        delay_p50: float | None
+        delay_p90: float | None
+        delay_p99: float | None
+        delay_max: float | None
+        node_memory: int | None
+        errors: typing.Sequence[str]
+
+    SubscriptionTestOutput = typing.Mapping[
+        str, typing.Sequence[SubscriptionTestDatum]
+    ]
+
     #
     # # load test types
     #
@@ -80,11 +113,27 @@ if typing.TYPE_CHECKING:
         duration: int
         calls: typing.Sequence[typing.Any]
         vegeta_args: VegetaArgs
+        warmup_calls: typing.Sequence[typing.Any] | None
+        offsets: typing.Sequence[float] | None
 
     VegetaArgs = typing.Union[str, None]
     MultiVegetaArgs = typing.Sequence[VegetaArgs]
     VegetaArgsShorthand = typing.Union[VegetaArgs, MultiVegetaArgs]
 
+    class AdaptiveDuration(typing.TypedDict):
+        metrics: typing.Sequence[str]
+        target_precision: float
+        confidence: float
+        min_duration: int
+
+    class Warmup(typing.TypedDict):
+        duration: int | None
+        requests: int | None
+
+    LoadTestEngine = typing.Literal[
+        'vegeta', 'persistent', 'websocket', 'ipc'
+    ]
+
     class TestGenerationParameters(typing.TypedDict):
         flood_version: str
         test_name: str
@@ -93,6 +142,64 @@ if typing.TYPE_CHECKING:
         durations: typing.Sequence[int] | None
         vegeta_args: VegetaArgsShorthand | None
         network: str
+        adaptive_duration: AdaptiveDuration | None
+        warmup: Warmup | None
+        engine: LoadTestEngine | None
+        max_connections: int | None
+        max_workers: int | None
+        batch_size: int | None
+        mix: typing.Mapping[str, float] | None
+        replay: Replay | None
+        workload_model: WorkloadModel | None
+        distribution: AccessDistribution | None
+        repeats: Repeats | None
+        block_range: tuple[int, int] | None
+
+    AccessDistributionName = typing.Literal[
+        'uniform', 'zipf', 'hot_set', 'recent'
+    ]
+
+    class AccessDistribution(typing.TypedDict):
+        name: AccessDistributionName
+        exponent: float | None
+        hot_fraction: float | None
+        hot_probability: float | None
+        mean_age: float | None
+
+    class Repeats(typing.TypedDict):
+        ratio: float
+        reuse_distance: AccessDistribution | None
+
+    # (start_block, end_block), 'node', or 'latest-N'
+    BlockRangeShorthand = typing.Union[tuple[int, int], str]
+
+    ReplayMode = typing.Literal['timed', 'shuffled']
+
+    class Replay(typing.TypedDict):
+        mode: ReplayMode
+        speeds: typing.Sequence[float] | None
+        n_requests: int
+        duration: float
+        # gzip-compressed base64 ndjson of [offset, call]
+        requests: str
+
+    class WorkloadMethodModel(typing.TypedDict):
+        weight: float
+        templates: typing.Sequence[typing.Any]
+        block_age_quantiles: typing.Sequence[float] | None
+        log_range_quantiles: typing.Sequence[float] | None
+        # counts of addresses at each address parameter, like 0 or 0.from
+        addresses: typing.Mapping[str, typing.Mapping[str, int]]
+
+    class WorkloadModel(typing.TypedDict):
+        n_requests: int
+        duration: float
+        rate: float
+        head_block: int | None
+        # std of gaps between requests relative to mean gap
+        burstiness: float
+        gap_quantiles: typing.Sequence[float] | None
+        methods: typing.Mapping[str, WorkloadMethodModel]
 
     # LoadTest = typing.Sequence[VegetaAttack]
     class LoadTest(typing.TypedDict):
@@ -110,6 +217,86 @@ if typing.TYPE_CHECKING:
     LoadTestGenerator = typing.Callable[..., typing.Sequence[VegetaAttack]]
     MultiLoadTestGenerator = typing.Callable[..., typing.Mapping[str, LoadTest]]
 
+    import asyncio
+    import ssl
+
+    Connection = tuple[asyncio.StreamReader, asyncio.StreamWriter]
+
+    class ConnectionPool(typing.TypedDict):
+        url: str
+        host: str
+        port: int
+        path: str
+        host_header: str
+        ssl: ssl.SSLContext | None
+        loop: asyncio.AbstractEventLoop
+        idle: list[Connection]
+        n_open: int
+        available: asyncio.Condition | None
+        max_connections: int | None
+        n_opened: int
+        n_reused: int
+        n_dropped: int
+
+    class Recorder(typing.TypedDict):
+        output_dir: str
+        max_file_size: int
+        file: typing.BinaryIO | None
+        file_index: int
+        file_size: int
+        paths: list[str]
+        n_requests: int
+        n_errors: int
+        n_bytes: int
+        # latencies in ns, merged into aggregates in batches
+        overheads: ValueAggregate
+        latencies: ValueAggregate
+        pending_overheads: list[int]
+        pending_latencies: list[int]
+
+    class RecordingSummary(typing.TypedDict):
+        upstream: str
+        duration: float
+        n_requests: int
+        n_errors: int
+        n_bytes: int
+        paths: typing.Sequence[str]
+        overhead: typing.Mapping[str, float | None]
+        latency: typing.Mapping[str, float | None]
+
+    class WebsocketConnection(typing.TypedDict):
+        reader: asyncio.StreamReader
+        writer: asyncio.StreamWriter
+        pending: dict[int, asyncio.Future[typing.Any]]
+        receiver: asyncio.Task[None] | None
+        notify: typing.Callable[[typing.Any, int], None] | None
+
+    class WebsocketPool(typing.TypedDict):
+        url: str
+        transport: typing.Literal['websocket', 'ipc']
+        host: str
+        port: int
+        path: str
+        host_header: str
+        ssl: ssl.SSLContext | None
+        loop: asyncio.AbstractEventLoop
+        connections: list[WebsocketConnection | None]
+        locks: list[asyncio.Lock] | None
+        next_id: int
+        n_opened: int
+        n_reused: int
+        n_dropped: int
+
+    class ConnectionCounts(typing.TypedDict):
+        opened: int
+        reused: int
+        dropped: int
+
+    LatencyPhase = typing.Literal[
+        'queue', 'dns', 'connect', 'tls', 'ttfb', 'transfer'
+    ]
+    PhaseLatencies = typing.Mapping[LatencyPhase, typing.Mapping[str, float]]
+
     #
     # # load tests outputs
     #
@@ -137,7 +324,7 @@ if typing.TYPE_CHECKING:
     class LoadTestOutputDatum(typing.TypedDict):
         target_rate: int
         actual_rate: float | None
-        target_duration: int
+        target_duration: float
         actual_duration: float | None
         requests: int
         throughput: float | None
@@ -155,20 +342,123 @@ if typing.TYPE_CHECKING:
         last_request_timestamp: str | None
         last_response_timestamp: str | None
         final_wait_time: float | None
+        precision: typing.Mapping[str, float] | None
+        warmup: LoadTestOutputDatum | None
+        connections_opened: int | None
+        connections_reused: int | None
+        connections_dropped: int | None
+        phase_latencies: PhaseLatencies | None
+        batch_size: int | None
+        call_throughput: float | None
+        repeat_ratio: float | None
         # additional deep keys
+        # path of parquet file of raw output in raw_output_dir, relative to
+        # results.json once results are saved, see
+        # flood.scan_single_run_raw_output(). earlier versions stored
+        # base64 gzipped raw output, see decode_raw_vegeta_output()
         deep_raw_output: str | None
         deep_metrics: typing.Mapping[
             ResponseCategory, LoadTestDeepOutputDatum
         ] | None
         deep_rpc_error_pairs: typing.Sequence[ErrorPair] | None
+        deep_method_metrics: typing.Mapping[
+            str, LoadTestDeepOutputDatum
+        ] | None
+        deep_failed_calls: typing.Sequence[FailedCall] | None
+        deep_slowest_calls: typing.Sequence[SlowCall] | None
+        deep_size_latency_samples: typing.Sequence[SizeLatencySample] | None
 
     ResponseCategory = typing.Literal['all', 'successful', 'failed']
     ErrorPair = tuple[typing.Any, typing.Any]
 
+    class FailedCall(typing.TypedDict):
+        error: str
+        call_index: int
+        n_failures: int
+        call: typing.Any
+
+    # (response size in bytes, latency in seconds)
+    SizeLatencySample = tuple[int, float]
+
+    class SlowCall(typing.TypedDict):
+        # each attack has its own calls, so calls are identified by both
+        attack_index: int | None
+        call_index: int
+        call: typing.Any
+        latency: float
+        response_size: int
+        timestamp: str
+
+    class SlowCallRemeasurement(typing.TypedDict):
+        attack_index: int | None
+        call_index: int
+        call: typing.Any
+        load_latency: float
+        isolated_latency: float
+        # None if latency under load was not measurable
+        isolated_ratio: float | None
+        intrinsic: bool
+
+    SchemaErrorCategory = typing.Literal[
+        'wrong_type',
+        'invalid_hex',
+        'missing_key',
+        'empty_result',
+    ]
+    ResponseSchema = typing.Union[str, typing.Mapping[str, typing.Any], None]
+
+    class ValueAggregate(typing.TypedDict):
+        n: int
+        total: int
+        min: int | None
+        max: int | None
+        exact_values: list[pl.Series] | None
+        histogram: npt.NDArray[np.int64] | None
+
+    class DeepAggregate(typing.TypedDict):
+        requests: int
+        n_successful: int
+        first_timestamp: int | None
+        last_timestamp: int | None
+        last_response_timestamp: int | None
+        status_codes: typing.MutableMapping[str, int]
+        errors: list[str]
+        n_invalid_json_errors: int
+        n_rpc_errors: int
+        n_schema_errors: int
+        n_wrong_type_errors: int
+        n_invalid_hex_errors: int
+        n_missing_key_errors: int
+        n_empty_result_errors: int
+        n_calls: int
+        n_failed_calls: int
+        values: typing.MutableMapping[str, ValueAggregate]
+        sum_squared_sizes: float
+        sum_size_latencies: float
+
+    class ResponseSizeMetrics(typing.TypedDict):
+        response_size_mean: float | None
+        response_size_p50: float | None
+        response_size_p90: float | None
+        response_size_p99: float | None
+        response_size_max: float | None
+        bytes_throughput: float | None
+        size_latency_slope: float | None
+        size_latency_intercept: float | None
+
+    class ErrorReservoir(typing.TypedDict):
+        n_seen: int
+        responses: list[bytes]
+        call_indices: list[int | None]
+
+    class LatencyReservoir(typing.TypedDict):
+        n_seen: int
+        latencies: list[int]
+
     class LoadTestDeepOutputDatum(typing.TypedDict):
         target_rate: int
         actual_rate: float | None
-        target_duration: int
+        target_duration: float
         actual_duration: float | None
         requests: int
         throughput: float | None
@@ -186,14 +476,30 @@ if typing.TYPE_CHECKING:
         last_request_timestamp: str | None
         last_response_timestamp: str | None
         final_wait_time: float | None
+        phase_latencies: PhaseLatencies | None
         # additional deep keys:
         n_invalid_json_errors: int
         n_rpc_errors: int
+        n_schema_errors: int
+        n_wrong_type_errors: int
+        n_invalid_hex_errors: int
+        n_missing_key_errors: int
+        n_empty_result_errors: int
+        n_calls: int
+        n_failed_calls: int
+        response_size_mean: float | None
+        response_size_p50: float | None
+        response_size_p90: float | None
+        response_size_p99: float | None
+        response_size_max: float | None
+        bytes_throughput: float | None
+        size_latency_slope: float | None
+        size_latency_intercept: float | None
 
     class LoadTestOutput(typing.TypedDict):
         target_rate: typing.Sequence[int]
         actual_rate: typing.Sequence[float | None]
-        target_duration: typing.Sequence[int]
+        target_duration: typing.Sequence[float]
         actual_duration: typing.Sequence[float | None]
         requests: typing.Sequence[int]
         throughput: typing.Sequence[float | None]
@@ -211,6 +517,15 @@ if typing.TYPE_CHECKING:
         last_request_timestamp: typing.Sequence[str | None]
         last_response_timestamp: typing.Sequence[str | None]
         final_wait_time: typing.Sequence[float | None]
+        precision: typing.Sequence[typing.Mapping[str, float] | None]
+        warmup: LoadTestOutput | None
+        connections_opened: typing.Sequence[int | None]
+        connections_reused: typing.Sequence[int | None]
+        connections_dropped: typing.Sequence[int | None]
+        phase_latencies: typing.Sequence[PhaseLatencies | None]
+        batch_size: typing.Sequence[int | None]
+        call_throughput: typing.Sequence[float | None]
+        repeat_ratio: typing.Sequence[float | None]
         # additional deep keys
         deep_raw_output: typing.Sequence[str | None] | None
         deep_metrics: typing.Mapping[
@@ -219,11 +534,21 @@ if typing.TYPE_CHECKING:
         deep_rpc_error_pairs: typing.Sequence[
             typing.Sequence[ErrorPair] | None
         ] | None
+        deep_method_metrics: typing.Mapping[str, LoadTestDeepOutput] | None
+        deep_failed_calls: typing.Sequence[
+            typing.Sequence[FailedCall] | None
+        ] | None
+        deep_slowest_calls: typing.Sequence[
+            typing.Sequence[SlowCall] | None
+        ] | None
+        deep_size_latency_samples: typing.Sequence[
+            typing.Sequence[SizeLatencySample] | None
+        ] | None
 
     class LoadTestDeepOutput(typing.TypedDict):
         target_rate: typing.Sequence[int]
         actual_rate: typing.Sequence[float | None]
-        target_duration: typing.Sequence[int]
+        target_duration: typing.Sequence[float]
         actual_duration: typing.Sequence[float | None]
         requests: typing.Sequence[int]
         throughput: typing.Sequence[float | None]
@@ -241,9 +566,25 @@ if typing.TYPE_CHECKING:
         last_request_timestamp: typing.Sequence[str | None]
         last_response_timestamp: typing.Sequence[str | None]
         final_wait_time: typing.Sequence[float | None]
+        phase_latencies: typing.Sequence[PhaseLatencies | None]
         # additional deep keys:
         n_invalid_json_errors: typing.Sequence[int]
         n_rpc_errors: typing.Sequence[int]
+        n_schema_errors: typing.Sequence[int]
+        n_wrong_type_errors: typing.Sequence[int]
+        n_invalid_hex_errors: typing.Sequence[int]
+        n_missing_key_errors: typing.Sequence[int]
+        n_empty_result_errors: typing.Sequence[int]
+        n_calls: typing.Sequence[int]
+        n_failed_calls: typing.Sequence[int]
+        response_size_mean: typing.Sequence[float | None]
+        response_size_p50: typing.Sequence[float | None]
+        response_size_p90: typing.Sequence[float | None]
+        response_size_p99: typing.Sequence[float | None]
+        response_size_max: typing.Sequence[float | None]
+        bytes_throughput: typing.Sequence[float | None]
+        size_latency_slope: typing.Sequence[float | None]
+        size_latency_intercept: typing.Sequence[float | None]
 
     RunType = typing.Literal['single_test']  # noqa: F821
     DeepOutput = typing.Literal['raw', 'metrics']
@@ -1,2 +1,3 @@
 from .equality_tests import *
 from .load_tests import *
+from .subscription_tests import *
@@ -1,6 +1,17 @@
+from .adaptive_durations import *
+from .batch_requests import *
+from .block_age_sweeps import *
+from .deep_aggregates import *
 from .deep_utils import *
 from .load_test_construction import *
 from .load_test_plots import *
 from .load_test_reports import *
 from .load_test_runs import *
+from .persistent_engine import *
+from .repeated_calls import *
+from .request_phases import *
+from .response_schemas import *
+from .response_sizes import *
+from .slowest_calls import *
 from .vegeta import *
+from .websocket_engine import *
@@ -0,0 +1,376 @@
+"""extend attacks until latency percentiles have converged
+
+precision is estimated by bootstrapping a bounded uniform sample of the
+latencies seen so far, so that each check takes the same time regardless of
+attack length
+
+vegeta attacks run as a single process that is interrupted once precision
+is reached, so that load and connections are kept up during each check.
+attacks of the persistent and websocket engines run in chunks over their
+connection pool, which keeps connections open between chunks
+"""
+from __future__ import annotations
+
+import typing
+
+from ... import spec
+from . import vegeta
+
+if typing.TYPE_CHECKING:
+    import random
+
+
+# latencies kept for bootstrapping, sampled uniformly from all latencies
+max_bootstrap_samples = 10_000
+
+
+def run_adaptive_vegeta_attack(
+    *,
+    url: str,
+    rate: int,
+    calls: typing.Sequence[typing.Any],
+    max_duration: float,
+    adaptive_duration: spec.AdaptiveDuration,
+    vegeta_args: str | None = None,
+    max_connections: int | None = None,
+    max_workers: int | None = None,
+    connection_pool: spec.ConnectionPool | None = None,
+    websocket_pool: spec.WebsocketPool | None = None,
+    output: typing.BinaryIO | None = None,
+    verbose: bool = False,
+) -> tuple[
+    bytes,
+    float,
+    typing.Mapping[str, float],
+    spec.ConnectionCounts | None,
+]:
+    """attack until the target precision or max_duration is reached
+
+    precision is checked every min_duration seconds
+
+    if output is given, json results are written to output while the attack
+    runs and empty bytes are returned. output must be readable as well as
+    writable, such as a file opened with mode w+b
+
+    returns (
+        raw output of attack as json results,
+        seconds attacked,
+        achieved precision,
+        connection counts summed over chunks,
+    )
+    """
+    min_duration = adaptive_duration['min_duration']
+    if min_duration <= 0:
+        raise Exception('min_duration must be positive')
+    if output is None:
+        import io
+
+        buffer = io.BytesIO()
+        result = run_adaptive_vegeta_attack(
+            url=url,
+            rate=rate,
+            calls=calls,
+            max_duration=max_duration,
+            adaptive_duration=adaptive_duration,
+            vegeta_args=vegeta_args,
+            max_connections=max_connections,
+            max_workers=max_workers,
+            connection_pool=connection_pool,
+            websocket_pool=websocket_pool,
+            output=buffer,
+            verbose=verbose,
+        )
+        return buffer.getvalue(), result[1], result[2], result[3]
+    if connection_pool is None and websocket_pool is None:
+        return _run_interruptible_vegeta_attack(
+            url=url,
+            rate=rate,
+            calls=calls,
+            max_duration=max_duration,
+            adaptive_duration=adaptive_duration,
+            vegeta_args=vegeta_args,
+            max_connections=max_connections,
+            max_workers=max_workers,
+            output=output,
+            verbose=verbose,
+        )
+
+    import orjson
+    import random
+
+    reservoir: spec.LatencyReservoir = {'n_seen': 0, 'latencies': []}
+    rng = random.Random(0)
+    elapsed: float = 0
+    precision: typing.Mapping[str, float] = {}
+    connection_counts: spec.ConnectionCounts | None = None
+    while elapsed < max_duration:
+        # attack using the next unused slice of calls
+        chunk_duration = min(min_duration, max_duration - elapsed)
+        chunk_calls = calls[
+            int(rate * elapsed) : int(rate * (elapsed + chunk_duration))
+        ]
+        if len(chunk_calls) == 0:
+            chunk_calls = calls
+        chunk_start = output.tell()
+        chunk_counts = vegeta._run_attack(
+            url=url,
+            rate=rate,
+            calls=chunk_calls,
+            duration=chunk_duration,
+            vegeta_args=vegeta_args,
+            max_connections=max_connections,
+            max_workers=max_workers,
+            connection_pool=connection_pool,
+            websocket_pool=websocket_pool,
+            output=output,
+            verbose=verbose,
+        )
+        elapsed += chunk_duration
+        if chunk_counts is not None:
+            if connection_counts is None:
+                connection_counts = chunk_counts
+            else:
+                connection_counts = {
+                    'opened': connection_counts['opened']
+                    + chunk_counts['opened'],
+                    'reused': connection_counts['reused']
+                    + chunk_counts['reused'],
+                    'dropped': connection_counts['dropped']
+                    + chunk_counts['dropped'],
+                }
+
+        # output of persistent and websocket engines is json results, which
+        # are read back line by line from the start of the chunk
+        output.seek(chunk_start)
+        for line in output:
+            if len(line) > 1:
+                latency = orjson.loads(line)['latency']
+                _update_latency_reservoir(reservoir, latency, rng=rng)
+
+        # stop once every metric has converged
+        precision = _compute_reservoir_precision(reservoir, adaptive_duration)
+        if verbose:
+            print('- precision after', elapsed, 'seconds:', precision)
+        if _has_converged(precision, adaptive_duration):
+            break
+
+    return b'', elapsed, precision, connection_counts
+
+
+def _run_interruptible_vegeta_attack(
+    *,
+    url: str,
+    rate: int,
+    calls: typing.Sequence[typing.Any],
+    max_duration: float,
+    adaptive_duration: spec.AdaptiveDuration,
+    vegeta_args: str | None = None,
+    max_connections: int | None = None,
+    max_workers: int | None = None,
+    output: typing.BinaryIO,
+    verbose: bool = False,
+) -> tuple[bytes, float, typing.Mapping[str, float], None]:
+    """run one vegeta attack for max_duration, interrupting it on convergence
+
+    results are encoded as json and written to output while the attack runs,
+    and vegeta stops sending and flushes its results when interrupted
+    """
+    import orjson
+    import random
+    import signal
+    import subprocess
+    import threading
+    import time
+
+    attack = vegeta._construct_vegeta_attack(
+        calls=calls, url=url, verbose=verbose
+    )
+    cmd = vegeta._get_vegeta_attack_command(
+        attack['schedule_dir'],
+        duration=max_duration,
+        rate=rate,
+        max_connections=max_connections,
+        max_workers=max_workers,
+        vegeta_args=vegeta_args,
+    )
+    if verbose:
+        print('- command:', cmd)
+
+    attack_process = subprocess.Popen(cmd.split(' '), stdout=subprocess.PIPE)
+    encode_process = subprocess.Popen(
+        ['vegeta', 'encode', '--to', 'json'],
+        stdin=attack_process.stdout,
+        stdout=subprocess.PIPE,
+    )
+    assert attack_process.stdout is not None
+    attack_process.stdout.close()
+
+    # write results in a thread, while precision is checked in this one
+    reservoir: spec.LatencyReservoir = {'n_seen': 0, 'latencies': []}
+    rng = random.Random(0)
+    lock = threading.Lock()
+
+    def read_results() -> None:
+        assert encode_process.stdout is not None
+        for line in encode_process.stdout:
+            if len(line) > 1:
+                latency = orjson.loads(line)['latency']
+                output.write(line)
+                with lock:
+                    _update_latency_reservoir(reservoir, latency, rng=rng)
+
+    reader = threading.Thread(target=read_results, daemon=True)
+    reader.start()
+
+    t_start = time.perf_counter()
+    precision: typing.Mapping[str, float] = {}
+    next_check = float(adaptive_duration['min_duration'])
+    try:
+        while next_check < max_duration:
+            timeout = t_start + next_check - time.perf_counter()
+            try:
+                attack_process.wait(timeout=max(timeout, 0))
+                break
+            except subprocess.TimeoutExpired:
+                pass
+            with lock:
+                snapshot: spec.LatencyReservoir = {
+                    'n_seen': reservoir['n_seen'],
+                    'latencies': list(reservoir['latencies']),
+                }
+            precision = _compute_reservoir_precision(
+                snapshot, adaptive_duration
+            )
+            if verbose:
+                print('- precision after', next_check, 'seconds:', precision)
+            if _has_converged(precision, adaptive_duration):
+                attack_process.send_signal(signal.SIGINT)
+                break
+            next_check += adaptive_duration['min_duration']
+        attack_process.wait()
+        elapsed = min(time.perf_counter() - t_start, max_duration)
+        reader.join()
+        if encode_process.wait() != 0:
+            raise Exception('could not encode vegeta results')
+    finally:
+        for process in [attack_process, encode_process]:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+    if attack_process.returncode not in (0, -signal.SIGINT):
+        raise Exception('vegeta attack failed')
+
+    precision = _compute_reservoir_precision(reservoir, adaptive_duration)
+    return b'', elapsed, precision, None
+
+
+def _has_converged(
+    precision: typing.Mapping[str, float],
+    adaptive_duration: spec.AdaptiveDuration,
+) -> bool:
+    return all(
+        value <= adaptive_duration['target_precision']
+        for value in precision.values()
+    )
+
+
+#
+# # latency samples
+#
+
+
+def _update_latency_reservoir(
+    reservoir: spec.LatencyReservoir, latency: int, *, rng: random.Random
+) -> None:
+    """add latency to uniform sample of all latencies, of bounded size"""
+    reservoir['n_seen'] += 1
+    if len(reservoir['latencies']) < max_bootstrap_samples:
+        reservoir['latencies'].append(latency)
+    else:
+        index = rng.randrange(reservoir['n_seen'])
+        if index < max_bootstrap_samples:
+            reservoir['latencies'][index] = latency
+
+
+def _compute_reservoir_precision(
+    reservoir: spec.LatencyReservoir,
+    adaptive_duration: spec.AdaptiveDuration,
+) -> typing.Mapping[str, float]:
+    return compute_bootstrap_precision(
+        latencies=reservoir['latencies'],
+        metrics=adaptive_duration['metrics'],
+        confidence=adaptive_duration['confidence'],
+        n_latencies=reservoir['n_seen'],
+    )
+
+
+#
+# # bootstrap
+#
+
+
+def compute_bootstrap_precision(
+    latencies: typing.Sequence[float],
+    metrics: typing.Sequence[str],
+    *,
+    confidence: float = 0.95,
+    n_resamples: int = 200,
+    random_seed: spec.RandomSeed | None = 0,
+    n_latencies: int | None = None,
+) -> typing.Mapping[str, float]:
+    """compute relative width of bootstrap confidence interval of metrics
+
+    metrics can be latency percentiles like p50 or p99, or mean
+
+    at most max_bootstrap_samples latencies are resampled. if latencies are a
+    uniform sample of n_latencies latencies, or are subsampled, intervals are
+    narrowed from the sample size to the full size by the square root of
+    their ratio, as in an m out of n bootstrap
+    """
+    import numpy as np
+    from flood import generators
+
+    if n_latencies is None:
+        n_latencies = len(latencies)
+    if len(latencies) < 2:
+        return {metric: float('inf') for metric in metrics}
+
+    rng = generators.get_rng(random_seed=random_seed)
+    samples = np.array(latencies, dtype=float)
+    if len(samples) > max_bootstrap_samples:
+        samples = rng.choice(samples, size=max_bootstrap_samples, replace=False)
+    indices = rng.integers(0, len(samples), size=(n_resamples, len(samples)))
+    resamples = samples[indices]
+    estimates = np.stack(
+        [_compute_metric(resamples, metric, axis=1) for metric in metrics],
+        axis=1,
+    )
+    lower, upper = np.quantile(
+        estimates,
+        [(1 - confidence) / 2, (1 + confidence) / 2],
+        axis=0,
+    )
+    scale = np.sqrt(len(samples) / max(n_latencies, len(samples)))
+
+    precision = {}
+    for m, metric in enumerate(metrics):
+        point_estimate = float(_compute_metric(samples, metric))
+        if point_estimate > 0:
+            width = (upper[m] - lower[m]) * scale
+            precision[metric] = float(width / point_estimate)
+        else:
+            precision[metric] = float('inf')
+    return precision
+
+
+def _compute_metric(
+    samples: typing.Any, metric: str, axis: int | None = None
+) -> typing.Any:
+    import numpy as np
+
+    if metric == 'mean':
+        return np.mean(samples, axis=axis)
+    elif metric.startswith('p') and metric[1:].isdecimal():
+        return np.quantile(samples, int(metric[1:]) / 100, axis=axis)
+    else:
+        raise Exception('invalid precision metric: ' + str(metric))
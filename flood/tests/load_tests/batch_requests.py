@@ -0,0 +1,203 @@
+"""json-rpc batch requests, where each request is an array of calls"""
+from __future__ import annotations
+
+import typing
+
+import flood
+from flood import spec
+
+
+def add_attack_batches(
+    attacks: typing.Sequence[spec.VegetaAttack],
+    batch_size: int,
+    rates: typing.Sequence[int],
+) -> typing.Sequence[spec.VegetaAttack]:
+    """pack consecutive calls of each attack into batches of batch_size
+
+    attacks should have been generated at rates multiplied by batch_size,
+    rates are the request rates of each attack after batching
+    """
+    if batch_size < 1:
+        raise Exception('batch_size must be at least 1')
+    if len(attacks) != len(rates):
+        raise Exception('different number of attacks vs rates')
+    new_attacks = []
+    for attack, rate in zip(attacks, rates):
+        calls = attack['calls']
+        n_batches = len(calls) // batch_size
+        if n_batches == 0:
+            raise Exception('not enough calls to create batch of attack')
+        new_attack = typing.cast('spec.VegetaAttack', dict(attack))
+        new_attack['rate'] = rate
+        new_attack['calls'] = [
+            list(calls[b * batch_size : (b + 1) * batch_size])
+            for b in range(n_batches)
+        ]
+        new_attacks.append(new_attack)
+    return new_attacks
+
+
+def get_batch_size(calls: typing.Sequence[typing.Any]) -> int | None:
+    """get number of calls per request, or None if requests are not batched
+
+    replayed traffic can mix batches of different sizes with single calls,
+    which have no single batch size, see get_request_batch_sizes()
+    """
+    if len(calls) > 0 and isinstance(calls[0], list):
+        batch_size = len(calls[0])
+        if all(
+            isinstance(call, list) and len(call) == batch_size
+            for call in calls
+        ):
+            return batch_size
+    return None
+
+
+def get_request_batch_sizes(
+    calls: typing.Sequence[typing.Any],
+) -> typing.Sequence[int | None] | None:
+    """get number of calls of each request, or None if no request is batched
+
+    single calls that are not in a batch have a size of None
+    """
+    sizes = [len(call) if isinstance(call, list) else None for call in calls]
+    if all(size is None for size in sizes):
+        return None
+    return sizes
+
+
+def compute_call_metrics(
+    report: spec.LoadTestOutputDatum,
+    batch_size: int | None,
+) -> spec.LoadTestOutputDatum:
+    """add per-call throughput to request-level report
+
+    no call of a batch completes before its whole request does, so per-call
+    latencies are the request latencies and are not repeated
+
+    an http 200 batch can still contain failed calls, so successful calls are
+    counted from the deep check when available, over the same time span as
+    vegeta's throughput. without a deep check, call throughput assumes every
+    call of a successful request succeeded, and is an upper bound
+    """
+    report['batch_size'] = batch_size
+    throughput = report['throughput']
+    deep_metrics = report.get('deep_metrics')
+    if batch_size is None or throughput is None:
+        call_throughput = None
+    elif deep_metrics is not None and 'all' in deep_metrics:
+        all_metrics = deep_metrics['all']
+        n_successful = all_metrics['n_calls'] - all_metrics['n_failed_calls']
+        elapsed = (report['actual_duration'] or 0) + (
+            report['final_wait_time'] or 0
+        )
+        if elapsed > 0:
+            call_throughput = n_successful / elapsed
+        else:
+            call_throughput = 0.0
+    else:
+        call_throughput = throughput * batch_size
+    report['call_throughput'] = call_throughput
+    return report
+
+
+#
+# # batch size sweeps
+#
+
+
+def run_batch_size_sweep(
+    *,
+    node: spec.NodeShorthand,
+    test_name: str,
+    batch_sizes: typing.Sequence[int],
+    rates: typing.Sequence[int],
+    durations: typing.Sequence[int],
+    network: str,
+    random_seed: spec.RandomSeed | None = None,
+    verbose: bool | int = False,
+    include_deep_output: typing.Sequence[spec.DeepOutput] | None = None,
+) -> typing.Mapping[str, spec.LoadTestOutput]:
+    """run same test at multiple batch sizes, keyed by batch size
+
+    rates are in requests per second, so each batch size sends calls at
+    a different rate
+    """
+    tests = {
+        'batch_size=' + str(batch_size): flood.generate_test(
+            test_name=test_name,
+            rates=rates,
+            durations=durations,
+            network=network,
+            random_seed=random_seed,
+            batch_size=batch_size,
+            flood_version=flood.get_flood_version(),
+        )
+        for batch_size in batch_sizes
+    }
+    return flood.run_load_tests(
+        node=node,
+        tests=tests,
+        verbose=verbose,
+        include_deep_output=include_deep_output,
+    )
+
+
+def compute_batch_size_saturation(
+    results: typing.Mapping[str, spec.LoadTestOutput],
+    min_improvement: float = 0.1,
+) -> typing.Mapping[int, int | None]:
+    """find batch size past which call throughput stops improving, per rate
+
+    batch size is the largest one that improved call throughput by at least
+    min_improvement over all smaller batch sizes
+    """
+
+    def sort_key(result: spec.LoadTestOutput) -> int:
+        batch_size = result['batch_size'][0]
+        if batch_size is None:
+            raise Exception('results are not batched')
+        return batch_size
+
+    by_batch_size = sorted(results.values(), key=sort_key)
+    rates = by_batch_size[0]['target_rate']
+    saturation: dict[int, int | None] = {}
+    for r, rate in enumerate(rates):
+        best = by_batch_size[0]['batch_size'][r]
+        previous = by_batch_size[0]['call_throughput'][r]
+        for result in by_batch_size[1:]:
+            throughput = result['call_throughput'][r]
+            if throughput is None or previous is None:
+                continue
+            if throughput >= previous * (1 + min_improvement):
+                best = result['batch_size'][r]
+            previous = max(previous, throughput)
+        saturation[rate] = best
+    return saturation
+
+
+def print_batch_size_sweep(
+    results: typing.Mapping[str, spec.LoadTestOutput],
+    min_improvement: float = 0.1,
+) -> None:
+    """print per-call metrics of sweep and where batching stops helping"""
+    import toolstr
+
+    flood.user_io.print_metric_tables(
+        results=results,
+        metrics=['call_throughput', 'throughput', 'p50'],
+        comparison=False,
+        indent=4,
+    )
+    print()
+    saturation = compute_batch_size_saturation(
+        results, min_improvement=min_improvement
+    )
+    rows = [[rate, batch_size] for rate, batch_size in saturation.items()]
+    toolstr.print_table(
+        rows,
+        labels=['rate (rps)', 'largest helpful batch size'],
+        label_style=flood.user_io.styles.get('metavar'),
+        border=flood.user_io.styles.get('content'),
+        indent=4,
+    )
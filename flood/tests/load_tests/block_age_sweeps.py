@@ -0,0 +1,180 @@
+"""block age sweeps, which run the same state test against older and older state
+
+archive nodes store recent state and historical state differently, so state
+lookups tend to get slower the further back in history they reach
+
+each bucket of block ages becomes its own test, so latency and throughput
+are reported per bucket, see block_generators.get_block_age_ranges()
+
+only blocks are sampled per bucket, the addresses, contracts, and slots of
+calls come from samples of mainnet state between blocks 10M and 16M, so in
+buckets before that era many calls look up state that does not exist yet,
+which understates the cost of old state
+"""
+from __future__ import annotations
+
+import typing
+
+import flood
+from flood import spec
+
+
+# first block of the era that address, contract, and slot samples come from
+sampled_state_start_block = 10_000_000
+
+# tests whose calls read state at a sampled block
+block_age_test_names = [
+    'eth_call',
+    'eth_getBalance',
+    'eth_getCode',
+    'eth_getStorageAt',
+    'eth_getTransactionCount',
+]
+
+
+def generate_block_age_tests(
+    *,
+    test_name: str,
+    head_block: int,
+    earliest_block: int = 0,
+    rates: typing.Sequence[int],
+    durations: typing.Sequence[int],
+    network: str,
+    buckets: typing.Mapping[str, tuple[int, int]] | None = None,
+    genesis_blocks: int | None = 1_000_000,
+    random_seed: spec.RandomSeed | None = None,
+) -> typing.Mapping[str, spec.LoadTest]:
+    """generate one test per block age bucket, keyed by bucket name"""
+    if test_name not in block_age_test_names:
+        raise Exception(
+            'block age sweeps only support state tests: '
+            + ', '.join(block_age_test_names)
+        )
+    block_ranges = flood.generators.get_block_age_ranges(
+        head_block,
+        buckets=buckets,
+        genesis_blocks=genesis_blocks,
+        earliest_block=earliest_block,
+    )
+    if network == 'ethereum':
+        early_buckets = [
+            name
+            for name, (start_block, end_block) in block_ranges.items()
+            if end_block < sampled_state_start_block
+        ]
+        if len(early_buckets) > 0:
+            import warnings
+
+            warnings.warn(
+                'buckets '
+                + ', '.join(early_buckets)
+                + ' end before block '
+                + str(sampled_state_start_block)
+                + ', where most sampled addresses, contracts, and slots do'
+                ' not exist yet, so their calls mostly look up empty state'
+            )
+    return {
+        name: flood.generate_test(
+            test_name=test_name,
+            rates=rates,
+            durations=durations,
+            network=network,
+            random_seed=random_seed,
+            block_range=block_range,
+            flood_version=flood.get_flood_version(),
+        )
+        for name, block_range in block_ranges.items()
+    }
+
+
+def run_block_age_sweep(
+    *,
+    node: spec.NodeShorthand,
+    test_name: str,
+    rates: typing.Sequence[int],
+    durations: typing.Sequence[int],
+    network: str,
+    head_block: int | None = None,
+    buckets: typing.Mapping[str, tuple[int, int]] | None = None,
+    genesis_blocks: int | None = 1_000_000,
+    random_seed: spec.RandomSeed | None = None,
+    verbose: bool | int = False,
+    include_deep_output: typing.Sequence[spec.DeepOutput] | None = None,
+) -> typing.Mapping[str, spec.LoadTestOutput]:
+    """run same state test at multiple block ages, keyed by bucket name
+
+    if head_block is not given, the head block and earliest block with state
+    are requested from node, and buckets without state are omitted
+    """
+    earliest_block = 0
+    if head_block is None:
+        parsed_node = flood.user_io.parse_node(node, request_metadata=False)
+        earliest_block, head_block = flood.user_io.get_node_block_bounds(
+            url=parsed_node['url'], remote=parsed_node['remote']
+        )
+    tests = generate_block_age_tests(
+        test_name=test_name,
+        head_block=head_block,
+        earliest_block=earliest_block,
+        rates=rates,
+        durations=durations,
+        network=network,
+        buckets=buckets,
+        genesis_blocks=genesis_blocks,
+        random_seed=random_seed,
+    )
+    return flood.run_load_tests(
+        node=node,
+        tests=tests,
+        verbose=verbose,
+        include_deep_output=include_deep_output,
+    )
+
+
+def compute_block_age_slowdown(
+    results: typing.Mapping[str, spec.LoadTestOutput],
+    metric: str = 'p50',
+) -> typing.Mapping[str, typing.Sequence[float | None]]:
+    """compute metric of each bucket relative to first bucket, at each rate"""
+    buckets = list(results.keys())
+    if len(buckets) == 0:
+        return {}
+    baseline = results[buckets[0]][metric]  # type: ignore
+    slowdown = {}
+    for bucket in buckets:
+        values = results[bucket][metric]  # type: ignore
+        slowdown[bucket] = [
+            value / base if value is not None and base else None
+            for value, base in zip(values, baseline)
+        ]
+    return slowdown
+
+
+def print_block_age_sweep(
+    results: typing.Mapping[str, spec.LoadTestOutput],
+    metric: str = 'p50',
+) -> None:
+    """print metrics of each bucket and slowdown relative to first bucket"""
+    import toolstr
+
+    flood.user_io.print_metric_tables(
+        results=results,
+        metrics=['success', 'throughput', 'p50', 'p90'],
+        comparison=False,
+        indent=4,
+    )
+    print()
+    slowdown = compute_block_age_slowdown(results, metric=metric)
+    rates = list(results.values())[0]['target_rate']
+    rows = [
+        [rate] + [values[r] for values in slowdown.values()]
+        for r, rate in enumerate(rates)
+    ]
+    toolstr.print_table(
+        rows,
+        labels=['rate (rps)']
+        + [bucket + ' ' + metric + ' slowdown' for bucket in slowdown],
+        label_style=flood.user_io.styles.get('metavar'),
+        border=flood.user_io.styles.get('content'),
+        indent=4,
+    )
@@ -0,0 +1,628 @@
+"""mergeable aggregates of deep check results
+
+deep checks consume the results of an attack in batches, reducing each batch
+to an aggregate of counts and value statistics that is merged into a running
+aggregate, so that memory of deep checks does not grow with attack length
+
+values of each column are kept exactly up to max_exact_values, so that
+percentiles of typical attacks are exact, and are replaced by a log-spaced
+histogram beyond that, whose percentiles have bounded relative error
+"""
+from __future__ import annotations
+
+import typing
+
+from ... import spec
+
+if typing.TYPE_CHECKING:
+    import random
+
+    import numpy as np
+    import numpy.typing as npt
+    import polars as pl
+
+
+# values of each column are kept exactly up to this many values
+max_exact_values = 1_000_000
+
+# relative width of histogram buckets, used beyond max_exact_values
+histogram_relative_error = 0.01
+
+# distinct error messages kept by each aggregate
+max_distinct_errors = 1_000
+
+# rpc error responses kept by each deep check, sampled from all errors
+max_error_responses = 1_000
+
+# calls listed for each error message in tables of failed calls
+max_failed_calls_per_error = 100
+
+
+#
+# # value aggregates
+#
+
+
+def create_value_aggregate(
+    values: pl.Series | None = None,
+) -> spec.ValueAggregate:
+    """create aggregate of integer values, such as latencies in ns"""
+    if values is None or len(values) == 0:
+        return {
+            'n': 0,
+            'total': 0,
+            'min': None,
+            'max': None,
+            'exact_values': [],
+            'histogram': None,
+        }
+    aggregate: spec.ValueAggregate = {
+        'n': len(values),
+        'total': int(values.sum()),
+        'min': int(values.min()),  # type: ignore
+        'max': int(values.max()),  # type: ignore
+        'exact_values': [values],
+        'histogram': None,
+    }
+    return _limit_exact_values(aggregate)
+
+
+def merge_value_aggregates(
+    first: spec.ValueAggregate, second: spec.ValueAggregate
+) -> spec.ValueAggregate:
+    """merge two aggregates of values"""
+    if first['n'] == 0:
+        return second
+    if second['n'] == 0:
+        return first
+    assert first['min'] is not None and first['max'] is not None
+    assert second['min'] is not None and second['max'] is not None
+
+    exact_values = None
+    histogram = None
+    if first['exact_values'] is not None and second['exact_values'] is not None:
+        exact_values = first['exact_values'] + second['exact_values']
+    else:
+        histogram = _get_histogram(first) + _get_histogram(second)
+    merged: spec.ValueAggregate = {
+        'n': first['n'] + second['n'],
+        'total': first['total'] + second['total'],
+        'min': min(first['min'], second['min']),
+        'max': max(first['max'], second['max']),
+        'exact_values': exact_values,
+        'histogram': histogram,
+    }
+    return _limit_exact_values(merged)
+
+
+def compute_value_stats(
+    aggregate: spec.ValueAggregate,
+) -> typing.Mapping[str, float] | None:
+    """compute min, mean, p50, p90, p95, p99, and max of aggregated values
+
+    percentiles are exact while exact values are kept, otherwise they are
+    estimated from the histogram of values
+    """
+    if aggregate['n'] == 0:
+        return None
+    if aggregate['exact_values'] is not None:
+        import polars as pl
+
+        values = pl.concat(aggregate['exact_values'])
+        return {
+            'min': values.min(),  # type: ignore
+            'mean': values.mean(),  # type: ignore
+            'p50': values.median(),  # type: ignore
+            'p90': values.quantile(0.90),  # type: ignore
+            'p95': values.quantile(0.95),  # type: ignore
+            'p99': values.quantile(0.99),  # type: ignore
+            'max': values.max(),  # type: ignore
+        }
+    else:
+        assert aggregate['min'] is not None and aggregate['max'] is not None
+        return {
+            'min': aggregate['min'],
+            'mean': aggregate['total'] / aggregate['n'],
+            'p50': _compute_histogram_quantile(aggregate, 0.50),
+            'p90': _compute_histogram_quantile(aggregate, 0.90),
+            'p95': _compute_histogram_quantile(aggregate, 0.95),
+            'p99': _compute_histogram_quantile(aggregate, 0.99),
+            'max': aggregate['max'],
+        }
+
+
+def _limit_exact_values(
+    aggregate: spec.ValueAggregate,
+) -> spec.ValueAggregate:
+    if (
+        aggregate['exact_values'] is not None
+        and aggregate['n'] > max_exact_values
+    ):
+        aggregate = dict(aggregate)  # type: ignore
+        aggregate['histogram'] = _get_histogram(aggregate)
+        aggregate['exact_values'] = None
+    return aggregate
+
+
+def _get_histogram_bucket_width() -> float:
+    import math
+
+    return math.log1p(histogram_relative_error)
+
+
+def _get_histogram(aggregate: spec.ValueAggregate) -> npt.NDArray[np.int64]:
+    """get histogram of values, where bucket 0 holds values below 1
+
+    bucket i > 0 holds values in [(1 + e) ** (i - 1), (1 + e) ** i), where e is
+    histogram_relative_error
+    """
+    import math
+    import numpy as np
+
+    if aggregate['histogram'] is not None:
+        return aggregate['histogram']
+
+    width = _get_histogram_bucket_width()
+    n_buckets = int(math.log(2**63) / width) + 2
+    histogram = np.zeros(n_buckets, dtype=np.int64)
+    assert aggregate['exact_values'] is not None
+    for values in aggregate['exact_values']:
+        array = values.to_numpy()
+        indices = np.zeros(len(array), dtype=np.int64)
+        positive = array >= 1
+        indices[positive] = (
+            np.floor(np.log(array[positive]) / width).astype(np.int64) + 1
+        )
+        histogram += np.bincount(indices, minlength=n_buckets)
+    return histogram
+
+
+def _compute_histogram_quantile(
+    aggregate: spec.ValueAggregate, quantile: float
+) -> float:
+    """estimate quantile as the geometric middle of its histogram bucket"""
+    import math
+    import numpy as np
+
+    assert aggregate['min'] is not None and aggregate['max'] is not None
+    histogram = _get_histogram(aggregate)
+    rank = round(quantile * (aggregate['n'] - 1))
+    bucket = int(np.searchsorted(np.cumsum(histogram), rank + 1))
+    if bucket == 0:
+        value = float(aggregate['min'])
+    else:
+        value = math.exp((bucket - 0.5) * _get_histogram_bucket_width())
+    return min(max(value, aggregate['min']), aggregate['max'])
+
+
+#
+# # deep aggregates
+#
+
+
+def create_deep_aggregate(df: pl.DataFrame | None = None) -> spec.DeepAggregate:
+    """create aggregate of batch of deep check results, 1 row per response
+
+    df needs timestamp, latency, status_code, error, invalid_json_error,
+    rpc_error, schema_error, n_calls, and n_failed_calls columns, and
+    bytes_in and phase_{phase} columns are aggregated if present
+    """
+    from . import response_schemas
+
+    if df is None or len(df) == 0:
+        return {
+            'requests': 0,
+            'n_successful': 0,
+            'first_timestamp': None,
+            'last_timestamp': None,
+            'last_response_timestamp': None,
+            'status_codes': {},
+            'errors': [],
+            'n_invalid_json_errors': 0,
+            'n_rpc_errors': 0,
+            'n_schema_errors': 0,
+            'n_wrong_type_errors': 0,
+            'n_invalid_hex_errors': 0,
+            'n_missing_key_errors': 0,
+            'n_empty_result_errors': 0,
+            'n_calls': 0,
+            'n_failed_calls': 0,
+            'values': {},
+            'sum_squared_sizes': 0.0,
+            'sum_size_latencies': 0.0,
+        }
+
+    import polars as pl
+
+    summary = df.select(
+        (pl.col('status_code') == 200).sum().alias('n_successful'),
+        pl.min('timestamp').alias('first_timestamp'),
+        pl.max('timestamp').alias('last_timestamp'),
+        (pl.col('timestamp') + pl.col('latency'))
+        .max()
+        .alias('last_response_timestamp'),
+        pl.sum('invalid_json_error').alias('n_invalid_json_errors'),
+        pl.sum('rpc_error').alias('n_rpc_errors'),
+        pl.col('schema_error').is_not_null().sum().alias('n_schema_errors'),
+        *[
+            (pl.col('schema_error') == category)
+            .sum()
+            .alias('n_' + category + '_errors')
+            for category in response_schemas.schema_error_categories
+        ],
+        pl.sum('n_calls').alias('n_calls'),
+        pl.sum('n_failed_calls').alias('n_failed_calls'),
+    ).to_dicts()[0]
+    status_codes = {}
+    for code, count in df['status_code'].value_counts().rows():
+        status_codes[str(code)] = count
+    errors = df.filter(~pl.col('error').is_null())['error'].unique().to_list()
+    value_columns = [
+        column
+        for column in df.columns
+        if column in ['latency', 'bytes_in'] or column.startswith('phase_')
+    ]
+    if 'bytes_in' in df.columns:
+        size = pl.col('bytes_in').cast(pl.Float64)
+        size_sums = df.select(
+            (size * size).sum().alias('sum_squared_sizes'),
+            (size * pl.col('latency')).sum().alias('sum_size_latencies'),
+        ).to_dicts()[0]
+    else:
+        size_sums = {'sum_squared_sizes': 0.0, 'sum_size_latencies': 0.0}
+    return {
+        'requests': len(df),
+        'n_successful': int(summary['n_successful']),
+        'first_timestamp': summary['first_timestamp'],
+        'last_timestamp': summary['last_timestamp'],
+        'last_response_timestamp': summary['last_response_timestamp'],
+        'status_codes': status_codes,
+        'errors': errors[:max_distinct_errors],
+        'n_invalid_json_errors': int(summary['n_invalid_json_errors']),
+        'n_rpc_errors': int(summary['n_rpc_errors']),
+        'n_schema_errors': int(summary['n_schema_errors']),
+        'n_wrong_type_errors': int(summary['n_wrong_type_errors']),
+        'n_invalid_hex_errors': int(summary['n_invalid_hex_errors']),
+        'n_missing_key_errors': int(summary['n_missing_key_errors']),
+        'n_empty_result_errors': int(summary['n_empty_result_errors']),
+        'n_calls': int(summary['n_calls']),
+        'n_failed_calls': int(summary['n_failed_calls']),
+        'values': {
+            column: create_value_aggregate(df[column])
+            for column in value_columns
+        },
+        'sum_squared_sizes': float(size_sums['sum_squared_sizes']),
+        'sum_size_latencies': float(size_sums['sum_size_latencies']),
+    }
+
+
+def merge_deep_aggregates(
+    first: spec.DeepAggregate, second: spec.DeepAggregate
+) -> spec.DeepAggregate:
+    """merge two aggregates of deep check results"""
+    if first['requests'] == 0:
+        return second
+    if second['requests'] == 0:
+        return first
+    assert first['first_timestamp'] is not None
+    assert second['first_timestamp'] is not None
+    assert first['last_timestamp'] is not None
+    assert second['last_timestamp'] is not None
+    assert first['last_response_timestamp'] is not None
+    assert second['last_response_timestamp'] is not None
+
+    status_codes = dict(first['status_codes'])
+    for code, count in second['status_codes'].items():
+        status_codes[code] = status_codes.get(code, 0) + count
+    errors = list(first['errors'])
+    seen_errors = set(errors)
+    for error in second['errors']:
+        if len(errors) >= max_distinct_errors:
+            break
+        if error not in seen_errors:
+            errors.append(error)
+            seen_errors.add(error)
+    values = {}
+    for column in list(first['values']) + list(second['values']):
+        if column not in values:
+            values[column] = merge_value_aggregates(
+                first['values'].get(column, create_value_aggregate()),
+                second['values'].get(column, create_value_aggregate()),
+            )
+
+    return {
+        'requests': first['requests'] + second['requests'],
+        'n_successful': first['n_successful'] + second['n_successful'],
+        'first_timestamp': min(
+            first['first_timestamp'], second['first_timestamp']
+        ),
+        'last_timestamp': max(
+            first['last_timestamp'], second['last_timestamp']
+        ),
+        'last_response_timestamp': max(
+            first['last_response_timestamp'],
+            second['last_response_timestamp'],
+        ),
+        'status_codes': status_codes,
+        'errors': errors,
+        'n_invalid_json_errors': first['n_invalid_json_errors']
+        + second['n_invalid_json_errors'],
+        'n_rpc_errors': first['n_rpc_errors'] + second['n_rpc_errors'],
+        'n_schema_errors': first['n_schema_errors']
+        + second['n_schema_errors'],
+        'n_wrong_type_errors': first['n_wrong_type_errors']
+        + second['n_wrong_type_errors'],
+        'n_invalid_hex_errors': first['n_invalid_hex_errors']
+        + second['n_invalid_hex_errors'],
+        'n_missing_key_errors': first['n_missing_key_errors']
+        + second['n_missing_key_errors'],
+        'n_empty_result_errors': first['n_empty_result_errors']
+        + second['n_empty_result_errors'],
+        'n_calls': first['n_calls'] + second['n_calls'],
+        'n_failed_calls': first['n_failed_calls'] + second['n_failed_calls'],
+        'values': values,
+        'sum_squared_sizes': first['sum_squared_sizes']
+        + second['sum_squared_sizes'],
+        'sum_size_latencies': first['sum_size_latencies']
+        + second['sum_size_latencies'],
+    }
+
+
+def compute_deep_aggregate_metrics(
+    aggregate: spec.DeepAggregate,
+    target_rate: int,
+    target_duration: float,
+) -> spec.LoadTestDeepOutputDatum:
+    """compute standard test metrics from aggregate of deep check results"""
+    if aggregate['requests'] == 0:
+        return {
+            'target_rate': target_rate,
+            'actual_rate': 0,
+            'target_duration': target_duration,
+            'actual_duration': None,
+            'requests': 0,
+            'throughput': None,
+            'success': None,
+            'min': None,
+            'mean': None,
+            'p50': None,
+            'p90': None,
+            'p95': None,
+            'p99': None,
+            'max': None,
+            'status_codes': {},
+            'errors': [],
+            'first_request_timestamp': None,
+            'last_request_timestamp': None,
+            'last_response_timestamp': None,
+            'final_wait_time': None,
+            'phase_latencies': None,
+            'n_invalid_json_errors': 0,
+            'n_rpc_errors': 0,
+            'n_schema_errors': 0,
+            'n_wrong_type_errors': 0,
+            'n_invalid_hex_errors': 0,
+            'n_missing_key_errors': 0,
+            'n_empty_result_errors': 0,
+            'n_calls': 0,
+            'n_failed_calls': 0,
+            'response_size_mean': None,
+            'response_size_p50': None,
+            'response_size_p90': None,
+            'response_size_p99': None,
+            'response_size_max': None,
+            'bytes_throughput': None,
+            'size_latency_slope': None,
+            'size_latency_intercept': None,
+        }
+
+    first_timestamp = aggregate['first_timestamp']
+    last_timestamp = aggregate['last_timestamp']
+    last_response_timestamp = aggregate['last_response_timestamp']
+    assert first_timestamp is not None
+    assert last_timestamp is not None
+    assert last_response_timestamp is not None
+    latencies = compute_value_stats(aggregate['values']['latency'])
+    assert latencies is not None
+
+    requests = aggregate['requests']
+    request_duration = last_timestamp - first_timestamp
+    if request_duration == 0:
+        actual_rate = float('inf')
+    else:
+        actual_rate = requests / request_duration * 1e9
+    total_duration = last_response_timestamp - first_timestamp
+    size_metrics = _compute_aggregate_size_metrics(aggregate, total_duration)
+    return {
+        'target_rate': target_rate,
+        'actual_rate': actual_rate,
+        'target_duration': target_duration,
+        'actual_duration': request_duration / 1e9,
+        'requests': requests,
+        'throughput': aggregate['n_successful'] / total_duration * 1e9,
+        'success': aggregate['n_successful'] / requests,
+        'min': latencies['min'] / 1e9,
+        'mean': latencies['mean'] / 1e9,
+        'p50': latencies['p50'] / 1e9,
+        'p90': latencies['p90'] / 1e9,
+        'p95': latencies['p95'] / 1e9,
+        'p99': latencies['p99'] / 1e9,
+        'max': latencies['max'] / 1e9,
+        'status_codes': dict(aggregate['status_codes']),
+        'errors': list(aggregate['errors']),
+        'first_request_timestamp': _format_timestamp(first_timestamp),
+        'last_request_timestamp': _format_timestamp(last_timestamp),
+        'last_response_timestamp': _format_timestamp(last_response_timestamp),
+        'final_wait_time': (last_response_timestamp - last_timestamp) / 1e9,
+        'phase_latencies': _compute_aggregate_phase_latencies(aggregate),
+        'n_invalid_json_errors': aggregate['n_invalid_json_errors'],
+        'n_rpc_errors': aggregate['n_rpc_errors'],
+        'n_schema_errors': aggregate['n_schema_errors'],
+        'n_wrong_type_errors': aggregate['n_wrong_type_errors'],
+        'n_invalid_hex_errors': aggregate['n_invalid_hex_errors'],
+        'n_missing_key_errors': aggregate['n_missing_key_errors'],
+        'n_empty_result_errors': aggregate['n_empty_result_errors'],
+        'n_calls': aggregate['n_calls'],
+        'n_failed_calls': aggregate['n_failed_calls'],
+        'response_size_mean': size_metrics['response_size_mean'],
+        'response_size_p50': size_metrics['response_size_p50'],
+        'response_size_p90': size_metrics['response_size_p90'],
+        'response_size_p99': size_metrics['response_size_p99'],
+        'response_size_max': size_metrics['response_size_max'],
+        'bytes_throughput': size_metrics['bytes_throughput'],
+        'size_latency_slope': size_metrics['size_latency_slope'],
+        'size_latency_intercept': size_metrics['size_latency_intercept'],
+    }
+
+
+def _compute_aggregate_size_metrics(
+    aggregate: spec.DeepAggregate,
+    total_duration: int,
+) -> spec.ResponseSizeMetrics:
+    from . import response_sizes
+
+    sizes = None
+    if 'bytes_in' in aggregate['values']:
+        sizes = compute_value_stats(aggregate['values']['bytes_in'])
+    if sizes is None:
+        return {
+            'response_size_mean': None,
+            'response_size_p50': None,
+            'response_size_p90': None,
+            'response_size_p99': None,
+            'response_size_max': None,
+            'bytes_throughput': None,
+            'size_latency_slope': None,
+            'size_latency_intercept': None,
+        }
+
+    size_aggregate = aggregate['values']['bytes_in']
+    if total_duration > 0:
+        bytes_throughput = size_aggregate['total'] / total_duration * 1e9
+    else:
+        bytes_throughput = None
+    fit = response_sizes.fit_latency_vs_size(
+        n=size_aggregate['n'],
+        sum_sizes=size_aggregate['total'],
+        sum_latencies=aggregate['values']['latency']['total'],
+        sum_squared_sizes=aggregate['sum_squared_sizes'],
+        sum_size_latencies=aggregate['sum_size_latencies'],
+    )
+    if fit is None:
+        slope, intercept = None, None
+    else:
+        slope, intercept = fit
+    return {
+        'response_size_mean': sizes['mean'],
+        'response_size_p50': sizes['p50'],
+        'response_size_p90': sizes['p90'],
+        'response_size_p99': sizes['p99'],
+        'response_size_max': sizes['max'],
+        'bytes_throughput': bytes_throughput,
+        'size_latency_slope': slope,
+        'size_latency_intercept': intercept,
+    }
+
+
+def _compute_aggregate_phase_latencies(
+    aggregate: spec.DeepAggregate,
+) -> spec.PhaseLatencies | None:
+    from . import request_phases
+
+    values = aggregate['values']
+    return request_phases.compute_aggregate_phase_latencies(values)
+
+
+def _format_timestamp(timestamp_ns: int) -> str:
+    import polars as pl
+
+    timestamp: str = (
+        pl.Series([timestamp_ns / 1e3]).cast(pl.Datetime).cast(str)[0]
+    )
+    return timestamp
+
+
+#
+# # error reservoirs
+#
+
+
+def create_error_reservoir() -> spec.ErrorReservoir:
+    """create reservoir that keeps a uniform sample of error responses"""
+    return {'n_seen': 0, 'responses': [], 'call_indices': []}
+
+
+def update_error_reservoir(
+    reservoir: spec.ErrorReservoir,
+    responses: typing.Iterable[bytes],
+    rng: random.Random,
+    call_indices: typing.Iterable[int | None] | None = None,
+) -> None:
+    """add responses to reservoir, keeping at most max_error_responses
+
+    call_indices are the indices of the calls that caused each response
+    """
+    import itertools
+
+    if call_indices is None:
+        call_indices = itertools.repeat(None)
+    for response, call_index in zip(responses, call_indices):
+        if len(reservoir['responses']) < max_error_responses:
+            reservoir['responses'].append(response)
+            reservoir['call_indices'].append(call_index)
+        else:
+            index = rng.randrange(reservoir['n_seen'] + 1)
+            if index < max_error_responses:
+                reservoir['responses'][index] = response
+                reservoir['call_indices'][index] = call_index
+        reservoir['n_seen'] += 1
+
+
+#
+# # failed call tables
+#
+
+
+def update_failed_call_counts(
+    counts: typing.MutableMapping[str, typing.MutableMapping[int, int]],
+    errors: typing.Iterable[str],
+    call_indices: typing.Iterable[int],
+) -> None:
+    """count failures of each call, grouped by error message
+
+    at most max_distinct_errors error messages are counted
+    """
+    for error, call_index in zip(errors, call_indices):
+        error_counts = counts.get(error)
+        if error_counts is None:
+            if len(counts) >= max_distinct_errors:
+                continue
+            error_counts = counts[error] = {}
+        error_counts[call_index] = error_counts.get(call_index, 0) + 1
+
+
+def create_failed_calls_table(
+    counts: typing.Mapping[str, typing.Mapping[int, int]],
+    calls: typing.Sequence[typing.Any],
+) -> list[spec.FailedCall]:
+    """create table of failed calls, grouped by error message
+
+    errors with the most failures come first, and within each error, the
+    max_failed_calls_per_error calls with the most failures are kept
+    """
+    errors = sorted(counts, key=lambda error: -sum(counts[error].values()))
+    table: list[spec.FailedCall] = []
+    for error in errors:
+        error_counts = sorted(
+            counts[error].items(), key=lambda item: (-item[1], item[0])
+        )
+        for call_index, n_failures in error_counts[:max_failed_calls_per_error]:
+            table.append(
+                {
+                    'error': error,
+                    'call_index': call_index,
+                    'n_failures': n_failures,
+                    'call': calls[call_index],
+                }
+            )
+    return table
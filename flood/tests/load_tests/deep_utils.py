@@ -2,241 +2,793 @@ from __future__ import annotations
 
 import typing
 from ... import spec
+from . import batch_requests
+from . import deep_aggregates
+from . import request_phases
+from . import response_schemas
+from . import response_sizes
+from . import slowest_calls
 
 if typing.TYPE_CHECKING:
+    import multiprocessing.pool
+
     import polars as pl
 
 
 def compute_deep_datum(
-    raw_output: bytes,
+    raw_output: bytes | str | typing.Iterable[pl.DataFrame],
     target_rate: int,
-    target_duration: int,
+    target_duration: float,
     calls: typing.Sequence[typing.Any],
 ) -> tuple[
     typing.Mapping[spec.ResponseCategory, spec.LoadTestDeepOutputDatum],
     typing.Sequence[spec.ErrorPair],
+    typing.Mapping[str, spec.LoadTestDeepOutputDatum] | None,
+    typing.Sequence[spec.FailedCall],
+    typing.Sequence[spec.SlowCall],
+    typing.Sequence[spec.SizeLatencySample],
 ]:
+    """compute deep metrics, rpc error pairs, metrics of each method, table
+    of failed calls, table of slowest calls, and (size, latency) samples
+
+    raw output can be given as bytes, as a path of a file of raw output, or
+    as dataframes of batches that are already decoded, and is processed in
+    batches that are reduced to mergeable aggregates,
+    and only a bounded sample of rpc error responses is kept, so that memory
+    of deep checks does not grow with attack length
+
+    each response is linked to the call that caused it, by json-rpc id or by
+    request sequence index, so that rpc error pairs are (call, response) and
+    failed calls can be replayed against a node
+
+    responses are parsed in one process pool for the whole deep check, which
+    is started at the first batch of at least min_parallel_responses
+    """
+    import base64
+    import multiprocessing
+    import os
+    import random
+    import numpy as np
     import polars as pl
 
-    # convert to dataframe
-    all_df = _convert_raw_vegeta_output_to_dataframe(raw_output)
+    batch_size = batch_requests.get_batch_size(calls)
+    request_batch_sizes = None
+    if batch_size is None:
+        request_batch_sizes = batch_requests.get_request_batch_sizes(calls)
+    _check_call_ids(calls)
+    method_counts = _get_method_counts(calls)
+    call_indices_by_id = _get_call_indices_by_id(calls)
+
+    # results are validated against the schema of the method of their call
+    flat_calls = _flatten_batches(calls)
+    flat_methods = {call.get('method') for call in flat_calls}
+    methods: str | typing.Mapping[typing.Any, str] | None
+    if len(flat_methods) == 1:
+        methods = next(iter(flat_methods))
+    else:
+        methods = {call.get('id'): call.get('method') for call in flat_calls}
+
+    categories: list[spec.ResponseCategory] = ['all', 'successful', 'failed']
+    aggregates = {
+        category: deep_aggregates.create_deep_aggregate()
+        for category in categories
+    }
+    method_aggregates = {
+        method: deep_aggregates.create_deep_aggregate()
+        for method in method_counts
+    }
+    error_reservoir = deep_aggregates.create_error_reservoir()
+    failed_call_counts: typing.MutableMapping[
+        str, typing.MutableMapping[int, int]
+    ] = {}
+    slowest: pl.DataFrame | None = None
+    size_latency_samples: pl.DataFrame | None = None
+    rng = random.Random(0)
+    sample_rng = np.random.default_rng(0)
+    if isinstance(raw_output, (bytes, str)):
+        raw_output = _iter_raw_vegeta_output_dataframes(raw_output)
+    max_workers = os.cpu_count() or 1
+    pool: multiprocessing.pool.Pool | None = None
+    try:
+        for df in raw_output:
+            if (
+                pool is None
+                and max_workers > 1
+                and len(df) >= min_parallel_responses
+            ):
+                pool = multiprocessing.Pool(max_workers)
+
+            # add error columns, where requests of mixed sizes are found by
+            # their sequence index, because targets are sent in order
+            response_batch_sizes: int | None | typing.Sequence[int | None]
+            if request_batch_sizes is None:
+                response_batch_sizes = batch_size
+                n_calls: pl.Expr | pl.Series = pl.lit(batch_size or 1)
+            else:
+                response_batch_sizes = [
+                    request_batch_sizes[index % len(calls)]
+                    for index in df['index']
+                ]
+                n_calls = pl.Series(
+                    [size or 1 for size in response_batch_sizes], dtype=pl.Int64
+                )
+            validation = _validate_responses(
+                df['status_code'],
+                df['response'],
+                response_batch_sizes,
+                max_workers=max_workers,
+                methods=methods,
+                pool=pool,
+            )
+            (
+                invalid_json_error,
+                rpc_error,
+                n_failed_calls,
+                response_ids,
+                schema_errors,
+            ) = validation
+            df = df.with_columns(
+                pl.Series('invalid_json_error', invalid_json_error, pl.Boolean),
+                pl.Series('rpc_error', rpc_error, pl.Boolean),
+                pl.Series('schema_error', schema_errors, pl.Utf8),
+                n_calls.alias('n_calls'),
+                pl.Series('n_failed_calls', n_failed_calls, dtype=pl.Int64),
+            )
+            df = df.with_columns(
+                (
+                    (pl.col('status_code') == 200)
+                    & ~pl.col('invalid_json_error')
+                    & ~pl.col('rpc_error')
+                    & pl.col('schema_error').is_null()
+                ).alias('deep_success')
+            )
+
+            # link each response to its call
+            call_indices = _get_call_indices(
+                df['index'], response_ids, len(calls), call_indices_by_id
+            )
+            df = df.with_columns(
+                pl.Series('call_index', call_indices, pl.Int64)
+            )
+            slowest = slowest_calls.update_slowest_calls(slowest, df)
+            size_latency_samples = response_sizes.update_size_latency_samples(
+                size_latency_samples, df, rng=sample_rng
+            )
+
+            # sample rpc error responses and count failures of each call, then
+            # drop response bodies
+            rpc_error_df = df.filter(pl.col('rpc_error'))
+            deep_aggregates.update_error_reservoir(
+                error_reservoir,
+                rpc_error_df['response'],
+                rng=rng,
+                call_indices=rpc_error_df['call_index'],
+            )
+            failed_df = df.filter(~pl.col('deep_success'))
+            deep_aggregates.update_failed_call_counts(
+                failed_call_counts,
+                _get_failure_messages(failed_df),
+                failed_df['call_index'],
+            )
+            df = df.drop('response')
+
+            # aggregate each category of responses
+            category_dfs: list[tuple[spec.ResponseCategory, pl.DataFrame]] = [
+                ('all', df),
+                ('successful', df.filter(pl.col('deep_success'))),
+                ('failed', df.filter(~pl.col('deep_success'))),
+            ]
+            for category, category_df in category_dfs:
+                aggregates[category] = deep_aggregates.merge_deep_aggregates(
+                    aggregates[category],
+                    deep_aggregates.create_deep_aggregate(category_df),
+                )
+
+            # aggregate each method, if attack mixes methods
+            if len(method_aggregates) > 0:
+                call_methods = [
+                    calls[index]['method'] for index in call_indices
+                ]
+                df = df.with_columns(pl.Series('call_method', call_methods))
+                for method in method_aggregates:
+                    method_aggregates[method] = (
+                        deep_aggregates.merge_deep_aggregates(
+                            method_aggregates[method],
+                            deep_aggregates.create_deep_aggregate(
+                                df.filter(pl.col('call_method') == method)
+                            ),
+                        )
+                    )
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
 
-    # add error columns
-    rpc_error = []
+    # compute sample metrics
+    category_data = {
+        category: deep_aggregates.compute_deep_aggregate_metrics(
+            aggregate,
+            target_rate=target_rate,
+            target_duration=target_duration,
+        )
+        for category, aggregate in aggregates.items()
+    }
+
+    # responses are reported as base64, as encoded by vegeta
+    rpc_error_pairs: typing.Sequence[spec.ErrorPair] = [
+        (
+            calls[call_index] if call_index is not None else None,
+            base64.b64encode(response).decode(),
+        )
+        for call_index, response in zip(
+            error_reservoir['call_indices'], error_reservoir['responses']
+        )
+    ]
+    failed_calls = deep_aggregates.create_failed_calls_table(
+        failed_call_counts, calls
+    )
+    slowest_calls_table = slowest_calls.create_slowest_calls_table(
+        slowest, calls
+    )
+    size_latency_table = response_sizes.create_size_latency_samples_table(
+        size_latency_samples
+    )
+
+    # compute sample metrics of each method, if attack mixes methods
+    method_data = None
+    if len(method_aggregates) > 0:
+        method_data = {
+            method: deep_aggregates.compute_deep_aggregate_metrics(
+                aggregate,
+                target_rate=round(
+                    target_rate * method_counts[method] / len(calls)
+                ),
+                target_duration=target_duration,
+            )
+            for method, aggregate in method_aggregates.items()
+        }
+
+    return (
+        category_data,
+        rpc_error_pairs,
+        method_data,
+        failed_calls,
+        slowest_calls_table,
+        size_latency_table,
+    )
+
+
+# responses of a batch are parsed in the process pool of the deep check, if
+# the batch has at least this many responses
+min_parallel_responses = 10_000
+
+
+def _validate_responses(
+    status_codes: pl.Series,
+    responses: pl.Series,
+    batch_size: int | None | typing.Sequence[int | None],
+    max_workers: int | None = None,
+    methods: str | typing.Mapping[typing.Any, str] | None = None,
+    pool: multiprocessing.pool.Pool | None = None,
+) -> tuple[
+    list[bool],
+    list[bool],
+    list[int],
+    list[typing.Any],
+    list[spec.SchemaErrorCategory | None],
+]:
+    """validate responses
+
+    returns (invalid_json, rpc_error, n_failed, ids, schema_error) of each
+    response, see _parse_response_chunk()
+
+    responses are binary response bodies, which are parsed with orjson in
+    chunks, using pool if given and if there are at least
+    min_parallel_responses responses, where pool has max_workers processes
+
+    batch_size is the batch size of every request, or of each request
+    """
+    import functools
+    import os
+
+    status_code_list = status_codes.to_list()
+    bodies = responses.to_list()
+    if batch_size is None or isinstance(batch_size, int):
+        batch_sizes = [batch_size] * len(bodies)
+    else:
+        batch_sizes = list(batch_size)
+
+    # parse chunks of responses
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    parse_chunk = functools.partial(_parse_response_chunk, methods=methods)
+    if pool is None or len(bodies) < min_parallel_responses:
+        chunk_results = [
+            parse_chunk((status_code_list, bodies, batch_sizes))
+        ]
+    else:
+        chunk_size = -(-len(bodies) // (max_workers * 4))
+        chunks = [
+            (
+                status_code_list[i : i + chunk_size],
+                bodies[i : i + chunk_size],
+                batch_sizes[i : i + chunk_size],
+            )
+            for i in range(0, len(bodies), chunk_size)
+        ]
+        chunk_results = pool.map(parse_chunk, chunks)
     invalid_json_error = []
-    for status_code, response in zip(all_df['status_code'], all_df['response']):
-        if status_code == 200:
-            try:
-                import json
-                import base64
+    rpc_error = []
+    n_failed_calls = []
+    response_ids = []
+    schema_errors = []
+    for chunk_result in chunk_results:
+        invalid_json_error.extend(chunk_result[0])
+        rpc_error.extend(chunk_result[1])
+        n_failed_calls.extend(chunk_result[2])
+        response_ids.extend(chunk_result[3])
+        schema_errors.extend(chunk_result[4])
+
+    return (
+        invalid_json_error,
+        rpc_error,
+        n_failed_calls,
+        response_ids,
+        schema_errors,
+    )
 
-                decoded = json.loads(base64.b64decode(response))
 
-                invalid_json_error.append(False)
-                if decoded.get('result') is None:
-                    rpc_error.append(True)
-                else:
-                    rpc_error.append(False)
+def _parse_response_chunk(
+    chunk: tuple[
+        typing.Sequence[int],
+        typing.Sequence[bytes | None],
+        typing.Sequence[int | None],
+    ],
+    methods: str | typing.Mapping[typing.Any, str] | None = None,
+) -> tuple[
+    list[bool],
+    list[bool],
+    list[int],
+    list[typing.Any],
+    list[spec.SchemaErrorCategory | None],
+]:
+    """parse (status_codes, response_bodies, batch_sizes) chunk using orjson
+
+    returns (invalid_json, rpc_error, n_failed_calls, ids, schema_error) of
+    each response
+
+    methods is the method of every call, or a mapping from call id to method,
+    and results are validated against the schema of their method, see
+    response_schemas.validate_result(), counting invalid results as failed
+    calls
+    """
+    import json
+    import orjson
 
+    invalid_json_error = []
+    rpc_error = []
+    n_failed_calls = []
+    response_ids = []
+    schema_errors = []
+    for status_code, raw_response, batch_size in zip(*chunk):
+        n_calls = batch_size or 1
+        invalid = True
+        error = False
+        n_failed = n_calls
+        schema_error = None
+        response_id = None
+        if raw_response is not None:
+            try:
+                try:
+                    response = orjson.loads(raw_response)
+                except orjson.JSONDecodeError:
+                    # json module also accepts NaN, big integers, and utf-16
+                    response = json.loads(raw_response)
+                if isinstance(response, dict):
+                    response_id = response.get('id')
+                    if isinstance(response_id, float):
+                        # orjson reads integers beyond 64 bits as floats
+                        response_id = json.loads(raw_response).get('id')
+                    response_items = [(response_id, response)]
+                else:
+                    response_items = [
+                        (item.get('id'), item) for item in response
+                    ]
+                n_rpc_errors = 0
+                n_schema_errors = 0
+                if batch_size is None or (
+                    isinstance(response, list) and len(response) == batch_size
+                ):
+                    if batch_size is None and not isinstance(response, dict):
+                        raise Exception('response is not an object')
+                    for item_id, item in response_items:
+                        result = item.get('result')
+                        if result is None:
+                            n_rpc_errors += 1
+                            continue
+                        if isinstance(methods, str) or methods is None:
+                            method = methods
+                        else:
+                            method = methods.get(item_id)
+                        item_error = response_schemas.validate_result(
+                            method, result
+                        )
+                        if item_error is not None:
+                            n_schema_errors += 1
+                            if schema_error is None:
+                                schema_error = item_error
+                    n_failed = n_rpc_errors + n_schema_errors
+                    invalid = False
+                error = not invalid and n_rpc_errors > 0
             except Exception:
-                invalid_json_error.append(True)
-                rpc_error.append(False)
-        else:
-            invalid_json_error.append(False)
-            rpc_error.append(False)
-    all_df = all_df.with_columns(
-        pl.Series('invalid_json_error', invalid_json_error),
-        pl.Series('rpc_error', rpc_error),
-    )
-    all_df = all_df.with_columns(
-        (
-            (pl.col('status_code') == 200)
-            & ~pl.col('invalid_json_error')
-            & ~pl.col('rpc_error')
-        ).alias('deep_success')
+                invalid = True
+                error = False
+                n_failed = n_calls
+                schema_error = None
+        if status_code != 200:
+            invalid = False
+            error = False
+            n_failed = n_calls
+            schema_error = None
+        invalid_json_error.append(invalid)
+        rpc_error.append(error)
+        n_failed_calls.append(n_failed)
+        response_ids.append(response_id)
+        schema_errors.append(schema_error)
+    return (
+        invalid_json_error,
+        rpc_error,
+        n_failed_calls,
+        response_ids,
+        schema_errors,
     )
 
-    # get error pairs
-    rpc_error_pairs: typing.Sequence[spec.ErrorPair] = []
-    rpc_error_pairs = _gather_error_pairs(df=all_df, calls=calls)
 
-    # compute sample metrics
-    category_data = {}
-    dataframes: list[tuple[spec.ResponseCategory, pl.DataFrame]] = [
-        ('all', all_df),
-        ('successful', all_df.filter(pl.col('deep_success'))),
-        ('failed', all_df.filter(~pl.col('deep_success'))),
-    ]
-    for category, df in dataframes:
-        category_data[category] = _compute_raw_output_sample_metrics(
-            df=df, target_rate=target_rate, target_duration=target_duration
-        )
+# raw output is decoded in batches of about this many bytes of json results
+decode_batch_bytes = 64 * 1024 * 1024
 
-    return category_data, rpc_error_pairs
 
+def _convert_raw_vegeta_output_to_dataframe(
+    raw_output: bytes | str,
+    batch_bytes: int | None = None,
+) -> pl.DataFrame:
+    """convert raw vegeta attack output to dataframe, 1 row per response
 
-def _convert_raw_vegeta_output_to_dataframe(raw_output: bytes) -> pl.DataFrame:
-    """convert raw vegeta attack output to dataframe, 1 row per response"""
-    import io
+    json results are decoded into arrow columns in batches of lines, without
+    an intermediate csv, and response bodies are decoded into a binary column
+
+    gob output of vegeta is streamed through vegeta encode --to json, because
+    gob is a go-specific format
+    """
+    import polars as pl
+
+    dfs = list(_iter_raw_vegeta_output_dataframes(raw_output, batch_bytes))
+    if len(dfs) == 0:
+        return _convert_json_results(b'')
+    elif len(dfs) == 1:
+        return dfs[0]
+    else:
+        return pl.concat(dfs, rechunk=False)
+
+
+def _iter_raw_vegeta_output_dataframes(
+    raw_output: bytes | str,
+    batch_bytes: int | None = None,
+) -> typing.Iterator[pl.DataFrame]:
+    """convert raw vegeta attack output to non-empty dataframes of batches
+
+    raw_output can be bytes or a path of a file of raw output, which is read
+    one batch at a time
+    """
+    if batch_bytes is None:
+        batch_bytes = decode_batch_bytes
+    batches: typing.Iterator[bytes | memoryview]
+    if isinstance(raw_output, str):
+        batches = _iter_result_file_lines(raw_output, batch_bytes)
+    elif len(raw_output) == 0:
+        return
+    elif raw_output.startswith(b'{'):
+        batches = _iter_result_lines(raw_output, batch_bytes)
+    else:
+        batches = _iter_encoded_result_lines(raw_output, batch_bytes)
+    for batch in batches:
+        df = _convert_json_results(batch)
+        if len(df) > 0:
+            yield df
+
+
+def _iter_result_lines(
+    raw_output: bytes, batch_bytes: int
+) -> typing.Iterator[memoryview]:
+    """split json results into batches of complete lines, without copies"""
+    view = memoryview(raw_output)
+    start = 0
+    while start < len(raw_output):
+        end = raw_output.find(b'\n', start + batch_bytes) + 1
+        if end == 0:
+            end = len(raw_output)
+        yield view[start:end]
+        start = end
+
+
+def _iter_result_file_lines(
+    path: str, batch_bytes: int
+) -> typing.Iterator[bytes]:
+    """read json or gob results from file, yielding batches of json lines"""
+    with open(path, 'rb') as f:
+        first_byte = f.read(1)
+        f.seek(0)
+        if first_byte in [b'', b'{']:
+            yield from _iter_line_batches(f, batch_bytes)
+        else:
+            yield from _iter_encoded_result_lines(f, batch_bytes)
+
+
+def _iter_line_batches(
+    f: typing.IO[bytes], batch_bytes: int
+) -> typing.Iterator[bytes]:
+    """read batches of complete lines of about batch_bytes from file"""
+    remainder = b''
+    while True:
+        chunk = f.read(batch_bytes)
+        if len(chunk) == 0:
+            break
+        chunk = remainder + chunk
+        end = chunk.rfind(b'\n') + 1
+        remainder = chunk[end:]
+        if end > 0:
+            yield chunk[:end]
+    if len(remainder.strip()) > 0:
+        yield remainder
+
+
+def _iter_encoded_result_lines(
+    raw_output: bytes | typing.BinaryIO, batch_bytes: int
+) -> typing.Iterator[bytes]:
+    """encode gob results as json using vegeta, yielding batches of lines
+
+    raw_output can be bytes or a file of gob results
+    """
     import subprocess
+    import threading
+
+    cmd = 'vegeta encode --to json'
+    if not isinstance(raw_output, bytes):
+        process = subprocess.Popen(
+            cmd.split(' '), stdin=raw_output, stdout=subprocess.PIPE
+        )
+        writer = None
+    else:
+        process = subprocess.Popen(
+            cmd.split(' '), stdin=subprocess.PIPE, stdout=subprocess.PIPE
+        )
+
+        def write_input() -> None:
+            try:
+                process.stdin.write(raw_output)  # type: ignore
+            except BrokenPipeError:
+                pass
+            finally:
+                process.stdin.close()  # type: ignore
+
+        writer = threading.Thread(target=write_input)
+        writer.start()
+    assert process.stdout is not None
+    completed = False
+    try:
+        yield from _iter_line_batches(process.stdout, batch_bytes)
+        completed = True
+    finally:
+        if not completed and process.poll() is None:
+            process.kill()
+        if writer is not None:
+            writer.join()
+        process.stdout.close()
+        returncode = process.wait()
+    if returncode != 0:
+        raise Exception('vegeta encode failed with code ' + str(returncode))
+
+
+def _convert_json_results(json_results: bytes | memoryview) -> pl.DataFrame:
+    """convert lines of vegeta json results to dataframe"""
+    import pyarrow as pa  # type: ignore
+    import pyarrow.json  # type: ignore
     import polars as pl
 
-    cmd = 'vegeta encode --to csv'
-    report_output = (
-        subprocess.check_output(cmd.split(' '), input=raw_output)
-        .decode()
-        .strip()
+    phase_fields = [
+        (phase, pa.int64()) for phase in request_phases.latency_phases
+    ]
+    schema = pa.schema(
+        [
+            ('attack', pa.string()),
+            ('seq', pa.int64()),
+            ('code', pa.int64()),
+            ('timestamp', pa.string()),
+            ('latency', pa.int64()),
+            ('bytes_out', pa.int64()),
+            ('bytes_in', pa.int64()),
+            ('error', pa.string()),
+            ('body', pa.string()),
+            ('method', pa.string()),
+            ('url', pa.string()),
+            ('timings', pa.struct(phase_fields)),
+        ]
     )
-
-    buf = io.StringIO()
-    buf.write(report_output)
-    buf.seek(0)
-
-    schema = [
-        'timestamp',
-        'status_code',
-        'latency',
-        'bytes_out',
-        'bytes_in',
-        'error',
-        'response',
-        'name',
-        'index',
-        'method',
-        'url',
-        'response_headers',
+    if len(json_results) == 0:
+        table = schema.empty_table()
+    else:
+        parse_options = pyarrow.json.ParseOptions(
+            explicit_schema=schema, unexpected_field_behavior='ignore'
+        )
+        try:
+            table = pyarrow.json.read_json(
+                pa.BufferReader(json_results), parse_options=parse_options
+            )
+        except pa.ArrowInvalid:
+            # lines longer than the default block size need a larger block
+            read_options = pyarrow.json.ReadOptions(
+                block_size=len(json_results) + 1
+            )
+            table = pyarrow.json.read_json(
+                pa.BufferReader(json_results),
+                read_options=read_options,
+                parse_options=parse_options,
+            )
+    df: pl.DataFrame = pl.from_arrow(table, rechunk=False)  # type: ignore
+
+    columns = [
+        pl.col('timestamp')
+        .str.strptime(pl.Datetime('ns'), '%+', utc=True)
+        .cast(pl.Int64),
+        pl.col('code').alias('status_code'),
+        pl.col('latency'),
+        pl.col('bytes_out'),
+        pl.col('bytes_in'),
+        pl.when(pl.col('error') == '')
+        .then(None)
+        .otherwise(pl.col('error'))
+        .alias('error'),
+        pl.col('body').str.decode('base64', strict=False).alias('response'),
+        pl.col('attack').alias('name'),
+        pl.col('seq').alias('index'),
+        pl.col('method'),
+        pl.col('url'),
     ]
-    dtypes = {
-        'bytes_in': pl.Int64,
-        'bytes_out': pl.Int64,
-        'error': pl.Utf8,
-        'index': pl.Int64,
-        'latency': pl.Int64,
-        'method': pl.Utf8,
-        'name': pl.Utf8,
-        'response': pl.Utf8,
-        'response_headers': pl.Utf8,
-        'status_code': pl.Int64,
-        'timestamp': pl.Int64,
-        'url': pl.Utf8,
-    }
-    return pl.read_csv(buf, new_columns=schema, has_header=False, dtypes=dtypes)
-
+    if len(df) > 0 and df['timings'].null_count() == 0:
+        columns.extend(
+            pl.col('timings').struct.field(phase).alias('phase_' + phase)
+            for phase in request_phases.latency_phases
+        )
+    return df.select(columns)
 
-def _gather_error_pairs(
-    df: pl.DataFrame, calls: typing.Sequence[typing.Any]
-) -> typing.Sequence[spec.ErrorPair]:
-    import polars as pl
 
-    calls_by_id = {}
-    for call in calls:
+def _check_call_ids(calls: typing.Sequence[typing.Any]) -> None:
+    call_ids = set()
+    for call in _flatten_batches(calls):
         call_id = call.get('id')
         if call_id is None:
             raise Exception('id not specified for call')
-        elif call_id in calls_by_id:
+        elif call_id in call_ids:
             raise Exception('duplicate call for id')
-        calls_by_id[call_id] = call
-
-    responses = df.filter(pl.col('rpc_error'))['response']
-
-    pairs = []
-    for response in responses:
-        pairs.append((None, response))
-
-    return pairs
-
-
-def _compute_raw_output_sample_metrics(
-    df: pl.DataFrame, target_rate: int, target_duration: int
-) -> spec.LoadTestDeepOutputDatum:
-    """convert standard test metrics from vegeta raw output dataframe"""
-    if len(df) == 0:
-        return {
-            'target_rate': target_rate,
-            'actual_rate': 0,
-            'target_duration': target_duration,
-            'actual_duration': None,
-            'requests': 0,
-            'throughput': None,
-            'success': None,
-            'min': None,
-            'mean': None,
-            'p50': None,
-            'p90': None,
-            'p95': None,
-            'p99': None,
-            'max': None,
-            'status_codes': {},
-            'errors': [],
-            'first_request_timestamp': None,
-            'last_request_timestamp': None,
-            'last_response_timestamp': None,
-            'final_wait_time': None,
-            'n_invalid_json_errors': 0,
-            'n_rpc_errors': 0,
-        }
+        call_ids.add(call_id)
 
-    import polars as pl
 
-    actual_rate = (
-        pl.count()
-        / (pl.col('timestamp').max() - pl.col('timestamp').min())
-        * 1e9
-    )
-    actual_rate = actual_rate.alias('actual_rate')
-    successful = df.filter(pl.col('status_code') == 200)
-    total_duration = (  # type: ignore
-        df.select(pl.col('timestamp') + pl.col('latency')).max()
-    ) - df['timestamp'].min()
-    total_duration = total_duration.rows()[0][0]
-    status_codes = {}
-    for k, v in df['status_code'].value_counts().rows():
-        status_codes[str(k)] = v
-    errors = df.filter(~pl.col('error').is_null())['error'].unique().to_list()
-
-    metrics_df = df.select(
-        pl.lit(target_rate).alias('target_rate'),
-        actual_rate,
-        pl.lit(target_duration).alias('target_duration'),
-        (pl.max('timestamp') - pl.min('timestamp')).alias('actual_duration')
-        / 1e9,
-        pl.count().alias('requests'),
-        pl.lit(len(successful) / total_duration).alias('throughput') * 1e9,
-        (len(successful) / pl.count()).alias('success'),
-        pl.min('latency').alias('min') / 1e9,
-        pl.mean('latency').alias('mean') / 1e9,
-        pl.median('latency').alias('p50') / 1e9,
-        pl.quantile('latency', 0.90).alias('p90') / 1e9,
-        pl.quantile('latency', 0.95).alias('p95') / 1e9,
-        pl.quantile('latency', 0.99).alias('p99') / 1e9,
-        pl.max('latency').alias('max') / 1e9,
-        pl.struct(**status_codes, eager=True).alias('status_codes'),
-        pl.Series([errors]).alias('errors'),
-        (pl.col('timestamp').min() / 1e3)
-        .cast(pl.Datetime)
-        .cast(str)
-        .alias('first_request_timestamp'),
-        (pl.col('timestamp').max() / 1e3)
-        .cast(pl.Datetime)
-        .cast(str)
-        .alias('last_request_timestamp'),
-        ((pl.col('timestamp') + pl.col('latency')) / 1e3)
-        .max()
-        .cast(pl.Datetime)
-        .cast(str)
-        .alias('last_response_timestamp'),
-        (
-            (pl.col('timestamp') + pl.col('latency')).max()
-            - pl.max('timestamp')
-        ).alias('final_wait_time')
-        / 1e9,
-    )
+def _flatten_batches(
+    calls: typing.Sequence[typing.Any],
+) -> typing.Sequence[typing.Any]:
+    if batch_requests.get_request_batch_sizes(calls) is None:
+        return calls
+    else:
+        flat_calls = []
+        for call in calls:
+            if isinstance(call, list):
+                flat_calls.extend(call)
+            else:
+                flat_calls.append(call)
+        return flat_calls
+
+
+def _get_method_counts(
+    calls: typing.Sequence[typing.Any],
+) -> typing.Mapping[str, int]:
+    """count calls of each method, or return {} if attack does not mix methods
+
+    per-method metrics are not computed for batch requests
+    """
+    import collections
 
-    output: spec.LoadTestDeepOutputDatum = metrics_df.to_dicts()[0]  # type: ignore # noqa: E501
-    output['n_invalid_json_errors'] = int(df['invalid_json_error'].sum())
-    output['n_rpc_errors'] = int(df['rpc_error'].sum())
+    if batch_requests.get_request_batch_sizes(calls) is not None:
+        return {}
+    method_counts = collections.Counter(call['method'] for call in calls)
+    if len(method_counts) < 2:
+        return {}
+    return dict(sorted(method_counts.items()))
 
-    return output
+
+def _get_call_indices_by_id(
+    calls: typing.Sequence[typing.Any],
+) -> typing.Mapping[typing.Any, int]:
+    """map json-rpc id of each call to index of its request in calls"""
+    call_indices_by_id = {}
+    for index, call in enumerate(calls):
+        if isinstance(call, list):
+            for item in call:
+                call_indices_by_id[item.get('id')] = index
+        else:
+            call_indices_by_id[call.get('id')] = index
+    return call_indices_by_id
+
+
+def _get_call_indices(
+    indices: pl.Series,
+    response_ids: typing.Sequence[typing.Any],
+    n_calls: int,
+    call_indices_by_id: typing.Mapping[typing.Any, int],
+) -> list[int]:
+    """get index of call of each response
+
+    responses are matched to calls by json-rpc id, falling back to the
+    request sequence index when a response has no decodable id, because
+    targets are sent in order and cycle through calls
+    """
+    call_indices = []
+    for index, response_id in zip(indices, response_ids):
+        call_index = call_indices_by_id.get(response_id)
+        if call_index is None:
+            call_index = index % n_calls
+        call_indices.append(call_index)
+    return call_indices
+
+
+def _get_failure_messages(df: pl.DataFrame) -> list[str]:
+    """get error message of each failed response"""
+    messages = []
+    for status_code, error, invalid_json, rpc_error, schema_error, response in (
+        df.select(
+            'status_code',
+            'error',
+            'invalid_json_error',
+            'rpc_error',
+            'schema_error',
+            'response',
+        ).iter_rows()
+    ):
+        if error is not None:
+            message = error
+        elif status_code != 200:
+            message = 'status code ' + str(status_code)
+        elif invalid_json:
+            message = 'invalid json response'
+        elif rpc_error:
+            message = 'rpc error: ' + _get_rpc_error_message(response)
+        elif schema_error is not None:
+            message = 'schema error: ' + schema_error
+        else:
+            message = 'unknown error'
+        messages.append(message)
+    return messages
+
+
+def _get_rpc_error_message(response: bytes) -> str:
+    """get message of first rpc error in response"""
+    import json
+
+    try:
+        decoded = json.loads(response)
+        if isinstance(decoded, dict):
+            decoded = [decoded]
+        for item in decoded:
+            if item.get('result') is None:
+                error = item.get('error')
+                if isinstance(error, dict) and 'message' in error:
+                    return str(error['message'])
+                elif error is not None:
+                    return json.dumps(error)
+                else:
+                    return 'missing result'
+    except Exception:
+        pass
+    return 'unknown rpc error'
 
 
 # def compute_raw_output_metrics(
@@ -303,27 +855,72 @@ def _compute_raw_output_sample_metrics(
 #
 
 
-def encode_raw_vegeta_output(raw_output: bytes) -> str:
-    """encode raw output to str for use in JSON"""
-    import base64
-    import io
-    import gzip
+def write_raw_vegeta_output(raw_output: bytes | str, path: str) -> str:
+    """write raw output as zstd parquet file, 1 row per response, return path
 
-    # gzip compress
-    buf = io.BytesIO()
-    f = gzip.GzipFile(fileobj=buf, mode='wb')
-    f.write(raw_output)
-    f.close()
-    compressed = buf.getvalue()
+    raw_output can be bytes or a path of a file of raw output, and is written
+    batch by batch, so that raw output is never held as a single dataframe
+    """
+    for _ in _write_raw_dataframes(
+        _iter_raw_vegeta_output_dataframes(raw_output), path
+    ):
+        pass
+    return path
 
-    # encode as base64
-    as_base64 = base64.b64encode(compressed).decode('utf-8')
 
-    return as_base64
+def _write_raw_dataframes(
+    dataframes: typing.Iterable[pl.DataFrame], path: str
+) -> typing.Iterator[pl.DataFrame]:
+    """write batches of raw output to zstd parquet file, yielding each batch
+
+    batches can then be deep checked in the same pass over raw output, and a
+    partially written file is removed if writing fails
+    """
+    import os
+    import polars as pl
+    import pyarrow.parquet  # type: ignore
+
+    writer = None
+    schema = None
+    try:
+        for df in dataframes:
+            written = df
+            if schema is None:
+                schema = df.schema
+                writer = pyarrow.parquet.ParquetWriter(
+                    path, df.to_arrow().schema, compression='zstd'
+                )
+            elif df.schema != schema:
+                # phase columns are only decoded when every row has timings
+                written = df.select(
+                    pl.col(column)
+                    if column in df.columns
+                    else pl.lit(None, dtype=dtype).alias(column)
+                    for column, dtype in schema.items()
+                )
+            assert writer is not None
+            writer.write_table(written.to_arrow())
+            yield df
+        if writer is None:
+            empty = _convert_json_results(b'').to_arrow()
+            pyarrow.parquet.write_table(empty, path, compression='zstd')
+    except BaseException:
+        if writer is not None:
+            writer.close()
+            writer = None
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+    finally:
+        if writer is not None:
+            writer.close()
 
 
 def decode_raw_vegeta_output(encoded_output: str) -> bytes:
-    """decode raw output from str for use in JSON"""
+    """decode raw output embedded in results.json by earlier flood versions
+
+    raw output is now saved as parquet files, see write_raw_vegeta_output()
+    """
     import base64
     import io
     import gzip
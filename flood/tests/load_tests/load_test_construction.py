@@ -85,8 +85,63 @@ def create_load_test(
             'duration': duration,
             'calls': a_calls,
             'vegeta_args': attack_kwargs,
+            'warmup_calls': None,
+            'offsets': None,
         }
         load_test.append(attack)
 
     return load_test
 
+
+#
+# # warmups
+#
+
+
+def get_warmup_call_count(warmup: flood.Warmup, rate: int) -> int:
+    """get number of calls sent during warmup of attack"""
+    if warmup['requests'] is not None:
+        return warmup['requests']
+    elif warmup['duration'] is not None:
+        return rate * warmup['duration']
+    else:
+        raise Exception('must specify warmup duration or requests')
+
+
+def get_warmup_duration(warmup: flood.Warmup, rate: int) -> float:
+    """get number of seconds spent on warmup of attack"""
+    if warmup['requests'] is not None:
+        return warmup['requests'] / rate
+    elif warmup['duration'] is not None:
+        return warmup['duration']
+    else:
+        raise Exception('must specify warmup duration or requests')
+
+
+def add_attack_warmups(
+    attacks: typing.Sequence[flood.VegetaAttack],
+    warmup: flood.Warmup,
+    durations: typing.Sequence[int],
+) -> typing.Sequence[flood.VegetaAttack]:
+    """split the leading calls of each attack into a separate warmup
+
+    attacks should have been generated with enough calls for both phases,
+    durations are the durations of each attack excluding warmup
+    """
+    if len(attacks) != len(durations):
+        raise Exception('different number of attacks vs durations')
+    new_attacks = []
+    for attack, duration in zip(attacks, durations):
+        n_warmup_calls = get_warmup_call_count(warmup, attack['rate'])
+        n_attack_calls = attack['rate'] * duration
+        calls = attack['calls']
+        if len(calls) < n_warmup_calls + n_attack_calls:
+            raise Exception('not enough calls for warmup of attack')
+        new_attack = typing.cast('flood.VegetaAttack', dict(attack))
+        new_attack['duration'] = duration
+        new_attack['warmup_calls'] = calls[:n_warmup_calls]
+        new_attack['calls'] = calls[
+            n_warmup_calls : n_warmup_calls + n_attack_calls
+        ]
+        new_attacks.append(new_attack)
+    return new_attacks
@@ -17,6 +17,8 @@ def plot_load_test_results(
     plot_success_rate: bool = True,
     plot_throughput: bool = True,
     plot_latency: bool = True,
+    plot_phases: bool = True,
+    plot_sizes: bool = True,
 ) -> None:
     import os
     import matplotlib.pyplot as plt  # type: ignore
@@ -66,7 +68,43 @@ def plot_load_test_results(
         else:
             plt.show()
 
+    has_phases = any(
+        value is not None
+        for output in outputs.values()
+        for value in output.get('phase_latencies', [])
+    )
+    if plot_phases and has_phases:
+        plot_load_test_phases(
+            outputs, test_name=test_name, title_suffix=title_suffix
+        )
+        if output_dir is not None:
+            path = os.path.join(
+                output_dir, 'latency_phases' + file_suffix + '.png'
+            )
+            plt.savefig(path)
+        else:
+            plt.show()
+
     # deep graphs
+    has_size_samples = any(
+        output.get('deep_size_latency_samples') is not None
+        for output in outputs.values()
+    )
+    if plot_sizes and has_size_samples:
+        plt.figure()
+        plot_latency_vs_size(
+            outputs,  # type: ignore
+            test_name=test_name,
+            colors=colors,
+        )
+        if output_dir is not None:
+            path = os.path.join(
+                output_dir, 'latency_vs_size' + file_suffix + '.png'
+            )
+            plt.savefig(path)
+        else:
+            plt.show()
+
     has_deep_outputs = any(
         output.get('deep_metrics') is not None for output in outputs.values()
     )
@@ -176,6 +214,201 @@ def plot_load_test_latencies(
     plt.legend(loc='upper left')
 
 
+def plot_load_test_phases(
+    results: typing.Mapping[str, flood.LoadTestOutput]
+    | typing.Mapping[str, flood.LoadTestDeepOutput],
+    *,
+    stat: str = 'mean',
+    colors: typing.Mapping[str, str] | None = None,
+    test_name: str | None = None,
+    title_suffix: str = '',
+) -> None:
+    """plot latency phases of each node as stacked bars at each request rate
+
+    only means of phases add up to the mean latency, percentiles do not stack
+    """
+    import matplotlib.pyplot as plt
+    import toolplot
+
+    if colors is None:
+        colors = phase_plot_colors
+
+    fig, axes = plt.subplots(
+        1,
+        len(results),
+        squeeze=False,
+        figsize=(6.4 * len(results), 4.8),
+    )
+    for ax, (name, result) in zip(axes[0], results.items()):
+        rates = result['target_rate']
+        positions = list(range(len(rates)))
+        bottoms = [0.0] * len(rates)
+        for phase in flood.tests.load_tests.latency_phases:
+            heights = []
+            for phase_latencies in result['phase_latencies']:
+                if phase_latencies is None:
+                    heights.append(0.0)
+                else:
+                    heights.append(phase_latencies[phase][stat])
+            ax.bar(
+                positions,
+                heights,
+                bottom=bottoms,
+                color=colors[phase],
+                label=phase,
+            )
+            bottoms = [bottom + h for bottom, h in zip(bottoms, heights)]
+        plt.sca(ax)
+        xlabel = 'requests per second'
+        if test_name is not None:
+            xlabel += '\n[' + test_name + ']'
+        toolplot.set_labels(
+            title=name + ' ' + stat + ' latency phases' + title_suffix,
+            xlabel=xlabel,
+            ylabel='latency (seconds)',
+        )
+        ax.set_xticks(positions)
+        ax.set_xticklabels([str(rate) for rate in rates])
+    axes[0][-1].legend(loc='upper left', bbox_to_anchor=(1, 1))
+    fig.tight_layout()
+
+
+def plot_latency_vs_size(
+    results: typing.Mapping[str, flood.LoadTestOutput],
+    *,
+    colors: typing.Mapping[str, str] | None = None,
+    test_name: str | None = None,
+) -> None:
+    """plot sampled latency vs response size of each node, with fitted lines
+
+    results should be deep checked, points are pooled across request rates
+    """
+    import matplotlib.pyplot as plt
+    import numpy as np
+    import toolplot
+
+    if colors is None:
+        colors = dict(zip(results.keys(), flood.user_io.plot_colors.keys()))
+
+    for name, result in results.items():
+        samples = [
+            sample
+            for attack_samples in result['deep_size_latency_samples'] or []
+            for sample in attack_samples or []
+        ]
+        if len(samples) == 0:
+            continue
+        sizes = np.array([size for size, latency in samples]) / 1e6
+        latencies = np.array([latency for size, latency in samples])
+
+        color = colors.get(name)
+        if color in flood.user_io.plot_colors:
+            color = flood.user_io.plot_colors[color][1]
+        plt.scatter(sizes, latencies, s=4, alpha=0.3, color=color)
+        label = name
+        if len(set(sizes)) > 1:
+            slope, intercept = np.polyfit(sizes, latencies, 1)
+            line_sizes = np.array([sizes.min(), sizes.max()])
+            plt.plot(
+                line_sizes, intercept + slope * line_sizes, color=color
+            )
+            label += ' (' + format(slope, '.3g') + ' s/MB)'
+        plt.plot([], [], '.-', markersize=20, color=color, label=label)
+
+    xlabel = 'response size (MB)'
+    if test_name is not None:
+        xlabel += '\n[' + test_name + ']'
+    toolplot.set_labels(
+        title='Latency vs Response Size\n(lower slope is better)',
+        xlabel=xlabel,
+        ylabel='latency (seconds)',
+    )
+    plt.legend(loc='upper left')
+
+
+def plot_batch_size_sweep(
+    results: typing.Mapping[str, flood.LoadTestOutput],
+    *,
+    metric: str = 'call_throughput',
+    test_name: str | None = None,
+) -> None:
+    """plot per-call metric vs batch size, with one line per request rate
+
+    results should be output of run_batch_size_sweep()
+    """
+    import matplotlib.pyplot as plt
+    import toolplot
+
+    by_batch_size = sorted(
+        results.values(), key=lambda result: result['batch_size'][0] or 0
+    )
+    batch_sizes = [result['batch_size'][0] or 0 for result in by_batch_size]
+    rates = by_batch_size[0]['target_rate']
+    for r, rate in enumerate(rates):
+        plt.plot(
+            batch_sizes,
+            [result[metric][r] for result in by_batch_size],  # type: ignore
+            '.-',
+            markersize=20,
+            label=str(rate) + ' rps',
+        )
+    plt.xscale('log')
+    xlabel = 'calls per batch'
+    if test_name is not None:
+        xlabel += '\n[' + test_name + ']'
+    toolplot.set_labels(
+        title=metric + ' vs Batch Size',
+        xlabel=xlabel,
+        ylabel=metric,
+    )
+    plt.legend(loc='upper left')
+
+
+def plot_block_age_sweep(
+    results: typing.Mapping[str, flood.LoadTestOutput],
+    *,
+    metric: str = 'p90',
+    test_name: str | None = None,
+) -> None:
+    """plot metric vs block age bucket, with one line per request rate
+
+    results should be output of run_block_age_sweep()
+    """
+    import matplotlib.pyplot as plt
+    import toolplot
+
+    buckets = list(results.keys())
+    rates = results[buckets[0]]['target_rate']
+    for r, rate in enumerate(rates):
+        plt.plot(
+            range(len(buckets)),
+            [results[bucket][metric][r] for bucket in buckets],  # type: ignore
+            '.-',
+            markersize=20,
+            label=str(rate) + ' rps',
+        )
+    plt.xticks(range(len(buckets)), buckets)
+    xlabel = 'block age'
+    if test_name is not None:
+        xlabel += '\n[' + test_name + ']'
+    toolplot.set_labels(
+        title=metric + ' vs Block Age',
+        xlabel=xlabel,
+        ylabel=metric,
+    )
+    plt.legend(loc='upper left')
+
+
+phase_plot_colors = {
+    'queue': 'lightgray',
+    'dns': 'gold',
+    'connect': 'darkorange',
+    'tls': 'firebrick',
+    'ttfb': 'dodgerblue',
+    'transfer': 'rebeccapurple',
+}
+
+
 def plot_load_test_result_metrics(
     results: typing.Mapping[str, flood.LoadTestOutput]
     | typing.Mapping[str, flood.LoadTestDeepOutput],
@@ -5,7 +5,11 @@ import typing
 import flood
 from flood import user_io
 from flood import spec
+from . import load_test_construction
+from . import persistent_engine
+from . import repeated_calls
 from . import vegeta
+from . import websocket_engine
 
 if typing.TYPE_CHECKING:
     import multiprocessing
@@ -20,8 +24,13 @@ def run_load_tests(
     | None = None,
     verbose: bool | int = False,
     include_deep_output: typing.Sequence[spec.DeepOutput] | None = None,
+    raw_output_dir: str | None = None,
 ) -> typing.Mapping[str, spec.LoadTestOutput]:
-    """run multiple load tests"""
+    """run multiple load tests
+
+    raw output of local nodes is saved as parquet files in raw_output_dir,
+    which is needed if include_deep_output includes raw
+    """
     # parse user_io
     if (node is None) == (nodes is None):
         raise Exception('must specify either node or nodes')
@@ -49,6 +58,7 @@ def run_load_tests(
             node=node,
             test=test,
             include_deep_output=include_deep_output,
+            raw_output_dir=raw_output_dir,
         )
 
     # case: single node and multiple tests
@@ -59,6 +69,7 @@ def run_load_tests(
                 verbose=verbose,
                 test=each_test,
                 include_deep_output=include_deep_output,
+                raw_output_dir=raw_output_dir,
             )
 
     # case: multiple nodes and single tests
@@ -69,6 +80,7 @@ def run_load_tests(
                 verbose=verbose,
                 test=test,
                 include_deep_output=include_deep_output,
+                raw_output_dir=raw_output_dir,
             )
 
     # case: multiple nodes and multiple tests
@@ -80,6 +92,7 @@ def run_load_tests(
                     verbose=verbose,
                     test=test,
                     include_deep_output=include_deep_output,
+                    raw_output_dir=raw_output_dir,
                 )
 
     # case: invalid input
@@ -99,11 +112,14 @@ def run_load_tests(
 
                 sys.exit()
             results_path = queue.get()
-            with open(results_path, 'r') as f:
-                import json
+            import os
 
-                test_results: spec.SingleRunResultsPayload = json.load(f)
-                joined[name] = test_results['results'][name]
+            test_results = flood.load_single_run_results_payload(
+                os.path.dirname(results_path)
+            )
+            joined[name] = _resolve_raw_output_paths(
+                test_results['results'][name], results_path
+            )
         else:
             raise Exception('invalid result type')
 
@@ -116,6 +132,7 @@ def schedule_load_test(
     test: spec.LoadTest | spec.TestGenerationParameters,
     verbose: bool | int = False,
     include_deep_output: typing.Sequence[spec.DeepOutput] | None = None,
+    raw_output_dir: str | None = None,
     _pbar_kwargs: typing.Mapping[str, typing.Any] | None = None,
 ) -> (
     spec.LoadTestOutput
@@ -136,6 +153,7 @@ def schedule_load_test(
                 test=test,
                 verbose=verbose,
                 include_deep_output=include_deep_output,
+                raw_output_dir=raw_output_dir,
                 _pbar_kwargs=_pbar_kwargs,
                 _container=queue,
             ),
@@ -148,6 +166,7 @@ def schedule_load_test(
             test=test,
             verbose=verbose,
             include_deep_output=include_deep_output,
+            raw_output_dir=raw_output_dir,
             _pbar_kwargs=_pbar_kwargs,
         )
 
@@ -160,6 +179,7 @@ def run_load_test(
     _pbar_kwargs: typing.Mapping[str, typing.Any] | None = None,
     _container: multiprocessing.Queue[str] | None = None,
     include_deep_output: typing.Sequence[spec.DeepOutput] | None = None,
+    raw_output_dir: str | None = None,
 ) -> spec.LoadTestOutput | str:
     """run a load test against a single node"""
 
@@ -174,6 +194,7 @@ def run_load_test(
             verbose=verbose,
             _pbar_kwargs=_pbar_kwargs,
             include_deep_output=include_deep_output,
+            raw_output_dir=raw_output_dir,
         )
     else:
         result = _run_load_test_remotely(
@@ -199,6 +220,7 @@ def _run_load_test_locally(
     verbose: bool | int = False,
     _pbar_kwargs: typing.Mapping[str, typing.Any] | None = None,
     include_deep_output: typing.Sequence[spec.DeepOutput] | None = None,
+    raw_output_dir: str | None = None,
 ) -> spec.LoadTestOutput:
     """run a load test from local node"""
 
@@ -226,28 +248,123 @@ def _run_load_test_locally(
         use_test = flood.generate_test(**test)
 
     # perform tests
+    test_parameters = use_test['test_parameters']
+    adaptive_duration = test_parameters.get('adaptive_duration')
+    warmup = test_parameters.get('warmup')
+    engine = test_parameters.get('engine')
+    max_connections = test_parameters.get('max_connections')
+    max_workers = test_parameters.get('max_workers')
+    if engine is None and node['url'].startswith(('ws://', 'wss://')):
+        engine = 'websocket'
+    elif engine is None and node['url'].startswith('ipc://'):
+        engine = 'ipc'
+    elif engine is None and any(
+        attack.get('offsets') is not None for attack in use_test['attacks']
+    ):
+        engine = 'persistent'
+    connection_pool = None
+    websocket_pool = None
+    if engine == 'persistent':
+        connection_pool = persistent_engine.create_connection_pool(
+            node['url'], max_connections=max_connections
+        )
+    elif engine == 'websocket':
+        websocket_pool = websocket_engine.create_websocket_pool(
+            node['url'], n_connections=max_connections
+        )
+    elif engine == 'ipc':
+        websocket_pool = websocket_engine.create_ipc_pool(
+            node['url'], n_connections=max_connections
+        )
+    elif engine is not None and engine != 'vegeta':
+        raise Exception('invalid engine: ' + str(engine))
     results = []
-    for attack in tqdm.tqdm(use_test['attacks'], **tqdm_kwargs):
-        if verbose:
-            flood.user_io.print_timestamped(
-                'Running attack at rate = ' + str(attack['rate']) + ' rps'
+    try:
+        for attack in tqdm.tqdm(use_test['attacks'], **tqdm_kwargs):
+            # perform warmup, excluded from attack metrics
+            warmup_result = None
+            warmup_calls = attack.get('warmup_calls')
+            if warmup is not None and warmup_calls is not None:
+                if verbose:
+                    flood.user_io.print_timestamped(
+                        'Warming up at rate = ' + str(attack['rate']) + ' rps'
+                    )
+                warmup_result = vegeta.run_vegeta_attack(
+                    url=node['url'],
+                    calls=warmup_calls,
+                    duration=load_test_construction.get_warmup_duration(
+                        warmup, attack['rate']
+                    ),
+                    rate=attack['rate'],
+                    vegeta_args=attack['vegeta_args'],
+                    verbose=verbose >= 2,
+                    include_deep_output=include_deep_output,
+                    max_connections=max_connections,
+                    max_workers=max_workers,
+                    connection_pool=connection_pool,
+                    websocket_pool=websocket_pool,
+                    raw_output_dir=raw_output_dir,
+                )
+
+            if verbose:
+                flood.user_io.print_timestamped(
+                    'Running attack at rate = ' + str(attack['rate']) + ' rps'
+                )
+
+            result = vegeta.run_vegeta_attack(
+                url=node['url'],
+                calls=attack['calls'],
+                duration=attack['duration'],
+                rate=attack['rate'],
+                vegeta_args=attack['vegeta_args'],
+                verbose=verbose >= 2,
+                include_deep_output=include_deep_output,
+                adaptive_duration=adaptive_duration,
+                max_connections=max_connections,
+                max_workers=max_workers,
+                connection_pool=connection_pool,
+                websocket_pool=websocket_pool,
+                offsets=attack.get('offsets'),
+                raw_output_dir=raw_output_dir,
             )
+            result['warmup'] = warmup_result
+            result['repeat_ratio'] = repeated_calls.compute_repeat_ratio(
+                attack['calls'], warmup_calls=warmup_calls
+            )
+            results.append(result)
+            if verbose >= 2:
+                print()
+    finally:
+        if connection_pool is not None:
+            persistent_engine.close_connection_pool(connection_pool)
+        if websocket_pool is not None:
+            websocket_engine.close_websocket_pool(websocket_pool)
 
-        result = vegeta.run_vegeta_attack(
-            url=node['url'],
-            calls=attack['calls'],
-            duration=attack['duration'],
-            rate=attack['rate'],
-            vegeta_args=attack['vegeta_args'],
-            verbose=verbose >= 2,
+    # format output
+    output_data = _format_load_test_output(
+        results=results, include_deep_output=include_deep_output
+    )
+    if any(result['warmup'] is not None for result in results):
+        warmup_results = [result['warmup'] for result in results]
+        if any(warmup_result is None for warmup_result in warmup_results):
+            raise Exception('warmup missing for some attacks')
+        output_data['warmup'] = _format_load_test_output(
+            results=warmup_results,  # type: ignore
             include_deep_output=include_deep_output,
         )
-        results.append(result)
-        if verbose >= 2:
-            print()
+
+    return output_data
+
+
+def _format_load_test_output(
+    results: typing.Sequence[spec.LoadTestOutputDatum],
+    include_deep_output: typing.Sequence[spec.DeepOutput] | None,
+) -> spec.LoadTestOutput:
+    """convert attack results into columnar load test output"""
 
     # format output
     output_data: spec.LoadTestOutput = _list_of_maps_to_map_of_lists(results)  # type: ignore # noqa: E501
+    output_data['warmup'] = None
 
     # format deep output
     if include_deep_output is None or len(include_deep_output) == 0:
@@ -258,17 +375,39 @@ def _run_load_test_locally(
         output_data['deep_rpc_error_pairs'] = [
             result['deep_rpc_error_pairs'] for result in results
         ]
+        for attack_index, result in enumerate(results):
+            for slow_call in result['deep_slowest_calls'] or []:
+                slow_call['attack_index'] = attack_index
 
         # convert list of map of map into map of map of list
-        categories: list[spec.ResponseCategory] = list(
-            results[0]['deep_metrics'].keys()  # type: ignore
-        )
-        deep_metrics = {}
-        for category in categories:
-            deep_metrics[category] = _list_of_maps_to_map_of_lists(
-                [result['deep_metrics'][category] for result in results]  # type: ignore # noqa: E501
+        if results[0]['deep_metrics'] is not None:
+            categories: list[spec.ResponseCategory] = list(
+                results[0]['deep_metrics'].keys()
             )
-        output_data['deep_metrics'] = deep_metrics  # type: ignore
+            deep_metrics = {}
+            for category in categories:
+                deep_metrics[category] = _list_of_maps_to_map_of_lists(
+                    [result['deep_metrics'][category] for result in results]  # type: ignore # noqa: E501
+                )
+            output_data['deep_metrics'] = deep_metrics  # type: ignore
+
+        # convert list of map of map into map of map of list, per method
+        # (only methods present in every attack)
+        if results[0]['deep_method_metrics'] is not None:
+            methods = [
+                method
+                for method in results[0]['deep_method_metrics'].keys()
+                if all(
+                    method in (result['deep_method_metrics'] or {})
+                    for result in results
+                )
+            ]
+            deep_method_metrics = {}
+            for method in methods:
+                deep_method_metrics[method] = _list_of_maps_to_map_of_lists(
+                    [result['deep_method_metrics'][method] for result in results]  # type: ignore # noqa: E501
+                )
+            output_data['deep_method_metrics'] = deep_method_metrics  # type: ignore # noqa: E501
 
     return output_data
 
@@ -385,6 +524,33 @@ def _run_load_test_remotely(
     results_path = os.path.join(tempdir, 'results.json')
     cmd = 'rsync ' + remote + ':' + results_path + ' ' + results_path
     subprocess.call(cmd.split(' '), stderr=subprocess.DEVNULL)
+    if include_deep_output is not None and 'metrics' in include_deep_output:
+        deep_results_path = os.path.join(tempdir, 'deep_results.json')
+        cmd = 'rsync ' + remote + ':' + deep_results_path + ' ' + tempdir
+        subprocess.call(cmd.split(' '), stderr=subprocess.DEVNULL)
+    if include_deep_output is not None and 'raw' in include_deep_output:
+        raw_path = os.path.join(tempdir, 'raw')
+        cmd = 'rsync -r ' + remote + ':' + raw_path + ' ' + tempdir
+        subprocess.call(cmd.split(' '), stderr=subprocess.DEVNULL)
 
     return results_path
 
+
+def _resolve_raw_output_paths(
+    result: spec.LoadTestOutput, results_path: str
+) -> spec.LoadTestOutput:
+    """make paths of raw output files relative to results.json absolute"""
+    import os
+
+    directory = os.path.dirname(os.path.abspath(results_path))
+    resolved: typing.Any = dict(result)
+    if resolved['warmup'] is not None:
+        resolved['warmup'] = dict(resolved['warmup'])
+    for output in [resolved, resolved['warmup']]:
+        if output is not None and output.get('deep_raw_output') is not None:
+            output['deep_raw_output'] = [
+                os.path.join(directory, path) if path is not None else None
+                for path in output['deep_raw_output']
+            ]
+    return resolved  # type: ignore
+
@@ -0,0 +1,566 @@
+"""HTTP engine that keeps a connection pool open across attacks
+
+unlike vegeta, which opens new connections for every attack, this engine
+reuses one pool of keep-alive connections for every attack of a test against
+a node, and counts how many connections are opened, reused, and dropped
+
+each result also includes the duration of each phase of its request, see
+request_phases.py
+
+outputs are encoded as vegeta json results so that they can be processed by
+the same reporting and deep check code as vegeta attacks
+"""
+from __future__ import annotations
+
+import typing
+
+from ... import spec
+from .request_phases import latency_phases
+
+if typing.TYPE_CHECKING:
+    import asyncio
+    import ssl
+
+
+default_persistent_timeout = 30
+
+
+def create_connection_pool(
+    url: str,
+    *,
+    max_connections: int | None = None,
+) -> spec.ConnectionPool:
+    """create connection pool that can be used for multiple attacks"""
+    import asyncio
+    import urllib.parse
+
+    parsed = urllib.parse.urlparse(url)
+    if parsed.scheme not in ['http', 'https']:
+        raise Exception('persistent engine only supports http(s) urls')
+    if parsed.hostname is None:
+        raise Exception('url has no host: ' + str(url))
+    if max_connections is not None and max_connections <= 0:
+        raise Exception('max_connections must be positive')
+    if parsed.scheme == 'https':
+        import ssl
+
+        ssl_context: ssl.SSLContext | None = ssl.create_default_context()
+        default_port = 443
+    else:
+        ssl_context = None
+        default_port = 80
+    path = parsed.path or '/'
+    if parsed.query:
+        path += '?' + parsed.query
+
+    return {
+        'url': url,
+        'host': parsed.hostname,
+        'port': parsed.port or default_port,
+        'path': path,
+        'host_header': parsed.netloc.rsplit('@', 1)[-1],
+        'ssl': ssl_context,
+        'loop': asyncio.new_event_loop(),
+        'idle': [],
+        'n_open': 0,
+        'available': None,
+        'max_connections': max_connections,
+        'n_opened': 0,
+        'n_reused': 0,
+        'n_dropped': 0,
+    }
+
+
+def close_connection_pool(pool: spec.ConnectionPool) -> None:
+    """close all idle connections of pool and its event loop"""
+
+    async def close_idle() -> None:
+        for reader, writer in pool['idle']:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+    pool['loop'].run_until_complete(close_idle())
+    pool['idle'] = []
+    pool['n_open'] = 0
+    pool['loop'].close()
+
+
+def run_persistent_attack(
+    *,
+    pool: spec.ConnectionPool,
+    calls: typing.Sequence[typing.Any],
+    rate: int,
+    duration: float,
+    max_workers: int | None = None,
+    offsets: typing.Sequence[float] | None = None,
+    output: typing.BinaryIO | None = None,
+    verbose: bool = False,
+) -> tuple[bytes, spec.ConnectionCounts]:
+    """attack using connections of pool, returning vegeta json results
+
+    if offsets are given, each call is sent at its offset in seconds from the
+    start of the attack, instead of at a constant rate
+
+    if output is given, results are written to output while the attack runs
+    and empty bytes are returned, so that results are not kept in memory
+    """
+    import json
+
+    if output is None:
+        import io
+
+        buffer = io.BytesIO()
+        _, buffer_counts = run_persistent_attack(
+            pool=pool,
+            calls=calls,
+            rate=rate,
+            duration=duration,
+            max_workers=max_workers,
+            offsets=offsets,
+            output=buffer,
+            verbose=verbose,
+        )
+        return buffer.getvalue(), buffer_counts
+
+    if len(calls) == 0:
+        raise Exception('no calls given for attack')
+    if max_workers is not None and max_workers <= 0:
+        raise Exception('max_workers must be positive')
+    if verbose:
+        print('running persistent attack...')
+        print('- url:', pool['url'])
+        print('- open connections:', len(pool['idle']))
+
+    bodies = [json.dumps(call).encode() for call in calls]
+    before = (pool['n_opened'], pool['n_reused'], pool['n_dropped'])
+    pool['loop'].run_until_complete(
+        _async_attack(
+            pool=pool,
+            bodies=bodies,
+            n_requests=_get_n_requests(rate, duration, offsets),
+            rate=rate,
+            max_workers=max_workers,
+            offsets=offsets,
+            output=output,
+        )
+    )
+    counts: spec.ConnectionCounts = {
+        'opened': pool['n_opened'] - before[0],
+        'reused': pool['n_reused'] - before[1],
+        'dropped': pool['n_dropped'] - before[2],
+    }
+    if verbose:
+        print('- connections:', counts)
+
+    return b'', counts
+
+
+#
+# # scheduling
+#
+
+
+async def _async_attack(
+    *,
+    pool: spec.ConnectionPool,
+    bodies: typing.Sequence[bytes],
+    n_requests: int,
+    rate: int,
+    max_workers: int | None,
+    offsets: typing.Sequence[float] | None,
+    output: typing.BinaryIO,
+) -> None:
+    import asyncio
+
+    if pool['available'] is None:
+        pool['available'] = asyncio.Condition()
+    await _schedule_requests(
+        lambda seq: _hit(pool, seq=seq, body=bodies[seq % len(bodies)]),
+        n_requests=n_requests,
+        rate=rate,
+        max_workers=max_workers,
+        offsets=offsets,
+        output=output,
+    )
+
+
+def _get_n_requests(
+    rate: int, duration: float, offsets: typing.Sequence[float] | None
+) -> int:
+    if offsets is not None:
+        return len(offsets)
+    else:
+        return int(rate * duration)
+
+
+async def _schedule_requests(
+    hit: typing.Callable[
+        [int], typing.Coroutine[typing.Any, typing.Any, typing.Any]
+    ],
+    *,
+    n_requests: int,
+    rate: int,
+    max_workers: int | None,
+    offsets: typing.Sequence[float] | None = None,
+    output: typing.BinaryIO,
+) -> None:
+    """call hit(seq) at constant rate, like vegeta cycling through targets
+
+    if offsets are given, hit(seq) is called offsets[seq] seconds after start
+
+    results are written to output as json lines in order of seq, as soon as
+    every earlier request has completed, so that only results of requests in
+    flight are kept in memory
+    """
+    import asyncio
+    import orjson
+
+    workers = asyncio.Semaphore(max_workers) if max_workers else None
+    loop = asyncio.get_running_loop()
+    t_start = loop.time()
+    tasks: dict[int, asyncio.Task[typing.Any]] = {}
+    errors: list[BaseException] = []
+    next_seq = 0
+
+    def write_completed(_: typing.Any = None) -> None:
+        nonlocal next_seq
+        while next_seq in tasks and tasks[next_seq].done():
+            task = tasks.pop(next_seq)
+            if task.cancelled():
+                errors.append(asyncio.CancelledError())
+            elif task.exception() is not None:
+                errors.append(task.exception())  # type: ignore
+            else:
+                output.write(orjson.dumps(task.result()) + b'\n')
+            next_seq += 1
+
+    for seq in range(n_requests):
+        if offsets is not None:
+            delay = t_start + offsets[seq] - loop.time()
+        else:
+            delay = t_start + seq / rate - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if workers is not None:
+            await workers.acquire()
+        task = asyncio.create_task(hit(seq))
+        if workers is not None:
+            task.add_done_callback(lambda _: workers.release())  # type: ignore
+        task.add_done_callback(write_completed)
+        tasks[seq] = task
+
+    if len(tasks) > 0:
+        await asyncio.wait(list(tasks.values()))
+    write_completed()
+    if len(errors) > 0:
+        raise errors[0]
+
+
+async def _hit(
+    pool: spec.ConnectionPool, *, seq: int, body: bytes
+) -> typing.Mapping[str, typing.Any]:
+    import asyncio
+    import base64
+    import time
+
+    request = (
+        b'POST '
+        + pool['path'].encode()
+        + b' HTTP/1.1\r\nHost: '
+        + pool['host_header'].encode()
+        + b'\r\nContent-Type: application/json\r\nContent-Length: '
+        + str(len(body)).encode()
+        + b'\r\n\r\n'
+        + body
+    )
+
+    timestamp = time.time_ns()
+    t_start = time.perf_counter_ns()
+    timings: dict[str, int] = dict.fromkeys(latency_phases, 0)
+    code = 0
+    error = ''
+    response_body = b''
+    headers: typing.Mapping[str, typing.Sequence[str]] = {}
+    try:
+        code, status, headers, response_body = await asyncio.wait_for(
+            _request(pool, request, timings),
+            timeout=default_persistent_timeout,
+        )
+        if code < 200 or code >= 400:
+            error = status
+    except asyncio.TimeoutError:
+        error = 'timeout after ' + str(default_persistent_timeout) + 's'
+    except Exception as e:
+        error = str(e) or type(e).__name__
+    latency = time.perf_counter_ns() - t_start
+
+    return {
+        'attack': '',
+        'seq': seq,
+        'code': code,
+        'timestamp': _format_timestamp(timestamp),
+        'latency': latency,
+        'bytes_out': len(body),
+        'bytes_in': len(response_body),
+        'error': error,
+        'body': base64.b64encode(response_body).decode(),
+        'method': 'POST',
+        'url': pool['url'],
+        'headers': headers,
+        'timings': timings,
+    }
+
+
+def _format_timestamp(timestamp_ns: int) -> str:
+    """format timestamp as RFC3339 with nanoseconds, as used by vegeta"""
+    import datetime
+
+    seconds, nanoseconds = divmod(timestamp_ns, 1_000_000_000)
+    dt = datetime.datetime.fromtimestamp(seconds, tz=datetime.timezone.utc)
+    return dt.strftime('%Y-%m-%dT%H:%M:%S.') + '%09d' % nanoseconds + 'Z'
+
+
+#
+# # connections
+#
+
+
+async def _request(
+    pool: spec.ConnectionPool,
+    request: bytes,
+    timings: typing.MutableMapping[str, int],
+) -> tuple[int, str, typing.Mapping[str, typing.Sequence[str]], bytes]:
+    """send request over pooled connection and read its response
+
+    durations of each phase of the request are added to timings, in ns
+    """
+    import asyncio
+
+    reused, (reader, writer) = await _acquire_connection(pool, timings)
+    try:
+        writer.write(request)
+        await writer.drain()
+        response = await _read_response(reader, timings)
+    except BaseException as e:
+        await _discard_connection(pool, writer)
+        stale = isinstance(e, (ConnectionError, asyncio.IncompleteReadError))
+        if not reused or not stale:
+            raise
+
+        # server can close idle connection before request arrives, retry once
+        reused, (reader, writer) = await _acquire_connection(
+            pool, timings, new=True
+        )
+        try:
+            writer.write(request)
+            await writer.drain()
+            response = await _read_response(reader, timings)
+        except BaseException:
+            await _discard_connection(pool, writer)
+            raise
+
+    code, status, headers, body, keep_alive = response
+    if keep_alive:
+        await _release_connection(pool, reader, writer)
+    else:
+        await _discard_connection(pool, writer)
+    return code, status, headers, body
+
+
+async def _acquire_connection(
+    pool: spec.ConnectionPool,
+    timings: typing.MutableMapping[str, int],
+    *,
+    new: bool = False,
+) -> tuple[bool, tuple[asyncio.StreamReader, asyncio.StreamWriter]]:
+    """get idle connection from pool or open new one, return (reused, conn)"""
+    import time
+
+    available = pool['available']
+    if available is None:
+        raise Exception('pool not initialized')
+
+    t_start = time.perf_counter_ns()
+    async with available:
+        while True:
+            while len(pool['idle']) > 0 and not new:
+                reader, writer = pool['idle'].pop()
+                if reader.at_eof() or writer.is_closing():
+                    writer.close()
+                    pool['n_open'] -= 1
+                    pool['n_dropped'] += 1
+                    continue
+                pool['n_reused'] += 1
+                timings['queue'] += time.perf_counter_ns() - t_start
+                return True, (reader, writer)
+            if (
+                pool['max_connections'] is None
+                or pool['n_open'] < pool['max_connections']
+            ):
+                pool['n_open'] += 1
+                break
+            await available.wait()
+    timings['queue'] += time.perf_counter_ns() - t_start
+
+    try:
+        connection = await _open_connection(
+            host=pool['host'],
+            port=pool['port'],
+            ssl_context=pool['ssl'],
+            timings=timings,
+        )
+    except BaseException:
+        async with available:
+            pool['n_open'] -= 1
+            available.notify()
+        raise
+    pool['n_opened'] += 1
+    return False, connection
+
+
+async def _open_connection(
+    *,
+    host: str,
+    port: int,
+    ssl_context: ssl.SSLContext | None,
+    timings: typing.MutableMapping[str, int],
+) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    """open connection in separate dns, connect, and tls steps to time them"""
+    import asyncio
+    import socket
+    import time
+
+    loop = asyncio.get_running_loop()
+
+    # dns
+    t_start = time.perf_counter_ns()
+    addresses = await loop.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    t_resolved = time.perf_counter_ns()
+    timings['dns'] += t_resolved - t_start
+
+    # connect, trying each resolved address
+    sock = None
+    connect_errors = []
+    for family, sock_type, proto, _, address in addresses:
+        sock = socket.socket(family, sock_type, proto)
+        sock.setblocking(False)
+        try:
+            await loop.sock_connect(sock, address)
+            break
+        except OSError as e:
+            sock.close()
+            sock = None
+            connect_errors.append(e)
+    if sock is None:
+        if len(connect_errors) > 0:
+            raise connect_errors[0]
+        raise ConnectionError('could not resolve ' + host)
+    t_connected = time.perf_counter_ns()
+    timings['connect'] += t_connected - t_resolved
+
+    # tls
+    try:
+        if ssl_context is not None:
+            connection = await asyncio.open_connection(
+                sock=sock, ssl=ssl_context, server_hostname=host
+            )
+            timings['tls'] += time.perf_counter_ns() - t_connected
+        else:
+            connection = await asyncio.open_connection(sock=sock)
+            timings['connect'] += time.perf_counter_ns() - t_connected
+    except BaseException:
+        sock.close()
+        raise
+
+    return connection
+
+
+async def _release_connection(
+    pool: spec.ConnectionPool,
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+) -> None:
+    available = pool['available']
+    if available is None:
+        raise Exception('pool not initialized')
+    async with available:
+        pool['idle'].append((reader, writer))
+        available.notify()
+
+
+async def _discard_connection(
+    pool: spec.ConnectionPool, writer: asyncio.StreamWriter
+) -> None:
+    writer.close()
+    available = pool['available']
+    if available is None:
+        raise Exception('pool not initialized')
+    async with available:
+        pool['n_open'] -= 1
+        pool['n_dropped'] += 1
+        available.notify()
+
+
+async def _read_response(
+    reader: asyncio.StreamReader,
+    timings: typing.MutableMapping[str, int],
+) -> tuple[int, str, typing.Mapping[str, typing.Sequence[str]], bytes, bool]:
+    """read HTTP/1.1 response
+
+    ttfb is measured from after the request has been sent
+
+    returns (code, status, headers, body, keep_alive)
+    """
+    import time
+
+    t_sent = time.perf_counter_ns()
+    status_line = await reader.readline()
+    t_first_byte = time.perf_counter_ns()
+    timings['ttfb'] += t_first_byte - t_sent
+    if len(status_line) == 0:
+        raise ConnectionError('connection closed by server')
+    version, code_str, *_ = status_line.decode('latin-1').split(' ', 2)
+    code = int(code_str)
+    status = status_line.decode('latin-1').split(' ', 1)[1].strip()
+
+    # read headers
+    headers: dict[str, list[str]] = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        key, _, value = line.decode('latin-1').partition(':')
+        headers.setdefault(key.strip().title(), []).append(value.strip())
+
+    # read body
+    keep_alive = version == 'HTTP/1.1'
+    connection_header = ','.join(headers.get('Connection', [])).lower()
+    if 'close' in connection_header:
+        keep_alive = False
+    elif 'keep-alive' in connection_header:
+        keep_alive = True
+    if 'chunked' in ','.join(headers.get('Transfer-Encoding', [])).lower():
+        chunks = []
+        while True:
+            size_line = await reader.readline()
+            size = int(size_line.split(b';', 1)[0].strip(), 16)
+            if size == 0:
+                while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+        body = b''.join(chunks)
+    elif 'Content-Length' in headers:
+        body = await reader.readexactly(int(headers['Content-Length'][0]))
+    elif code in (204, 304) or 100 <= code < 200:
+        body = b''
+    else:
+        body = await reader.read()
+        keep_alive = False
+    timings['transfer'] += time.perf_counter_ns() - t_first_byte
+
+    return code, status, headers, body, keep_alive
@@ -0,0 +1,156 @@
+"""repeated calls, where a fraction of calls repeat earlier calls of attack
+
+repeats measure how much caching layers and node caches help, because
+repeated calls can be served from cache while other calls cannot
+
+how far back repeats reach is controlled by a reuse distance distribution,
+where reuse distance 0 repeats the previous call, see access_distributions.py
+"""
+from __future__ import annotations
+
+import typing
+
+import flood
+from flood import spec
+
+
+def create_repeats(
+    ratio: float,
+    reuse_distance: spec.AccessDistribution | None = None,
+) -> spec.Repeats:
+    """create repeats, where reuse_distance None repeats any earlier call"""
+    repeats: spec.Repeats = {'ratio': ratio, 'reuse_distance': reuse_distance}
+    validate_repeats(repeats)
+    return repeats
+
+
+def validate_repeats(repeats: spec.Repeats) -> None:
+    if not 0 <= repeats['ratio'] < 1:
+        raise Exception('repeat ratio must be at least 0 and less than 1')
+    if repeats['reuse_distance'] is not None:
+        flood.generators.validate_distribution(repeats['reuse_distance'])
+
+
+def add_attack_repeats(
+    attacks: typing.Sequence[spec.VegetaAttack],
+    repeats: spec.Repeats,
+    random_seed: spec.RandomSeed | None = None,
+) -> typing.Sequence[spec.VegetaAttack]:
+    """replace a fraction of calls of each attack by copies of earlier calls
+
+    repeated calls keep the id of the call they replace, reuse distances
+    beyond the start of the attack wrap around to earlier calls
+    """
+    import numpy as np
+
+    validate_repeats(repeats)
+    reuse_distance = repeats['reuse_distance']
+    if reuse_distance is None:
+        reuse_distance = flood.generators.create_distribution('uniform')
+    rng = flood.generators.get_rng(random_seed=random_seed)
+
+    new_attacks = []
+    for attack in attacks:
+        calls = list(attack['calls'])
+        n_calls = len(calls)
+        if n_calls > 1 and repeats['ratio'] > 0:
+            if any(not isinstance(call, dict) for call in calls):
+                raise Exception('repeats must be added before batches')
+            is_repeat = rng.random(n_calls) < repeats['ratio']
+            distances = flood.generators.sample_ranks(
+                n_calls,
+                n_calls,
+                distribution=reuse_distance,
+                rng=rng,
+            )
+            for i in np.nonzero(is_repeat[1:])[0] + 1:
+                source = calls[i - 1 - distances[i] % i]
+                calls[i] = dict(source, id=calls[i].get('id'))
+        new_attack = typing.cast('spec.VegetaAttack', dict(attack))
+        new_attack['calls'] = calls
+        new_attacks.append(new_attack)
+    return new_attacks
+
+
+def compute_repeat_ratio(
+    calls: typing.Sequence[typing.Any],
+    warmup_calls: typing.Sequence[typing.Any] | None = None,
+) -> float | None:
+    """compute fraction of calls that repeat an earlier call
+
+    calls are compared by method and params, batches are split into calls,
+    and calls that repeat a warmup call also count as repeats
+    """
+    import orjson
+
+    def get_key(call: typing.Any) -> bytes:
+        return orjson.dumps(
+            [call.get('method'), call.get('params')],
+            option=orjson.OPT_SORT_KEYS,
+        )
+
+    seen = set()
+    if warmup_calls is not None:
+        for call in _flatten_calls(warmup_calls):
+            seen.add(get_key(call))
+    n_calls = 0
+    n_repeats = 0
+    for call in _flatten_calls(calls):
+        key = get_key(call)
+        n_calls += 1
+        if key in seen:
+            n_repeats += 1
+        else:
+            seen.add(key)
+    if n_calls == 0:
+        return None
+    return n_repeats / n_calls
+
+
+def _flatten_calls(
+    calls: typing.Sequence[typing.Any],
+) -> typing.Iterator[typing.Any]:
+    for call in calls:
+        if isinstance(call, list):
+            yield from call
+        else:
+            yield call
+
+
+#
+# # repeat ratio sweeps
+#
+
+
+def run_repeat_ratio_sweep(
+    *,
+    node: spec.NodeShorthand,
+    test_name: str,
+    repeat_ratios: typing.Sequence[float],
+    rates: typing.Sequence[int],
+    durations: typing.Sequence[int],
+    network: str,
+    reuse_distance: spec.AccessDistribution | None = None,
+    random_seed: spec.RandomSeed | None = None,
+    verbose: bool | int = False,
+    include_deep_output: typing.Sequence[spec.DeepOutput] | None = None,
+) -> typing.Mapping[str, spec.LoadTestOutput]:
+    """run same test at multiple repeat ratios, keyed by repeat ratio"""
+    tests = {
+        'repeat_ratio=' + str(ratio): flood.generate_test(
+            test_name=test_name,
+            rates=rates,
+            durations=durations,
+            network=network,
+            random_seed=random_seed,
+            repeats=create_repeats(ratio, reuse_distance),
+            flood_version=flood.get_flood_version(),
+        )
+        for ratio in repeat_ratios
+    }
+    return flood.run_load_tests(
+        node=node,
+        tests=tests,
+        verbose=verbose,
+        include_deep_output=include_deep_output,
+    )
@@ -0,0 +1,136 @@
+"""breakdown of request latency into phases
+
+phases of each request:
+- queue: waiting for a connection from the pool
+- dns: resolving the host of the node
+- connect: establishing the tcp connection
+- tls: performing the tls handshake
+- ttfb: time to first byte, from sending request to receiving response status
+- transfer: receiving the rest of the response
+
+dns, connect, and tls are zero for requests that reuse an open connection
+
+phase timings are only recorded by the persistent engine, vegeta does not
+report them
+"""
+from __future__ import annotations
+
+import typing
+
+from ... import spec
+
+if typing.TYPE_CHECKING:
+    import polars as pl
+
+
+latency_phases: typing.Sequence[spec.LatencyPhase] = [
+    'queue',
+    'dns',
+    'connect',
+    'tls',
+    'ttfb',
+    'transfer',
+]
+
+
+def extract_phase_timings(raw_output: bytes) -> pl.DataFrame | None:
+    """extract per-request phase timings (in ns) from raw attack output
+
+    phase columns are decoded from the arrow batches of the deep check
+    parser, see deep_utils._convert_json_results()
+
+    returns None if raw output does not contain phase timings
+    """
+    from . import deep_utils
+
+    columns = ['phase_' + phase for phase in latency_phases]
+    df = deep_utils._convert_raw_vegeta_output_to_dataframe(raw_output)
+    if len(df) == 0 or any(column not in df.columns for column in columns):
+        return None
+    return df.select(columns)
+
+
+def aggregate_phase_timings(
+    dataframes: typing.Iterable[pl.DataFrame],
+    aggregates: typing.MutableMapping[str, spec.ValueAggregate | None],
+) -> typing.Iterator[pl.DataFrame]:
+    """aggregate phase timings of batches of results, yielding each batch
+
+    aggregates maps each phase_{phase} column to an aggregate of its values,
+    or to None once a batch has results without phase timings, so that phase
+    latencies can be computed without keeping timings of every request
+    """
+    from . import deep_aggregates
+
+    empty = deep_aggregates.create_value_aggregate()
+    for df in dataframes:
+        for phase in latency_phases:
+            column = 'phase_' + phase
+            previous = aggregates.get(column, empty)
+            if previous is None or column not in df.columns:
+                aggregates[column] = None
+            else:
+                aggregates[column] = deep_aggregates.merge_value_aggregates(
+                    previous,
+                    deep_aggregates.create_value_aggregate(df[column]),
+                )
+        yield df
+
+
+def compute_aggregate_phase_latencies(
+    aggregates: typing.Mapping[str, spec.ValueAggregate | None],
+) -> spec.PhaseLatencies | None:
+    """compute latency statistics (in seconds) of each phase of requests
+
+    aggregates map each phase_{phase} column to an aggregate of its values,
+    see aggregate_phase_timings()
+    """
+    from . import deep_aggregates
+
+    phase_latencies = {}
+    for phase in latency_phases:
+        aggregate = aggregates.get('phase_' + phase)
+        if aggregate is None:
+            return None
+        stats = deep_aggregates.compute_value_stats(aggregate)
+        if stats is None:
+            return None
+        phase_latencies[phase] = {
+            stat: stats[stat] / 1e9
+            for stat in ['mean', 'p50', 'p90', 'p95', 'p99', 'max']
+        }
+    return phase_latencies
+
+
+def compute_phase_latencies(df: pl.DataFrame) -> spec.PhaseLatencies | None:
+    """compute latency statistics (in seconds) of each phase of requests
+
+    df should have a phase_{phase} column for each phase, in ns
+    """
+    import polars as pl
+
+    if len(df) == 0 or any(
+        'phase_' + phase not in df.columns for phase in latency_phases
+    ):
+        return None
+
+    stats = df.select(
+        [
+            expression.alias(phase + '__' + stat)
+            for phase in latency_phases
+            for stat, expression in [
+                ('mean', pl.col('phase_' + phase).mean()),
+                ('p50', pl.col('phase_' + phase).median()),
+                ('p90', pl.col('phase_' + phase).quantile(0.90)),
+                ('p95', pl.col('phase_' + phase).quantile(0.95)),
+                ('p99', pl.col('phase_' + phase).quantile(0.99)),
+                ('max', pl.col('phase_' + phase).max()),
+            ]
+        ]
+    ).to_dicts()[0]
+
+    phase_latencies: dict[str, dict[str, float]] = {}
+    for key, value in stats.items():
+        phase, stat = key.split('__')
+        phase_latencies.setdefault(phase, {})[stat] = value / 1e9
+    return phase_latencies  # type: ignore
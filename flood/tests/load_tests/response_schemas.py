@@ -0,0 +1,193 @@
+"""validation of json-rpc results against the expected schema of each method
+
+nodes under load can return well-formed responses with junk results, such as
+hex of the wrong length or empty receipts, which deep checks count as schema
+errors instead of successes
+
+schemas are shallow: hex strings are matched with precompiled regexes, and
+arrays are spot-checked at their first, middle, and last items, so that
+validation stays cheap relative to parsing the json of each response
+
+schemas can be:
+- None: any value
+- a hex format: 'quantity', 'data', 'hash', or 'address'
+- {'type': 'object', 'keys': {key: schema}}: object with required keys
+- {'type': 'array', 'items': schema, 'non_empty': bool}: array of items
+"""
+from __future__ import annotations
+
+import re
+import typing
+
+from ... import spec
+
+
+schema_error_categories: typing.Sequence[spec.SchemaErrorCategory] = [
+    'wrong_type',
+    'invalid_hex',
+    'missing_key',
+    'empty_result',
+]
+
+hex_patterns: typing.Mapping[str, re.Pattern[str]] = {
+    'quantity': re.compile('0x[0-9a-fA-F]+'),
+    'data': re.compile('0x(?:[0-9a-fA-F]{2})*'),
+    'hash': re.compile('0x[0-9a-fA-F]{64}'),
+    'address': re.compile('0x[0-9a-fA-F]{40}'),
+}
+
+_block_schema: spec.ResponseSchema = {
+    'type': 'object',
+    'keys': {
+        'number': 'quantity',
+        'hash': 'hash',
+        'parentHash': 'hash',
+        'timestamp': 'quantity',
+        'transactions': {'type': 'array'},
+    },
+}
+
+_transaction_schema: spec.ResponseSchema = {
+    'type': 'object',
+    'keys': {
+        'hash': 'hash',
+        'from': 'address',
+        'input': 'data',
+        'nonce': 'quantity',
+    },
+}
+
+_log_schema: spec.ResponseSchema = {
+    'type': 'object',
+    'keys': {
+        'address': 'address',
+        'topics': {'type': 'array', 'items': 'hash'},
+        'data': 'data',
+        'blockNumber': 'quantity',
+        'transactionHash': 'hash',
+    },
+}
+
+_receipt_schema: spec.ResponseSchema = {
+    'type': 'object',
+    'keys': {
+        'transactionHash': 'hash',
+        'blockNumber': 'quantity',
+        'gasUsed': 'quantity',
+        'logs': {'type': 'array', 'items': _log_schema},
+    },
+}
+
+_trace_schema: spec.ResponseSchema = {
+    'type': 'object',
+    'keys': {'action': {'type': 'object'}, 'type': None},
+}
+
+_replay_schema: spec.ResponseSchema = {
+    'type': 'object',
+    'keys': {'output': 'data'},
+}
+
+# expected schema of result of each method, methods not listed are not checked
+method_schemas: typing.MutableMapping[str, spec.ResponseSchema] = {
+    'eth_blockNumber': 'quantity',
+    'eth_call': 'data',
+    'eth_estimateGas': 'quantity',
+    'eth_feeHistory': {
+        'type': 'object',
+        'keys': {
+            'oldestBlock': 'quantity',
+            'baseFeePerGas': {
+                'type': 'array',
+                'items': 'quantity',
+                'non_empty': True,
+            },
+        },
+    },
+    'eth_getBalance': 'quantity',
+    'eth_getBlockByHash': _block_schema,
+    'eth_getBlockByNumber': _block_schema,
+    'eth_getBlockReceipts': {'type': 'array', 'items': _receipt_schema},
+    'eth_getBlockTransactionCountByNumber': 'quantity',
+    'eth_getCode': 'data',
+    'eth_getLogs': {'type': 'array', 'items': _log_schema},
+    'eth_getProof': {
+        'type': 'object',
+        'keys': {
+            'address': 'address',
+            'balance': 'quantity',
+            'accountProof': {'type': 'array', 'items': 'data'},
+        },
+    },
+    'eth_getStorageAt': 'hash',
+    'eth_getTransactionByHash': _transaction_schema,
+    'eth_getTransactionCount': 'quantity',
+    'eth_getTransactionReceipt': _receipt_schema,
+    'eth_getUncleCountByBlockNumber': 'quantity',
+    'trace_block': {'type': 'array', 'items': _trace_schema},
+    'trace_call': _replay_schema,
+    'trace_filter': {'type': 'array', 'items': _trace_schema},
+    'trace_replayBlockTransactions': {
+        'type': 'array',
+        'items': _replay_schema,
+    },
+    'trace_replayTransaction': _replay_schema,
+    'trace_transaction': {
+        'type': 'array',
+        'items': _trace_schema,
+        'non_empty': True,
+    },
+}
+
+
+def validate_result(
+    method: str | None, result: typing.Any
+) -> spec.SchemaErrorCategory | None:
+    """validate result of method, returning category of error if invalid"""
+    if method is None:
+        return None
+    schema = method_schemas.get(method)
+    if schema is None:
+        return None
+    return _validate_value(result, schema)
+
+
+def _validate_value(
+    value: typing.Any, schema: spec.ResponseSchema
+) -> spec.SchemaErrorCategory | None:
+    if schema is None:
+        return None
+    elif isinstance(schema, str):
+        if not isinstance(value, str):
+            return 'wrong_type'
+        if hex_patterns[schema].fullmatch(value) is None:
+            return 'invalid_hex'
+        return None
+    elif schema['type'] == 'object':
+        if not isinstance(value, dict):
+            return 'wrong_type'
+        if len(value) == 0:
+            return 'empty_result'
+        for key, key_schema in schema.get('keys', {}).items():
+            if key not in value:
+                return 'missing_key'
+            error = _validate_value(value[key], key_schema)
+            if error is not None:
+                return error
+        return None
+    elif schema['type'] == 'array':
+        if not isinstance(value, list):
+            return 'wrong_type'
+        if len(value) == 0:
+            if schema.get('non_empty'):
+                return 'empty_result'
+            return None
+        item_schema = schema.get('items')
+        if item_schema is not None:
+            for index in sorted({0, len(value) // 2, len(value) - 1}):
+                error = _validate_value(value[index], item_schema)
+                if error is not None:
+                    return error
+        return None
+    else:
+        raise Exception('unknown schema type: ' + str(schema['type']))
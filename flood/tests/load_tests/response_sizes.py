@@ -0,0 +1,85 @@
+"""response sizes of deep checks, and how latency scales with them
+
+latency of methods like eth_getLogs, trace_*, and eth_getBlockByNumber is
+dominated by the size of their responses, so nodes are better compared per
+byte served than per request
+
+latency is fit as a linear function of response size, from sums that are
+merged across batches of results, and a uniform sample of (size, latency)
+points of each attack is kept for plotting
+"""
+from __future__ import annotations
+
+import typing
+
+from flood import spec
+
+if typing.TYPE_CHECKING:
+    import numpy as np
+    import polars as pl
+
+
+# (size, latency) points kept by each deep check, sampled from all responses
+max_size_latency_samples = 1_000
+
+
+def fit_latency_vs_size(
+    n: int,
+    sum_sizes: float,
+    sum_latencies: float,
+    sum_squared_sizes: float,
+    sum_size_latencies: float,
+) -> tuple[float, float] | None:
+    """fit latency = intercept + slope * size by least squares
+
+    sizes are in bytes and latencies in ns, returns (slope, intercept) in
+    (seconds per MB, seconds), or None if sizes do not vary
+    """
+    if n < 2:
+        return None
+    size_variance = sum_squared_sizes - sum_sizes * sum_sizes / n
+    if size_variance <= 0:
+        return None
+    covariance = sum_size_latencies - sum_sizes * sum_latencies / n
+    slope = covariance / size_variance
+    intercept = (sum_latencies - slope * sum_sizes) / n
+    return slope * 1e6 / 1e9, intercept / 1e9
+
+
+def update_size_latency_samples(
+    samples: pl.DataFrame | None,
+    df: pl.DataFrame,
+    rng: np.random.Generator,
+    k: int | None = None,
+) -> pl.DataFrame:
+    """merge responses of df into uniform sample of k (size, latency) points
+
+    each response gets a random key and the k largest keys are kept, so the
+    sample is uniform over all batches merged so far
+    """
+    import polars as pl
+
+    if k is None:
+        k = max_size_latency_samples
+    candidates = df.select('bytes_in', 'latency').with_columns(
+        pl.Series('sample_key', rng.random(len(df)))
+    )
+    if samples is not None:
+        candidates = pl.concat([samples, candidates])
+    return candidates.top_k(k, by='sample_key').sort('sample_key')
+
+
+def create_size_latency_samples_table(
+    samples: pl.DataFrame | None,
+) -> list[spec.SizeLatencySample]:
+    """create list of (size, latency) points, sorted by size"""
+    import polars as pl
+
+    if samples is None:
+        return []
+    rows = (
+        samples.select(pl.col('bytes_in'), pl.col('latency') / 1e9)
+        .sort('bytes_in')
+        .rows()
+    )
+    return [(size, latency) for size, latency in rows]
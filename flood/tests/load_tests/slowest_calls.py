@@ -0,0 +1,207 @@
+"""index of slowest calls of each attack, and isolated re-measurement of them
+
+deep checks keep the top max_slowest_calls responses of each attack by
+latency, linked to the calls that caused them, so that slow blocks, addresses,
+or ranges behind a bad p99 can be identified
+
+replaying only those calls sequentially against an idle node tells whether
+they are intrinsically expensive or were only slow from queueing under load
+"""
+from __future__ import annotations
+
+import typing
+
+from flood import spec
+
+if typing.TYPE_CHECKING:
+    import polars as pl
+
+
+# slowest calls kept by each deep check
+max_slowest_calls = 20
+
+# isolated latency must be at least this fraction of latency under load for a
+# call to be classified as intrinsically slow
+intrinsic_latency_ratio = 0.5
+
+_slowest_call_columns = ['call_index', 'latency', 'bytes_in', 'timestamp']
+
+
+def update_slowest_calls(
+    slowest: pl.DataFrame | None,
+    df: pl.DataFrame,
+    k: int | None = None,
+) -> pl.DataFrame:
+    """merge responses of df into top k slowest responses"""
+    import polars as pl
+
+    if k is None:
+        k = max_slowest_calls
+    candidates = df.select(_slowest_call_columns)
+    if slowest is not None:
+        candidates = pl.concat([slowest, candidates])
+    return candidates.top_k(k, by='latency').sort('latency', descending=True)
+
+
+def create_slowest_calls_table(
+    slowest: pl.DataFrame | None,
+    calls: typing.Sequence[typing.Any],
+) -> list[spec.SlowCall]:
+    """create table of slowest calls, slowest first"""
+    import polars as pl
+
+    if slowest is None:
+        return []
+    rows = slowest.select(
+        pl.col('call_index'),
+        pl.col('latency') / 1e9,
+        pl.col('bytes_in'),
+        (pl.col('timestamp') // 1000).cast(pl.Datetime('us')).cast(pl.Utf8),
+    ).iter_rows()
+    return [
+        {
+            'attack_index': None,
+            'call_index': call_index,
+            'call': calls[call_index],
+            'latency': latency,
+            'response_size': response_size,
+            'timestamp': timestamp,
+        }
+        for call_index, latency, response_size, timestamp in rows
+    ]
+
+
+def get_slowest_calls(
+    result: spec.LoadTestOutput,
+) -> list[spec.SlowCall]:
+    """get slowest calls across attacks of load test, one row per call
+
+    each attack has its own calls, so calls are identified by attack index
+    and call index
+    """
+    attacks_slowest_calls = result.get('deep_slowest_calls')
+    if attacks_slowest_calls is None:
+        raise Exception('slowest calls not available, run with deep check')
+    slowest_by_index: typing.MutableMapping[
+        tuple[int, int], spec.SlowCall
+    ] = {}
+    for attack_index, slowest_calls in enumerate(attacks_slowest_calls):
+        for slow_call in slowest_calls or []:
+            key = (attack_index, slow_call['call_index'])
+            previous = slowest_by_index.get(key)
+            if previous is None or slow_call['latency'] > previous['latency']:
+                slowest_by_index[key] = {
+                    'attack_index': attack_index,
+                    'call_index': slow_call['call_index'],
+                    'call': slow_call['call'],
+                    'latency': slow_call['latency'],
+                    'response_size': slow_call['response_size'],
+                    'timestamp': slow_call['timestamp'],
+                }
+    return sorted(
+        slowest_by_index.values(),
+        key=lambda slow_call: -slow_call['latency'],
+    )
+
+
+def remeasure_slowest_calls(
+    node: spec.Node,
+    slowest_calls: typing.Sequence[spec.SlowCall],
+    n_repeats: int = 3,
+) -> list[spec.SlowCallRemeasurement]:
+    """replay slowest calls sequentially against idle node
+
+    each call is sent n_repeats times, one at a time, and its median latency
+    is compared to its latency under load
+    """
+    import json
+    import statistics
+    import time
+    import requests
+
+    if node['remote'] is not None:
+        raise Exception('remote not supported for remeasuring calls')
+    if not node['url'].startswith(('http://', 'https://')):
+        raise Exception(
+            'remeasuring calls requires an http(s) url, not ' + node['url']
+        )
+    if n_repeats < 1:
+        raise Exception('n_repeats must be at least 1')
+
+    headers = {'Content-Type': 'application/json', 'User-Agent': 'flood'}
+    remeasurements: list[spec.SlowCallRemeasurement] = []
+    with requests.Session() as session:
+        for slow_call in slowest_calls:
+            data = json.dumps(slow_call['call'])
+            latencies = []
+            for _ in range(n_repeats):
+                start = time.perf_counter()
+                response = session.post(
+                    url=node['url'], data=data, headers=headers
+                )
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+            isolated_latency = statistics.median(latencies)
+            ratio: float | None
+            if slow_call['latency'] > 0:
+                ratio = isolated_latency / slow_call['latency']
+                intrinsic = ratio >= intrinsic_latency_ratio
+            else:
+                # no time was spent queueing under load
+                ratio = None
+                intrinsic = True
+            remeasurements.append(
+                {
+                    'attack_index': slow_call['attack_index'],
+                    'call_index': slow_call['call_index'],
+                    'call': slow_call['call'],
+                    'load_latency': slow_call['latency'],
+                    'isolated_latency': isolated_latency,
+                    'isolated_ratio': ratio,
+                    'intrinsic': intrinsic,
+                }
+            )
+    return remeasurements
+
+
+def print_slowest_call_remeasurements(
+    remeasurements: typing.Sequence[spec.SlowCallRemeasurement],
+    indent: int | str | None = None,
+) -> None:
+    import json
+    import toolstr
+    import flood
+
+    rows = []
+    for remeasurement in remeasurements:
+        call = remeasurement['call']
+        if isinstance(call, list):
+            description = 'batch of ' + str(len(call))
+        else:
+            params = json.dumps(call.get('params'), separators=(',', ':'))
+            description = call['method'] + ' ' + params
+        rows.append(
+            [
+                remeasurement['attack_index'],
+                remeasurement['call_index'],
+                description,
+                remeasurement['load_latency'],
+                remeasurement['isolated_latency'],
+                'intrinsic' if remeasurement['intrinsic'] else 'queueing',
+            ]
+        )
+    toolstr.print_table(
+        rows,
+        labels=[
+            'attack',
+            'call',
+            'request',
+            'load (s)',
+            'isolated (s)',
+            'slow from',
+        ],
+        max_column_widths={'request': 60},
+        label_style=flood.user_io.styles.get('metavar'),
+        border=flood.user_io.styles.get('content'),
+        indent=indent,
+    )
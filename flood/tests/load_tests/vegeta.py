@@ -4,7 +4,12 @@ from __future__ import annotations
 import typing
 
 from ... import spec
+from . import adaptive_durations
+from . import batch_requests
 from . import deep_utils
+from . import request_phases
+from . import persistent_engine
+from . import websocket_engine
 
 
 def run_vegeta_attack(
@@ -12,33 +17,171 @@ def run_vegeta_attack(
     url: str,
     rate: int,
     calls: typing.Sequence[typing.Any],
-    duration: int,
+    duration: float,
     vegeta_args: str | None = None,
     verbose: bool = False,
     include_deep_output: typing.Sequence[spec.DeepOutput] | None = None,
+    adaptive_duration: spec.AdaptiveDuration | None = None,
+    max_connections: int | None = None,
+    max_workers: int | None = None,
+    connection_pool: spec.ConnectionPool | None = None,
+    websocket_pool: spec.WebsocketPool | None = None,
+    offsets: typing.Sequence[float] | None = None,
+    raw_output_dir: str | None = None,
 ) -> spec.LoadTestOutputDatum:
-    attack = _construct_vegeta_attack(
-        calls=calls,
-        url=url,
-        verbose=verbose,
-    )
-    attack_output = _vegeta_attack(
-        schedule_dir=attack['schedule_dir'],
-        duration=duration,
-        rate=rate,
-        vegeta_args=vegeta_args,
-        verbose=verbose,
-    )
-    report = _create_vegeta_report(
-        attack_output=attack_output,
-        target_rate=rate,
-        target_duration=duration,
-        include_deep_output=include_deep_output,
-        calls=calls,
+    """run attack using vegeta, or using connection_pool or websocket_pool
+
+    offsets are send times of each call, see run_persistent_attack()
+
+    raw output is saved as a parquet file in raw_output_dir, which is needed
+    if include_deep_output includes raw
+
+    results are streamed to a temporary file while the attack runs, and are
+    reported and deep checked from that file in batches, so that memory does
+    not grow with attack length
+    """
+    import os
+    import tempfile
+
+    if (
+        include_deep_output is not None
+        and 'raw' in include_deep_output
+        and raw_output_dir is None
+    ):
+        raise Exception('raw_output_dir must be given to save raw output')
+
+    fd, output_path = tempfile.mkstemp(prefix='flood_attack_', suffix='.json')
+    try:
+        with os.fdopen(fd, 'w+b') as output:
+            if adaptive_duration is not None:
+                if offsets is not None:
+                    raise Exception(
+                        'adaptive durations not used with call offsets'
+                    )
+                (
+                    _,
+                    duration,
+                    precision,
+                    connection_counts,
+                ) = adaptive_durations.run_adaptive_vegeta_attack(
+                    url=url,
+                    rate=rate,
+                    calls=calls,
+                    max_duration=duration,
+                    adaptive_duration=adaptive_duration,
+                    vegeta_args=vegeta_args,
+                    max_connections=max_connections,
+                    max_workers=max_workers,
+                    connection_pool=connection_pool,
+                    websocket_pool=websocket_pool,
+                    output=output,
+                    verbose=verbose,
+                )
+            else:
+                connection_counts = _run_attack(
+                    url=url,
+                    rate=rate,
+                    calls=calls,
+                    duration=duration,
+                    vegeta_args=vegeta_args,
+                    max_connections=max_connections,
+                    max_workers=max_workers,
+                    connection_pool=connection_pool,
+                    websocket_pool=websocket_pool,
+                    offsets=offsets,
+                    output=output,
+                    verbose=verbose,
+                )
+                precision = None
+        report = _create_vegeta_report(
+            attack_output=output_path,
+            target_rate=rate,
+            target_duration=duration,
+            include_deep_output=include_deep_output,
+            calls=calls,
+            raw_output_dir=raw_output_dir,
+        )
+    finally:
+        os.remove(output_path)
+    report['precision'] = precision
+    batch_requests.compute_call_metrics(
+        report, batch_size=batch_requests.get_batch_size(calls)
     )
+    if connection_counts is not None:
+        report['connections_opened'] = connection_counts['opened']
+        report['connections_reused'] = connection_counts['reused']
+        report['connections_dropped'] = connection_counts['dropped']
     return report
 
 
+def _run_attack(
+    *,
+    url: str,
+    rate: int,
+    calls: typing.Sequence[typing.Any],
+    duration: float,
+    vegeta_args: str | None = None,
+    max_connections: int | None = None,
+    max_workers: int | None = None,
+    connection_pool: spec.ConnectionPool | None = None,
+    websocket_pool: spec.WebsocketPool | None = None,
+    offsets: typing.Sequence[float] | None = None,
+    output: typing.BinaryIO,
+    verbose: bool = False,
+) -> spec.ConnectionCounts | None:
+    """run attack, writing json results to output
+
+    returns connection counts if known
+    """
+    if websocket_pool is not None:
+        if vegeta_args is not None:
+            raise Exception('vegeta_args not used by websocket engine')
+        _, counts = websocket_engine.run_websocket_attack(
+            pool=websocket_pool,
+            calls=calls,
+            rate=rate,
+            duration=duration,
+            max_workers=max_workers,
+            offsets=offsets,
+            output=output,
+            verbose=verbose,
+        )
+        return counts
+    elif connection_pool is not None:
+        if vegeta_args is not None:
+            raise Exception('vegeta_args not used by persistent engine')
+        _, counts = persistent_engine.run_persistent_attack(
+            pool=connection_pool,
+            calls=calls,
+            rate=rate,
+            duration=duration,
+            max_workers=max_workers,
+            offsets=offsets,
+            output=output,
+            verbose=verbose,
+        )
+        return counts
+    else:
+        if offsets is not None:
+            raise Exception('vegeta cannot send calls at given offsets')
+        attack = _construct_vegeta_attack(
+            calls=calls,
+            url=url,
+            verbose=verbose,
+        )
+        _vegeta_attack(
+            schedule_dir=attack['schedule_dir'],
+            duration=duration,
+            rate=rate,
+            max_connections=max_connections,
+            max_workers=max_workers,
+            vegeta_args=vegeta_args,
+            output=output,
+            verbose=verbose,
+        )
+        return None
+
+
 def _construct_vegeta_attack(
     calls: typing.Sequence[typing.Any],
     url: str,
@@ -91,19 +234,71 @@ def _construct_vegeta_attack(
 def _vegeta_attack(
     schedule_dir: str,
     *,
-    duration: int | None = None,
+    duration: float | None = None,
     rate: int | None = None,
     max_connections: int | None = None,
     max_workers: int | None = None,
     n_cpus: int | None = None,
     report_path: str | None = None,
     vegeta_args: str | None = None,
+    output: typing.BinaryIO,
     verbose: bool = False,
-) -> bytes:
-    import os
+) -> None:
+    """run vegeta attack, streaming its results to output as json results
+
+    vegeta writes gob results, which are encoded as json by a second vegeta
+    process reading from a pipe, so that results are never held in memory
+    """
     import subprocess
 
-    # construct command
+    cmd = _get_vegeta_attack_command(
+        schedule_dir,
+        duration=duration,
+        rate=rate,
+        max_connections=max_connections,
+        max_workers=max_workers,
+        vegeta_args=vegeta_args,
+    )
+    if verbose:
+        print('- command:', cmd)
+
+    # run command
+    output.flush()
+    attack_process = subprocess.Popen(cmd.split(' '), stdout=subprocess.PIPE)
+    encode_process = subprocess.Popen(
+        ['vegeta', 'encode', '--to', 'json'],
+        stdin=attack_process.stdout,
+        stdout=output,
+    )
+    assert attack_process.stdout is not None
+    attack_process.stdout.close()
+    try:
+        attack_returncode = attack_process.wait()
+        encode_returncode = encode_process.wait()
+    finally:
+        for process in [attack_process, encode_process]:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+    if attack_returncode != 0:
+        raise Exception(
+            'vegeta attack failed with code ' + str(attack_returncode)
+        )
+    if encode_returncode != 0:
+        raise Exception('could not encode vegeta results')
+
+
+def _get_vegeta_attack_command(
+    schedule_dir: str,
+    *,
+    duration: float | None = None,
+    rate: int | None = None,
+    max_connections: int | None = None,
+    max_workers: int | None = None,
+    vegeta_args: str | None = None,
+) -> str:
+    import os
+
     cmd = 'vegeta attack'
     cmd += ' -targets=' + os.path.join(schedule_dir, 'vegeta_targets')
     if rate is not None:
@@ -116,30 +311,29 @@ def _vegeta_attack(
         cmd += ' -max-workers=' + str(max_workers)
     if vegeta_args is not None:
         cmd += ' ' + vegeta_args
-
-    if verbose:
-        print('- command:', cmd)
-
-    # run command
-    return subprocess.check_output(cmd.split(' '))
+    return cmd
 
 
 def _create_vegeta_report(
-    attack_output: bytes,
+    attack_output: str,
     target_rate: int,
-    target_duration: int,
+    target_duration: float,
     include_deep_output: typing.Sequence[spec.DeepOutput] | None,
     calls: typing.Sequence[typing.Any],
+    raw_output_dir: str | None = None,
 ) -> spec.LoadTestOutputDatum:
+    """create report of attack from path of file of json results
+
+    vegeta reads results from the file, and results are decoded from the
+    file in batches once, for phase latencies, raw output, and deep metrics
+    """
     import json
+    import os
     import subprocess
+    import tempfile
 
-    cmd = 'vegeta report -type json'
-    report_output = (
-        subprocess.check_output(cmd.split(' '), input=attack_output)
-        .decode()
-        .strip()
-    )
+    cmd = ['vegeta', 'report', '-type', 'json', attack_output]
+    report_output = subprocess.check_output(cmd).decode().strip()
     report: spec.RawLoadTestOutputDatum = json.loads(report_output)
 
     if 'min' in report['latencies']:
@@ -147,25 +341,55 @@ def _create_vegeta_report(
     else:
         latency_min = None
 
-    # compute deep data
-    deep_raw_output = None
-    deep_metrics = None
-    deep_rpc_error_pairs = None
+    # decode batches of results once, aggregating phase latencies if
+    # recorded by engine, and writing raw output if requested
+    dataframes = deep_utils._iter_raw_vegeta_output_dataframes(attack_output)
+    phase_aggregates: dict[str, spec.ValueAggregate | None] = {}
+    dataframes = request_phases.aggregate_phase_timings(
+        dataframes, phase_aggregates
+    )
     if include_deep_output is None:
         include_deep_output = []
+    deep_raw_output = None
     if 'raw' in include_deep_output:
-        deep_raw_output = deep_utils.encode_raw_vegeta_output(attack_output)
+        if raw_output_dir is None:
+            raise Exception('raw_output_dir must be given to save raw output')
+        os.makedirs(raw_output_dir, exist_ok=True)
+        fd, deep_raw_output = tempfile.mkstemp(
+            prefix='flood_raw_', suffix='.parquet', dir=raw_output_dir
+        )
+        os.close(fd)
+        dataframes = deep_utils._write_raw_dataframes(
+            dataframes, deep_raw_output
+        )
+
+    # compute deep data
+    deep_metrics = None
+    deep_rpc_error_pairs = None
+    deep_method_metrics = None
+    deep_failed_calls = None
+    deep_slowest_calls = None
+    deep_size_latency_samples = None
     if 'metrics' in include_deep_output:
-        if 'metrics' in include_deep_output:
-            (
-                deep_metrics,
-                deep_rpc_error_pairs,
-            ) = deep_utils.compute_deep_datum(
-                raw_output=attack_output,
-                target_rate=target_rate,
-                target_duration=target_duration,
-                calls=calls,
-            )
+        (
+            deep_metrics,
+            deep_rpc_error_pairs,
+            deep_method_metrics,
+            deep_failed_calls,
+            deep_slowest_calls,
+            deep_size_latency_samples,
+        ) = deep_utils.compute_deep_datum(
+            raw_output=dataframes,
+            target_rate=target_rate,
+            target_duration=target_duration,
+            calls=calls,
+        )
+    else:
+        for _ in dataframes:
+            pass
+    phase_latencies = request_phases.compute_aggregate_phase_latencies(
+        phase_aggregates
+    )
 
     return {
         'target_rate': target_rate,
@@ -189,8 +413,21 @@ def _create_vegeta_report(
         'last_request_timestamp': report['latest'],
         'last_response_timestamp': report['end'],
         'final_wait_time': report['wait'] / 1e9,
+        'precision': None,
+        'warmup': None,
+        'connections_opened': None,
+        'connections_reused': None,
+        'connections_dropped': None,
+        'phase_latencies': phase_latencies,
+        'batch_size': None,
+        'call_throughput': None,
+        'repeat_ratio': None,
         'deep_raw_output': deep_raw_output,
         'deep_metrics': deep_metrics,
         'deep_rpc_error_pairs': deep_rpc_error_pairs,
+        'deep_method_metrics': deep_method_metrics,
+        'deep_failed_calls': deep_failed_calls,
+        'deep_slowest_calls': deep_slowest_calls,
+        'deep_size_latency_samples': deep_size_latency_samples,
     }
 
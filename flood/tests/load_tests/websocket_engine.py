@@ -0,0 +1,703 @@
+"""engine that sends json-rpc requests over long-lived websocket connections
+
+the same engine also sends requests over unix domain sockets of nodes that
+expose an ipc endpoint, which skips the http stack entirely
+
+requests are spread round-robin over a fixed number of connections, and each
+connection multiplexes many in-flight requests, matching responses to
+requests by their json-rpc id. ids of calls are rewritten to be unique per
+pool, and are restored in the recorded responses
+
+connections stay open across every attack of a test against a node, and are
+counted as opened, reused, and dropped like the persistent engine
+
+outputs are encoded as vegeta json results so that they can be processed by
+the same reporting and deep check code as vegeta attacks
+"""
+from __future__ import annotations
+
+import typing
+
+from ... import spec
+from . import persistent_engine
+from .request_phases import latency_phases
+
+if typing.TYPE_CHECKING:
+    import asyncio
+
+
+default_websocket_connections = 1
+
+_websocket_guid = b'258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+
+def create_websocket_pool(
+    url: str,
+    *,
+    n_connections: int | None = None,
+) -> spec.WebsocketPool:
+    """create pool of websocket connections used for multiple attacks
+
+    connections are opened when first used
+    """
+    import asyncio
+    import urllib.parse
+
+    parsed = urllib.parse.urlparse(url)
+    if parsed.scheme not in ['ws', 'wss']:
+        raise Exception('websocket engine only supports ws(s) urls')
+    if parsed.hostname is None:
+        raise Exception('url has no host: ' + str(url))
+    if n_connections is None:
+        n_connections = default_websocket_connections
+    if n_connections <= 0:
+        raise Exception('number of connections must be positive')
+    if parsed.scheme == 'wss':
+        import ssl
+
+        ssl_context: ssl.SSLContext | None = ssl.create_default_context()
+        default_port = 443
+    else:
+        ssl_context = None
+        default_port = 80
+    path = parsed.path or '/'
+    if parsed.query:
+        path += '?' + parsed.query
+
+    return {
+        'url': url,
+        'transport': 'websocket',
+        'host': parsed.hostname,
+        'port': parsed.port or default_port,
+        'path': path,
+        'host_header': parsed.netloc.rsplit('@', 1)[-1],
+        'ssl': ssl_context,
+        'loop': asyncio.new_event_loop(),
+        'connections': [None] * n_connections,
+        'locks': None,
+        'next_id': 0,
+        'n_opened': 0,
+        'n_reused': 0,
+        'n_dropped': 0,
+    }
+
+
+def create_ipc_pool(
+    url: str,
+    *,
+    n_connections: int | None = None,
+) -> spec.WebsocketPool:
+    """create pool of unix socket connections used for multiple attacks
+
+    url is a socket path, optionally prefixed by ipc://
+    """
+    import asyncio
+
+    if url.startswith('ipc://'):
+        path = url[len('ipc://') :]
+    else:
+        path = url
+        url = 'ipc://' + path
+    if path == '':
+        raise Exception('ipc url has no socket path')
+    if n_connections is None:
+        n_connections = default_websocket_connections
+    if n_connections <= 0:
+        raise Exception('number of connections must be positive')
+
+    return {
+        'url': url,
+        'transport': 'ipc',
+        'host': '',
+        'port': 0,
+        'path': path,
+        'host_header': '',
+        'ssl': None,
+        'loop': asyncio.new_event_loop(),
+        'connections': [None] * n_connections,
+        'locks': None,
+        'next_id': 0,
+        'n_opened': 0,
+        'n_reused': 0,
+        'n_dropped': 0,
+    }
+
+
+def close_websocket_pool(pool: spec.WebsocketPool) -> None:
+    """close all connections of pool and its event loop"""
+
+    async def close_all() -> None:
+        for c, connection in enumerate(pool['connections']):
+            if connection is None:
+                continue
+            pool['connections'][c] = None
+            if pool['transport'] == 'websocket':
+                try:
+                    connection['writer'].write(
+                        _encode_frame(b'\x03\xe8', opcode=0x8)
+                    )
+                except Exception:
+                    pass
+            receiver = connection['receiver']
+            if receiver is not None:
+                receiver.cancel()
+                try:
+                    await receiver
+                except BaseException:
+                    pass
+
+    pool['loop'].run_until_complete(close_all())
+    pool['loop'].close()
+
+
+def run_websocket_attack(
+    *,
+    pool: spec.WebsocketPool,
+    calls: typing.Sequence[typing.Any],
+    rate: int,
+    duration: float,
+    max_workers: int | None = None,
+    offsets: typing.Sequence[float] | None = None,
+    output: typing.BinaryIO | None = None,
+    verbose: bool = False,
+) -> tuple[bytes, spec.ConnectionCounts]:
+    """attack using connections of pool, returning vegeta json results
+
+    pool can be a websocket pool or an ipc pool, offsets and output are used
+    as in run_persistent_attack()
+    """
+    import asyncio
+
+    if output is None:
+        import io
+
+        buffer = io.BytesIO()
+        _, buffer_counts = run_websocket_attack(
+            pool=pool,
+            calls=calls,
+            rate=rate,
+            duration=duration,
+            max_workers=max_workers,
+            offsets=offsets,
+            output=buffer,
+            verbose=verbose,
+        )
+        return buffer.getvalue(), buffer_counts
+
+    if len(calls) == 0:
+        raise Exception('no calls given for attack')
+    if max_workers is not None and max_workers <= 0:
+        raise Exception('max_workers must be positive')
+    if verbose:
+        print('running ' + pool['transport'] + ' attack...')
+        print('- url:', pool['url'])
+        print('- connections:', len(pool['connections']))
+
+    results = output
+
+    async def attack() -> None:
+        if pool['locks'] is None:
+            pool['locks'] = [asyncio.Lock() for _ in pool['connections']]
+        await persistent_engine._schedule_requests(
+            lambda seq: _hit(pool, seq=seq, call=calls[seq % len(calls)]),
+            n_requests=persistent_engine._get_n_requests(
+                rate, duration, offsets
+            ),
+            rate=rate,
+            max_workers=max_workers,
+            offsets=offsets,
+            output=results,
+        )
+
+    before = (pool['n_opened'], pool['n_reused'], pool['n_dropped'])
+    pool['loop'].run_until_complete(attack())
+    counts: spec.ConnectionCounts = {
+        'opened': pool['n_opened'] - before[0],
+        'reused': pool['n_reused'] - before[1],
+        'dropped': pool['n_dropped'] - before[2],
+    }
+    if verbose:
+        print('- connection counts:', counts)
+
+    return b'', counts
+
+
+def send_websocket_call(url: str, call: typing.Any) -> bytes:
+    """send single call over new websocket or ipc connection, return response
+
+    used for node metadata requests outside of attacks
+    """
+    import asyncio
+
+    if url.startswith('ipc://'):
+        pool = create_ipc_pool(url)
+    else:
+        pool = create_websocket_pool(url)
+
+    async def send() -> tuple[int, int, bytes]:
+        pool['locks'] = [asyncio.Lock() for _ in pool['connections']]
+        timings: dict[str, int] = dict.fromkeys(latency_phases, 0)
+        return await asyncio.wait_for(
+            _request(pool, seq=0, call=call, timings=timings),
+            timeout=persistent_engine.default_persistent_timeout,
+        )
+
+    try:
+        _, _, response = pool['loop'].run_until_complete(send())
+    finally:
+        close_websocket_pool(pool)
+    return response
+
+
+async def _hit(
+    pool: spec.WebsocketPool, *, seq: int, call: typing.Any
+) -> typing.Mapping[str, typing.Any]:
+    import asyncio
+    import base64
+    import time
+
+    timestamp = time.time_ns()
+    t_start = time.perf_counter_ns()
+    timings: dict[str, int] = dict.fromkeys(latency_phases, 0)
+    code = 0
+    error = ''
+    bytes_out = 0
+    bytes_in = 0
+    response_body = b''
+    try:
+        bytes_out, bytes_in, response_body = await asyncio.wait_for(
+            _request(pool, seq=seq, call=call, timings=timings),
+            timeout=persistent_engine.default_persistent_timeout,
+        )
+        code = 200
+    except asyncio.TimeoutError:
+        error = (
+            'timeout after '
+            + str(persistent_engine.default_persistent_timeout)
+            + 's'
+        )
+    except Exception as e:
+        error = str(e) or type(e).__name__
+    latency = time.perf_counter_ns() - t_start
+
+    return {
+        'attack': '',
+        'seq': seq,
+        'code': code,
+        'timestamp': persistent_engine._format_timestamp(timestamp),
+        'latency': latency,
+        'bytes_out': bytes_out,
+        'bytes_in': bytes_in,
+        'error': error,
+        'body': base64.b64encode(response_body).decode(),
+        'method': pool['transport'].upper(),
+        'url': pool['url'],
+        'headers': {},
+        'timings': timings,
+    }
+
+
+async def _request(
+    pool: spec.WebsocketPool,
+    *,
+    seq: int,
+    call: typing.Any,
+    timings: typing.MutableMapping[str, int],
+) -> tuple[int, int, bytes]:
+    """send call over a connection of pool and wait for its response
+
+    returns (bytes sent, bytes received, response with original ids)
+    """
+    import json
+    import time
+
+    index = seq % len(pool['connections'])
+    connection = await _get_connection(pool, index, timings)
+    locks = pool['locks']
+    if locks is None:
+        raise Exception('pool not initialized')
+
+    # give each call an id that is unique among in-flight requests
+    if isinstance(call, list):
+        items = call
+    else:
+        items = [call]
+    original_ids = {}
+    wire_items = []
+    for item in items:
+        wire_id = pool['next_id']
+        pool['next_id'] += 1
+        original_ids[wire_id] = item.get('id')
+        wire_items.append(dict(item, id=wire_id))
+    if isinstance(call, list):
+        message = json.dumps(wire_items).encode()
+    else:
+        message = json.dumps(wire_items[0]).encode()
+    first_id = next(iter(original_ids))
+
+    future = pool['loop'].create_future()
+    connection['pending'][first_id] = future
+    try:
+        # wait for write buffer to drain so that sends are paced by the
+        # connection, time spent waiting is counted as queueing
+        t_write = time.perf_counter_ns()
+        async with locks[index]:
+            writer = connection['writer']
+            if writer.is_closing():
+                raise ConnectionError('connection closed by server')
+            if pool['transport'] == 'ipc':
+                writer.write(message + b'\n')
+            else:
+                writer.write(_encode_frame(message, opcode=0x1))
+            await writer.drain()
+        t_sent = time.perf_counter_ns()
+        timings['queue'] += t_sent - t_write
+        response, bytes_in, t_first_byte, t_complete = await future
+    finally:
+        connection['pending'].pop(first_id, None)
+    timings['ttfb'] += t_first_byte - t_sent
+    timings['transfer'] += t_complete - t_first_byte
+
+    # restore original ids
+    if isinstance(response, list):
+        response_items = response
+    else:
+        response_items = [response]
+    for item in response_items:
+        if isinstance(item, dict) and item.get('id') in original_ids:
+            item['id'] = original_ids[item['id']]
+
+    return len(message), bytes_in, json.dumps(response).encode()
+
+
+#
+# # connections
+#
+
+
+async def _get_connection(
+    pool: spec.WebsocketPool,
+    index: int,
+    timings: typing.MutableMapping[str, int],
+) -> spec.WebsocketConnection:
+    """get open connection at index of pool, opening it if needed"""
+    import asyncio
+    import time
+
+    locks = pool['locks']
+    if locks is None:
+        raise Exception('pool not initialized')
+
+    t_start = time.perf_counter_ns()
+    async with locks[index]:
+        timings['queue'] += time.perf_counter_ns() - t_start
+        connection = pool['connections'][index]
+        if connection is not None and not connection['writer'].is_closing():
+            pool['n_reused'] += 1
+            return connection
+
+        if pool['transport'] == 'ipc':
+            t_connect = time.perf_counter_ns()
+            reader, writer = await asyncio.open_unix_connection(pool['path'])
+            timings['connect'] += time.perf_counter_ns() - t_connect
+            receive = _receive_ipc
+        else:
+            reader, writer = await persistent_engine._open_connection(
+                host=pool['host'],
+                port=pool['port'],
+                ssl_context=pool['ssl'],
+                timings=timings,
+            )
+            try:
+                t_handshake = time.perf_counter_ns()
+                await _handshake(pool, reader, writer)
+                timings['connect'] += time.perf_counter_ns() - t_handshake
+            except BaseException:
+                writer.close()
+                raise
+            receive = _receive
+        new_connection: spec.WebsocketConnection = {
+            'reader': reader,
+            'writer': writer,
+            'pending': {},
+            'receiver': None,
+            'notify': None,
+        }
+        new_connection['receiver'] = asyncio.create_task(
+            receive(pool, index, new_connection)
+        )
+        pool['connections'][index] = new_connection
+        pool['n_opened'] += 1
+        return new_connection
+
+
+async def _handshake(
+    pool: spec.WebsocketPool,
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+) -> None:
+    """upgrade http connection to websocket connection"""
+    import base64
+    import hashlib
+    import os
+
+    key = base64.b64encode(os.urandom(16))
+    request = (
+        b'GET '
+        + pool['path'].encode()
+        + b' HTTP/1.1\r\nHost: '
+        + pool['host_header'].encode()
+        + b'\r\nUpgrade: websocket\r\nConnection: Upgrade'
+        + b'\r\nSec-WebSocket-Key: '
+        + key
+        + b'\r\nSec-WebSocket-Version: 13\r\n\r\n'
+    )
+    writer.write(request)
+    await writer.drain()
+
+    status_line = await reader.readline()
+    if len(status_line) == 0:
+        raise ConnectionError('connection closed by server')
+    status = status_line.decode('latin-1').split(' ', 1)[-1].strip()
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    if not status.startswith('101'):
+        raise Exception('websocket handshake failed: ' + status)
+    accept = base64.b64encode(hashlib.sha1(key + _websocket_guid).digest())
+    if headers.get('sec-websocket-accept') != accept.decode():
+        raise Exception('websocket handshake failed: invalid accept key')
+
+
+async def _receive(
+    pool: spec.WebsocketPool,
+    index: int,
+    connection: spec.WebsocketConnection,
+) -> None:
+    """read messages of connection and resolve their pending requests"""
+    import asyncio
+    import time
+
+    reader = connection['reader']
+    writer = connection['writer']
+    fragments: list[bytes] = []
+    t_message = 0
+    try:
+        while True:
+            header = await reader.readexactly(2)
+            t_first_byte = time.perf_counter_ns()
+            fin = header[0] & 0x80
+            opcode = header[0] & 0x0F
+            length = header[1] & 0x7F
+            if length == 126:
+                length = int.from_bytes(await reader.readexactly(2), 'big')
+            elif length == 127:
+                length = int.from_bytes(await reader.readexactly(8), 'big')
+            if header[1] & 0x80:
+                mask = await reader.readexactly(4)
+                payload = _mask(await reader.readexactly(length), mask)
+            else:
+                payload = await reader.readexactly(length)
+
+            if opcode == 0x8:
+                break
+            elif opcode == 0x9:
+                writer.write(_encode_frame(payload, opcode=0xA))
+            elif opcode == 0xA:
+                continue
+            else:
+                if opcode != 0x0:
+                    fragments = []
+                    t_message = t_first_byte
+                fragments.append(payload)
+                if fin:
+                    _resolve(
+                        connection,
+                        b''.join(fragments),
+                        t_message,
+                        time.perf_counter_ns(),
+                    )
+                    fragments = []
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        _drop_connection(pool, index, connection)
+
+
+async def _receive_ipc(
+    pool: spec.WebsocketPool,
+    index: int,
+    connection: spec.WebsocketConnection,
+) -> None:
+    """read stream of json values of ipc connection and resolve requests
+
+    values are delimited by tracking bracket depth outside of strings, and
+    each byte is scanned once, so that large responses arriving in many
+    chunks are not decoded repeatedly
+    """
+    import json
+    import re
+    import time
+
+    tokens = re.compile(rb'["\\{}\[\]]')
+    buffer = bytearray()
+    position = 0
+    start = 0
+    depth = 0
+    in_string = False
+    t_message = 0
+    try:
+        while True:
+            chunk = await connection['reader'].read(2**16)
+            t_chunk = time.perf_counter_ns()
+            if len(chunk) == 0:
+                break
+            buffer += chunk
+
+            while True:
+                match = tokens.search(buffer, position)
+                if match is None:
+                    # an escape at the end of a chunk skips past the buffer
+                    position = max(position, len(buffer))
+                    break
+                token = buffer[match.start()]
+                position = match.end()
+                if in_string:
+                    if token == ord('\\'):
+                        position += 1
+                    elif token == ord('"'):
+                        in_string = False
+                elif token == ord('"'):
+                    in_string = True
+                elif token in (ord('{'), ord('[')):
+                    if depth == 0:
+                        start = match.start()
+                        t_message = t_chunk
+                    depth += 1
+                elif depth > 0:
+                    depth -= 1
+                    if depth == 0:
+                        message = bytes(buffer[start:position])
+                        del buffer[:position]
+                        position = 0
+                        try:
+                            response = json.loads(message)
+                        except ValueError:
+                            continue
+                        _resolve_response(
+                            connection,
+                            response,
+                            len(message),
+                            t_message,
+                            time.perf_counter_ns(),
+                        )
+    except ConnectionError:
+        pass
+    finally:
+        _drop_connection(pool, index, connection)
+
+
+def _drop_connection(
+    pool: spec.WebsocketPool,
+    index: int,
+    connection: spec.WebsocketConnection,
+) -> None:
+    """close connection and fail its pending requests"""
+    connection['writer'].close()
+    if pool['connections'][index] is connection:
+        pool['connections'][index] = None
+        pool['n_dropped'] += 1
+    for future in connection['pending'].values():
+        if not future.done():
+            future.set_exception(ConnectionError('connection closed by server'))
+
+
+def _resolve(
+    connection: spec.WebsocketConnection,
+    message: bytes,
+    t_first_byte: int,
+    t_complete: int,
+) -> None:
+    """match message to pending request using json-rpc ids"""
+    import json
+
+    try:
+        response = json.loads(message)
+    except ValueError:
+        return
+    _resolve_response(
+        connection, response, len(message), t_first_byte, t_complete
+    )
+
+
+def _resolve_response(
+    connection: spec.WebsocketConnection,
+    response: typing.Any,
+    n_bytes: int,
+    t_first_byte: int,
+    t_complete: int,
+) -> None:
+    # subscription notifications are not responses to a pending request
+    if (
+        isinstance(response, dict)
+        and response.get('method') == 'eth_subscription'
+    ):
+        if connection['notify'] is not None:
+            connection['notify'](response.get('params'), t_complete)
+        return
+
+    if isinstance(response, list):
+        items = response
+    else:
+        items = [response]
+    result = (response, n_bytes, t_first_byte, t_complete)
+    for item in items:
+        if not isinstance(item, dict) or not isinstance(item.get('id'), int):
+            continue
+        future = connection['pending'].pop(item['id'], None)
+        if future is not None and not future.done():
+            future.set_result(result)
+            return
+
+    # errors of requests that could not be parsed have a null id, and are
+    # assigned to the oldest pending request so that it fails as an rpc error
+    if any(
+        isinstance(item, dict) and item.get('id') is None and 'error' in item
+        for item in items
+    ):
+        for wire_id, future in list(connection['pending'].items()):
+            del connection['pending'][wire_id]
+            if not future.done():
+                future.set_result(result)
+                return
+
+
+#
+# # frames
+#
+
+
+def _encode_frame(payload: bytes, *, opcode: int) -> bytes:
+    """encode single masked frame, as required of client frames"""
+    import os
+
+    length = len(payload)
+    if length < 126:
+        header = bytes([0x80 | opcode, 0x80 | length])
+    elif length < 2**16:
+        header = bytes([0x80 | opcode, 0x80 | 126]) + length.to_bytes(2, 'big')
+    else:
+        header = bytes([0x80 | opcode, 0x80 | 127]) + length.to_bytes(8, 'big')
+    mask = os.urandom(4)
+    return header + mask + _mask(payload, mask)
+
+
+def _mask(payload: bytes, mask: bytes) -> bytes:
+    length = len(payload)
+    repeated = (mask * (length // 4 + 1))[:length]
+    masked = int.from_bytes(payload, 'big') ^ int.from_bytes(repeated, 'big')
+    return masked.to_bytes(length, 'big')
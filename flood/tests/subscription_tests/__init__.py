@@ -0,0 +1 @@
+from .subscription_test_runs import *
@@ -0,0 +1,447 @@
+"""measure delivery of subscription notifications to many subscribers
+
+each stage of a test opens a number of subscribers, each on its own websocket
+or ipc connection, and listens for notifications. the delay of each delivery
+is measured relative to the earliest subscriber that received the same
+notification. deliveries more than late_threshold after the earliest are
+counted as late, and notifications that some subscriber never received are
+counted as dropped
+"""
+from __future__ import annotations
+
+import typing
+
+import flood
+from flood import spec
+from flood.tests.load_tests import persistent_engine
+from flood.tests.load_tests import websocket_engine
+
+
+subscription_types = ['newHeads', 'logs', 'newPendingTransactions']
+default_subscriber_counts = [1, 10, 100, 1000]
+default_subscription_duration = 30
+default_late_threshold = 1.0
+
+
+def run_subscription_test(
+    subscription: spec.SubscriptionType,
+    nodes: spec.NodesShorthand,
+    *,
+    subscriber_counts: typing.Sequence[int] | None = None,
+    duration: float | None = None,
+    late_threshold: float | None = None,
+    node_pid: int | None = None,
+    verbose: bool | int = True,
+    output_dir: str | None = None,
+) -> spec.SubscriptionTestOutput:
+    """run subscription test against each node, ramping subscriber counts
+
+    node_pid is the process id of a node on this machine, used to sample
+    the memory used by the node as subscribers are added
+    """
+    import json
+    import os
+    import toolstr
+
+    if subscription not in subscription_types:
+        raise Exception('invalid subscription type: ' + str(subscription))
+    if subscriber_counts is None:
+        subscriber_counts = default_subscriber_counts
+    if duration is None:
+        duration = default_subscription_duration
+    if late_threshold is None:
+        late_threshold = default_late_threshold
+    parsed_nodes = flood.user_io.parse_nodes(nodes, request_metadata=False)
+    for node in parsed_nodes.values():
+        if node['remote'] is not None:
+            raise Exception('remote not supported for subscription test')
+        if not node['url'].startswith(('ws://', 'wss://', 'ipc://')):
+            raise Exception('subscription test requires ws or ipc node url')
+    if output_dir is None:
+        import tempfile
+
+        output_dir = tempfile.mkdtemp()
+
+    # print preamble
+    styles = flood.user_io.styles
+    if verbose:
+        flood.user_io.print_text_box('Subscription test: ' + subscription)
+        flood.user_io.print_bullet(
+            key='subscribers',
+            value=', '.join(str(count) for count in subscriber_counts),
+        )
+        flood.user_io.print_bullet(
+            key='duration', value=str(duration) + 's per stage'
+        )
+        flood.user_io.print_bullet(
+            key='late threshold', value=str(late_threshold) + 's'
+        )
+        flood.user_io.print_bullet(key='output_dir', value=output_dir)
+        flood.user_io.print_bullet(key='nodes', value='')
+        for n, node in enumerate(parsed_nodes.values()):
+            toolstr.print(
+                toolstr.add_style(str(n + 1), styles['metavar'])
+                + '. '
+                + node['name']
+                + ', url='
+                + node['url'],
+                indent=4,
+                style=styles['description'],
+            )
+        print()
+
+    # run stages
+    results: dict[str, list[spec.SubscriptionTestDatum]] = {}
+    for node in parsed_nodes.values():
+        results[node['name']] = []
+        for n_subscribers in subscriber_counts:
+            if verbose:
+                flood.user_io.print_timestamped(
+                    'Running '
+                    + str(n_subscribers)
+                    + ' subscribers on '
+                    + node['name']
+                )
+            datum = run_subscription_stage(
+                url=node['url'],
+                subscription=subscription,
+                n_subscribers=n_subscribers,
+                duration=duration,
+                late_threshold=late_threshold,
+                node_pid=node_pid,
+            )
+            results[node['name']].append(datum)
+
+    # save output file
+    file_path = os.path.join(output_dir, 'subscription_results.json')
+    with open(file_path, 'w') as f:
+        json.dump(results, f)
+
+    if verbose:
+        print()
+        print_subscription_test_results(results)
+        print()
+        toolstr.print('results saved to: ' + file_path, style=styles['comment'])
+
+    return results
+
+
+def run_subscription_stage(
+    *,
+    url: str,
+    subscription: spec.SubscriptionType,
+    n_subscribers: int,
+    duration: float,
+    late_threshold: float = default_late_threshold,
+    params: typing.Any = None,
+    node_pid: int | None = None,
+) -> spec.SubscriptionTestDatum:
+    """open n_subscribers subscriptions and listen for duration seconds"""
+    if url.startswith('ipc://'):
+        pool = websocket_engine.create_ipc_pool(
+            url, n_connections=n_subscribers
+        )
+    else:
+        pool = websocket_engine.create_websocket_pool(
+            url, n_connections=n_subscribers
+        )
+    if params is None and subscription == 'logs':
+        params = {}
+    call: typing.Mapping[str, typing.Any] = {
+        'jsonrpc': '2.0',
+        'id': 1,
+        'method': 'eth_subscribe',
+        'params': [subscription] if params is None else [subscription, params],
+    }
+    try:
+        return pool['loop'].run_until_complete(
+            _async_stage(
+                pool=pool,
+                call=call,
+                n_subscribers=n_subscribers,
+                duration=duration,
+                late_threshold=late_threshold,
+                node_pid=node_pid,
+            )
+        )
+    finally:
+        websocket_engine.close_websocket_pool(pool)
+
+
+async def _async_stage(
+    *,
+    pool: spec.WebsocketPool,
+    call: typing.Mapping[str, typing.Any],
+    n_subscribers: int,
+    duration: float,
+    late_threshold: float,
+    node_pid: int | None,
+) -> spec.SubscriptionTestDatum:
+    import asyncio
+    import time
+
+    pool['locks'] = [asyncio.Lock() for _ in pool['connections']]
+
+    # only notifications first seen while every subscriber is listening count
+    arrivals: dict[str, dict[int, int]] = {}
+    excluded: set[str] = set()
+    window: dict[str, int | None] = {'start': None, 'end': None}
+
+    def create_handler(
+        subscriber: int,
+    ) -> typing.Callable[[typing.Any, int], None]:
+        def handle(params: typing.Any, t_received: int) -> None:
+            if not isinstance(params, dict):
+                return
+            key = _get_notification_key(params.get('result'))
+            if key in excluded:
+                return
+            if key not in arrivals:
+                start = window['start']
+                end = window['end']
+                if start is None or (end is not None and t_received > end):
+                    excluded.add(key)
+                    return
+                arrivals[key] = {}
+            arrivals[key].setdefault(subscriber, t_received)
+
+        return handle
+
+    # subscribe
+    outcomes = await asyncio.gather(
+        *[
+            _subscribe(pool, subscriber, call, create_handler(subscriber))
+            for subscriber in range(n_subscribers)
+        ],
+        return_exceptions=True,
+    )
+    subscribed = []
+    subscribe_times = []
+    errors = set()
+    for subscriber, outcome in enumerate(outcomes):
+        if isinstance(outcome, BaseException):
+            errors.add(str(outcome) or type(outcome).__name__)
+        else:
+            subscribed.append(subscriber)
+            subscribe_times.append(outcome)
+
+    # listen, sampling node memory
+    node_memory = None
+    window['start'] = time.perf_counter_ns()
+    for stop in ['end', 'grace']:
+        if stop == 'end':
+            wait = duration
+        else:
+            window['end'] = time.perf_counter_ns()
+            wait = late_threshold
+        t_stop = time.perf_counter() + wait
+        while True:
+            memory = _get_process_memory(node_pid)
+            if memory is not None:
+                node_memory = max(memory, node_memory or 0)
+            remaining = t_stop - time.perf_counter()
+            if remaining <= 0:
+                break
+            await asyncio.sleep(min(remaining, 0.5))
+
+    return _compute_stage_metrics(
+        n_subscribers=n_subscribers,
+        subscribed=subscribed,
+        subscribe_times=subscribe_times,
+        arrivals=arrivals,
+        late_threshold=late_threshold,
+        node_memory=node_memory,
+        errors=sorted(errors),
+    )
+
+
+async def _subscribe(
+    pool: spec.WebsocketPool,
+    subscriber: int,
+    call: typing.Mapping[str, typing.Any],
+    handle: typing.Callable[[typing.Any, int], None],
+) -> float:
+    """subscribe on connection of subscriber, return seconds taken"""
+    import asyncio
+    import json
+    import time
+
+    from flood.tests.load_tests.request_phases import latency_phases
+
+    t_start = time.perf_counter()
+    timings: dict[str, int] = dict.fromkeys(latency_phases, 0)
+    connection = await websocket_engine._get_connection(
+        pool, subscriber, timings
+    )
+    connection['notify'] = handle
+    _, _, raw_response = await asyncio.wait_for(
+        websocket_engine._request(
+            pool, seq=subscriber, call=call, timings=timings
+        ),
+        timeout=persistent_engine.default_persistent_timeout,
+    )
+    response = json.loads(raw_response)
+    if response.get('result') is None:
+        raise Exception('subscribe failed: ' + str(response.get('error')))
+    return time.perf_counter() - t_start
+
+
+def _get_notification_key(result: typing.Any) -> str:
+    """identify notification so deliveries to subscribers can be matched"""
+    import json
+
+    if isinstance(result, str):
+        return result
+    elif isinstance(result, dict):
+        if 'blockHash' in result and 'logIndex' in result:
+            return (
+                str(result['blockHash'])
+                + ':'
+                + str(result['logIndex'])
+                + ':'
+                + str(result.get('removed'))
+            )
+        elif 'hash' in result:
+            return str(result['hash'])
+    return json.dumps(result, sort_keys=True)
+
+
+def _get_process_memory(pid: int | None) -> int | None:
+    """get resident memory of process in bytes, if visible from /proc"""
+    if pid is None:
+        return None
+    try:
+        with open('/proc/' + str(pid) + '/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        return None
+    return None
+
+
+def _compute_stage_metrics(
+    *,
+    n_subscribers: int,
+    subscribed: typing.Sequence[int],
+    subscribe_times: typing.Sequence[float],
+    arrivals: typing.Mapping[str, typing.Mapping[int, int]],
+    late_threshold: float,
+    node_memory: int | None,
+    errors: typing.Sequence[str],
+) -> spec.SubscriptionTestDatum:
+    import numpy as np
+
+    delays = []
+    n_dropped = 0
+    for receivers in arrivals.values():
+        earliest = min(receivers.values())
+        for subscriber in subscribed:
+            t_received = receivers.get(subscriber)
+            if t_received is None:
+                n_dropped += 1
+            else:
+                delays.append((t_received - earliest) / 1e9)
+    n_late = sum(delay > late_threshold for delay in delays)
+
+    n_expected = len(arrivals) * len(subscribed)
+    delay_array = np.array(delays)
+    has_delays = len(delays) > 0
+    has_subscribes = len(subscribe_times) > 0
+    return {
+        'n_subscribers': n_subscribers,
+        'n_subscribed': len(subscribed),
+        'subscribe_p50': (
+            float(np.median(subscribe_times)) if has_subscribes else None
+        ),
+        'subscribe_max': (
+            float(np.max(subscribe_times)) if has_subscribes else None
+        ),
+        'n_notifications': len(arrivals),
+        'n_deliveries': len(delays),
+        'n_dropped': n_dropped,
+        'n_late': int(n_late),
+        'delivery_rate': len(delays) / n_expected if n_expected > 0 else None,
+        'delay_mean': float(np.mean(delay_array)) if has_delays else None,
+        'delay_p50': (
+            float(np.quantile(delay_array, 0.5)) if has_delays else None
+        ),
+        'delay_p90': (
+            float(np.quantile(delay_array, 0.9)) if has_delays else None
+        ),
+        'delay_p99': (
+            float(np.quantile(delay_array, 0.99)) if has_delays else None
+        ),
+        'delay_max': float(np.max(delay_array)) if has_delays else None,
+        'node_memory': node_memory,
+        'errors': errors,
+    }
+
+
+def print_subscription_test_results(
+    results: spec.SubscriptionTestOutput,
+) -> None:
+    """print table of delivery metrics vs subscriber count for each node"""
+    import toolstr
+
+    styles = flood.user_io.styles
+    labels = [
+        'subscribers',
+        'subscribed',
+        'notifications',
+        'delivered',
+        'dropped',
+        'late',
+        'delay p50 (s)',
+        'delay p99 (s)',
+        'delay max (s)',
+        'node memory',
+    ]
+    for name, data in results.items():
+        rows = []
+        for datum in data:
+            if datum['node_memory'] is None:
+                memory = None
+            else:
+                memory = toolstr.format_nbytes(datum['node_memory'])
+            rows.append(
+                [
+                    datum['n_subscribers'],
+                    datum['n_subscribed'],
+                    datum['n_notifications'],
+                    datum['delivery_rate'],
+                    datum['n_dropped'],
+                    datum['n_late'],
+                    datum['delay_p50'],
+                    datum['delay_p99'],
+                    datum['delay_max'],
+                    memory,
+                ]
+            )
+        toolstr.print_text_box(
+            toolstr.add_style(
+                'notification delivery of ' + name, styles.get('metavar')
+            ),
+            style=styles.get('content'),
+        )
+        flood.user_io.print_table(
+            rows,
+            labels=labels,
+            column_formats={
+                'delivered': {'percentage': True, 'decimals': 1},
+                'delay p50 (s)': {'decimals': 6},
+                'delay p99 (s)': {'decimals': 6},
+                'delay max (s)': {'decimals': 6},
+            },
+        )
+        for datum in data:
+            for error in datum['errors']:
+                toolstr.print(
+                    '- '
+                    + str(datum['n_subscribers'])
+                    + ' subscribers: '
+                    + error,
+                    style=styles['comment'],
+                )
+        if name != list(results.keys())[-1]:
+            print()
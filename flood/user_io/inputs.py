@@ -86,7 +86,7 @@ def parse_node(
     node: str | spec.Node, request_metadata: bool = True
 ) -> spec.Node:
     """parse node according to input specification"""
-    prefixes = ['http', 'https', 'ws', 'wss']
+    prefixes = ['http', 'https', 'ws', 'wss', 'ipc']
 
     if isinstance(node, dict):
         return node
@@ -120,18 +120,26 @@ def parse_node(
             remote = None
 
         # add missing prefix
-        if not any(url.startswith(prefix) for prefix in prefixes):
-            # check if is ip
-            pieces = url.split(':')[0].split('.')
-            is_ip = len(pieces) == 4 and all(
-                piece.isdecimal() for piece in pieces
-            )
-
-            # add prefix
-            if url.startswith('localhost') or is_ip:
-                url = 'http://' + url
+        if not any(url.startswith(prefix + '://') for prefix in prefixes):
+            if url.startswith(('/', '.', '~')) or url.endswith('.ipc'):
+                # unix socket paths use ipc
+                if remote is None:
+                    import os
+
+                    url = os.path.abspath(os.path.expanduser(url))
+                url = 'ipc://' + url
             else:
-                url = 'https://' + url
+                # check if is ip
+                pieces = url.split(':')[0].split('.')
+                is_ip = len(pieces) == 4 and all(
+                    piece.isdecimal() for piece in pieces
+                )
+
+                # add prefix
+                if url.startswith('localhost') or is_ip:
+                    url = 'http://' + url
+                else:
+                    url = 'https://' + url
 
         if request_metadata:
             # get client version
@@ -183,6 +191,132 @@ def get_node_client_version(url: str, remote: str | None = None) -> str | None:
         return None
 
 
+def get_node_block_number(url: str, remote: str | None = None) -> int:
+    """get latest block number of node"""
+    result = _request_node(url=url, remote=remote, method='eth_blockNumber')
+    return int(result, 16)
+
+
+# number of recent blocks whose state each node retains, None if archive
+_node_state_retention: typing.MutableMapping[
+    tuple[str, str | None], int | None
+] = {}
+
+
+def get_node_block_bounds(
+    url: str,
+    remote: str | None = None,
+    *,
+    use_cache: bool = True,
+) -> tuple[int, int]:
+    """get earliest block with available state and latest block of node
+
+    the earliest block is found by binary search over eth_getBalance calls,
+    then cached as a number of retained blocks, so that later calls only
+    request the latest block and pruned windows keep following the head
+    """
+    latest_block = get_node_block_number(url=url, remote=remote)
+    key = (url, remote)
+    if use_cache and key in _node_state_retention:
+        retention = _node_state_retention[key]
+    else:
+        earliest_block = _find_earliest_state_block(
+            url=url, remote=remote, latest_block=latest_block
+        )
+        if earliest_block == 0:
+            retention = None
+        else:
+            retention = latest_block - earliest_block
+        _node_state_retention[key] = retention
+    if retention is None:
+        return (0, latest_block)
+    else:
+        return (max(0, latest_block - retention), latest_block)
+
+
+def _find_earliest_state_block(
+    url: str, remote: str | None, latest_block: int
+) -> int:
+    # genesis state can outlive pruning, so probing starts at block 1
+    if not _node_has_state(url=url, remote=remote, block_number=latest_block):
+        raise Exception('node has no state at its latest block')
+    if latest_block == 0 or _node_has_state(
+        url=url, remote=remote, block_number=1
+    ):
+        return 0
+    lower = 1
+    upper = latest_block
+    while upper - lower > 1:
+        middle = (lower + upper) // 2
+        if _node_has_state(url=url, remote=remote, block_number=middle):
+            upper = middle
+        else:
+            lower = middle
+    return upper
+
+
+def _node_has_state(url: str, remote: str | None, block_number: int) -> bool:
+    try:
+        _request_node(
+            url=url,
+            remote=remote,
+            method='eth_getBalance',
+            params=['0x' + '0' * 40, hex(block_number)],
+        )
+        return True
+    except Exception:
+        return False
+
+
+def _request_node(
+    url: str,
+    remote: str | None,
+    method: str,
+    params: typing.Sequence[typing.Any] = (),
+) -> typing.Any:
+    import json
+
+    request = {
+        'jsonrpc': '2.0',
+        'id': 1,
+        'method': method,
+        'params': list(params),
+    }
+    output: str | bytes
+    if url.startswith(('ws://', 'wss://', 'ipc://')):
+        if remote is not None:
+            raise Exception(
+                'node requests over websocket or ipc are not supported for'
+                ' remote nodes, use an http url: ' + url
+            )
+        import flood.tests.load_tests
+
+        output = flood.tests.load_tests.send_websocket_call(url, request)
+    elif remote is None:
+        import ctc.rpc
+
+        output = ctc.rpc.sync_send(
+            request, context={'provider': url}, raw_output=True
+        )
+    else:
+        import shlex
+        import subprocess
+
+        cmd = [
+            """ssh""",
+            remote,
+            """curl -X POST -H 'Content-Type: application/json' -d """
+            + shlex.quote(json.dumps(request))
+            + ' '
+            + url,
+        ]
+        output = subprocess.check_output(cmd, stderr=subprocess.DEVNULL)
+    response = json.loads(output)
+    if 'error' in response:
+        raise Exception('rpc error: ' + str(response['error']))
+    return response['result']
+
+
 def parse_test_data(test: spec.LoadTest) -> spec.LoadTestColumnWise:
     rates = []
     durations = []
@@ -129,10 +129,27 @@ def print_metric_tables(
     rates = results[names[0]]['target_rate']
     for metric in metrics:
         # create labels
-        if metric in ['success', 'n_invalid_json_errors', 'n_rpc_errors']:
+        if metric in [
+            'success',
+            'repeat_ratio',
+        ]:
             metric_suffix = ''
+        elif metric.startswith('n_'):
+            metric_suffix = ''
+        elif metric.startswith('precision_'):
+            metric_suffix = ''
+        elif metric.startswith('connections_'):
+            metric_suffix = ''
+        elif metric.startswith('response_size_'):
+            metric_suffix = ' (bytes)'
+        elif metric == 'bytes_throughput':
+            metric_suffix = ' (bytes/s)'
+        elif metric == 'size_latency_slope':
+            metric_suffix = ' (s/MB)'
         elif metric == 'throughput':
             metric_suffix = ' (rps)'
+        elif metric == 'call_throughput':
+            metric_suffix = ' (calls/s)'
         else:
             metric_suffix = ' (s)'
         unitted_names = [name + metric_suffix for name in names]
@@ -157,7 +174,9 @@ def print_metric_tables(
                 row.append(row[-2] / row[-1])
 
         # compute column formats
-        if all(value > 1 for value in values if value is not None):
+        if metric.startswith('connections_'):
+            use_decimals = 0
+        elif all(value > 1 for value in values if value is not None):
             use_decimals = 1
         else:
             if decimals is None:
@@ -182,7 +201,9 @@ def print_metric_tables(
             indent=indent,
         )
 
-        if metric == 'success':
+        if metric in ['success', 'repeat_ratio'] or metric.startswith(
+            'precision_'
+        ):
             for label in labels[1:]:
                 column_formats.setdefault(label, {})
                 column_formats[label]['percentage'] = True
@@ -44,3 +44,219 @@ def skip_if_env_nodes_unset():
         if os.getenv(var) is None:
             pytest.skip(reason=var + ' env var not set')
 
+
+@pytest.fixture
+def local_rpc_server():
+    """local stand-in for an http rpc node, returns url"""
+    import http.server
+    import json
+    import threading
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            length = int(self.headers['Content-Length'])
+            request = json.loads(self.rfile.read(length))
+            if isinstance(request, list):
+                response = [self.respond(item) for item in request]
+            else:
+                response = self.respond(request)
+            body = json.dumps(response).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            if self.path == '/close':
+                self.send_header('Connection', 'close')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def respond(self, request):
+            return {
+                'jsonrpc': '2.0',
+                'id': request.get('id'),
+                'result': request.get('params'),
+            }
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield 'http://127.0.0.1:' + str(server.server_address[1])
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def local_ws_rpc_server():
+    """local stand-in for a websocket rpc node, returns url
+
+    each message is answered concurrently, so responses can arrive out of
+    order, and method test_sleep delays its response by params[0] seconds
+
+    method test_invalid is answered with an error that has a null id
+
+    eth_subscribe subscriptions receive a synthetic head every 50ms
+    """
+    import asyncio
+    import base64
+    import hashlib
+    import itertools
+    import json
+    import threading
+
+    guid = b'258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+    def encode_frame(payload, opcode=0x1):
+        length = len(payload)
+        if length < 126:
+            header = bytes([0x80 | opcode, length])
+        elif length < 2**16:
+            header = bytes([0x80 | opcode, 126]) + length.to_bytes(2, 'big')
+        else:
+            header = bytes([0x80 | opcode, 127]) + length.to_bytes(8, 'big')
+        return header + payload
+
+    subscriptions = {}
+    subscription_ids = itertools.count(1)
+
+    def respond_to_call(call, writer):
+        if call['method'] == 'test_invalid':
+            error = {'code': -32600, 'message': 'invalid request'}
+            return {'jsonrpc': '2.0', 'id': None, 'error': error}
+        elif call['method'] == 'eth_subscribe':
+            result = hex(next(subscription_ids))
+            subscriptions[result] = writer
+        else:
+            result = call['params']
+        return {'jsonrpc': '2.0', 'id': call['id'], 'result': result}
+
+    async def emit_heads():
+        number = 0
+        while True:
+            await asyncio.sleep(0.05)
+            number += 1
+            head = {'number': hex(number), 'hash': '0x' + '%064x' % number}
+            for subscription_id, writer in list(subscriptions.items()):
+                if writer.is_closing():
+                    del subscriptions[subscription_id]
+                    continue
+                notification = {
+                    'jsonrpc': '2.0',
+                    'method': 'eth_subscription',
+                    'params': {'subscription': subscription_id, 'result': head},
+                }
+                writer.write(encode_frame(json.dumps(notification).encode()))
+
+    async def respond(writer, message):
+        request = json.loads(message)
+        calls = request if isinstance(request, list) else [request]
+        for call in calls:
+            if call['method'] == 'test_sleep':
+                await asyncio.sleep(call['params'][0])
+        if isinstance(request, list):
+            response = [respond_to_call(call, writer) for call in request]
+        else:
+            response = respond_to_call(request, writer)
+        writer.write(encode_frame(json.dumps(response).encode()))
+
+    async def handle(reader, writer):
+        key = None
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b''):
+                break
+            name, _, value = line.decode().partition(':')
+            if name.strip().lower() == 'sec-websocket-key':
+                key = value.strip().encode()
+        accept = base64.b64encode(hashlib.sha1(key + guid).digest())
+        writer.write(
+            b'HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\n'
+            + b'Connection: Upgrade\r\nSec-WebSocket-Accept: '
+            + accept
+            + b'\r\n\r\n'
+        )
+        tasks = set()
+        try:
+            while True:
+                header = await reader.readexactly(2)
+                opcode = header[0] & 0x0F
+                length = header[1] & 0x7F
+                if length == 126:
+                    length = int.from_bytes(await reader.readexactly(2), 'big')
+                elif length == 127:
+                    length = int.from_bytes(await reader.readexactly(8), 'big')
+                mask = await reader.readexactly(4)
+                masked = await reader.readexactly(length)
+                payload = bytes(
+                    byte ^ mask[i % 4] for i, byte in enumerate(masked)
+                )
+                if opcode == 0x8:
+                    break
+                elif opcode == 0x1:
+                    task = asyncio.create_task(respond(writer, payload))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+        except asyncio.IncompleteReadError:
+            pass
+        writer.close()
+
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(
+        asyncio.start_server(handle, '127.0.0.1', 0)
+    )
+    port = server.sockets[0].getsockname()[1]
+    emitter = loop.create_task(emit_heads())
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield 'ws://127.0.0.1:' + str(port)
+    loop.call_soon_threadsafe(server.close)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    emitter.cancel()
+    loop.run_until_complete(asyncio.gather(emitter, return_exceptions=True))
+
+
+@pytest.fixture
+def local_ipc_rpc_server(tmp_path):
+    """local stand-in for an ipc rpc node, returns socket path
+
+    responses are written as newline-delimited json, like geth
+    """
+    import asyncio
+    import json
+    import threading
+
+    async def handle(reader, writer):
+        while True:
+            line = await reader.readline()
+            if line == b'':
+                break
+            request = json.loads(line)
+            calls = request if isinstance(request, list) else [request]
+            responses = [
+                {'jsonrpc': '2.0', 'id': call['id'], 'result': call['params']}
+                for call in calls
+            ]
+            if isinstance(request, list):
+                response = responses
+            else:
+                response = responses[0]
+            writer.write(json.dumps(response).encode() + b'\n')
+        writer.close()
+
+    path = str(tmp_path / 'node.ipc')
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(
+        asyncio.start_unix_server(handle, path, limit=2**24)
+    )
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield path
+    loop.call_soon_threadsafe(server.close)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
@@ -0,0 +1,99 @@
+import collections
+import shutil
+
+import numpy as np
+import pytest
+
+import flood
+
+
+requires_vegeta = pytest.mark.skipif(
+    shutil.which('vegeta') is None, reason='vegeta not found'
+)
+
+
+def _sample_ranks(text, n=100_000, population_size=10_000):
+    return flood.generators.sample_ranks(
+        n,
+        population_size,
+        distribution=flood.generators.parse_distribution(text),
+        rng=flood.generators.get_rng(random_seed=0),
+    )
+
+
+def test_sample_ranks():
+    for text in ['uniform', 'zipf:0.8', 'zipf', 'hot_set', 'recent:50']:
+        ranks = _sample_ranks(text)
+        assert ranks.min() >= 0 and ranks.max() < 10_000
+
+    zipf = np.bincount(_sample_ranks('zipf:1.2'), minlength=10_000)
+    assert zipf[0] > zipf[1] > zipf[10] > zipf[1000]
+
+    hot_set = _sample_ranks('hot_set:0.01:0.9')
+    assert (hot_set < 100).mean() == pytest.approx(0.9, abs=0.01)
+
+    recent = _sample_ranks('recent:50')
+    assert recent.mean() == pytest.approx(50, rel=0.05)
+
+
+def test_parse_distribution():
+    distribution = flood.generators.parse_distribution('hot_set:0.05')
+    assert distribution['hot_fraction'] == 0.05
+    assert distribution['hot_probability'] == 0.9
+    formatted = flood.generators.format_distribution(distribution)
+    assert formatted == 'hot_set:0.05:0.9'
+    assert flood.generators.parse_distribution(formatted) == distribution
+    for text in ['pareto', 'zipf:0', 'zipf:1:2', 'hot_set:2', 'recent:x']:
+        with pytest.raises(Exception):
+            flood.generators.parse_distribution(text)
+
+
+def test_skewed_block_numbers():
+    uniform = flood.generators.generate_block_numbers(
+        n=100, start_block=0, end_block=1000, random_seed=0
+    )
+    assert flood.generators.generate_block_numbers(
+        n=100,
+        start_block=0,
+        end_block=1000,
+        random_seed=0,
+        distribution=flood.generators.parse_distribution('uniform'),
+    ) == uniform
+
+    blocks = flood.generators.generate_block_numbers(
+        n=1000,
+        start_block=0,
+        end_block=1000,
+        random_seed=0,
+        distribution=flood.generators.parse_distribution('zipf:1.5'),
+    )
+    assert collections.Counter(blocks).most_common(1)[0][0] == 1000
+
+    ranges = flood.generators.generate_block_ranges(
+        n=1000,
+        range_size=10,
+        start_block=0,
+        end_block=1000,
+        random_seed=0,
+        distribution=flood.generators.parse_distribution('recent:5'),
+    )
+    assert all(end - start == 10 and start >= 0 for start, end in ranges)
+    assert max(end for start, end in ranges) == 1000
+
+
+@requires_vegeta
+def test_distribution_recorded_in_test_parameters():
+    distribution = flood.generators.parse_distribution('hot_set:0.00001')
+    test = flood.generate_test(
+        test_name='eth_getBlockByNumber',
+        rates=[100],
+        durations=[5],
+        network='ethereum',
+        random_seed=0,
+        flood_version=flood.__version__,
+        distribution=distribution,
+    )
+    assert test['test_parameters']['distribution'] == distribution
+    (attack,) = test['attacks']
+    blocks = [call['params'][0] for call in attack['calls']]
+    assert len(set(blocks)) < len(blocks) / 2
@@ -0,0 +1,104 @@
+import shutil
+
+import pytest
+
+import flood
+
+requires_vegeta = pytest.mark.skipif(
+    shutil.which('vegeta') is None, reason='vegeta not found'
+)
+
+
+@pytest.mark.parametrize('metric', ['p50', 'p90', 'p99', 'mean'])
+def test_precision_improves_with_samples(metric):
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    latencies = rng.exponential(0.01, size=20_000)
+    compute = flood.tests.load_tests.compute_bootstrap_precision
+    small = compute(latencies[:200], metrics=[metric])[metric]
+    large = compute(latencies, metrics=[metric])[metric]
+    assert 0 < large < small
+
+
+def test_precision_without_samples():
+    compute = flood.tests.load_tests.compute_bootstrap_precision
+    assert compute([0.1], metrics=['p99']) == {'p99': float('inf')}
+
+
+def test_precision_of_bounded_sample():
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    latencies = rng.exponential(0.01, size=100_000)
+    compute = flood.tests.load_tests.compute_bootstrap_precision
+    full = compute(latencies, metrics=['p90'])['p90']
+    sample = compute(
+        latencies[:10_000], metrics=['p90'], n_latencies=len(latencies)
+    )['p90']
+    assert sample == pytest.approx(full, rel=0.25)
+
+
+def _adaptive_duration(target_precision):
+    return {
+        'metrics': ['p50'],
+        'target_precision': target_precision,
+        'confidence': 0.95,
+        'min_duration': 1,
+    }
+
+
+@pytest.mark.parametrize('target_precision,duration', [(100, 1), (0, 3)])
+def test_adaptive_chunks(local_rpc_server, target_precision, duration):
+    import json
+
+    engine = flood.tests.load_tests
+    calls = [
+        {'jsonrpc': '2.0', 'id': i, 'method': 'test', 'params': [i]}
+        for i in range(60)
+    ]
+    pool = engine.create_connection_pool(local_rpc_server)
+    try:
+        output, elapsed, precision, counts = engine.run_adaptive_vegeta_attack(
+            url=local_rpc_server,
+            rate=20,
+            calls=calls,
+            max_duration=3,
+            adaptive_duration=_adaptive_duration(target_precision),
+            connection_pool=pool,
+        )
+    finally:
+        engine.close_connection_pool(pool)
+    results = [json.loads(line) for line in output.splitlines()]
+    assert elapsed == duration
+    assert len(results) == 20 * duration
+    assert all(result['code'] == 200 for result in results)
+    assert set(precision) == {'p50'}
+
+    # connections of the pool are reused across chunks
+    assert counts['opened'] + counts['reused'] == len(results)
+    assert counts['reused'] > counts['opened']
+
+
+@requires_vegeta
+def test_adaptive_vegeta_attack_is_interrupted(local_rpc_server):
+    import json
+
+    calls = [
+        {'jsonrpc': '2.0', 'id': i, 'method': 'test', 'params': [i]}
+        for i in range(20)
+    ]
+    engine = flood.tests.load_tests
+    output, elapsed, precision, counts = engine.run_adaptive_vegeta_attack(
+        url=local_rpc_server,
+        rate=20,
+        calls=calls,
+        max_duration=10,
+        adaptive_duration=_adaptive_duration(100),
+    )
+    results = [json.loads(line) for line in output.splitlines()]
+    assert 1 <= elapsed < 3
+    assert 15 <= len(results) <= 20 * elapsed + 1
+    assert all(result['code'] == 200 for result in results)
+    assert precision['p50'] <= 100
+    assert counts is None
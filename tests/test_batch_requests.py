@@ -0,0 +1,94 @@
+import json
+
+import polars as pl
+import pytest
+
+import flood
+
+
+def test_add_attack_batches():
+    calls = [{'id': i} for i in range(60)]
+    attacks = flood.tests.load_tests.create_load_test(
+        calls=calls, rates=[10, 20], durations=[1, 2]
+    )
+    batched = flood.tests.load_tests.add_attack_batches(
+        attacks, batch_size=5, rates=[2, 4]
+    )
+    assert [attack['rate'] for attack in batched] == [2, 4]
+    assert [len(attack['calls']) for attack in batched] == [2, 8]
+    assert batched[0]['calls'][1] == calls[5:10]
+    assert flood.tests.load_tests.get_batch_size(batched[0]['calls']) == 5
+    assert flood.tests.load_tests.get_batch_size(calls) is None
+
+
+@pytest.mark.parametrize(
+    'response,expected',
+    [
+        ([{'id': 1, 'result': '0x1'}, {'id': 2, 'result': '0x2'}], (0, 0, 0)),
+        ([{'id': 1, 'result': '0x1'}, {'id': 2, 'error': {}}], (0, 1, 1)),
+        ([{'id': 1, 'result': '0x1'}], (1, 0, 2)),
+        ({'id': 1, 'result': '0x1'}, (1, 0, 2)),
+    ],
+)
+def test_validate_batch_response(response, expected):
+    validate = flood.tests.load_tests.deep_utils._validate_responses
+    invalid, rpc_error, n_failed, ids, _ = validate(
+        pl.Series([200]), pl.Series([json.dumps(response).encode()]), 2
+    )
+    assert (int(invalid[0]), int(rpc_error[0]), n_failed[0]) == expected
+
+
+def test_validate_mixed_batch_responses():
+    calls = [{'id': 1}, [{'id': 2}, {'id': 3}], {'id': 4}]
+    assert flood.tests.load_tests.get_batch_size(calls) is None
+    sizes = flood.tests.load_tests.get_request_batch_sizes(calls)
+    assert sizes == [None, 2, None]
+
+    responses = [
+        {'id': 1, 'result': '0x1'},
+        [{'id': 2, 'result': '0x2'}, {'id': 3, 'error': {}}],
+        [{'id': 4, 'result': '0x4'}],
+    ]
+    validate = flood.tests.load_tests.deep_utils._validate_responses
+    invalid, rpc_error, n_failed, ids, _ = validate(
+        pl.Series([200] * 3),
+        pl.Series([json.dumps(response).encode() for response in responses]),
+        sizes,
+    )
+    assert invalid == [False, False, True]
+    assert rpc_error == [False, True, False]
+    assert n_failed == [0, 1, 1]
+
+
+def test_batch_size_saturation():
+    results = {
+        'batch_size=' + str(batch_size): {
+            'target_rate': [10, 100],
+            'batch_size': [batch_size, batch_size],
+            'call_throughput': throughputs,
+        }
+        for batch_size, throughputs in [
+            (1, [10, 100]),
+            (10, [100, 400]),
+            (100, [1000, 410]),
+        ]
+    }
+    saturation = flood.tests.load_tests.compute_batch_size_saturation(results)
+    assert saturation == {10: 100, 100: 10}
+
+
+def test_call_metrics_count_successful_calls():
+    report = {
+        'throughput': 10.0,
+        'actual_duration': 9.0,
+        'final_wait_time': 1.0,
+        'p50': 0.1,
+    }
+    report = flood.tests.load_tests.compute_call_metrics(report, batch_size=5)
+    assert report['call_throughput'] == 50.0
+    assert 'call_p50' not in report
+
+    # failed calls inside http 200 batches are not throughput
+    report['deep_metrics'] = {'all': {'n_calls': 500, 'n_failed_calls': 100}}
+    report = flood.tests.load_tests.compute_call_metrics(report, batch_size=5)
+    assert report['call_throughput'] == 40.0
@@ -0,0 +1,74 @@
+import shutil
+
+import pytest
+
+import flood
+
+
+requires_vegeta = pytest.mark.skipif(
+    shutil.which('vegeta') is None, reason='vegeta not found'
+)
+
+
+def test_get_block_age_ranges():
+    block_ranges = flood.generators.get_block_age_ranges(17_000_000)
+    assert block_ranges == {
+        'head-1k': (16_999_001, 17_000_000),
+        'head-100k': (16_900_001, 16_999_000),
+        'head-1m': (16_000_001, 16_900_000),
+        'genesis': (0, 1_000_000),
+    }
+
+    # buckets reaching past genesis are truncated or omitted
+    block_ranges = flood.generators.get_block_age_ranges(
+        50_000, genesis_blocks=None
+    )
+    assert block_ranges == {
+        'head-1k': (49_001, 50_000),
+        'head-100k': (0, 49_000),
+    }
+
+
+def test_parse_block_range():
+    assert flood.generators.parse_block_range('100:200') == (100, 200)
+    for text in ['100', '200:100', 'a:b', '-1:5']:
+        with pytest.raises(Exception):
+            flood.generators.parse_block_range(text)
+
+
+@requires_vegeta
+def test_generate_block_age_tests():
+    with pytest.warns(UserWarning, match='genesis'):
+        tests = flood.tests.load_tests.generate_block_age_tests(
+            test_name='eth_call',
+            head_block=17_000_000,
+            rates=[10],
+            durations=[2],
+            network='ethereum',
+            random_seed=0,
+        )
+    assert list(tests) == ['head-1k', 'head-100k', 'head-1m', 'genesis']
+    for test in tests.values():
+        start_block, end_block = test['test_parameters']['block_range']
+        for call in test['attacks'][0]['calls']:
+            assert start_block <= int(call['params'][1], 16) <= end_block
+
+    with pytest.raises(Exception):
+        flood.tests.load_tests.generate_block_age_tests(
+            test_name='eth_getTransactionByHash',
+            head_block=17_000_000,
+            rates=[10],
+            durations=[2],
+            network='ethereum',
+        )
+
+
+def test_compute_block_age_slowdown():
+    results = {
+        'head-1k': {'p50': [0.01, 0.02]},
+        'genesis': {'p50': [0.03, None]},
+    }
+    slowdown = flood.tests.load_tests.compute_block_age_slowdown(results)
+    assert slowdown['head-1k'] == [1, 1]
+    assert slowdown['genesis'][0] == pytest.approx(3)
+    assert slowdown['genesis'][1] is None
@@ -0,0 +1,86 @@
+import http.server
+import json
+import threading
+
+import pytest
+
+import flood
+
+
+@pytest.fixture
+def pruned_rpc_server():
+    """stand-in node at block 1000 that keeps state of blocks 900 and later"""
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_POST(self):
+            length = int(self.headers['Content-Length'])
+            request = json.loads(self.rfile.read(length))
+            response = {'jsonrpc': '2.0', 'id': request.get('id')}
+            if request['method'] == 'eth_chainId':
+                response['result'] = '0x1'
+            elif request['method'] == 'eth_blockNumber':
+                response['result'] = hex(1000)
+            elif int(request['params'][1], 16) >= 900:
+                response['result'] = '0x0'
+            else:
+                response['error'] = {'code': -32000, 'message': 'missing'}
+            body = json.dumps(response).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield 'http://127.0.0.1:' + str(server.server_address[1])
+    server.shutdown()
+
+
+def test_get_node_block_bounds(pruned_rpc_server):
+    bounds = flood.user_io.get_node_block_bounds(pruned_rpc_server)
+    assert bounds == (900, 1000)
+    assert flood.user_io.get_node_block_number(pruned_rpc_server) == 1000
+
+
+def test_resolve_block_range():
+    resolve = flood.generators.resolve_block_range
+    assert resolve('node', [(0, 1000)]) == (0, 1000)
+    assert resolve('latest-100', [(0, 1000)]) == (900, 1000)
+
+    # nodes share blocks, skipping oldest quarter of pruned windows
+    assert resolve('node', [(0, 1000), (600, 1010)]) == (700, 1000)
+    assert resolve('latest-1000', [(600, 1000)]) == (700, 1000)
+    assert resolve((5, 10), []) == (5, 10)
+    with pytest.raises(Exception):
+        resolve('node', [(0, 10), (20, 30)])
+
+
+def test_parse_block_range_shorthand():
+    assert flood.generators.parse_block_range('node') == 'node'
+    assert flood.generators.parse_block_range('latest-64') == 'latest-64'
+    with pytest.raises(Exception):
+        flood.generators.parse_block_range('latest-')
+    with pytest.raises(Exception):
+        flood.generators.generate_test(
+            test_name='eth_call',
+            rates=[10],
+            durations=[1],
+            network='ethereum',
+            flood_version=flood.__version__,
+            block_range='node',
+        )
+
+
+def test_block_age_ranges_skip_pruned_state():
+    block_ranges = flood.generators.get_block_age_ranges(
+        17_000_000, earliest_block=16_950_000
+    )
+    assert block_ranges == {
+        'head-1k': (16_999_001, 17_000_000),
+        'head-100k': (16_950_000, 16_999_000),
+    }
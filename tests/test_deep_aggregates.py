@@ -0,0 +1,197 @@
+import base64
+import json
+import multiprocessing
+import os
+import random
+
+import polars as pl
+import pytest
+
+from flood.tests.load_tests import deep_aggregates
+from flood.tests.load_tests import deep_utils
+
+
+def _create_results_df(latencies, status_codes):
+    n = len(latencies)
+    return pl.DataFrame(
+        {
+            'timestamp': [1_000_000_000 * i for i in range(n)],
+            'latency': latencies,
+            'status_code': status_codes,
+            'error': [None if code == 200 else 'boom' for code in status_codes],
+            'invalid_json_error': [False] * n,
+            'rpc_error': [code == 500 for code in status_codes],
+            'schema_error': [None] * n,
+            'n_calls': [1] * n,
+            'n_failed_calls': [int(code != 200) for code in status_codes],
+        },
+        schema_overrides={'error': pl.Utf8, 'schema_error': pl.Utf8},
+    )
+
+
+def test_merged_aggregates_match_single_aggregate():
+    rng = random.Random(0)
+    latencies = [rng.randint(1_000, 10_000_000) for _ in range(1_000)]
+    status_codes = [rng.choice([200, 200, 500]) for _ in range(1_000)]
+    df = _create_results_df(latencies, status_codes)
+
+    merged = deep_aggregates.create_deep_aggregate()
+    for start in range(0, len(df), 300):
+        merged = deep_aggregates.merge_deep_aggregates(
+            merged, deep_aggregates.create_deep_aggregate(df[start:start + 300])
+        )
+    single = deep_aggregates.create_deep_aggregate(df)
+
+    merged_metrics = deep_aggregates.compute_deep_aggregate_metrics(
+        merged, target_rate=10, target_duration=100
+    )
+    single_metrics = deep_aggregates.compute_deep_aggregate_metrics(
+        single, target_rate=10, target_duration=100
+    )
+    assert merged_metrics == single_metrics
+    assert merged_metrics['requests'] == 1_000
+    assert merged_metrics['p50'] == pl.Series(latencies).median() / 1e9
+
+
+def test_histogram_quantiles(monkeypatch):
+    monkeypatch.setattr(deep_aggregates, 'max_exact_values', 100)
+    rng = random.Random(0)
+    values = pl.Series([rng.randint(1, 10**9) for _ in range(10_000)])
+    aggregate = deep_aggregates.create_value_aggregate(values[:5_000])
+    aggregate = deep_aggregates.merge_value_aggregates(
+        aggregate, deep_aggregates.create_value_aggregate(values[5_000:])
+    )
+    assert aggregate['exact_values'] is None
+    stats = deep_aggregates.compute_value_stats(aggregate)
+    assert stats is not None
+    assert stats['min'] == values.min()
+    assert stats['max'] == values.max()
+    assert stats['mean'] == pytest.approx(values.mean())
+    for quantile in [0.50, 0.90, 0.95, 0.99]:
+        expected = values.quantile(quantile)
+        key = 'p' + str(int(quantile * 100))
+        assert stats[key] == pytest.approx(expected, rel=0.01)
+
+
+def test_error_reservoir(monkeypatch):
+    monkeypatch.setattr(deep_aggregates, 'max_error_responses', 10)
+    rng = random.Random(0)
+    reservoir = deep_aggregates.create_error_reservoir()
+    responses = [str(i).encode() for i in range(5)]
+    deep_aggregates.update_error_reservoir(reservoir, responses, rng)
+    assert reservoir['responses'] == responses
+
+    responses = [str(i).encode() for i in range(5, 1_000)]
+    deep_aggregates.update_error_reservoir(reservoir, responses, rng)
+    assert reservoir['n_seen'] == 1_000
+    assert len(reservoir['responses']) == 10
+    assert len(set(reservoir['responses'])) == 10
+
+
+def _json_result(seq, body, code=200):
+    return json.dumps(
+        {
+            'attack': '',
+            'seq': seq,
+            'code': code,
+            'timestamp': '2023-10-19T07:20:%02d.%09dZ' % (seq // 100, seq),
+            'latency': 1_000_000 + 7919 * seq % 1_000_000,
+            'bytes_out': 10,
+            'bytes_in': len(body),
+            'error': '' if code == 200 else 'boom',
+            'body': base64.b64encode(body).decode(),
+            'method': 'POST',
+            'url': 'http://localhost:8545',
+            'headers': {},
+        }
+    )
+
+
+def test_compute_deep_datum_in_batches(monkeypatch):
+    methods = ['eth_call', 'eth_getBalance', 'eth_blockNumber']
+    calls = [
+        {'jsonrpc': '2.0', 'id': i, 'method': methods[i % 3], 'params': []}
+        for i in range(30)
+    ]
+    lines = []
+    for seq in range(3_000):
+        call_id = seq % 30
+        if seq % 7 == 0:
+            body = b'{"id": %d, "error": {"code": -32000}}' % call_id
+        else:
+            body = b'{"id": %d, "result": "0x1"}' % call_id
+        code = 500 if seq % 11 == 0 else 200
+        lines.append(_json_result(seq, body, code=code))
+    raw_output = ('\n'.join(lines) + '\n').encode()
+
+    expected = deep_utils.compute_deep_datum(raw_output, 100, 30, calls)
+    monkeypatch.setattr(deep_utils, 'decode_batch_bytes', 10_000)
+    batched = deep_utils.compute_deep_datum(raw_output, 100, 30, calls)
+
+    # batches are parsed in one process pool for the whole deep check
+    pools = []
+    create_pool = multiprocessing.Pool
+
+    def count_pools(*args, **kwargs):
+        pool = create_pool(*args, **kwargs)
+        pools.append(pool)
+        return pool
+
+    monkeypatch.setattr(deep_utils, 'min_parallel_responses', 10)
+    monkeypatch.setattr(os, 'cpu_count', lambda: 2)
+    monkeypatch.setattr(multiprocessing, 'Pool', count_pools)
+    parallel = deep_utils.compute_deep_datum(raw_output, 100, 30, calls)
+    assert len(pools) == 1
+    assert parallel[1:] == batched[1:]
+    for category in ['all', 'successful', 'failed']:
+        assert dict(parallel[0][category]) == dict(batched[0][category])
+
+    for category in ['all', 'successful', 'failed']:
+        expected_metrics = dict(expected[0][category])
+        batched_metrics = dict(batched[0][category])
+        assert sorted(expected_metrics.pop('errors')) == sorted(
+            batched_metrics.pop('errors')
+        )
+        assert expected_metrics == batched_metrics
+    assert sorted(expected[1], key=str) == sorted(batched[1], key=str)
+    assert expected[2] == batched[2]
+    assert expected[2] is not None and set(expected[2]) == set(methods)
+    assert expected[3] == batched[3]
+
+
+def test_errors_are_linked_to_calls():
+    calls = [
+        {'jsonrpc': '2.0', 'id': i, 'method': 'eth_getBalance', 'params': [i]}
+        for i in range(10)
+    ]
+    lines = []
+    for seq in range(100):
+        call_id = seq % 10
+        if call_id == 3:
+            body = b'{"id": 3, "error": {"code": -32000, "message": "boom"}}'
+        elif call_id == 7 and seq % 20 == 7:
+            body = b'{"id": 7, "result": "0xzz"}'
+        else:
+            body = b'{"id": %d, "result": "0x1"}' % call_id
+        lines.append(_json_result(seq, body))
+    raw_output = ('\n'.join(lines) + '\n').encode()
+
+    _, error_pairs, _, failed_calls, _, _ = deep_utils.compute_deep_datum(
+        raw_output, 100, 1, calls
+    )
+    assert len(error_pairs) == 10
+    assert all(call == calls[3] for call, response in error_pairs)
+    assert failed_calls == [
+        {
+            'error': 'rpc error: boom',
+            'call_index': 3,
+            'n_failures': 10,
+            'call': calls[3],
+        },
+        {
+            'error': 'schema error: invalid_hex',
+            'call_index': 7,
+            'n_failures': 5,
+            'call': calls[7],
+        },
+    ]
@@ -0,0 +1,234 @@
+import base64
+import json
+import os
+import time
+
+import polars as pl
+import pytest
+
+from flood.tests.load_tests import deep_utils
+from flood.tests.load_tests import request_phases
+
+
+responses = [
+    b'{"jsonrpc": "2.0", "id": 1, "result": "0x1"}',
+    b'{"jsonrpc": "2.0", "id": "a", "result": null}',
+    b'{"jsonrpc": "2.0", "id": 3, "error": {"code": -32000}}',
+    b'{"id": 4, "result": NaN}',
+    b'{"id": 123456789012345678901234567890, "result": 1}',
+    b'[{"id": 5, "result": 1}, {"id": 6, "result": null}]',
+    b'[{"id": 7, "result": 1}, 8]',
+    b'{"id": 9, "result": "\\ud800"}',
+    b'not json',
+    b'',
+    b'{"id": 1}',
+    None,
+]
+
+
+def _validate_response(status_code, response, batch_size):
+    """validate a single response with the json module"""
+    n_calls = batch_size or 1
+    try:
+        decoded = json.loads(response)
+    except Exception:
+        decoded = None
+    response_id = decoded.get('id') if isinstance(decoded, dict) else None
+    if status_code != 200:
+        return (False, False, n_calls), response_id
+    try:
+        if batch_size is None:
+            n_failed = int(decoded.get('result') is None)
+        elif not isinstance(decoded, list) or len(decoded) != batch_size:
+            return (True, False, n_calls), response_id
+        else:
+            n_failed = sum(item.get('result') is None for item in decoded)
+        return (False, n_failed > 0, n_failed), response_id
+    except Exception:
+        return (True, False, n_calls), response_id
+
+
+@pytest.mark.parametrize('batch_size', [None, 2])
+@pytest.mark.parametrize('max_workers', [1, 2])
+def test_validate_responses_matches_reference(
+    batch_size, max_workers, monkeypatch
+):
+    import multiprocessing
+
+    monkeypatch.setattr(deep_utils, 'min_parallel_responses', 4)
+    all_responses = responses * 3
+    status_codes = [200, 500] * (len(all_responses) // 2)
+    with multiprocessing.Pool(max_workers) as pool:
+        invalid, error, failed, ids, _ = deep_utils._validate_responses(
+            pl.Series(status_codes),
+            pl.Series(all_responses, dtype=pl.Binary),
+            batch_size,
+            max_workers=max_workers,
+            pool=pool if max_workers > 1 else None,
+        )
+    for i, (status_code, response) in enumerate(
+        zip(status_codes, all_responses)
+    ):
+        expected, expected_id = _validate_response(
+            status_code, response, batch_size
+        )
+        assert (invalid[i], error[i], failed[i]) == expected
+        assert ids[i] == expected_id
+
+
+@pytest.mark.skipif(
+    os.environ.get('FLOOD_BENCHMARK') is None,
+    reason='FLOOD_BENCHMARK env var not set',
+)
+def test_validate_responses_benchmark():
+    """compare per-response validation to chunked validation"""
+    n = 1_000_000
+    block_hash = b'0x' + b'a' * 64
+    result = b'{"jsonrpc": "2.0", "id": 1, "result": "%s"}' % block_hash
+    error = b'{"jsonrpc": "2.0", "id": 2, "error": {"code": -32000}}'
+    all_responses = pl.Series([result] * (n - n // 10) + [error] * (n // 10))
+    status_codes = pl.Series([200] * n)
+
+    start = time.time()
+    expected = [
+        _validate_response(status_code, response, None)[0]
+        for status_code, response in zip(status_codes, all_responses)
+    ]
+    reference_time = time.time() - start
+
+    import multiprocessing
+
+    start = time.time()
+    with multiprocessing.Pool(os.cpu_count()) as pool:
+        invalid, error, failed, ids, _ = deep_utils._validate_responses(
+            status_codes, all_responses, None, pool=pool
+        )
+    chunked_time = time.time() - start
+
+    assert list(zip(invalid, error, failed)) == expected
+    print()
+    print('per-response validation:', round(reference_time, 2), 's')
+    print('chunked validation:', round(chunked_time, 2), 's')
+
+
+def _json_result(seq, timestamp, body, error='', **extra):
+    result = {
+        'attack': 'eth_call',
+        'seq': seq,
+        'code': 200 if error == '' else 0,
+        'timestamp': timestamp,
+        'latency': 1_000_000 + seq,
+        'bytes_out': 100,
+        'bytes_in': 0 if body is None else len(body),
+        'error': error,
+        'body': None if body is None else base64.b64encode(body).decode(),
+        'method': 'POST',
+        'url': 'http://localhost:8545',
+        'headers': {'Content-Type': ['application/json']},
+    }
+    result.update(extra)
+    return json.dumps(result)
+
+
+json_results = [
+    _json_result(0, '2023-10-19T07:20:00.123456789Z', b'{"id": 0}'),
+    _json_result(1, '2023-10-19T07:20:01Z', b''),
+    _json_result(2, '2023-10-19T03:20:02.5-04:00', None, error='timeout'),
+    _json_result(3, '2023-10-19T12:50:03.000000001+05:30', b'\xff\x00'),
+]
+
+
+def test_convert_json_results(tmp_path):
+    raw_output = ('\n'.join(json_results) + '\n').encode()
+    df = deep_utils._convert_raw_vegeta_output_to_dataframe(raw_output)
+    assert df['timestamp'].to_list() == [
+        1697700000123456789,
+        1697700001000000000,
+        1697700002500000000,
+        1697700003000000001,
+    ]
+    assert df['response'].dtype == pl.Binary
+    assert df['response'].to_list() == [b'{"id": 0}', b'', None, b'\xff\x00']
+    assert df['error'].to_list() == [None, None, 'timeout', None]
+    assert df['index'].to_list() == [0, 1, 2, 3]
+    assert df['status_code'].to_list() == [200, 200, 0, 200]
+    assert not any(column.startswith('phase_') for column in df.columns)
+
+    # batches split at line boundaries give the same dataframe
+    batched = deep_utils._convert_raw_vegeta_output_to_dataframe(
+        raw_output + b'\n', batch_bytes=10
+    )
+    assert batched.frame_equal(df, null_equal=True)
+
+    # files of results are read in batches of lines
+    path = tmp_path / 'results.json'
+    path.write_bytes(raw_output)
+    from_file = deep_utils._convert_raw_vegeta_output_to_dataframe(
+        str(path), batch_bytes=10
+    )
+    assert from_file.frame_equal(df, null_equal=True)
+
+
+def test_convert_json_results_with_phase_timings():
+    timings = {
+        'queue': 1,
+        'dns': 2,
+        'connect': 3,
+        'tls': 4,
+        'ttfb': 5,
+        'transfer': 6,
+    }
+    raw_output = (
+        _json_result(0, '2023-10-19T07:20:00Z', b'{}', timings=timings) + '\n'
+    ).encode()
+    df = deep_utils._convert_raw_vegeta_output_to_dataframe(raw_output)
+    for phase, value in timings.items():
+        assert df['phase_' + phase].to_list() == [value]
+
+
+def test_aggregate_phase_timings():
+    timed = [
+        _json_result(
+            i,
+            '2023-10-19T07:20:00Z',
+            b'{}',
+            timings={
+                phase: i * 10 + p
+                for p, phase in enumerate(request_phases.latency_phases)
+            },
+        )
+        for i in range(20)
+    ]
+    raw_output = ('\n'.join(timed) + '\n').encode()
+    expected = request_phases.compute_phase_latencies(
+        deep_utils._convert_raw_vegeta_output_to_dataframe(raw_output)
+    )
+    aggregates: dict = {}
+    batches = deep_utils._iter_raw_vegeta_output_dataframes(
+        raw_output, batch_bytes=100
+    )
+    n_batches = sum(
+        1 for _ in request_phases.aggregate_phase_timings(batches, aggregates)
+    )
+    assert n_batches > 1
+    assert request_phases.compute_aggregate_phase_latencies(aggregates) == (
+        expected
+    )
+
+    # batches of results without timings have no phase latencies
+    untimed = _json_result(20, '2023-10-19T07:20:00Z', b'{}') + '\n'
+    batches = deep_utils._iter_raw_vegeta_output_dataframes(
+        raw_output + untimed.encode(), batch_bytes=100
+    )
+    aggregates = {}
+    for _ in request_phases.aggregate_phase_timings(batches, aggregates):
+        pass
+    assert request_phases.compute_aggregate_phase_latencies(aggregates) is None
+
+
+def test_convert_empty_output(monkeypatch):
+    # empty output must not need vegeta to be installed
+    monkeypatch.setenv('PATH', '')
+    df = deep_utils._convert_raw_vegeta_output_to_dataframe(b'')
+    assert len(df) == 0
+    assert df['response'].dtype == pl.Binary
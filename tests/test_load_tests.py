@@ -34,3 +34,30 @@ def test_load_test(
     )
     subprocess.check_call(cmd.split(' '))
 
+
+@pytest.mark.parametrize(
+    'warmup',
+    [{'duration': 2, 'requests': None}, {'duration': None, 'requests': 5}],
+)
+def test_warmup_calls_are_separate(warmup):
+    import shutil
+
+    if shutil.which('vegeta') is None:
+        pytest.skip('vegeta not installed')
+    test = flood.generate_test(
+        test_name='eth_getBlockByNumber',
+        rates=[10, 20],
+        durations=[1, 3],
+        warmup=warmup,
+        network='ethereum',
+        flood_version=flood.__version__,
+    )
+    for attack, duration in zip(test['attacks'], [1, 3]):
+        n_warmup = flood.tests.load_tests.get_warmup_call_count(
+            warmup, attack['rate']
+        )
+        assert attack['duration'] == duration
+        assert len(attack['calls']) == attack['rate'] * duration
+        assert len(attack['warmup_calls']) == n_warmup
+        for call in attack['warmup_calls']:
+            assert call not in attack['calls']
@@ -0,0 +1,95 @@
+import collections
+import shutil
+
+import pytest
+
+import flood
+
+
+mix = {'eth_call': 60, 'eth_getLogs': 20, 'eth_getBlockByNumber': 20}
+requires_vegeta = pytest.mark.skipif(
+    shutil.which('vegeta') is None, reason='vegeta not found'
+)
+
+
+def _generate_mixed_test(**kwargs):
+    return flood.generate_test(
+        test_name='mix',
+        mix=mix,
+        rates=[10, 25],
+        durations=[2, 2],
+        network='ethereum',
+        random_seed=0,
+        flood_version=flood.__version__,
+        **kwargs
+    )
+
+
+def test_allocate_call_counts():
+    allocate = flood.generators.mixed_test_generators._allocate_call_counts
+    assert allocate(100, [60, 20, 20]) == [60, 20, 20]
+    assert allocate(10, [1, 1, 1]) == [4, 3, 3]
+    assert allocate(1, [3, 1]) == [1, 0]
+    assert sum(allocate(7, [0.5, 0.3, 0.2])) == 7
+
+
+@requires_vegeta
+def test_mixed_test_interleaves_methods_by_weight():
+    test = _generate_mixed_test()
+    assert test['test_parameters']['mix'] == mix
+    for attack in test['attacks']:
+        calls = attack['calls']
+        assert len(calls) == attack['rate'] * attack['duration']
+        counts = collections.Counter(call['method'] for call in calls)
+        assert counts == {
+            'eth_call': len(calls) * 0.6,
+            'eth_getLogs': len(calls) * 0.2,
+            'eth_getBlockByNumber': len(calls) * 0.2,
+        }
+        assert [call['method'] for call in calls] != sorted(
+            call['method'] for call in calls
+        )
+
+    # call ids are random, but which calls are sent is seeded
+    regenerated = _generate_mixed_test()
+    for attack, other in zip(test['attacks'], regenerated['attacks']):
+        assert [call['params'] for call in attack['calls']] == [
+            call['params'] for call in other['calls']
+        ]
+
+
+def test_parse_mix():
+    parsed = flood.generators.parse_mix(['eth_call=3', 'eth_getLogs=1.5'])
+    assert parsed == {'eth_call': 3, 'eth_getLogs': 1.5}
+    for items in [[], ['eth_call'], ['eth_call=0'], ['not_a_test=1']]:
+        with pytest.raises(Exception):
+            flood.generators.parse_mix(items)
+
+
+def test_mix_requires_mix_test_name():
+    with pytest.raises(Exception, match='mix must be specified'):
+        flood.generate_test(
+            test_name='eth_call',
+            mix=mix,
+            rates=[10],
+            durations=[1],
+            network='ethereum',
+            flood_version=flood.__version__,
+        )
+
+
+@requires_vegeta
+def test_deep_metrics_per_method(local_rpc_server):
+    test = _generate_mixed_test(engine='persistent')
+    output = flood.tests.load_tests.run_load_test(
+        test=test,
+        node={'name': 'local', 'url': local_rpc_server, 'remote': None},
+        include_deep_output=['metrics'],
+    )
+    method_metrics = output['deep_method_metrics']
+    assert method_metrics is not None
+    assert set(method_metrics.keys()) == set(mix.keys())
+    assert method_metrics['eth_call']['requests'] == [12, 30]
+    assert method_metrics['eth_getLogs']['target_rate'] == [2, 5]
+    total = sum(sum(metrics['requests']) for metrics in method_metrics.values())
+    assert total == sum(output['requests'])
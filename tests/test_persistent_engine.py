@@ -0,0 +1,95 @@
+import json
+
+import pytest
+
+import flood
+
+
+calls = [
+    {'jsonrpc': '2.0', 'id': i, 'method': 'eth_blockNumber', 'params': [i]}
+    for i in range(10)
+]
+
+
+def test_connections_persist_across_attacks(local_rpc_server):
+    engine = flood.tests.load_tests
+    pool = engine.create_connection_pool(local_rpc_server, max_connections=2)
+    try:
+        all_counts = []
+        for rate in [20, 40]:
+            output, counts = engine.run_persistent_attack(
+                pool=pool, calls=calls, rate=rate, duration=0.5
+            )
+            results = [json.loads(line) for line in output.splitlines()]
+            assert len(results) == rate // 2
+            assert [result['seq'] for result in results] == list(
+                range(rate // 2)
+            )
+            assert all(result['code'] == 200 for result in results)
+            all_counts.append(counts)
+    finally:
+        engine.close_connection_pool(pool)
+
+    # how many connections the first attack opens depends on timing, but
+    # connections are never opened beyond the pool size across attacks
+    assert 1 <= all_counts[0]['opened'] + all_counts[1]['opened'] <= 2
+    assert all_counts[1]['reused'] > 0
+    assert all_counts[0]['dropped'] == all_counts[1]['dropped'] == 0
+
+
+def test_results_are_written_to_output(local_rpc_server, tmp_path):
+    engine = flood.tests.load_tests
+    pool = engine.create_connection_pool(local_rpc_server)
+    path = tmp_path / 'results.json'
+    try:
+        with open(path, 'wb') as f:
+            output, counts = engine.run_persistent_attack(
+                pool=pool, calls=calls, rate=40, duration=0.5, output=f
+            )
+    finally:
+        engine.close_connection_pool(pool)
+    assert output == b''
+    results = [json.loads(line) for line in path.read_bytes().splitlines()]
+    assert [result['seq'] for result in results] == list(range(20))
+
+
+def test_closed_connections_are_dropped(local_rpc_server):
+    engine = flood.tests.load_tests
+    pool = engine.create_connection_pool(local_rpc_server + '/close')
+    try:
+        output, counts = engine.run_persistent_attack(
+            pool=pool, calls=calls, rate=20, duration=0.5
+        )
+    finally:
+        engine.close_connection_pool(pool)
+    assert counts == {'opened': 10, 'reused': 0, 'dropped': 10}
+
+
+def test_invalid_url():
+    with pytest.raises(Exception):
+        flood.tests.load_tests.create_connection_pool('ws://localhost:8545')
+
+
+def test_phase_timings(local_rpc_server):
+    engine = flood.tests.load_tests
+    pool = engine.create_connection_pool(local_rpc_server)
+    try:
+        output, counts = engine.run_persistent_attack(
+            pool=pool, calls=calls, rate=20, duration=0.5
+        )
+    finally:
+        engine.close_connection_pool(pool)
+
+    for line in output.splitlines():
+        result = json.loads(line)
+        timings = result['timings']
+        assert set(timings.keys()) == set(engine.latency_phases)
+        assert timings['ttfb'] > 0
+        assert timings['tls'] == 0
+        assert sum(timings.values()) <= result['latency']
+
+    phase_timings = engine.extract_phase_timings(output)
+    phase_latencies = engine.compute_phase_latencies(phase_timings)
+    assert phase_latencies['ttfb']['p50'] > 0
+    assert phase_latencies['connect']['max'] > 0
+    assert phase_latencies['connect']['p50'] == 0
@@ -0,0 +1,138 @@
+import base64
+import json
+import os
+import shutil
+
+import polars as pl
+import pytest
+
+import flood
+from flood.runners.single_runner import single_runner_io
+from flood.tests.load_tests import deep_utils
+from flood.tests.load_tests import vegeta
+
+requires_vegeta = pytest.mark.skipif(
+    shutil.which('vegeta') is None, reason='vegeta not found'
+)
+
+
+def _json_result(seq):
+    body = b'{"id": 1, "result": "0x%x"}' % seq
+    return json.dumps(
+        {
+            'attack': '',
+            'seq': seq,
+            'code': 200,
+            'timestamp': '2023-10-19T07:20:00.%09dZ' % seq,
+            'latency': 1_000_000 + seq,
+            'bytes_out': 10,
+            'bytes_in': len(body),
+            'error': '',
+            'body': base64.b64encode(body).decode(),
+            'method': 'POST',
+            'url': 'http://localhost:8545',
+        }
+    )
+
+
+def _raw_output(n):
+    return ('\n'.join(_json_result(seq) for seq in range(n)) + '\n').encode()
+
+
+def test_write_raw_vegeta_output(tmp_path, monkeypatch):
+    monkeypatch.setattr(deep_utils, 'decode_batch_bytes', 5_000)
+    path = deep_utils.write_raw_vegeta_output(
+        _raw_output(300), path=str(tmp_path / 'raw.parquet')
+    )
+    df = pl.read_parquet(path)
+    assert df['latency'].to_list() == [1_000_000 + seq for seq in range(300)]
+    assert df['response'][0] == b'{"id": 1, "result": "0x0"}'
+
+    # empty attacks must not need vegeta to be installed
+    monkeypatch.setenv('PATH', '')
+    empty = deep_utils.write_raw_vegeta_output(
+        b'', path=str(tmp_path / 'empty.parquet')
+    )
+    assert len(pl.read_parquet(empty)) == 0
+
+
+def test_scan_single_run_raw_output(tmp_path):
+    output_dir = str(tmp_path / 'output')
+    os.makedirs(output_dir)
+    results = {
+        name: {
+            'deep_raw_output': [
+                deep_utils.write_raw_vegeta_output(
+                    _raw_output(n),
+                    path=str(tmp_path / (name + str(n) + '.parquet')),
+                )
+                for n in [10, 20]
+            ],
+            'warmup': None,
+        }
+        for name in ['node1', 'node2']
+    }
+    saved = single_runner_io._save_raw_output_sidecars(
+        output_dir=output_dir,
+        results=results,  # type: ignore
+    )
+    assert saved['node1']['deep_raw_output'] == [
+        os.path.join('raw', 'node1__0.parquet'),
+        os.path.join('raw', 'node1__1.parquet'),
+    ]
+    path = single_runner_io.get_single_run_results_path(output_dir)
+    with open(path, 'w') as f:
+        json.dump({'results': saved}, f)
+
+    df = (
+        flood.scan_single_run_raw_output(output_dir)
+        .filter(pl.col('result_name') == 'node2')
+        .select('attack_index', 'latency')
+        .collect()
+    )
+    assert df.columns == ['attack_index', 'latency']
+    assert df['attack_index'].to_list() == [0] * 10 + [1] * 20
+
+
+@requires_vegeta
+def test_raw_output_and_deep_check_share_one_pass(tmp_path, monkeypatch):
+    calls = [
+        {'jsonrpc': '2.0', 'id': 1, 'method': 'eth_blockNumber', 'params': []}
+    ]
+    results_path = tmp_path / 'results.json'
+    results_path.write_bytes(_raw_output(300))
+    raw_output_dir = str(tmp_path / 'raw')
+    n_decoded = []
+    convert_json_results = deep_utils._convert_json_results
+
+    def count_decoded(json_results):
+        n_decoded.append(len(json_results))
+        return convert_json_results(json_results)
+
+    monkeypatch.setattr(deep_utils, 'decode_batch_bytes', 5_000)
+    monkeypatch.setattr(deep_utils, '_convert_json_results', count_decoded)
+    report = vegeta._create_vegeta_report(
+        attack_output=str(results_path),
+        target_rate=100,
+        target_duration=3,
+        include_deep_output=['raw', 'metrics'],
+        calls=calls,
+        raw_output_dir=raw_output_dir,
+    )
+    assert sum(n_decoded) == results_path.stat().st_size
+    assert report['deep_metrics'] is not None
+    assert report['deep_metrics']['all']['requests'] == 300
+    assert report['deep_raw_output'] is not None
+    assert os.path.dirname(report['deep_raw_output']) == raw_output_dir
+    assert len(pl.read_parquet(report['deep_raw_output'])) == 300
+
+
+def test_raw_output_needs_output_dir():
+    with pytest.raises(Exception, match='raw_output_dir'):
+        vegeta.run_vegeta_attack(
+            url='http://localhost:8545',
+            rate=10,
+            calls=[{'id': 1, 'method': 'eth_blockNumber'}],
+            duration=1,
+            include_deep_output=['raw'],
+        )
@@ -0,0 +1,133 @@
+import json
+import os
+import socket
+import threading
+import time
+import urllib.request
+
+import flood
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def test_recording_proxy(local_rpc_server, tmp_path):
+    output_dir = str(tmp_path / 'recordings')
+    port = _free_port()
+    summaries = []
+    thread = threading.Thread(
+        target=lambda: summaries.append(
+            flood.ops.run_recording_proxy(
+                upstream=local_rpc_server,
+                output_dir=output_dir,
+                listen='127.0.0.1:' + str(port),
+                max_file_size=1000,
+                duration=1.5,
+                verbose=False,
+            )
+        )
+    )
+    thread.start()
+    time.sleep(0.3)
+
+    responses = []
+    for i in range(20):
+        call = {'jsonrpc': '2.0', 'id': i, 'method': 'test', 'params': [i]}
+        request = urllib.request.Request(
+            'http://127.0.0.1:' + str(port),
+            data=json.dumps(call).encode(),
+            headers={'Content-Type': 'application/json'},
+        )
+        with urllib.request.urlopen(request) as response:
+            responses.append(json.loads(response.read()))
+    thread.join()
+
+    # responses are forwarded from upstream
+    assert [response['result'] for response in responses] == [
+        [i] for i in range(20)
+    ]
+
+    # recordings are rotated by size
+    paths = flood.ops.get_recording_paths(output_dir)
+    assert len(paths) > 1
+    assert all(os.path.getsize(path) <= 1000 for path in paths)
+    entries = [json.loads(line) for path in paths for line in open(path)]
+    assert [json.loads(entry['body'])['id'] for entry in entries] == list(
+        range(20)
+    )
+    assert all(entry['overhead'] >= 0 for entry in entries)
+
+    # overhead is summarized
+    (summary,) = summaries
+    assert summary['n_requests'] == 20
+    assert summary['n_errors'] == 0
+    assert summary['overhead']['max'] is not None
+    with open(os.path.join(output_dir, 'recording_summary.json')) as f:
+        assert json.load(f)['n_requests'] == 20
+
+    # recordings can be replayed
+    replay = flood.generators.create_replay(output_dir)
+    assert replay['n_requests'] == 20
+
+
+def test_forwarded_headers():
+    from flood.ops import recording_proxy
+
+    headers = [
+        ('Host', 'proxy:9545'),
+        ('Authorization', 'Bearer token'),
+        ('Content-Type', 'application/json'),
+        ('Content-Length', '10'),
+        ('Connection', 'keep-alive, X-Session'),
+        ('X-Session', 'abc'),
+        ('Transfer-Encoding', 'chunked'),
+    ]
+    forwarded = recording_proxy._get_forwarded_headers(headers)
+    assert forwarded == (
+        b'Authorization: Bearer token\r\n'
+        b'Content-Type: application/json\r\n'
+    )
+
+
+def test_recorder_latencies_are_bounded(tmp_path, monkeypatch):
+    from flood.ops import recording_proxy
+    from flood.tests.load_tests import deep_aggregates
+
+    monkeypatch.setattr(recording_proxy, 'aggregate_batch_size', 10)
+    recorder = {
+        'output_dir': str(tmp_path),
+        'max_file_size': 1_000_000,
+        'file': None,
+        'file_index': 0,
+        'file_size': 0,
+        'paths': [],
+        'n_requests': 0,
+        'n_errors': 0,
+        'n_bytes': 0,
+        'overheads': deep_aggregates.create_value_aggregate(),
+        'latencies': deep_aggregates.create_value_aggregate(),
+        'pending_overheads': [],
+        'pending_latencies': [],
+    }
+    for i in range(1, 26):
+        recording_proxy._record_request(
+            recorder,
+            timestamp=0.0,
+            body=b'{}',
+            code=200,
+            latency=i / 1000,
+            overhead=0.0001,
+            response_size=2,
+        )
+        assert len(recorder['pending_latencies']) < 10
+    recording_proxy._close_recording_file(recorder)
+    summary = recording_proxy._summarize_recording(
+        recorder, upstream='', duration=1.0
+    )
+    assert recorder['latencies']['n'] == 25
+    assert summary['latency']['max'] == 0.025
+    assert summary['latency']['p50'] == 0.013
+    assert summary['overhead']['mean'] == 0.0001
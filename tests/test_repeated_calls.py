@@ -0,0 +1,87 @@
+import shutil
+
+import pytest
+
+import flood
+
+
+requires_vegeta = pytest.mark.skipif(
+    shutil.which('vegeta') is None, reason='vegeta not found'
+)
+
+
+def _attack(n_calls):
+    calls = [
+        {'jsonrpc': '2.0', 'id': i, 'method': 'eth_getBalance', 'params': [i]}
+        for i in range(n_calls)
+    ]
+    return {
+        'rate': n_calls,
+        'duration': 1,
+        'calls': calls,
+        'vegeta_args': None,
+        'warmup_calls': None,
+        'offsets': None,
+    }
+
+
+def test_compute_repeat_ratio():
+    compute = flood.tests.load_tests.compute_repeat_ratio
+    calls = _attack(4)['calls']
+    assert compute(calls) == 0
+    assert compute(calls + [dict(calls[0], id=10)]) == pytest.approx(0.2)
+    assert compute([calls[:2], calls[:2]]) == 0.5
+    assert compute(calls[2:], warmup_calls=calls[:3]) == 0.5
+    assert compute([]) is None
+
+
+@pytest.mark.parametrize('ratio', [0, 0.5, 0.9])
+def test_add_attack_repeats(ratio):
+    repeats = flood.tests.load_tests.create_repeats(ratio)
+    (attack,) = flood.tests.load_tests.add_attack_repeats(
+        [_attack(10_000)], repeats=repeats, random_seed=0
+    )
+    calls = attack['calls']
+    assert [call['id'] for call in calls] == list(range(10_000))
+    realized = flood.tests.load_tests.compute_repeat_ratio(calls)
+    assert realized == pytest.approx(ratio, abs=0.02)
+
+
+def test_reuse_distance():
+    repeats = flood.tests.load_tests.create_repeats(
+        0.5, reuse_distance=flood.generators.parse_distribution('recent:3')
+    )
+    (attack,) = flood.tests.load_tests.add_attack_repeats(
+        [_attack(10_000)], repeats=repeats, random_seed=0
+    )
+    distances = [
+        i - call['params'][0]
+        for i, call in enumerate(attack['calls'])
+        if call['params'][0] != i
+    ]
+    assert min(distances) >= 1
+    assert sum(distances) / len(distances) < 10
+
+    with pytest.raises(Exception):
+        flood.tests.load_tests.create_repeats(1.0)
+
+
+@requires_vegeta
+def test_repeat_ratio_reported(local_rpc_server):
+    test = flood.generate_test(
+        test_name='eth_getBlockByNumber',
+        rates=[50, 100],
+        durations=[1, 1],
+        network='ethereum',
+        random_seed=0,
+        flood_version=flood.__version__,
+        engine='persistent',
+        repeats=flood.tests.load_tests.create_repeats(0.5),
+    )
+    assert test['test_parameters']['repeats']['ratio'] == 0.5
+    output = flood.tests.load_tests.run_load_test(
+        test=test,
+        node={'name': 'local', 'url': local_rpc_server, 'remote': None},
+    )
+    assert len(output['repeat_ratio']) == 2
+    assert all(0.35 < ratio < 0.65 for ratio in output['repeat_ratio'])
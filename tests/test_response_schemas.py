@@ -0,0 +1,95 @@
+import base64
+import json
+
+import pytest
+
+from flood.tests.load_tests import deep_utils
+from flood.tests.load_tests import response_schemas
+
+
+block_hash = '0x' + 'ab' * 32
+address = '0x' + '12' * 20
+receipt = {
+    'transactionHash': block_hash,
+    'blockNumber': '0x10',
+    'gasUsed': '0x5208',
+    'logs': [],
+}
+
+
+@pytest.mark.parametrize(
+    'method,result,expected',
+    [
+        ('eth_getBalance', '0x1bc16d674ec80000', None),
+        ('eth_getBalance', '0xzz', 'invalid_hex'),
+        ('eth_getBalance', 5, 'wrong_type'),
+        ('eth_call', '0x', None),
+        ('eth_call', '0xabc', 'invalid_hex'),
+        ('eth_getStorageAt', '0x' + '0' * 63, 'invalid_hex'),
+        ('eth_getTransactionReceipt', receipt, None),
+        ('eth_getTransactionReceipt', {}, 'empty_result'),
+        ('eth_getTransactionReceipt', {'gasUsed': '0x1'}, 'missing_key'),
+        ('eth_getBlockReceipts', [receipt] * 3, None),
+        ('eth_getBlockReceipts', [receipt, receipt, []], 'wrong_type'),
+        ('trace_transaction', [], 'empty_result'),
+        ('eth_getLogs', [], None),
+        ('eth_getProof', {'address': address}, 'missing_key'),
+        ('web3_clientVersion', 5, None),
+        (None, 5, None),
+    ],
+)
+def test_validate_result(method, result, expected):
+    assert response_schemas.validate_result(method, result) == expected
+
+
+def _json_result(seq, body):
+    return json.dumps(
+        {
+            'attack': '',
+            'seq': seq,
+            'code': 200,
+            'timestamp': '2023-10-19T07:20:00.%09dZ' % seq,
+            'latency': 1_000_000,
+            'bytes_out': 10,
+            'bytes_in': len(body),
+            'error': '',
+            'body': base64.b64encode(body).decode(),
+            'method': 'POST',
+            'url': 'http://localhost:8545',
+        }
+    )
+
+
+def test_deep_check_counts_schema_errors():
+    calls = [
+        {'jsonrpc': '2.0', 'id': 1, 'method': 'eth_getBalance', 'params': []},
+        {
+            'jsonrpc': '2.0',
+            'id': 2,
+            'method': 'eth_getTransactionReceipt',
+            'params': [],
+        },
+    ]
+    bodies = [
+        b'{"id": 1, "result": "0x10"}',
+        b'{"id": 2, "result": %s}' % json.dumps(receipt).encode(),
+        b'{"id": 1, "result": "0xzz"}',
+        b'{"id": 2, "result": {}}',
+        b'{"id": 1, "error": {"code": -32000}}',
+    ]
+    lines = [_json_result(seq, body) for seq, body in enumerate(bodies)]
+    raw_output = ('\n'.join(lines) + '\n').encode()
+
+    category_data, _, method_data, _, _, _ = deep_utils.compute_deep_datum(
+        raw_output, 5, 1, calls
+    )
+    assert category_data['all']['n_schema_errors'] == 2
+    assert category_data['all']['n_invalid_hex_errors'] == 1
+    assert category_data['all']['n_empty_result_errors'] == 1
+    assert category_data['all']['n_rpc_errors'] == 1
+    assert category_data['successful']['requests'] == 2
+    assert category_data['failed']['n_schema_errors'] == 2
+    assert method_data is not None
+    assert method_data['eth_getBalance']['n_invalid_hex_errors'] == 1
+    receipt_data = method_data['eth_getTransactionReceipt']
+    assert receipt_data['n_empty_result_errors'] == 1
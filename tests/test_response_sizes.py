@@ -0,0 +1,73 @@
+import base64
+import json
+
+import pytest
+
+from flood.tests.load_tests import deep_utils
+from flood.tests.load_tests import response_sizes
+
+
+def _json_result(seq, size):
+    body = b'{"id": 1, "result": "0x%s"}' % (b'00' * size)
+    return json.dumps(
+        {
+            'attack': '',
+            'seq': seq,
+            'code': 200,
+            'timestamp': '2023-10-19T07:20:%02d.000000000Z' % (seq // 100),
+            # 2 ms + 10 ms per MB
+            'latency': 2_000_000 + 10 * len(body),
+            'bytes_out': 10,
+            'bytes_in': len(body),
+            'error': '',
+            'body': base64.b64encode(body).decode(),
+            'method': 'POST',
+            'url': 'http://localhost:8545',
+        }
+    )
+
+
+def _compute_deep_datum(n):
+    calls = [{'jsonrpc': '2.0', 'id': 1, 'method': 'eth_call', 'params': []}]
+    lines = [_json_result(seq, 100 * (seq % 50)) for seq in range(n)]
+    raw_output = ('\n'.join(lines) + '\n').encode()
+    return deep_utils.compute_deep_datum(raw_output, 100, n / 100, calls)
+
+
+def test_size_metrics():
+    category_data, *_, samples = _compute_deep_datum(3_000)
+    metrics = category_data['successful']
+    assert metrics['size_latency_slope'] == pytest.approx(0.01)
+    assert metrics['size_latency_intercept'] == pytest.approx(0.002)
+    assert metrics['response_size_max'] == 9_825
+    total_bytes = sum(25 + 200 * (seq % 50) for seq in range(3_000))
+    assert metrics['bytes_throughput'] == pytest.approx(
+        total_bytes / 29, rel=0.01
+    )
+    assert len(samples) == response_sizes.max_size_latency_samples
+    assert samples == sorted(samples)
+
+
+def test_size_samples_in_batches(monkeypatch):
+    expected = _compute_deep_datum(3_000)
+    monkeypatch.setattr(deep_utils, 'decode_batch_bytes', 20_000)
+    batched = _compute_deep_datum(3_000)
+    assert batched[5] == expected[5]
+    assert batched[0]['all'] == expected[0]['all']
+
+
+def test_fit_without_size_variation():
+    assert response_sizes.fit_latency_vs_size(10, 100, 10, 1_000, 100) is None
+    assert response_sizes.fit_latency_vs_size(1, 10, 1, 100, 10) is None
+
+
+def test_plot_latency_vs_size():
+    import matplotlib
+
+    matplotlib.use('Agg')
+    import flood
+
+    samples = _compute_deep_datum(500)[5]
+    flood.tests.load_tests.plot_latency_vs_size(
+        {'node': {'deep_size_latency_samples': [samples, None]}}
+    )
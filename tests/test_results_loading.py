@@ -0,0 +1,96 @@
+import json
+
+import flood
+from flood.cli import print_command
+from flood.runners.single_runner import single_runner_io
+
+
+def _result(warmup=None):
+    return {
+        'target_rate': [10, 20],
+        'throughput': [9.5, 19.0],
+        'deep_metrics': {'all': {'throughput': [9.5, 19.0]}},
+        'deep_rpc_error_pairs': [[], []],
+        'deep_failed_calls': [[], []],
+        'deep_slowest_calls': [
+            [
+                {
+                    'call_index': 0,
+                    'call': {'method': 'eth_blockNumber'},
+                    'latency': 0.5,
+                    'response_size': 10,
+                    'timestamp': '',
+                }
+            ],
+            None,
+        ],
+        'deep_size_latency_samples': [[[10, 0.5]], None],
+        'warmup': warmup,
+    }
+
+
+def test_load_results_without_deep_keys(tmp_path):
+    output_dir = str(tmp_path)
+    results = {'node': _result(warmup=_result()), 'other': _result()}
+    summary_results, deep_results = single_runner_io._split_deep_results(
+        results  # type: ignore
+    )
+    path = single_runner_io.get_single_run_results_path(output_dir)
+    with open(path, 'w') as f:
+        json.dump({'results': summary_results}, f)
+    path = single_runner_io.get_single_run_deep_results_path(output_dir)
+    with open(path, 'w') as f:
+        json.dump(deep_results, f)
+
+    summary = flood.load_single_run_results_payload(output_dir, deep=False)
+    for result in [summary['results']['node'], summary['results']['other']]:
+        assert result['throughput'] == [9.5, 19.0]
+        assert 'deep_metrics' in result
+        for key in single_runner_io._deep_result_keys:
+            assert key not in result
+    assert 'deep_slowest_calls' not in summary['results']['node']['warmup']
+
+    payload = flood.load_single_run_results_payload(output_dir)
+    assert payload['results'] == results
+
+
+def test_print_does_not_regenerate_test(tmp_path, capsys):
+    output_dir = str(tmp_path)
+    test_payload = {
+        'flood_version': flood.__version__,
+        'type': 'single_test',
+        'name': 'replay_test',
+        'test_parameters': {
+            'flood_version': flood.__version__,
+            'test_name': 'replay_test',
+            'rates': None,
+            'durations': None,
+            'vegeta_args': None,
+            'network': 'ethereum',
+            # calls would have to be decoded to regenerate the test
+            'replay': {
+                'mode': 'timed',
+                'speeds': [1.0, 2.0],
+                'n_requests': 100,
+                'duration': 10.0,
+                'requests': 'not a log',
+            },
+        },
+    }
+    path = single_runner_io.get_single_run_test_path(output_dir)
+    with open(path, 'w') as f:
+        json.dump(test_payload, f)
+    result = {
+        'target_rate': [10, 20],
+        'target_duration': [10.0, 5.0],
+        'success': [1.0, 1.0],
+        'throughput': [9.5, 19.0],
+        'p90': [0.1, 0.2],
+        'warmup': None,
+    }
+    path = single_runner_io.get_single_run_results_path(output_dir)
+    with open(path, 'w') as f:
+        json.dump({'nodes': {}, 'results': {'node': result}}, f)
+
+    print_command.print_single(output_dir, metrics=[])
+    assert 'replay_test' in capsys.readouterr().out
@@ -0,0 +1,140 @@
+import base64
+import json
+
+import polars as pl
+import pytest
+
+from flood.tests.load_tests import deep_utils
+from flood.tests.load_tests import slowest_calls
+
+
+def _json_result(seq, latency):
+    body = b'{"id": %d, "result": "0x1"}' % (seq % 10)
+    return json.dumps(
+        {
+            'attack': '',
+            'seq': seq,
+            'code': 200,
+            'timestamp': '2023-10-19T07:20:00.%09dZ' % seq,
+            'latency': latency,
+            'bytes_out': 10,
+            'bytes_in': len(body),
+            'error': '',
+            'body': base64.b64encode(body).decode(),
+            'method': 'POST',
+            'url': 'http://localhost:8545',
+        }
+    )
+
+
+def test_slowest_calls_in_batches(monkeypatch):
+    calls = [
+        {'jsonrpc': '2.0', 'id': i, 'method': 'eth_getBalance', 'params': [i]}
+        for i in range(10)
+    ]
+    latencies = [(7919 * seq) % 1_000_003 for seq in range(500)]
+    lines = [_json_result(seq, latencies[seq]) for seq in range(500)]
+    raw_output = ('\n'.join(lines) + '\n').encode()
+
+    expected = deep_utils.compute_deep_datum(raw_output, 100, 5, calls)[4]
+    monkeypatch.setattr(deep_utils, 'decode_batch_bytes', 5_000)
+    batched = deep_utils.compute_deep_datum(raw_output, 100, 5, calls)[4]
+
+    assert batched == expected
+    assert len(expected) == slowest_calls.max_slowest_calls
+    top_seqs = sorted(range(500), key=lambda seq: -latencies[seq])[:20]
+    assert [row['latency'] for row in expected] == [
+        latencies[seq] / 1e9 for seq in top_seqs
+    ]
+    assert [row['call'] for row in expected] == [
+        calls[seq % 10] for seq in top_seqs
+    ]
+    assert expected[0]['timestamp'].startswith('2023-10-19 07:20:00')
+
+
+def test_update_slowest_calls():
+    df = pl.DataFrame(
+        {
+            'call_index': [0, 1, 2],
+            'latency': [3, 1, 2],
+            'bytes_in': [10, 10, 10],
+            'timestamp': [0, 1, 2],
+        }
+    )
+    slowest = slowest_calls.update_slowest_calls(None, df, k=2)
+    slowest = slowest_calls.update_slowest_calls(slowest, df[1:], k=2)
+    assert slowest['call_index'].to_list() == [0, 2]
+
+
+def _slow_call(call_index, call, latency):
+    return {
+        'attack_index': None,
+        'call_index': call_index,
+        'call': call,
+        'latency': latency,
+        'response_size': 10,
+        'timestamp': '',
+    }
+
+
+def test_remeasure_slowest_calls(local_rpc_server):
+    # each attack has its own calls, so equal call indices of different
+    # attacks are different calls
+    attack_calls = [
+        [
+            {'jsonrpc': '2.0', 'id': i, 'method': 'eth_getBalance', 'params': [a, i]}  # noqa: E501
+            for i in range(3)
+        ]
+        for a in range(2)
+    ]
+    result = {
+        'deep_slowest_calls': [
+            [
+                _slow_call(1, attack_calls[0][1], 10.0),
+                _slow_call(1, attack_calls[0][1], 5.0),
+            ],
+            [
+                _slow_call(2, attack_calls[1][2], 1e-9),
+                _slow_call(1, attack_calls[1][1], 20.0),
+            ],
+        ],
+    }
+    slow_calls = slowest_calls.get_slowest_calls(result)
+    assert [
+        (row['attack_index'], row['call_index'], row['latency'])
+        for row in slow_calls
+    ] == [(1, 1, 20.0), (0, 1, 10.0), (1, 2, 1e-9)]
+    assert [row['call'] for row in slow_calls] == [
+        attack_calls[1][1],
+        attack_calls[0][1],
+        attack_calls[1][2],
+    ]
+
+    node = {
+        'name': 'local',
+        'url': local_rpc_server,
+        'remote': None,
+        'client_version': None,
+        'network': None,
+    }
+    remeasurements = slowest_calls.remeasure_slowest_calls(
+        node, slow_calls, n_repeats=2
+    )
+    assert [row['attack_index'] for row in remeasurements] == [1, 0, 1]
+    assert [row['intrinsic'] for row in remeasurements] == [
+        False,
+        False,
+        True,
+    ]
+    assert all(row['isolated_latency'] > 0 for row in remeasurements)
+
+    slow_calls[2]['latency'] = 0.0
+    remeasurements = slowest_calls.remeasure_slowest_calls(
+        node, slow_calls, n_repeats=1
+    )
+    assert remeasurements[2]['isolated_ratio'] is None
+    assert remeasurements[2]['intrinsic']
+
+    node['url'] = 'ws://127.0.0.1:8546'
+    with pytest.raises(Exception, match='http'):
+        slowest_calls.remeasure_slowest_calls(node, slow_calls)
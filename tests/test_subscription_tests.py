@@ -0,0 +1,40 @@
+import flood
+from flood.tests.subscription_tests import subscription_test_runs
+
+
+def test_subscription_stage(local_ws_rpc_server):
+    datum = flood.tests.run_subscription_stage(
+        url=local_ws_rpc_server,
+        subscription='newHeads',
+        n_subscribers=5,
+        duration=0.5,
+        late_threshold=0.2,
+    )
+    assert datum['n_subscribed'] == 5
+    assert datum['errors'] == []
+    assert datum['n_notifications'] >= 5
+    assert datum['n_deliveries'] == 5 * datum['n_notifications']
+    assert datum['delivery_rate'] == 1
+    assert datum['n_dropped'] == 0
+    assert 0 <= datum['delay_p50'] <= datum['delay_max'] < 0.2
+
+
+def test_dropped_and_late_notifications():
+    datum = subscription_test_runs._compute_stage_metrics(
+        n_subscribers=3,
+        subscribed=[0, 1, 2],
+        subscribe_times=[0.1, 0.2, 0.3],
+        arrivals={
+            'a': {0: 0, 1: int(0.5e9), 2: int(2e9)},
+            'b': {0: int(10e9), 2: int(10e9)},
+        },
+        late_threshold=1.0,
+        node_memory=None,
+        errors=[],
+    )
+    assert datum['n_notifications'] == 2
+    assert datum['n_deliveries'] == 5
+    assert datum['n_dropped'] == 1
+    assert datum['n_late'] == 1
+    assert datum['delivery_rate'] == 5 / 6
+    assert datum['delay_max'] == 2.0
@@ -0,0 +1,140 @@
+import datetime
+import gzip
+import json
+
+import pytest
+
+import flood
+
+
+def _call(method, id=1):
+    return {'jsonrpc': '2.0', 'id': id, 'method': method, 'params': []}
+
+
+@pytest.fixture
+def request_log(tmp_path):
+    """log with a burst at t=0 and a batch request at t=2"""
+    path = tmp_path / 'requests.ndjson'
+    lines = [
+        {'timestamp': 1697712000.0, 'body': _call('eth_blockNumber')},
+        {'timestamp': 1697712000.1, 'body': json.dumps(_call('eth_chainId'))},
+        {
+            'timestamp': 1697712002.0,
+            'body': [_call('eth_gasPrice'), _call('eth_chainId', id=2)],
+        },
+    ]
+    path.write_text(''.join(json.dumps(line) + '\n' for line in lines))
+    return str(path)
+
+
+def test_load_request_log_formats(tmp_path):
+    t = 1697712000.5
+    body = json.dumps(_call('eth_blockNumber'))
+    iso = datetime.datetime.fromtimestamp(t, tz=datetime.timezone.utc)
+    path = tmp_path / 'requests.log.gz'
+    with gzip.open(path, 'wt') as f:
+        f.write('%.3f %s\n' % (t + 2, body.replace('"', '\\x22')))
+        f.write('%.3f -\n' % (t + 3))
+        for timestamp in [int(t * 1e9), iso.isoformat(), int(t * 1e3) + 1]:
+            f.write(json.dumps({'timestamp': timestamp, 'body': body}) + '\n')
+    requests = flood.generators.load_request_log(str(path))
+    timestamps = [timestamp for timestamp, body in requests]
+    assert timestamps == pytest.approx([t, t, t + 0.001, t + 2])
+    assert all(body == _call('eth_blockNumber') for _, body in requests)
+
+
+def test_timed_replay(request_log):
+    replay = flood.generators.create_replay(request_log, speeds=[1, 4])
+    assert replay['n_requests'] == 3
+    assert replay['duration'] == 2
+    assert flood.generators.get_replay_timings(replay) == ([2, 3], [2, 1])
+
+    attacks = flood.generators.generate_replay_attacks(replay=replay)
+    assert [attack['offsets'] for attack in attacks] == [
+        [0, 0.1, 2],
+        [0, 0.025, 0.5],
+    ]
+
+    # batches stay batches, with unique ids across all calls
+    calls = attacks[0]['calls']
+    assert [call['method'] for call in calls[:2]] == [
+        'eth_blockNumber',
+        'eth_chainId',
+    ]
+    assert [call['method'] for call in calls[2]] == [
+        'eth_gasPrice',
+        'eth_chainId',
+    ]
+    assert [call['id'] for call in calls[:2]] == [1, 2]
+    assert [call['id'] for call in calls[2]] == [3, 4]
+
+
+def test_shuffled_replay(request_log):
+    replay = flood.generators.create_replay(request_log, shuffle=True)
+    attacks = flood.generators.generate_replay_attacks(
+        replay=replay, rates=[3, 5], durations=[2, 2]
+    )
+    requests = [request for attack in attacks for request in attack['calls']]
+    assert [len(attack['calls']) for attack in attacks] == [6, 10]
+    calls = [
+        call
+        for request in requests
+        for call in (request if isinstance(request, list) else [request])
+    ]
+    assert len({call['id'] for call in calls}) == len(calls)
+    assert all(attack['offsets'] is None for attack in attacks)
+
+    rerun = flood.generators.generate_replay_attacks(
+        replay=replay, rates=[3, 5], durations=[2, 2]
+    )
+    assert rerun == attacks
+
+    with pytest.raises(Exception):
+        flood.generators.create_replay(request_log, shuffle=True, speeds=[2])
+
+
+def test_persistent_attack_offsets(local_rpc_server):
+    engine = flood.tests.load_tests
+    calls = [_call('eth_blockNumber', id=i) for i in range(3)]
+    pool = engine.create_connection_pool(local_rpc_server)
+    try:
+        output, counts = engine.run_persistent_attack(
+            pool=pool, calls=calls, rate=1, duration=1, offsets=[0, 0, 0.3]
+        )
+    finally:
+        engine.close_connection_pool(pool)
+    results = [json.loads(line) for line in output.splitlines()]
+    assert len(results) == 3
+    timestamps = [
+        datetime.datetime.fromisoformat(result['timestamp'][:26])
+        for result in results
+    ]
+    assert (timestamps[1] - timestamps[0]).total_seconds() < 0.1
+    assert (timestamps[2] - timestamps[0]).total_seconds() >= 0.25
+
+
+def test_replayed_batches_are_deep_checked(request_log, local_rpc_server):
+    replay = flood.generators.create_replay(request_log, speeds=[100])
+    (attack,) = flood.generators.generate_replay_attacks(replay=replay)
+    engine = flood.tests.load_tests
+    pool = engine.create_connection_pool(local_rpc_server)
+    try:
+        output, counts = engine.run_persistent_attack(
+            pool=pool,
+            calls=attack['calls'],
+            rate=attack['rate'],
+            duration=attack['duration'],
+            offsets=attack['offsets'],
+        )
+    finally:
+        engine.close_connection_pool(pool)
+    deep_metrics, _, _, failed, *_ = engine.deep_utils.compute_deep_datum(
+        raw_output=output,
+        target_rate=attack['rate'],
+        target_duration=attack['duration'],
+        calls=attack['calls'],
+    )
+    # stand-in server echoes params, which is not a valid block number
+    assert deep_metrics['all']['n_calls'] == 4
+    assert deep_metrics['all']['n_failed_calls'] == 1
+    assert [call['call_index'] for call in failed] == [0]
@@ -0,0 +1,162 @@
+import base64
+import json
+
+import pytest
+
+import flood
+
+
+def test_requests_are_multiplexed(local_ws_rpc_server):
+    engine = flood.tests.load_tests
+    calls = [
+        {'jsonrpc': '2.0', 'id': 1, 'method': 'test_sleep', 'params': [0.3]},
+        {'jsonrpc': '2.0', 'id': 1, 'method': 'test_sleep', 'params': [0]},
+    ]
+    pool = engine.create_websocket_pool(local_ws_rpc_server)
+    try:
+        output, counts = engine.run_websocket_attack(
+            pool=pool, calls=calls, rate=40, duration=0.5
+        )
+    finally:
+        engine.close_websocket_pool(pool)
+
+    results = [json.loads(line) for line in output.splitlines()]
+    assert len(results) == 20
+    assert all(result['code'] == 200 for result in results)
+    for result in results:
+        response = json.loads(base64.b64decode(result['body']))
+        assert response['id'] == 1
+        assert response['result'] == calls[result['seq'] % 2]['params']
+
+    # slow responses did not block fast responses on the same connection
+    slow = [r['latency'] for r in results if r['seq'] % 2 == 0]
+    fast = [r['latency'] for r in results if r['seq'] % 2 == 1]
+    assert max(fast) < min(slow)
+    assert counts == {'opened': 1, 'reused': 19, 'dropped': 0}
+
+
+def test_connections_persist_across_attacks(local_ws_rpc_server):
+    engine = flood.tests.load_tests
+    calls = [
+        {'jsonrpc': '2.0', 'id': i, 'method': 'eth_blockNumber', 'params': [i]}
+        for i in range(10)
+    ]
+    batches = [calls[:5], calls[5:]]
+    pool = engine.create_websocket_pool(local_ws_rpc_server, n_connections=3)
+    try:
+        _, first_counts = engine.run_websocket_attack(
+            pool=pool, calls=calls, rate=20, duration=0.5
+        )
+        output, second_counts = engine.run_websocket_attack(
+            pool=pool, calls=batches, rate=20, duration=0.5
+        )
+    finally:
+        engine.close_websocket_pool(pool)
+
+    assert first_counts == {'opened': 3, 'reused': 7, 'dropped': 0}
+    assert second_counts == {'opened': 0, 'reused': 10, 'dropped': 0}
+    for line in output.splitlines():
+        result = json.loads(line)
+        response = json.loads(base64.b64decode(result['body']))
+        batch = batches[result['seq'] % 2]
+        assert [item['id'] for item in response] == [
+            call['id'] for call in batch
+        ]
+
+
+def test_null_id_errors_fail_pending_requests(local_ws_rpc_server):
+    engine = flood.tests.load_tests
+    calls = [{'jsonrpc': '2.0', 'id': 1, 'method': 'test_invalid'}]
+    pool = engine.create_websocket_pool(local_ws_rpc_server)
+    try:
+        output, _ = engine.run_websocket_attack(
+            pool=pool, calls=calls, rate=20, duration=0.5
+        )
+    finally:
+        engine.close_websocket_pool(pool)
+
+    results = [json.loads(line) for line in output.splitlines()]
+    assert len(results) == 10
+    for result in results:
+        assert result['error'] == ''
+        assert result['latency'] < 1e9
+        response = json.loads(base64.b64decode(result['body']))
+        assert response['error']['code'] == -32600
+
+
+def test_invalid_url():
+    with pytest.raises(Exception):
+        flood.tests.load_tests.create_websocket_pool('http://localhost:8545')
+
+
+def test_ipc_attack(local_ipc_rpc_server):
+    engine = flood.tests.load_tests
+    calls = [
+        {'jsonrpc': '2.0', 'id': i, 'method': 'eth_blockNumber', 'params': [i]}
+        for i in range(10)
+    ]
+    pool = engine.create_ipc_pool(local_ipc_rpc_server, n_connections=2)
+    try:
+        output, counts = engine.run_websocket_attack(
+            pool=pool, calls=calls, rate=40, duration=0.5
+        )
+    finally:
+        engine.close_websocket_pool(pool)
+
+    results = [json.loads(line) for line in output.splitlines()]
+    assert len(results) == 20
+    for result in results:
+        assert result['code'] == 200
+        assert result['method'] == 'IPC'
+        response = json.loads(base64.b64decode(result['body']))
+        assert response['id'] == result['seq'] % 10
+        assert response['result'] == [result['seq'] % 10]
+    assert counts == {'opened': 2, 'reused': 18, 'dropped': 0}
+
+
+def test_ipc_large_responses(local_ipc_rpc_server):
+    engine = flood.tests.load_tests
+    params = ['{"[\\' * 100_000, ['}]'] * 1_000, '\u00e9' * 1_000]
+    calls = [{'jsonrpc': '2.0', 'id': 1, 'method': 'test', 'params': params}]
+    pool = engine.create_ipc_pool(local_ipc_rpc_server)
+    try:
+        output, _ = engine.run_websocket_attack(
+            pool=pool, calls=calls, rate=10, duration=0.5
+        )
+    finally:
+        engine.close_websocket_pool(pool)
+
+    results = [json.loads(line) for line in output.splitlines()]
+    assert len(results) == 5
+    for result in results:
+        assert result['code'] == 200
+        response = json.loads(base64.b64decode(result['body']))
+        assert response['result'] == params
+
+
+def test_parse_ipc_node():
+    node = flood.user_io.parse_node('/tmp/geth.ipc', request_metadata=False)
+    assert node['url'] == 'ipc:///tmp/geth.ipc'
+    node = flood.user_io.parse_node(
+        'remote:/data/geth.ipc', request_metadata=False
+    )
+    assert node['url'] == 'ipc:///data/geth.ipc'
+    assert node['remote'] == 'remote'
+    node = flood.user_io.parse_node(
+        'ipcnode.example:8545', request_metadata=False
+    )
+    assert node['url'] == 'https://ipcnode.example:8545'
+
+
+def test_request_node_over_websocket_and_ipc(
+    local_ws_rpc_server, local_ipc_rpc_server
+):
+    for url in [local_ws_rpc_server, 'ipc://' + local_ipc_rpc_server]:
+        result = flood.user_io.inputs._request_node(
+            url=url, remote=None, method='eth_getBalance', params=['0x1']
+        )
+        assert result == ['0x1']
+    with pytest.raises(Exception, match='remote'):
+        flood.user_io.inputs._request_node(
+            url=local_ws_rpc_server, remote='host', method='eth_blockNumber'
+        )
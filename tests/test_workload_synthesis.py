@@ -0,0 +1,144 @@
+import collections
+import json
+
+import pytest
+
+import flood
+
+
+popular = '0x' + 'a' * 40
+unpopular = '0x' + 'b' * 40
+contract = '0x' + 'c' * 40
+
+
+@pytest.fixture
+def request_log(tmp_path):
+    """bursty log of eth_call, eth_getLogs, eth_getBalance, eth_blockNumber"""
+    lines = []
+    for i in range(100):
+        # bursts of 10 requests every second
+        timestamp = 1697712000 + (i // 10) + (i % 10) * 0.001
+        if i % 2 == 0:
+            sender = unpopular if i % 10 == 0 else popular
+            transaction = {'from': sender, 'to': contract, 'data': '0x18160ddd'}
+            params = [transaction, hex(1000 - i)]
+            call = {'method': 'eth_call', 'params': params}
+        elif i % 4 == 1:
+            call = {
+                'method': 'eth_getLogs',
+                'params': [
+                    {'fromBlock': hex(900 - i), 'toBlock': hex(910 - i)}
+                ],
+            }
+        elif i % 8 == 3:
+            call = {'method': 'eth_getBalance', 'params': [popular, 'latest']}
+        else:
+            call = {'method': 'eth_blockNumber', 'params': []}
+        call = dict(call, jsonrpc='2.0', id=i)
+        lines.append({'timestamp': timestamp, 'body': call})
+    path = tmp_path / 'requests.ndjson'
+    path.write_text(''.join(json.dumps(line) + '\n' for line in lines))
+    return str(path)
+
+
+def test_fit_workload_model(request_log):
+    model = flood.generators.fit_workload_model(request_log)
+    assert model['n_requests'] == 100
+    assert model['head_block'] == 1000
+    assert model['burstiness'] > 1
+
+    methods = model['methods']
+    assert methods['eth_call']['weight'] == 0.5
+    assert methods['eth_getLogs']['weight'] == 0.25
+    assert methods['eth_call']['addresses'] == {
+        '0.from': {popular: 40, unpopular: 10}
+    }
+    assert methods['eth_getBalance']['addresses'] == {'0': {popular: 13}}
+    assert methods['eth_getLogs']['addresses'] == {}
+    assert methods['eth_call']['block_age_quantiles'][0] == 0
+    assert methods['eth_call']['block_age_quantiles'][-1] == 98
+    assert set(methods['eth_getLogs']['log_range_quantiles']) == {10}
+    assert methods['eth_blockNumber']['block_age_quantiles'] is None
+    json.dumps(model)
+
+
+def test_synthesized_attacks(request_log):
+    model = flood.generators.fit_workload_model(request_log)
+    rates = flood.generators.get_growth_rates(model, [1, 10])
+    attacks = flood.generators.generate_synthesized_attacks(
+        workload_model=model, rates=rates, durations=[4, 4]
+    )
+    assert rates == [11, 111]
+
+    calls = [call for attack in attacks for call in attack['calls']]
+    assert len({call['id'] for call in calls}) == len(calls)
+    for attack in attacks:
+        counts = collections.Counter(call['method'] for call in attack['calls'])
+        n_calls = attack['rate'] * attack['duration']
+        assert counts['eth_call'] == n_calls / 2
+        assert counts['eth_getLogs'] == n_calls / 4
+        offsets = attack['offsets']
+        assert len(offsets) == n_calls
+        assert offsets == sorted(offsets)
+        assert offsets[0] == 0 and offsets[-1] < attack['duration']
+
+    # parameters are resampled from fitted distributions at known positions
+    for call in calls:
+        if call['method'] == 'eth_call':
+            assert call['params'][0]['from'] in [popular, unpopular]
+            assert call['params'][0]['to'] == contract
+            assert call['params'][0]['data'] == '0x18160ddd'
+            assert 902 <= int(call['params'][1], 16) <= 1000
+        elif call['method'] == 'eth_getBalance':
+            assert call['params'] == [popular, 'latest']
+        elif call['method'] == 'eth_getLogs':
+            log_filter = call['params'][0]
+            from_block = int(log_filter['fromBlock'], 16)
+            to_block = int(log_filter['toBlock'], 16)
+            assert to_block - from_block == 10
+
+    # synthesis is seeded, so reruns send the same requests
+    rerun = flood.generators.generate_synthesized_attacks(
+        workload_model=model, rates=rates, durations=[4, 4]
+    )
+    assert rerun == attacks
+
+
+def test_workload_model_requires_synth_test_name(request_log):
+    model = flood.generators.fit_workload_model(request_log)
+    with pytest.raises(Exception, match='workload_model must be specified'):
+        flood.generate_test(
+            test_name='eth_call',
+            workload_model=model,
+            rates=[10],
+            durations=[1],
+            network='ethereum',
+            flood_version=flood.__version__,
+        )
+
+
+def test_synthesized_generator_calls():
+    from flood.generators.test_generators import synthesized_test_generators
+
+    method_model = {
+        'weight': 1.0,
+        'templates': [[unpopular, hex(990)]],
+        'block_age_quantiles': [0, 10],
+        'log_range_quantiles': None,
+        'addresses': {'0': {popular: 3, unpopular: 1}},
+    }
+    rng = flood.generators.get_rng(random_seed=0)
+    calls = synthesized_test_generators._synthesize_method_calls(
+        method='eth_getTransactionCount',
+        method_model=method_model,
+        head_block=1000,
+        n=100,
+        rng=rng,
+        network='ethereum',
+    )
+    addresses = collections.Counter(call['params'][0] for call in calls)
+    assert set(addresses) == {popular, unpopular}
+    assert addresses[popular] > addresses[unpopular]
+    for call in calls:
+        assert call['method'] == 'eth_getTransactionCount'
+        assert 990 <= int(call['params'][1], 16) <= 1000